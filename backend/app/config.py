@@ -19,14 +19,59 @@ class AppSettings(BaseSettings):
     allowed_origins: str = "http://localhost:4321"
     max_file_size_mb: int = 50
     max_files: int = 20
-    max_concurrent_analyses: int = 5
+    max_concurrent_analyses: int = 5  # pipelines running at once; the rest wait in the scheduler
+    analysis_max_per_user: int = 2  # running analyses per user (0 = no cap)
+    analysis_interactive_reserve: int = 1  # run slots batch analyses may not take
+    analysis_user_weights: str = ""  # fair-share weights, e.g. "user_a=2,user_b=0.5" (default 1)
+    job_queue_path: str = ""  # SQLite analysis job queue; "" = {temp_dir}/jobs.sqlite3
+    job_worker_embedded: bool = True  # run a pipeline worker in the API process (False = enqueue only)
+    job_lease_seconds: int = 60  # a job is re-queued when its worker misses heartbeats this long
+    job_max_attempts: int = 3  # claims per job before a lost worker fails the analysis
+    job_poll_seconds: float = 1.0  # idle workers check the queue this often
+    job_drain_seconds: int = 30  # on shutdown, running analyses get this long before re-queueing
     temp_dir: str = "/tmp/foxdoc"
+    workspace_ttl_hours: int = 24  # leftover analysis workspaces / scratch older than this are deleted
+    workspace_quota_mb: int = 20480  # disk cap for all workspaces under temp_dir (0 = unlimited)
+    workspace_quota_wait_s: int = 30  # uploads wait this long for space before 503
+    workspace_hot_dir: str = ""  # tmpfs dir (e.g. /dev/shm/foxdoc) for scratch files; "" = disk
+    archive_max_total_mb: int = 2048  # bytes one upload may unpack from its archives
+    archive_max_files: int = 5000  # files one upload may unpack from its archives
+    archive_max_ratio: int = 100  # uncompressed/compressed limit per archive member
+    archive_workers: int = 4  # archive members / nested archives decompressed in parallel
+    archive_memory_member_kb: int = 4096  # ZIP members up to this size are parsed from memory (0 = always disk)
+    archive_memory_total_mb: int = 256  # in-memory member bytes one upload may hold
     parser_force_backend_text: bool = False
     parser_doc_timeout: int = 120
-    parser_max_concurrent: int = 2
+    parser_max_concurrent: int = 2  # parse worker processes (0 = all cores)
+    parser_backend: str = "process"  # "process" (ProcessPoolExecutor) or "thread"
+    parser_pdf_engine: str = "auto"  # "auto", "pypdfium2", "pypdf", "docling"
+    parser_pdf_split_pages: int = 200  # PDFs above this page count parse in parallel ranges (0 = off)
+    parse_cache_enabled: bool = True
+    parse_cache_dir: str = ""  # empty = {temp_dir}/parse_cache
+    parse_cache_max_mb: int = 1024
+    extraction_cache_enabled: bool = True  # reuse LLM extractions of identical documents/chunks
+    extraction_cache_dir: str = ""  # empty = {temp_dir}/extraction_cache
+    extraction_cache_max_mb: int = 512
+    extraction_cache_ttl_hours: int = 168  # entries older than this are extracted again (0 = never expire)
+    docling_service_url: str = ""  # "" = in-process Docling; http://127.0.0.1:8765 or unix:///path.sock
+    docling_service_timeout: int = 600  # seconds per conversion request, queue wait included
+    docling_service_workers: int = 1  # conversions run concurrently inside the service
+    docling_service_queue_size: int = 16  # jobs allowed to wait before the service answers 503
     ocr_enabled: bool = True
     ocr_scanned_threshold: int = 100  # chars per page — below = scanned
     ocr_pdf_engine: str = "native"  # "native", "mistral-ocr", "pdf-text"
+    ocr_cpu_budget: int = 0  # cores local OCR may use across all scans (0 = half the cores)
+    ocr_pages_per_job: int = 8  # scanned PDF pages per OCR job — the unit of parallelism
+    ocr_threads_per_job: int = 1  # RapidOCR threads inside one job (budget / threads = parallel jobs)
+    ocr_image_preset: str = "balanced"  # scan preprocessing: "off", "fast", "balanced", "quality"
+    extraction_max_concurrent: int = 5  # documents in LLM extraction at once per analysis
+    event_flush_interval_ms: int = 250  # pipeline progress events are written in batches this often
+    event_flush_batch: int = 50  # ...or as soon as this many are waiting
+    amendment_max_changed_ratio: float = 0.5  # amended document re-extracted whole above this changed share
+    llm_provider_max_concurrent: int = 16  # ceiling of in-flight LLM requests per provider, all analyses
+    llm_model_max_concurrent: int = 8  # ceiling of in-flight LLM requests per model, all analyses
+    llm_initial_concurrent: int = 4  # starting limit; grows while latency holds, halves on 429
+    llm_latency_tolerance: float = 2.0  # stop growing once latency exceeds this × its baseline
 
 
 @lru_cache
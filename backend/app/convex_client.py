@@ -83,13 +83,27 @@ class ConvexDB:
     #  Analyses
     # ------------------------------------------------------------------ #
 
-    async def create_analysis(self, model: str, user_id: str | None = None) -> str:
-        """Create a new analysis record and return its ID."""
+    async def create_analysis(
+        self,
+        model: str,
+        user_id: str | None = None,
+        fingerprint: str | None = None,
+        params_json: dict | None = None,
+    ) -> str:
+        """Create a new analysis record and return its ID.
+
+        ``params_json`` holds the run settings besides the model (analysis_type,
+        custom_instructions, thinking, origin) — the amend endpoint reruns with them.
+        """
         if self.is_convex:
             try:
                 args: dict[str, Any] = {"model": model, "status": "pending"}
                 if user_id:
                     args["user_id"] = user_id
+                if fingerprint:
+                    args["fingerprint"] = fingerprint
+                if params_json:
+                    args["params_json"] = params_json
                 result = self._client.mutation(
                     "analyses:create",
                     args,
@@ -114,6 +128,10 @@ class ConvexDB:
             }
             if user_id:
                 record["user_id"] = user_id
+            if fingerprint:
+                record["fingerprint"] = fingerprint
+            if params_json:
+                record["params_json"] = params_json
             self._table("analyses")[aid] = record
             return aid
 
@@ -152,6 +170,32 @@ class ConvexDB:
             record = self._table("analyses").get(analysis_id)
             return dict(record) if record is not None else None
 
+    async def find_completed_analysis(
+        self, fingerprint: str, user_id: str | None = None
+    ) -> Optional[dict]:
+        """Newest completed analysis of *user_id* with this tender fingerprint."""
+        if self.is_convex:
+            try:
+                args: dict[str, Any] = {"fingerprint": fingerprint}
+                if user_id:
+                    args["user_id"] = user_id
+                return self._client.query("analyses:findCompletedByFingerprint", args)
+            except Exception as e:
+                logger.error("Convex find_completed_analysis failed: %s", e)
+                raise
+
+        async with self._lock:
+            matches = [
+                r
+                for r in self._table("analyses").values()
+                if r.get("fingerprint") == fingerprint
+                and r.get("status") == "completed"
+                and r.get("user_id") == (user_id or None)
+            ]
+            if not matches:
+                return None
+            return dict(max(matches, key=lambda r: r.get("_creationTime", "")))
+
     async def list_analyses(self, limit: int = 20, offset: int = 0) -> list[dict]:
         """List analyses sorted by creation time descending."""
         if self.is_convex:
@@ -430,6 +474,29 @@ class ConvexDB:
                 record["events_json"] = []
             record["events_json"].append(event)
 
+    async def append_events(self, analysis_id: str, events: list[dict]) -> None:
+        """Append several pipeline events in one write (see services/event_buffer.py)."""
+        if not events:
+            return
+        if self.is_convex:
+            try:
+                self._client.mutation(
+                    "analyses:appendEvents",
+                    {"id": analysis_id, "events": events},
+                )
+                return
+            except Exception as e:
+                logger.error("Convex append_events failed: %s", e)
+                raise
+
+        async with self._lock:
+            record = self._table("analyses").get(analysis_id)
+            if record is None:
+                raise KeyError(f"Analysis {analysis_id} not found")
+            if record.get("events_json") is None:
+                record["events_json"] = []
+            record["events_json"].extend(events)
+
     async def get_events(
         self, analysis_id: str, since_index: int = 0
     ) -> list[dict]:
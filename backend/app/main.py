@@ -15,8 +15,42 @@ from fastapi.middleware.cors import CORSMiddleware
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan: startup and shutdown hooks."""
+    import asyncio
+
+    from app.config import get_settings
+    from app.services import docling_client
+    from app.services.ocr_scheduler import shutdown_ocr_pool
+    from app.services.parse_pool import shutdown_pool, start_pool
+    from app.services.pipeline_worker import get_pipeline_worker
+    from app.services.workspace import get_workspace_manager
+
+    settings = get_settings()
+
+    await start_pool()  # spawn + warm parse workers before the first upload
+    # Sweep workspaces left by a previous run, then keep collecting expired ones
+    workspace_gc = asyncio.create_task(get_workspace_manager().run_gc())
+    if docling_client.service_configured():
+        loop = asyncio.get_running_loop()
+        healthy = await loop.run_in_executor(None, docling_client.check_health, True)
+        logging.getLogger(__name__).info(
+            "Docling service %s: %s",
+            docling_client.service_url(),
+            "healthy" if healthy else "UNAVAILABLE",
+        )
+    # Claim analysis jobs here too unless only dedicated workers should run them
+    worker_task = None
+    if settings.job_worker_embedded:
+        worker_task = asyncio.create_task(get_pipeline_worker().run())
     yield
-    # Cleanup if needed (e.g. close LLM client connections)
+    if worker_task is not None:
+        # Hand unfinished analyses back with their checkpoints flushed, so a
+        # worker (this one after a redeploy) resumes them where they stopped
+        await get_pipeline_worker().drain(settings.job_drain_seconds)
+        worker_task.cancel()
+    workspace_gc.cancel()
+    shutdown_pool()
+    shutdown_ocr_pool()
+    docling_client.close_client()
 
 
 app = FastAPI(
@@ -46,4 +80,20 @@ app.include_router(user.router)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    import asyncio
+
+    from app.services.analysis_scheduler import get_analysis_scheduler
+    from app.services.job_queue import get_job_queue
+    from app.services.llm_governor import get_llm_governor
+    from app.services.workspace import get_workspace_manager
+
+    loop = asyncio.get_running_loop()
+    workspaces = await loop.run_in_executor(None, get_workspace_manager().stats)
+    jobs = await loop.run_in_executor(None, get_job_queue().stats)
+    return {
+        "status": "ok",
+        "workspaces": workspaces,
+        "jobs": jobs,
+        "analyses": get_analysis_scheduler().stats(),
+        "llm": get_llm_governor().stats(),
+    }
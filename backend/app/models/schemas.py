@@ -444,6 +444,8 @@ class AnalysisProgress(BaseModel):
     documents_parsed: int = 0
     documents_total: int = 0
     error: Optional[str] = None
+    queue_position: Optional[int] = None  # while pending: analyses that start first
+    eta_seconds: Optional[int] = None  # while pending: rough wait until it starts
 
 
 class AnalysisSummary(BaseModel):
@@ -1,21 +1,27 @@
 # backend/app/routers/analyze.py
-# Analysis endpoints: upload, status, stream, export, chat, history, delete
+# Analysis endpoints: upload, status, stream, export, chat, history, delete,
+# cancel, resume, amend
 # Main API surface for the procurement analysis workflow
-# Related: services/pipeline.py, services/chat.py, services/exporter.py
+# Related: services/pipeline.py, services/job_queue.py (analysis jobs),
+#          services/amendment.py, services/chat.py, services/exporter.py
 
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
-import tempfile
+import shutil
+import uuid
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Query, UploadFile
 from fastapi.responses import FileResponse
 from sse_starlette.sse import EventSourceResponse
+from starlette.background import BackgroundTask
 
 from app.config import AppSettings, get_settings
 from app.convex_client import ConvexDB, get_db
@@ -32,6 +38,16 @@ from app.models.schemas import (
     QAEvaluation,
     SourceDocument,
 )
+from app.services.analysis_scheduler import (
+    ORIGINS,
+    QueueInfo,
+    get_analysis_scheduler,
+    priority_of,
+)
+from app.services.job_queue import QUEUED, RUNNING, get_job_queue
+from app.services.pipeline_worker import get_pipeline_worker
+from app.services.tender_fingerprint import reuse_completed_analysis, tender_fingerprint
+from app.services.workspace import WorkspaceQuotaExceeded, get_workspace_manager
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +67,7 @@ MAX_FILES = 20
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
 
-def _build_progress(record: dict) -> AnalysisProgress:
+async def _build_progress(record: dict) -> AnalysisProgress:
     """Build an AnalysisProgress from a DB analysis record."""
     status = record.get("status", "pending")
     events = record.get("events_json") or []
@@ -83,6 +99,18 @@ def _build_progress(record: dict) -> AnalysisProgress:
         extraction_pct = int(extraction_done / docs_total * 100)
         progress_pct = 40 + int(extraction_pct * 0.30)  # 40% → 70%
 
+    # Waiting in the job queue or for a run slot in the analysis scheduler
+    queue = None
+    if status == "pending" and record.get("_id"):
+        scheduler = get_analysis_scheduler()
+        queue = scheduler.queue_info(record["_id"])
+        if queue is None:
+            position = await asyncio.get_running_loop().run_in_executor(
+                None, get_job_queue().position, record["_id"],
+            )
+            if position is not None:
+                queue = QueueInfo(position, scheduler.eta_seconds(position))
+
     return AnalysisProgress(
         status=AnalysisStatus(status),
         progress_percent=progress_pct,
@@ -90,6 +118,8 @@ def _build_progress(record: dict) -> AnalysisProgress:
         documents_parsed=docs_parsed,
         documents_total=docs_total,
         error=record.get("error"),
+        queue_position=queue.position if queue else None,
+        eta_seconds=queue.eta_seconds if queue else None,
     )
 
 
@@ -109,7 +139,75 @@ def _status_label(status: str) -> str | None:
     return labels.get(status)
 
 
-def _build_detail(record: dict, documents: list[dict]) -> AnalysisDetail:
+async def _validate_uploads(files: list[UploadFile]) -> tuple[int, list[str]]:
+    """Check count, formats and sizes; returns (total bytes, SHA-256 per file)."""
+    # ── Validate file count
+    if len(files) > MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Maximum is {MAX_FILES}, got {len(files)}.",
+        )
+
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded.")
+
+    # ── Validate each file
+    upload_bytes = 0
+    file_hashes: list[str] = []
+    for f in files:
+        # Check extension
+        if f.filename:
+            ext = Path(f.filename).suffix.lower()
+            if ext not in SUPPORTED_EXTENSIONS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unsupported file format: {f.filename}. "
+                    f"Supported: {', '.join(sorted(SUPPORTED_EXTENSIONS))}",
+                )
+
+        # Check size (read content to get actual size)
+        content = await f.read()
+        if len(content) > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File {f.filename} exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit.",
+            )
+        upload_bytes += len(content)
+        file_hashes.append(hashlib.sha256(content).hexdigest())
+        # Seek back so we can read again when saving
+        await f.seek(0)
+    return upload_bytes, file_hashes
+
+
+async def _wait_for_space(upload_bytes: int, settings: AppSettings) -> None:
+    """Backpressure: wait for room under the workspace disk quota, else 503."""
+    try:
+        await get_workspace_manager().wait_for_space(
+            upload_bytes, timeout=settings.workspace_quota_wait_s,
+        )
+    except WorkspaceQuotaExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server is busy: {e}. Try again later.",
+            headers={"Retry-After": "60"},
+        )
+
+
+async def _save_uploads(files: list[UploadFile], uploads: Path) -> list[Path]:
+    upload_paths: list[Path] = []
+    for f in files:
+        if not f.filename:
+            continue
+        file_path = uploads / f.filename
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        content = await f.read()
+        file_path.write_bytes(content)
+        upload_paths.append(file_path)
+        logger.info("Saved upload: %s (%d bytes)", f.filename, len(content))
+    return upload_paths
+
+
+async def _build_detail(record: dict, documents: list[dict]) -> AnalysisDetail:
     """Build an AnalysisDetail response from DB records."""
     report = None
     if record.get("report_json"):
@@ -148,7 +246,7 @@ def _build_detail(record: dict, documents: list[dict]) -> AnalysisDetail:
         id=record["_id"],
         created_at=created_at,
         status=AnalysisStatus(record.get("status", "pending")),
-        progress=_build_progress(record),
+        progress=await _build_progress(record),
         report=report,
         qa=qa,
         documents=source_docs,
@@ -165,117 +263,95 @@ async def create_analysis(
     analysis_type: str = Form("detailed"),
     custom_instructions: str = Form(""),
     thinking: str = Form(""),
+    origin: str = Form("interactive"),
+    force: bool = Form(False),
     user_id: str = Depends(require_auth),
     db: ConvexDB = Depends(get_db),
     settings: AppSettings = Depends(get_settings),
 ):
-    """Upload files and start analysis. Returns analysis ID immediately."""
+    """Upload files and start analysis. Returns analysis ID immediately.
 
-    # ── Validate file count
-    if len(files) > MAX_FILES:
+    ``origin`` is "interactive" (a user waiting in the UI) or "batch"
+    (scripted submissions); batch analyses queue behind interactive ones.
+
+    Identical files with identical settings reuse the user's completed
+    analysis of them — the response is then already ``completed``.
+    ``force`` runs the pipeline regardless.
+    """
+
+    if origin not in ORIGINS:
         raise HTTPException(
             status_code=400,
-            detail=f"Too many files. Maximum is {MAX_FILES}, got {len(files)}.",
+            detail=f"Invalid origin: {origin}. Expected one of: {', '.join(ORIGINS)}",
         )
 
-    if not files:
-        raise HTTPException(status_code=400, detail="No files uploaded.")
-
-    # ── Validate each file
-    for f in files:
-        # Check extension
-        if f.filename:
-            ext = Path(f.filename).suffix.lower()
-            if ext not in SUPPORTED_EXTENSIONS:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Unsupported file format: {f.filename}. "
-                    f"Supported: {', '.join(sorted(SUPPORTED_EXTENSIONS))}",
-                )
+    upload_bytes, file_hashes = await _validate_uploads(files)
 
-        # Check size (read content to get actual size)
-        content = await f.read()
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File {f.filename} exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit.",
-            )
-        # Seek back so we can read again when saving
-        await f.seek(0)
-
-    # ── Save files to temp directory
-    temp_dir = Path(tempfile.mkdtemp(prefix="procurement_upload_"))
-    upload_paths: list[Path] = []
-
-    for f in files:
-        if not f.filename:
-            continue
-        file_path = temp_dir / f.filename
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        content = await f.read()
-        file_path.write_bytes(content)
-        upload_paths.append(file_path)
-        logger.info("Saved upload: %s (%d bytes)", f.filename, len(content))
+    # ── Short-circuit: the same tender was already analysed with these settings
+    fingerprint = tender_fingerprint(
+        file_hashes,
+        model=model,
+        analysis_type=analysis_type,
+        custom_instructions=custom_instructions,
+        thinking=thinking,
+    )
+    params = {
+        "analysis_type": analysis_type,
+        "custom_instructions": custom_instructions,
+        "thinking": thinking,
+        "origin": origin,
+    }
+    if not force:
+        reused_id = await reuse_completed_analysis(db, fingerprint, user_id, model, params)
+        if reused_id is not None:
+            record = await db.get_analysis(reused_id)
+            if record is None:
+                raise HTTPException(status_code=500, detail="Failed to create analysis record")
+            return await _build_detail(record, await db.get_documents(reused_id))
+
+    # ── Backpressure: wait for room under the workspace disk quota
+    workspaces = get_workspace_manager()
+    await _wait_for_space(upload_bytes, settings)
 
     # ── Create DB record
-    analysis_id = await db.create_analysis(model=model, user_id=user_id)
+    analysis_id = await db.create_analysis(
+        model=model, user_id=user_id, fingerprint=fingerprint, params_json=params,
+    )
     logger.info("Created analysis %s with model %s", analysis_id, model)
 
-    # ── Spawn background pipeline task
-    async def _run_pipeline():
-        try:
-            from app.services.llm import LLMClient
-            from app.services.pipeline import AnalysisPipeline
-
-            api_key = settings.openrouter_api_key
-            # Check if API key is in DB settings
-            if not api_key:
-                db_key = await db.get_setting("openrouter_api_key")
-                if db_key:
-                    api_key = db_key
-
-            if not api_key:
-                await db.update_analysis(
-                    analysis_id,
-                    status="failed",
-                    error="OpenRouter API key not configured. Set it in Settings.",
-                )
-                return
-
-            llm = LLMClient(api_key=api_key, default_model=model)
-            try:
-                pipeline = AnalysisPipeline(
-                    analysis_id=analysis_id,
-                    db=db,
-                    llm=llm,
-                    model=model,
-                    api_key=api_key,
-                    analysis_type=analysis_type,
-                    custom_instructions=custom_instructions,
-                    thinking_override=thinking,
-                )
-                await pipeline.run(upload_paths)
-            finally:
-                await llm.close()
-        except Exception as e:
-            logger.error("Pipeline failed for %s: %s", analysis_id, e, exc_info=True)
-            try:
-                await db.update_analysis(
-                    analysis_id,
-                    status="failed",
-                    error=str(e),
-                )
-            except Exception:
-                logger.error("Failed to update analysis status to failed")
+    # ── Save files to the analysis workspace
+    workspace = workspaces.create(analysis_id)
+    upload_paths = await _save_uploads(files, workspace.uploads)
 
-    asyncio.create_task(_run_pipeline())
+    # ── Enqueue the pipeline job — a pipeline worker claims and runs it
+    payload = {
+        "user_id": user_id,
+        "model": model,
+        **params,
+        "uploads": [str(path.relative_to(workspace.uploads)) for path in upload_paths],
+    }
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        None,
+        partial(
+            get_job_queue().enqueue,
+            analysis_id,
+            payload,
+            user_id=user_id,
+            priority=priority_of(analysis_type, origin),
+        ),
+    )
+    if settings.job_worker_embedded:
+        get_pipeline_worker().wake()
+    else:
+        workspaces.detach(analysis_id)  # owned by whichever worker claims the job
 
     # ── Return immediate response
     record = await db.get_analysis(analysis_id)
     if record is None:
         raise HTTPException(status_code=500, detail="Failed to create analysis record")
 
-    return _build_detail(record, [])
+    return await _build_detail(record, [])
 
 
 @router.get("/analyze/{analysis_id}", response_model=AnalysisDetail)
@@ -289,7 +365,7 @@ async def get_analysis(
         raise HTTPException(status_code=404, detail="Analysis not found")
 
     documents = await db.get_documents(analysis_id)
-    return _build_detail(record, documents)
+    return await _build_detail(record, documents)
 
 
 @router.get("/analyze/{analysis_id}/stream")
@@ -309,6 +385,7 @@ async def stream_analysis_progress(
 
         last_event_index = 0
         last_status = None
+        last_queue_state = (None, None)
 
         while True:
             try:
@@ -363,8 +440,9 @@ async def stream_analysis_progress(
                     last_event_index += 1
 
                 # Emit status change (uppercase for frontend compatibility)
-                if current_status != last_status:
-                    progress = _build_progress(record)
+                progress = await _build_progress(record)
+                queue_state = (progress.queue_position, progress.eta_seconds)
+                if current_status != last_status or queue_state != last_queue_state:
                     progress_dict = progress.model_dump()
                     progress_dict["status"] = progress_dict["status"].upper()
                     yield {
@@ -372,11 +450,12 @@ async def stream_analysis_progress(
                         "data": json.dumps(progress_dict),
                     }
                     last_status = current_status
+                    last_queue_state = queue_state
 
                 # Close on terminal status
                 if current_status in ("completed", "failed", "canceled"):
                     # Send final progress (uppercase status)
-                    progress = _build_progress(record)
+                    progress = await _build_progress(record)
                     progress_dict = progress.model_dump()
                     progress_dict["status"] = progress_dict["status"].upper()
                     yield {
@@ -451,6 +530,7 @@ async def export_analysis(
         media_type=media_type,
         filename=filename,
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        background=BackgroundTask(file_path.unlink, missing_ok=True),
     )
 
 
@@ -640,7 +720,7 @@ async def chat_with_analysis(
         from app.services.chat import ChatService
         from app.services.llm import LLMClient
 
-        llm = LLMClient(api_key=api_key, default_model=model)
+        llm = LLMClient(api_key=api_key, default_model=model, analysis_id=analysis_id)
         chat_service = ChatService(llm=llm)
         full_response = ""
 
@@ -737,6 +817,15 @@ async def cancel_analysis(
 
     await db.update_analysis(analysis_id, status="canceled")
 
+    # Still queued — drop it before it ever starts
+    loop = asyncio.get_running_loop()
+    if (
+        await loop.run_in_executor(None, get_job_queue().cancel, analysis_id)
+        or get_analysis_scheduler().cancel(analysis_id)
+    ):
+        logger.info("Cancelled analysis %s — removed from the queue", analysis_id)
+        return
+
     # Signal the running pipeline to stop all in-progress work
     from app.services.pipeline import get_active_pipeline
 
@@ -745,4 +834,119 @@ async def cancel_analysis(
         pipeline.request_cancel()
         logger.info("Cancelled analysis %s — signalled pipeline to stop", analysis_id)
     else:
-        logger.info("Cancelled analysis %s — no active pipeline found", analysis_id)
+        # Running in another worker process — its heartbeat sees the status
+        logger.info("Cancelled analysis %s — no active pipeline in this process", analysis_id)
+
+
+@router.post("/analyze/{analysis_id}/resume", response_model=AnalysisDetail, status_code=202)
+async def resume_analysis(
+    analysis_id: str,
+    db: ConvexDB = Depends(get_db),
+    settings: AppSettings = Depends(get_settings),
+):
+    """Run a failed analysis again from its checkpoints.
+
+    Parsed documents, extractions and the aggregated report finished before
+    the failure are restored, so only the remaining LLM work is paid for.
+    Needs the uploads, which stay on disk for workspace_ttl_hours.
+    """
+    record = await db.get_analysis(analysis_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if record.get("status") != AnalysisStatus.FAILED.value:
+        raise HTTPException(status_code=409, detail="Only failed analyses can be resumed")
+    if get_workspace_manager().locate(analysis_id) is None:
+        raise HTTPException(
+            status_code=410,
+            detail="Uploaded files are no longer available. Start a new analysis.",
+        )
+
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(None, get_job_queue().resume, analysis_id):
+        raise HTTPException(status_code=409, detail="Analysis job cannot be resumed")
+    await db.update_analysis(analysis_id, status=AnalysisStatus.PENDING.value, error="")
+    logger.info("Resuming analysis %s", analysis_id)
+    if settings.job_worker_embedded:
+        get_pipeline_worker().wake()
+
+    record = await db.get_analysis(analysis_id)
+    documents = await db.get_documents(analysis_id)
+    return await _build_detail(record, documents)
+
+
+@router.post("/analyze/{analysis_id}/amend", response_model=AnalysisDetail, status_code=202)
+async def amend_analysis(
+    analysis_id: str,
+    files: list[UploadFile],
+    user_id: str = Depends(require_auth),
+    db: ConvexDB = Depends(get_db),
+    settings: AppSettings = Depends(get_settings),
+):
+    """Add new or amended tender files to a completed analysis.
+
+    A file named like one of the analysis' documents replaces it; others are
+    added. Unchanged documents keep their extraction, replaced ones are only
+    re-extracted where their sections changed, then the report and QA are
+    rebuilt over all documents with the analysis' original settings.
+    """
+    record = await db.get_analysis(analysis_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if record.get("status") != AnalysisStatus.COMPLETED.value:
+        raise HTTPException(status_code=409, detail="Only completed analyses can be amended")
+
+    loop = asyncio.get_running_loop()
+    queue = get_job_queue()
+    job = await loop.run_in_executor(None, queue.get, analysis_id)
+    if job is not None and job["status"] in (QUEUED, RUNNING):
+        raise HTTPException(status_code=409, detail="Analysis is already running")
+
+    upload_bytes, _file_hashes = await _validate_uploads(files)
+    await _wait_for_space(upload_bytes, settings)
+
+    # Same settings as the analysis' first run (reused analyses have no job)
+    if job is not None:
+        params = json.loads(job["payload"])
+    else:
+        params = {"model": record.get("model", ""), **(record.get("params_json") or {})}
+    workspaces = get_workspace_manager()
+    workspace = workspaces.create(analysis_id)
+    # Own directory per request: an amendment that loses the race for the
+    # rerun below must not overwrite the uploads of the one that wins it
+    staging = workspace.uploads / f"amend-{uuid.uuid4().hex[:12]}"
+    upload_paths = await _save_uploads(files, staging)
+    payload = {
+        **params,
+        "user_id": params.get("user_id") or user_id,
+        "uploads": [str(path.relative_to(workspace.uploads)) for path in upload_paths],
+        "amend": True,
+    }
+    queued = await loop.run_in_executor(
+        None,
+        partial(
+            queue.rerun,
+            analysis_id,
+            payload,
+            user_id=payload["user_id"],
+            priority=priority_of(
+                payload.get("analysis_type", "detailed"), payload.get("origin", "interactive"),
+            ),
+        ),
+    )
+    if not queued:  # another amendment got in first; its worker owns the workspace
+        await loop.run_in_executor(None, partial(shutil.rmtree, staging, ignore_errors=True))
+        raise HTTPException(status_code=409, detail="Analysis is already running")
+
+    # The documents no longer match the original upload set
+    await db.update_analysis(
+        analysis_id, status=AnalysisStatus.PENDING.value, error="", fingerprint="",
+    )
+    logger.info("Amending analysis %s with %d files", analysis_id, len(upload_paths))
+    if settings.job_worker_embedded:
+        get_pipeline_worker().wake()
+    else:
+        workspaces.detach(analysis_id)
+
+    record = await db.get_analysis(analysis_id)
+    documents = await db.get_documents(analysis_id)
+    return await _build_detail(record, documents)
@@ -0,0 +1,271 @@
+# backend/app/services/amendment.py
+# Incremental re-analysis of amended tenders ("patikslinimai")
+# POST /api/analyze/{id}/amend adds files to a completed analysis. Its document
+# records (content + extraction) are the baseline: an upload named like a
+# previous document replaces it, any other upload is added, the rest are kept.
+# Unchanged uploads reuse the stored extraction; a replaced document is diffed
+# section by section and only the changed sections go to the LLM, their result
+# merged over the previous extraction. Aggregation and evaluation then rerun
+# over the full document set, so the LLM bill follows the size of the change.
+# Related: pipeline.py (amend mode), routers/analyze.py (amend endpoint),
+#          extraction.py (merge_chunk_extractions), config.py (amendment_*)
+
+import difflib
+import logging
+import re
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+
+from pydantic import BaseModel, ValidationError
+
+from app.config import get_settings
+from app.convex_client import ConvexDB
+from app.models.schemas import DocumentType, ExtractionResult
+from app.services.extraction import merge_chunk_extractions
+from app.services.parser import ParsedDocument
+
+logger = logging.getLogger(__name__)
+
+_HEADING = re.compile(r"^#{1,6}\s", re.MULTILINE)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+# Whole-document descriptions — an extraction of a few sections must not replace them
+_DOCUMENT_FIELDS = ("project_title", "project_summary")
+
+# confidence_notes prefixes written by extraction.py for results without data
+_FAILURE_NOTES = ("Extraction failed:", "Document skipped", "Extraction skipped", "Extraction aborted")
+
+Extraction = tuple[ParsedDocument, ExtractionResult, dict]
+
+
+def _no_usage() -> dict:
+    return {"input_tokens": 0, "output_tokens": 0}
+
+
+def stored_extraction(result: ExtractionResult) -> dict | None:
+    """``extraction_json`` for a document record; None when extraction failed."""
+    if any(note.startswith(_FAILURE_NOTES) for note in result.confidence_notes):
+        return None
+    return result.model_dump(mode="json")
+
+
+# ── Section diff ───────────────────────────────────────────────────────────
+
+
+def split_sections(content: str) -> list[str]:
+    """Markdown sections (heading + body), or paragraphs when there are no headings."""
+    starts = [m.start() for m in _HEADING.finditer(content)]
+    if len(starts) < 2:
+        parts = _PARAGRAPH_BREAK.split(content)
+    else:
+        if starts[0] != 0:
+            starts.insert(0, 0)
+        parts = [content[a:b] for a, b in zip(starts, starts[1:] + [len(content)])]
+    return [part.strip() for part in parts if part.strip()]
+
+
+@dataclass
+class SectionDiff:
+    changed: list[str]  # sections of the new version that are new or edited
+    removed: list[str]  # sections of the previous version that are gone or edited
+    total: int  # sections in the new version
+    changed_ratio: float  # share of the new version's text in changed sections
+
+
+def diff_sections(old: str, new: str) -> SectionDiff:
+    old_sections, new_sections = split_sections(old), split_sections(new)
+    matcher = difflib.SequenceMatcher(None, old_sections, new_sections, autojunk=False)
+    changed: list[str] = []
+    removed: list[str] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            removed += old_sections[i1:i2]
+            changed += new_sections[j1:j2]
+    total_chars = sum(len(s) for s in new_sections)
+    return SectionDiff(
+        changed=changed,
+        removed=removed,
+        total=len(new_sections),
+        changed_ratio=sum(len(s) for s in changed) / total_chars if total_chars else 1.0,
+    )
+
+
+def _heading(section: str) -> str:
+    return section.splitlines()[0].lstrip("# ").strip()[:80]
+
+
+def _merge_nested(previous: BaseModel, delta: BaseModel) -> BaseModel:
+    # Field by field: a section that only moves one deadline keeps the others
+    values = previous.model_dump()
+    for name, info in type(delta).model_fields.items():
+        value = getattr(delta, name)
+        if isinstance(value, list):
+            values[name] = value + [v for v in values[name] if v not in value]
+        elif value is not None and (name in delta.model_fields_set or value != info.default):
+            values[name] = value  # a non-None default (currency) only wins when extracted
+    return type(previous).model_validate(values)
+
+
+def merge_amended(previous: ExtractionResult, delta: ExtractionResult, diff: SectionDiff) -> ExtractionResult:
+    """Extraction of the changed sections merged over the previous version's.
+
+    Values found in the changed sections win, nested objects field by field;
+    list items are combined.
+    """
+    merged = merge_chunk_extractions([delta, previous])
+    for field in ExtractionResult.model_fields:
+        old, new = getattr(previous, field), getattr(delta, field)
+        if isinstance(old, BaseModel) and isinstance(new, BaseModel):
+            setattr(merged, field, _merge_nested(old, new))
+    for field in _DOCUMENT_FIELDS:
+        if getattr(previous, field):
+            setattr(merged, field, getattr(previous, field))
+    headings = "; ".join(_heading(s) for s in diff.changed[:5])
+    merged.confidence_notes.append(
+        f"Amended document: {len(diff.changed)} of {diff.total} sections re-extracted ({headings})"
+    )
+    if diff.removed:
+        merged.confidence_notes.append(
+            f"{len(diff.removed)} sections of the previous version were edited or removed; "
+            "list items taken from them may be outdated"
+        )
+    return merged
+
+
+# ── Amendment plan ─────────────────────────────────────────────────────────
+
+
+@dataclass
+class PreviousDocument:
+    """A document of the analysis being amended, rebuilt from its DB record."""
+
+    doc: ParsedDocument
+    extraction: ExtractionResult | None  # None if it never extracted successfully
+
+
+def previous_document(record: dict) -> PreviousDocument:
+    content = record.get("content_text") or ""
+    try:
+        doc_type = DocumentType(record.get("doc_type"))
+    except ValueError:
+        doc_type = DocumentType.OTHER
+    extraction = None
+    if record.get("extraction_json"):
+        try:
+            extraction = ExtractionResult.model_validate(record["extraction_json"])
+        except ValidationError:
+            logger.warning("Stored extraction of %s is invalid — extracting again", record["filename"])
+    doc = ParsedDocument(
+        filename=record["filename"],
+        content=content,
+        page_count=record.get("page_count") or 0,
+        file_size_bytes=len(content.encode("utf-8")),
+        doc_type=doc_type,
+        token_estimate=len(content) // 4,
+    )
+    return PreviousDocument(doc, extraction)
+
+
+class Amendment:
+    """Baseline documents of an amended analysis and what each upload changes.
+
+    The pipeline feeds its parsed uploads through plan() into extraction,
+    maps the results back with merge() and adds the documents the amendment
+    did not touch with combine().
+    """
+
+    def __init__(self, records: list[dict], max_changed_ratio: float = 0.5) -> None:
+        self.previous = {record["filename"]: previous_document(record) for record in records}
+        self.max_changed_ratio = max_changed_ratio
+        self.replaced: set[str] = set()
+        self.sections_reextracted = 0
+        self._unchanged: list[Extraction] = []
+        self._deltas: dict[int, tuple[ParsedDocument, ParsedDocument, ExtractionResult, SectionDiff]] = {}
+        self._retried: dict[str, Extraction] = {}
+
+    @classmethod
+    async def load(cls, db: ConvexDB, analysis_id: str) -> "Amendment":
+        records = await db.get_documents(analysis_id)
+        return cls(records, get_settings().amendment_max_changed_ratio)
+
+    @property
+    def documents_reused(self) -> int:
+        """Documents whose stored extraction is used as is."""
+        kept = sum(
+            1 for name, previous in self.previous.items()
+            if name not in self.replaced and previous.extraction is not None
+        )
+        return kept + len(self._unchanged)
+
+    async def plan(self, docs: AsyncIterable[ParsedDocument]) -> AsyncIterator[ParsedDocument]:
+        """Documents that need extraction: new and wholly re-extracted uploads,
+        the changed sections of replaced ones, then kept documents that were
+        never extracted successfully."""
+        async for doc in docs:
+            previous = self.previous.get(doc.filename)
+            if previous is None:
+                yield doc
+                continue
+            self.replaced.add(doc.filename)
+            work = self._plan_replacement(doc, previous)
+            if work is not None:
+                yield work
+        for name, previous in self.previous.items():
+            if name not in self.replaced and previous.extraction is None:
+                yield previous.doc
+
+    def _plan_replacement(self, doc: ParsedDocument, previous: PreviousDocument) -> ParsedDocument | None:
+        if previous.extraction is None or doc.is_scanned or doc.scanned_pages:
+            return doc  # nothing to build on, or text that says nothing about the pages
+        diff = diff_sections(previous.doc.content, doc.content)
+        if not diff.changed and not diff.removed:
+            logger.info("Amended upload %s is unchanged — reusing its extraction", doc.filename)
+            self._unchanged.append((doc, previous.extraction, _no_usage()))
+            return None
+        if not diff.changed or diff.changed_ratio > self.max_changed_ratio:
+            return doc  # mostly rewritten, or only deletions whose data must go
+        logger.info(
+            "Amended upload %s: re-extracting %d of %d sections",
+            doc.filename, len(diff.changed), diff.total,
+        )
+        content = "\n\n".join(diff.changed)
+        delta = ParsedDocument(
+            filename=doc.filename,
+            content=content,
+            page_count=doc.page_count,
+            file_size_bytes=doc.file_size_bytes,
+            doc_type=doc.doc_type,
+            token_estimate=len(content) // 4,
+            content_hash=doc.content_hash,
+            parser_used=doc.parser_used,
+        )
+        self._deltas[id(delta)] = (delta, doc, previous.extraction, diff)
+        self.sections_reextracted += len(diff.changed)
+        return delta
+
+    def merge(self, extractions: list[Extraction]) -> list[Extraction]:
+        """Extractions of the uploads (deltas merged back, unchanged reused)."""
+        merged: list[Extraction] = []
+        for doc, result, usage in extractions:
+            if id(doc) in self._deltas:
+                _delta, original, previous, diff = self._deltas[id(doc)]
+                merged.append((original, merge_amended(previous, result, diff), usage))
+            elif doc.filename in self.previous and doc is self.previous[doc.filename].doc:
+                self._retried[doc.filename] = (doc, result, usage)
+            else:
+                merged.append((doc, result, usage))
+        return merged + self._unchanged
+
+    def combine(self, uploads: list[Extraction]) -> list[Extraction]:
+        """The full document set: stored documents in their order (replaced ones
+        in place of their previous version), then the added ones."""
+        position = {name: i for i, name in enumerate(self.previous)}
+        kept: list[Extraction] = []
+        for name, previous in self.previous.items():
+            if name in self.replaced:
+                continue
+            if name in self._retried:
+                kept.append(self._retried[name])
+            elif previous.extraction is not None:
+                kept.append((previous.doc, previous.extraction, _no_usage()))
+        return sorted(kept + uploads, key=lambda item: position.get(item[0].filename, len(position)))
@@ -0,0 +1,250 @@
+# backend/app/services/analysis_scheduler.py
+# Admission scheduler in front of AnalysisPipeline.run
+# Runs at most max_concurrent_analyses pipelines; waiting analyses are ordered
+# by priority class (interactive before batch, quick before detailed), then by
+# weighted fair share of the running slots per user, then by arrival. A few
+# slots stay reserved for interactive work so batch load cannot fill them.
+# The same priority orders the analysis' requests in the LLM governor and the
+# claim order of the durable job queue.
+# Related: pipeline_worker.py (admission), routers/analyze.py (queue position in
+#          AnalysisProgress), llm_governor.py, job_queue.py, config.py (analysis_*)
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import AsyncIterator
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+ORIGINS = ("interactive", "batch")
+
+# Rank inside a lane — cheap analyses first so they are not stuck behind long ones
+_TYPE_RANK = {"quick": 0, "requirements": 1, "risks": 1, "detailed": 2, "custom": 2}
+
+# Lane offset: every batch analysis ranks after every interactive one
+_BATCH_OFFSET = 10
+
+# Run time assumed for ETAs until real runs have been measured
+_DEFAULT_DURATION = 180.0
+
+# Weight of the newest run in the duration moving average
+_DURATION_ALPHA = 0.2
+
+
+def priority_of(analysis_type: str, origin: str = "interactive") -> int:
+    """Priority class of an analysis — lower runs first."""
+    rank = _TYPE_RANK.get(analysis_type, _TYPE_RANK["detailed"])
+    return rank + (_BATCH_OFFSET if origin == "batch" else 0)
+
+
+def parse_user_weights(spec: str) -> dict[str, float]:
+    """Parse "user_a=2,user_b=0.5" into {user_id: weight}; bad entries are skipped."""
+    weights: dict[str, float] = {}
+    for entry in spec.split(","):
+        user_id, _, weight = entry.strip().partition("=")
+        try:
+            if user_id and float(weight) > 0:
+                weights[user_id] = float(weight)
+        except ValueError:
+            logger.warning("Ignoring malformed analysis_user_weights entry: %r", entry)
+    return weights
+
+
+class AdmissionCanceled(Exception):
+    """The analysis was canceled while it waited for a slot."""
+
+
+@dataclass
+class _Ticket:
+    analysis_id: str
+    user_id: str
+    analysis_type: str
+    origin: str
+    priority: int
+    seq: int
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.monotonic)
+    started: float = 0.0
+
+
+@dataclass
+class QueueInfo:
+    position: int  # 0 = next to start
+    eta_seconds: int
+
+
+class AnalysisScheduler:
+    """Priority + weighted-fair admission of analyses (event loop only)."""
+
+    def __init__(
+        self,
+        max_running: int,
+        per_user: int = 0,
+        interactive_reserve: int = 0,
+        user_weights: dict[str, float] | None = None,
+    ) -> None:
+        self.max_running = max(1, max_running)
+        self.per_user = per_user  # 0 = no per-user cap
+        self.interactive_reserve = min(max(0, interactive_reserve), self.max_running - 1)
+        self.user_weights = user_weights or {}
+        self._waiting: list[_Ticket] = []
+        self._running: dict[str, _Ticket] = {}
+        self._user_running: dict[str, int] = {}
+        self._seq = 0
+        self._mean_duration = _DEFAULT_DURATION
+
+    # ── Admission ──────────────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        analysis_id: str,
+        user_id: str,
+        analysis_type: str = "detailed",
+        origin: str = "interactive",
+    ) -> AsyncIterator[None]:
+        """Wait for a run slot, hold it for the block.
+
+        Raises AdmissionCanceled if cancel() is called while waiting.
+        """
+        ticket = await self._acquire(analysis_id, user_id, analysis_type, origin)
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    def cancel(self, analysis_id: str) -> bool:
+        """Drop a waiting analysis from the queue. False if it is not waiting."""
+        for ticket in self._waiting:
+            if ticket.analysis_id == analysis_id:
+                self._waiting.remove(ticket)
+                if not ticket.future.done():
+                    ticket.future.set_exception(AdmissionCanceled(analysis_id))
+                self._dispatch()
+                return True
+        return False
+
+    def claimable_priority(self) -> int | None:
+        """Least urgent priority class that could start now; None when full.
+
+        Pipeline workers pass this to the job queue so they only claim work
+        they can run at once (batch jobs never take the interactive reserve).
+        """
+        busy = len(self._running) + len(self._waiting)
+        if busy >= self.max_running:
+            return None
+        if busy >= self.max_running - self.interactive_reserve:
+            return _BATCH_OFFSET - 1
+        return _BATCH_OFFSET + max(_TYPE_RANK.values())
+
+    def priority(self, analysis_id: str) -> int:
+        ticket = self._running.get(analysis_id) or next(
+            (t for t in self._waiting if t.analysis_id == analysis_id), None,
+        )
+        return ticket.priority if ticket else 0
+
+    def queue_info(self, analysis_id: str) -> QueueInfo | None:
+        """Position and rough ETA of a waiting analysis (None once it runs)."""
+        for position, ticket in enumerate(self._ordered()):
+            if ticket.analysis_id == analysis_id:
+                return QueueInfo(position, self.eta_seconds(position))
+        return None
+
+    def eta_seconds(self, position: int) -> int:
+        """Rough wait for the analysis at ``position`` in line to start."""
+        return round((position // self.max_running + 1) * self._mean_duration)
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self._running),
+            "waiting": len(self._waiting),
+            "max_running": self.max_running,
+            "mean_duration_s": round(self._mean_duration, 1),
+        }
+
+    # ── Internals ──────────────────────────────────────────────────────────
+
+    async def _acquire(
+        self, analysis_id: str, user_id: str, analysis_type: str, origin: str,
+    ) -> _Ticket:
+        self._seq += 1
+        ticket = _Ticket(
+            analysis_id=analysis_id,
+            user_id=user_id,
+            analysis_type=analysis_type,
+            origin=origin,
+            priority=priority_of(analysis_type, origin),
+            seq=self._seq,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiting.append(ticket)
+        self._dispatch()
+        if not ticket.future.done():
+            logger.info(
+                "Analysis %s queued (user=%s, %s/%s, position %d)",
+                analysis_id, user_id, origin, analysis_type,
+                self._ordered().index(ticket),
+            )
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.analysis_id in self._running:
+                self._release(ticket)
+            elif ticket in self._waiting:
+                self._waiting.remove(ticket)
+                self._dispatch()
+            raise
+        return ticket
+
+    def _release(self, ticket: _Ticket) -> None:
+        if self._running.pop(ticket.analysis_id, None) is None:
+            return
+        self._user_running[ticket.user_id] -= 1
+        duration = time.monotonic() - ticket.started
+        self._mean_duration += _DURATION_ALPHA * (duration - self._mean_duration)
+        self._dispatch()
+
+    def _share(self, user_id: str) -> float:
+        return self._user_running.get(user_id, 0) / self.user_weights.get(user_id, 1.0)
+
+    def _ordered(self) -> list[_Ticket]:
+        return sorted(
+            self._waiting, key=lambda t: (t.priority, self._share(t.user_id), t.seq),
+        )
+
+    def _can_start(self, ticket: _Ticket) -> bool:
+        slots = self.max_running
+        if ticket.origin == "batch":
+            slots -= self.interactive_reserve
+        if len(self._running) >= slots:
+            return False
+        return not self.per_user or self._user_running.get(ticket.user_id, 0) < self.per_user
+
+    def _dispatch(self) -> None:
+        # Re-sort after every start — a start changes the user's fair share
+        while len(self._running) < self.max_running:
+            ticket = next((t for t in self._ordered() if self._can_start(t)), None)
+            if ticket is None:
+                return
+            self._waiting.remove(ticket)
+            self._running[ticket.analysis_id] = ticket
+            self._user_running[ticket.user_id] = self._user_running.get(ticket.user_id, 0) + 1
+            ticket.started = time.monotonic()
+            ticket.future.set_result(None)
+
+
+@lru_cache
+def get_analysis_scheduler() -> AnalysisScheduler:
+    """Process-wide scheduler built from the analysis_* settings."""
+    settings = get_settings()
+    return AnalysisScheduler(
+        max_running=settings.max_concurrent_analyses,
+        per_user=settings.analysis_max_per_user,
+        interactive_reserve=settings.analysis_interactive_reserve,
+        user_weights=parse_user_weights(settings.analysis_user_weights),
+    )
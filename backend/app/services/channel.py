@@ -0,0 +1,62 @@
+# backend/app/services/channel.py
+# Channel — unbounded async queue connecting streaming pipeline stages
+# A producer put()s items as they become ready and close()s it when done; the
+# consumer iterates with ``async for``. parse_all and extract_all accept a
+# Channel (any async iterable) as well as a list, so a document moves from
+# unpacking to parsing to LLM extraction without waiting for its siblings.
+# Related: pipeline.py (wires the stages), parser.py (parse_all), extraction.py (extract_all)
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+_CLOSED = object()
+
+
+class Channel(Generic[T]):
+    """Single-consumer stream of items between two pipeline stages.
+
+    put() and close() are synchronous so they can be called from the sync
+    progress callbacks of the producing stage (event loop thread only).
+    ``items`` keeps everything put so far, in arrival order.
+    """
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._closed = False
+        self.items: list[T] = []
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, item: T) -> None:
+        if self._closed:
+            raise RuntimeError("put() on a closed Channel")
+        self.items.append(item)
+        self._queue.put_nowait(item)
+
+    def close(self) -> None:
+        """End the stream; the consumer's ``async for`` finishes after the queued items."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put_nowait(_CLOSED)
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        while True:
+            item = await self._queue.get()
+            if item is _CLOSED:
+                return
+            yield item
+
+
+async def aiter_items(items: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    """Iterate a list or an async iterable (e.g. a Channel) with ``async for``."""
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
@@ -0,0 +1,205 @@
+# backend/app/services/checkpoint.py
+# Stage checkpoints that let an interrupted analysis resume without redoing work
+# Parsed documents, per-document and per-chunk extraction results and the
+# aggregated report are written as JSON under the analysis workspace the moment
+# they complete. A re-run of the same analysis (job re-claimed after a crash,
+# drained on redeploy, or POST /api/analyze/{id}/resume) restores them instead
+# of paying for the LLM calls again. Writes run in executor threads;
+# flush_checkpoints() waits for the pending ones (shutdown drain).
+# Related: pipeline.py (stage wiring), extraction.py (chunk checkpoints),
+#          pipeline_worker.py (drain), workspace.py (storage location)
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from app.models.schemas import AggregatedReport, DocumentType, ExtractionResult
+from app.services.parser import ParsedDocument
+from app.services.workspace import get_workspace_manager
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored shape changes — older checkpoints are then ignored
+CHECKPOINT_VERSION = 1
+
+# Writes scheduled by every store in this process, awaited by flush_checkpoints()
+_pending: set[asyncio.Future] = set()
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def _write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning("Unreadable checkpoint %s — ignoring", path.name)
+        return None
+    return data if data.get("version") == CHECKPOINT_VERSION else None
+
+
+def _usage(data: dict) -> dict:
+    return {
+        "input_tokens": data.get("input_tokens", 0),
+        "output_tokens": data.get("output_tokens", 0),
+    }
+
+
+class AnalysisCheckpoint:
+    """Checkpoint directory of one analysis (``<workspace>/checkpoint``)."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.restored = 0  # checkpoints used by this run
+
+    @classmethod
+    def for_analysis(cls, analysis_id: str) -> "AnalysisCheckpoint | None":
+        """Checkpoints of an analysis with an active workspace, else None."""
+        workspace = get_workspace_manager().get(analysis_id)
+        return cls(workspace.root / "checkpoint") if workspace else None
+
+    def exists(self) -> bool:
+        return self.root.is_dir() and any(self.root.iterdir())
+
+    # ── Parsed documents ───────────────────────────────────────────────────
+
+    def save_parsed(self, doc: ParsedDocument) -> None:
+        data = asdict(doc)
+        data["doc_type"] = doc.doc_type.value
+        data["file_path"] = None  # re-attached from the re-unpacked source
+        self._save(("parsed", _digest(doc.filename)), data)
+
+    async def load_parsed(self, filename: str, file_path: Path | None) -> ParsedDocument | None:
+        """Parsed document for ``filename``; None if missing or it needs a file we lack."""
+        data = await self._load(("parsed", _digest(filename)))
+        if data is None or data.get("filename") != filename:
+            return None
+        needs_file = data.get("is_scanned") or data.get("scanned_pages")
+        if needs_file and (file_path is None or not file_path.exists()):
+            return None  # OCR / multimodal extraction reads the original file
+        data.pop("version", None)
+        data["doc_type"] = DocumentType(data["doc_type"])
+        data["file_path"] = file_path
+        self.restored += 1
+        return ParsedDocument(**data)
+
+    # ── Extraction ─────────────────────────────────────────────────────────
+
+    def save_extraction(self, doc: ParsedDocument, result: ExtractionResult, usage: dict) -> None:
+        self._save(
+            ("extraction", _extraction_key(doc)),
+            {"result": result.model_dump(mode="json"), **_usage(usage)},
+        )
+
+    async def load_extraction(self, doc: ParsedDocument) -> tuple[ExtractionResult, dict] | None:
+        data = await self._load(("extraction", _extraction_key(doc)))
+        if data is None:
+            return None
+        self.restored += 1
+        return ExtractionResult.model_validate(data["result"]), _usage(data)
+
+    def save_chunk(
+        self, filename: str, index: int, total: int, chunk: str,
+        result: ExtractionResult, usage: dict,
+    ) -> None:
+        self._save(
+            ("chunks", _digest(filename, f"{index}/{total}", chunk)),
+            {"result": result.model_dump(mode="json"), **_usage(usage)},
+        )
+
+    async def load_chunk(
+        self, filename: str, index: int, total: int, chunk: str,
+    ) -> tuple[ExtractionResult, dict] | None:
+        data = await self._load(("chunks", _digest(filename, f"{index}/{total}", chunk)))
+        if data is None:
+            return None
+        self.restored += 1
+        return ExtractionResult.model_validate(data["result"]), _usage(data)
+
+    # ── Aggregation ────────────────────────────────────────────────────────
+
+    def save_aggregation(self, extractions_key: str, report: AggregatedReport, usage: dict) -> None:
+        self._save(
+            ("aggregation", extractions_key),
+            {"report": report.model_dump(mode="json"), **_usage(usage)},
+        )
+
+    async def load_aggregation(self, extractions_key: str) -> tuple[AggregatedReport, dict] | None:
+        data = await self._load(("aggregation", extractions_key))
+        if data is None:
+            return None
+        self.restored += 1
+        return AggregatedReport.model_validate(data["report"]), _usage(data)
+
+    # ── Markers ────────────────────────────────────────────────────────────
+
+    def mark(self, name: str) -> None:
+        self._save(("markers", name), {})
+
+    async def marked(self, name: str) -> bool:
+        return await self._load(("markers", name)) is not None
+
+    # ── Internals ──────────────────────────────────────────────────────────
+
+    def _path(self, key: tuple[str, str]) -> Path:
+        return self.root / key[0] / f"{key[1]}.json"
+
+    def _save(self, key: tuple[str, str], data: dict[str, Any]) -> None:
+        """Schedule an atomic write (call from the event loop)."""
+        payload = {"version": CHECKPOINT_VERSION, **data}
+        future = asyncio.get_running_loop().run_in_executor(
+            None, _write_json, self._path(key), payload,
+        )
+        _pending.add(future)
+        future.add_done_callback(_write_done)
+
+    async def _load(self, key: tuple[str, str]) -> dict | None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _read_json, self._path(key))
+
+
+def _write_done(future: asyncio.Future) -> None:
+    _pending.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Checkpoint write failed: %s", future.exception())
+
+
+def _extraction_key(doc: ParsedDocument) -> str:
+    return _digest(doc.filename, hashlib.sha256(doc.content.encode("utf-8")).hexdigest())
+
+
+def extractions_key(extractions: list[tuple[ParsedDocument, ExtractionResult, dict]]) -> str:
+    """Fingerprint of the aggregation input — a re-run extraction changes it."""
+    digest = hashlib.sha256()
+    for doc, result, _usage_ in extractions:
+        digest.update(doc.filename.encode("utf-8"))
+        digest.update(result.model_dump_json().encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+async def flush_checkpoints() -> None:
+    """Wait for every scheduled checkpoint write (graceful shutdown)."""
+    if _pending:
+        logger.info("Flushing %d checkpoint writes", len(_pending))
+        await asyncio.gather(*list(_pending), return_exceptions=True)
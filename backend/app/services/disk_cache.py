@@ -0,0 +1,167 @@
+# backend/app/services/disk_cache.py
+# Persistent content-addressed JSON cache with size-bounded LRU eviction
+# Entries are written atomically (temp file + os.replace) so concurrent API
+# workers and parse processes can share one cache directory safely. An
+# optional TTL expires entries by age regardless of use.
+# Related: parse_cache.py, extraction_cache.py
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Write time of an entry, stored alongside the value when a TTL is set
+_STORED_AT = "_stored_at"
+
+
+class DiskCache:
+    """Key → JSON value store under ``root``, bounded to ``max_bytes`` on disk.
+
+    Keys are hex digests; entries live at ``root/<key[:2]>/<key>.json``.
+    Recency is tracked through file mtimes (touched on every hit), so the LRU
+    order survives restarts and is shared by every process using the directory.
+    With ``ttl_seconds`` each entry records when it was written and is dropped
+    on the first read after it expires.
+    """
+
+    def __init__(
+        self, root: Path, max_bytes: int, name: str = "cache", ttl_seconds: float = 0,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.name = name
+        self.ttl_seconds = ttl_seconds  # 0 = entries never expire
+        self._lock = threading.Lock()
+        self._approx_bytes: int | None = None  # lazily measured on first write
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.expired = 0
+
+    # ── Public API ─────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except (OSError, ValueError):
+            logger.warning("%s: unreadable entry %s — dropping", self.name, key[:12])
+            self._unlink(path)
+            self._count("misses")
+            return None
+        if self.ttl_seconds:
+            stored_at = data.pop(_STORED_AT, 0)
+            if time.time() - stored_at > self.ttl_seconds:
+                self._unlink(path)
+                self._count("expired")
+                self._count("misses")
+                return None
+        try:
+            os.utime(path)  # mark as most recently used
+        except OSError:
+            pass
+        self._count("hits")
+        return data
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        path = self._path(key)
+        if self.ttl_seconds:
+            value = {**value, _STORED_AT: time.time()}
+        payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(payload)
+                os.replace(tmp_name, path)
+            except BaseException:
+                self._unlink(Path(tmp_name))
+                raise
+        except OSError:
+            logger.warning("%s: failed to write entry %s", self.name, key[:12], exc_info=True)
+            return
+
+        self._count("writes")
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._measure()
+            else:
+                self._approx_bytes += len(payload)
+            over = self._approx_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        # Evict down to 90% so every write near the limit doesn't rescan
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= target:
+                break
+            if self._unlink(path):
+                total -= size
+                removed += 1
+        with self._lock:
+            self._approx_bytes = total
+            self.evictions += removed
+        if removed:
+            logger.info("%s: evicted %d entries, %d KB left", self.name, removed, total // 1024)
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+    # ── Internals ──────────────────────────────────────────────────────────
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _measure(self) -> int:
+        total = 0
+        for path in self.root.glob("*/*.json"):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue
+        return total
+
+    @staticmethod
+    def _unlink(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except OSError:  # already evicted by another worker, or not removable
+            return False
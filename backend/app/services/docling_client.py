@@ -0,0 +1,141 @@
+# backend/app/services/docling_client.py
+# Client for the shared Docling/OCR service (docling_service.py)
+# parser.py sends Docling and RapidOCR conversions here when docling_service_url
+# is set; a short-lived cached health check lets it fall back to in-process
+# Docling (when installed) while the service is down. A full service queue
+# (503 + Retry-After) is retried with backoff within docling_service_timeout.
+# Related: docling_service.py, parser.py, config.py (docling_service_*)
+
+import logging
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_HEALTH_TTL = 10.0  # seconds a health check result is reused
+_CONNECT_TIMEOUT = 2.0
+_RETRY_MAX_DELAY = 30.0  # seconds between attempts while the service queue is full
+
+_client: httpx.Client | None = None
+_client_url = ""
+_client_lock = threading.Lock()
+_health: tuple[float, bool] = (0.0, False)
+
+
+class DoclingServiceError(RuntimeError):
+    """The Docling service is unreachable, overloaded or failed the conversion."""
+
+
+def service_url() -> str:
+    from app.config import get_settings
+
+    return get_settings().docling_service_url.strip()
+
+
+def service_configured() -> bool:
+    return bool(service_url())
+
+
+def _get_client() -> httpx.Client:
+    """HTTP client for the configured URL — http(s)://host:port or unix:///socket."""
+    global _client, _client_url
+    url = service_url()
+    with _client_lock:
+        if _client is None or _client_url != url:
+            if _client is not None:
+                _client.close()
+            if url.startswith("unix://"):
+                transport = httpx.HTTPTransport(uds=url[len("unix://"):])
+                _client = httpx.Client(base_url="http://docling", transport=transport)
+            else:
+                _client = httpx.Client(base_url=url)
+            _client_url = url
+        return _client
+
+
+def close_client() -> None:
+    global _client, _client_url
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client, _client_url = None, ""
+
+
+def _mark_health(healthy: bool) -> None:
+    global _health
+    _health = (time.monotonic(), healthy)
+
+
+def check_health(force: bool = False) -> bool:
+    """True when the service answers /health with "ok" or "warming" (cached ~10s)."""
+    checked_at, healthy = _health
+    if not force and time.monotonic() - checked_at < _HEALTH_TTL:
+        return healthy
+    try:
+        response = _get_client().get("/health", timeout=_CONNECT_TIMEOUT)
+        healthy = response.status_code == 200 and response.json().get("status") in ("ok", "warming")
+    except (httpx.HTTPError, ValueError) as exc:
+        logger.warning("Docling service health check failed (%s): %s", service_url(), exc)
+        healthy = False
+    _mark_health(healthy)
+    return healthy
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Seconds the service asked us to wait, None if it is not a "queue full" 503."""
+    if response.status_code != 503 or "retry-after" not in response.headers:
+        return None
+    try:
+        return max(0.0, float(response.headers["retry-after"]))
+    except ValueError:
+        return 1.0
+
+
+def convert(file_path: Path, mode: str = "docling") -> tuple[str, int]:
+    """Convert a file through the service — returns (markdown_text, page_count).
+
+    ``mode`` is "docling" (layout + tables) or "ocr" (RapidOCR). Blocking; call
+    it from an executor thread like the in-process converters. While the
+    service queue is full the request is retried, honouring Retry-After with
+    exponential backoff, until docling_service_timeout has passed.
+    """
+    from app.config import get_settings
+
+    deadline = time.monotonic() + get_settings().docling_service_timeout
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            response = _get_client().post(
+                "/convert",
+                json={"path": str(Path(file_path).resolve()), "mode": mode},
+                timeout=httpx.Timeout(max(remaining, _CONNECT_TIMEOUT), connect=_CONNECT_TIMEOUT),
+            )
+        except httpx.TimeoutException as exc:
+            raise DoclingServiceError(f"Docling service timed out: {exc}") from exc
+        except httpx.HTTPError as exc:
+            _mark_health(False)
+            raise DoclingServiceError(f"Docling service unreachable: {exc}") from exc
+
+        delay = _retry_after(response)
+        if delay is None:
+            break
+        delay = min(max(delay, 2.0 ** attempt), _RETRY_MAX_DELAY)
+        if time.monotonic() + delay >= deadline:
+            break  # no time left to wait — report the 503
+        attempt += 1
+        logger.info("Docling service queue full — retrying %s in %.0fs", Path(file_path).name, delay)
+        time.sleep(delay)
+
+    if response.status_code != 200:
+        try:
+            detail = response.json().get("detail", response.text)
+        except ValueError:
+            detail = response.text
+        raise DoclingServiceError(f"Docling service error {response.status_code}: {detail}")
+
+    data = response.json()
+    return data["content"], data["page_count"]
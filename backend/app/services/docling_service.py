@@ -0,0 +1,240 @@
+# backend/app/services/docling_service.py
+# Shared Docling/RapidOCR parsing service — one long-lived process for all API workers
+# Builds both converters once at startup and pre-loads their models, then serves
+# /convert through a bounded job queue. API workers reach it via docling_client.py
+# instead of each loading gigabytes of model weights on their first image.
+# Usage: python -m app.services.docling_service --port 8765
+#        python -m app.services.docling_service --uds /tmp/foxdoc/docling.sock
+# Related: docling_client.py, parser.py (_convert_with_docling, _convert_with_ocr), config.py
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Literal, Optional
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class ConvertRequest(BaseModel):
+    path: str  # file on the filesystem shared with the API workers
+    mode: Literal["docling", "ocr"] = "docling"
+
+
+class ConvertResponse(BaseModel):
+    content: str
+    page_count: int
+    seconds: float
+
+
+class QueueFull(Exception):
+    """Raised when the job queue has no room — mapped to HTTP 503."""
+
+
+class JobQueue:
+    """Bounded admission for conversions.
+
+    ``workers`` jobs run at once (each in a thread), up to ``max_waiting`` more
+    wait for a slot; anything beyond that is rejected so callers back off
+    instead of piling up behind a multi-minute OCR job.
+    """
+
+    def __init__(self, workers: int, max_waiting: int) -> None:
+        self.workers = max(1, workers)
+        self.max_waiting = max(0, max_waiting)
+        self._slots = asyncio.Semaphore(self.workers)
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable, *args):
+        if self.running + self.waiting >= self.workers + self.max_waiting:
+            self.rejected += 1
+            raise QueueFull(f"{self.running} running, {self.waiting} waiting")
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, func, *args)
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "max_waiting": self.max_waiting,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+def warm_converters() -> None:
+    """Build the Docling and OCR converters and load their PDF pipeline models."""
+    from docling.datamodel.base_models import InputFormat
+
+    from app.services.parser import _get_converter, _get_ocr_converter
+
+    for build in (_get_converter, _get_ocr_converter):
+        start = time.perf_counter()
+        converter = build()
+        try:
+            converter.initialize_pipeline(InputFormat.PDF)
+        except Exception:
+            logger.warning("Could not pre-load %s pipeline", build.__name__, exc_info=True)
+        logger.info("%s warmed in %.1fs", build.__name__, time.perf_counter() - start)
+
+
+def _allowed_roots() -> list[Path]:
+    from app.config import get_settings
+
+    settings = get_settings()
+    roots = [Path(tempfile.gettempdir()), Path(settings.temp_dir)]
+    if settings.workspace_hot_dir:
+        roots.append(Path(settings.workspace_hot_dir))
+    return [root.resolve() for root in roots]
+
+
+def _resolve_input(raw_path: str) -> Path:
+    path = Path(raw_path).resolve()
+    if not any(path.is_relative_to(root) for root in _allowed_roots()):
+        raise HTTPException(status_code=400, detail="path outside the shared temp directories")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="file not found")
+    return path
+
+
+def _convert(path: Path, mode: str) -> tuple[str, int]:
+    from app.services import parser
+
+    if mode == "ocr":
+        return parser._convert_with_ocr(path)
+    return parser._convert_with_docling(path, path.suffix.lower())
+
+
+def create_app(
+    workers: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    warm: Optional[Callable[[], None]] = warm_converters,
+) -> FastAPI:
+    """Build the service app; ``warm`` runs once in a thread before jobs are served."""
+    from app.config import get_settings
+
+    settings = get_settings()
+    queue = JobQueue(
+        workers if workers is not None else settings.docling_service_workers,
+        queue_size if queue_size is not None else settings.docling_service_queue_size,
+    )
+    ready = asyncio.Event()
+    state = {"warm_error": ""}
+
+    async def _warm_up() -> None:
+        try:
+            if warm is not None:
+                await asyncio.get_running_loop().run_in_executor(None, warm)
+        except Exception as exc:
+            logger.error("Docling service warm-up failed: %s", exc, exc_info=True)
+            state["warm_error"] = str(exc)
+        finally:
+            ready.set()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        from app.services import parser
+
+        if parser.DOCLING_AVAILABLE:
+            warm_task = asyncio.create_task(_warm_up())
+        else:
+            logger.error("Docling is not installed — the service will reject conversions")
+            warm_task = None
+            ready.set()
+        yield
+        if warm_task is not None:
+            warm_task.cancel()
+
+    app = FastAPI(title="Docling parsing service", lifespan=lifespan)
+    app.state.queue = queue
+
+    @app.get("/health")
+    async def health():
+        from app.services import parser
+
+        if not parser.DOCLING_AVAILABLE or state["warm_error"]:
+            status = "unavailable"
+        else:
+            status = "ok" if ready.is_set() else "warming"
+        body = {"status": status, "error": state["warm_error"], **queue.stats()}
+        if status == "unavailable":
+            raise HTTPException(status_code=503, detail=body)
+        return body
+
+    @app.post("/convert", response_model=ConvertResponse)
+    async def convert(request: ConvertRequest):
+        from app.services import parser
+
+        if not parser.DOCLING_AVAILABLE:
+            raise HTTPException(status_code=503, detail="Docling is not installed")
+        path = _resolve_input(request.path)
+        if not ready.is_set():
+            # Waiting here would bypass the queue bound; clients retry on Retry-After
+            raise HTTPException(
+                status_code=503, detail="warming up", headers={"Retry-After": "5"},
+            )
+        start = time.perf_counter()
+        try:
+            markdown_text, page_count = await queue.run(_convert, path, request.mode)
+        except QueueFull as exc:
+            raise HTTPException(
+                status_code=503, detail=f"queue full: {exc}", headers={"Retry-After": "5"},
+            ) from None
+        except Exception as exc:
+            logger.warning("Conversion failed for %s: %s", path.name, exc)
+            raise HTTPException(status_code=422, detail=str(exc)) from None
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "Converted %s (%s): %d pages, %d chars, %.2fs",
+            path.name, request.mode, page_count, len(markdown_text), elapsed,
+        )
+        return ConvertResponse(content=markdown_text, page_count=page_count, seconds=elapsed)
+
+    return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.docling_service",
+        description="Serve Docling/RapidOCR conversions to all API workers.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--uds", help="listen on a Unix socket instead of host:port")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(name)s: %(message)s")
+    uvicorn.run(create_app(), host=args.host, port=args.port, uds=args.uds, workers=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# backend/app/services/document_source.py
+# DocumentSource — one input document, either a file on disk or bytes in memory
+# Small archive members are handed to the parsers as buffers instead of being
+# written out and read back; they spill to their planned path only when a
+# consumer needs a real file (Docling, OCR, multimodal upload of a scan).
+# Related: zip_extractor.py (produces sources), parser.py (parse_document / parse_all)
+
+import hashlib
+import io
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# Formats whose fast parsers read from a buffer (pdf_engines, docx/xlsx/pptx parsers).
+# Images always go to Docling/OCR, which need a path.
+MEMORY_PARSEABLE_EXTENSIONS: set[str] = {".pdf", ".docx", ".xlsx", ".pptx"}
+
+# What the parse functions accept: a path, or the document bytes
+ParseInput = Path | bytes
+
+
+@dataclass(eq=False)
+class DocumentSource:
+    """A document to parse: ``filename`` as shown to users, bytes at ``path`` or in ``data``.
+
+    ``path`` is always set. For an in-memory source it is where the bytes go
+    if spill() is called; until then nothing exists there. close() drops the
+    buffer once the document has been parsed.
+    """
+
+    filename: str
+    path: Path
+    data: bytes | None = None
+
+    @classmethod
+    def from_item(cls, item: "DocumentSource | tuple[Path, str]") -> "DocumentSource":
+        """Accept the legacy ``(path, filename)`` tuples as well as sources."""
+        if isinstance(item, DocumentSource):
+            return item
+        path, filename = item
+        return cls(filename=filename, path=path)
+
+    @property
+    def in_memory(self) -> bool:
+        return self.data is not None
+
+    @property
+    def suffix(self) -> str:
+        return self.path.suffix.lower()
+
+    @property
+    def size(self) -> int:
+        """Size in bytes; raises OSError for a missing on-disk file."""
+        if self.data is not None:
+            return len(self.data)
+        return self.path.stat().st_size
+
+    def parse_input(self) -> ParseInput:
+        """What to pass to a parse function — the bytes (shared, not copied) or the path."""
+        return self.data if self.data is not None else self.path
+
+    def sha256(self) -> str:
+        if self.data is not None:
+            return hashlib.sha256(self.data).hexdigest()
+        from app.services.parse_cache import file_sha256
+
+        return file_sha256(self.path)
+
+    def spill(self) -> Path:
+        """Write an in-memory source to ``path`` (blocking) and release the buffer."""
+        if self.data is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_bytes(self.data)
+            logger.debug("Spilled %s to disk (%d bytes)", self.filename, len(self.data))
+            self.data = None
+        return self.path
+
+    def close(self) -> None:
+        """Release the in-memory buffer (the source cannot be parsed again)."""
+        self.data = None
+
+
+def open_input(source: ParseInput) -> Path | BinaryIO:
+    """Path as-is, bytes as a BytesIO over the same buffer — for parsers taking file objects."""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
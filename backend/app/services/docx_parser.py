@@ -0,0 +1,289 @@
+# backend/app/services/docx_parser.py
+# Streaming DOCX → markdown parser (single pass over word/document.xml)
+# Walks body-level paragraphs and tables with lxml iterparse, freeing each block
+# after rendering, so parse time is linear and memory stays flat on huge specs.
+# Related: parser.py (fast-path dispatch), parser_benchmark.py
+
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterator
+
+from lxml import etree
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_REL_OFFICE_DOCUMENT = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+)
+_REL_STYLES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+
+
+def _w(tag: str) -> str:
+    return f"{{{_W_NS}}}{tag}"
+
+
+_P = _w("p")
+_TBL = _w("tbl")
+_TR = _w("tr")
+_TC = _w("tc")
+_R = _w("r")
+_HYPERLINK = _w("hyperlink")
+_PPR = _w("pPr")
+_PSTYLE = _w("pStyle")
+_TRPR = _w("trPr")
+_TCPR = _w("tcPr")
+_VAL = _w("val")
+
+# Run inner-content → text, same mapping python-docx uses for Paragraph.text
+_RUN_TEXT = {
+    _w("tab"): "\t",
+    _w("ptab"): "\t",
+    _w("cr"): "\n",
+    _w("noBreakHyphen"): "-",
+}
+_T = _w("t")
+_BR = _w("br")
+
+# Body-level blocks live at depth 3: w:document → w:body → block
+_BLOCK_DEPTH = 3
+
+
+def parse_docx(source: Path | BinaryIO) -> tuple[str, int]:
+    """Parse a DOCX file into markdown — returns (markdown_text, page_count).
+
+    Output matches the python-docx renderer: heading styles become #-headings,
+    list/bullet styles become "- " items, tables become markdown tables.
+    """
+    with zipfile.ZipFile(source) as zf:
+        document_part = _main_document_part(zf)
+        styles, default_style = _load_paragraph_styles(zf, document_part)
+
+        parts: list[str] = []
+        with zf.open(document_part) as fh:
+            for block in _iter_body_blocks(fh):
+                if block.tag == _P:
+                    _render_paragraph(block, styles, default_style, parts)
+                elif block.tag == _TBL:
+                    _render_table(block, parts)
+
+    markdown_text = "\n\n".join(parts)
+
+    # Estimate pages from content length (~3000 chars per page)
+    page_count = max(len(markdown_text) // 3000, 1)
+
+    return markdown_text, page_count
+
+
+# ── Package navigation ───────────────────────────────────────────────────────
+
+
+def _main_document_part(zf: zipfile.ZipFile) -> str:
+    """Resolve the main document part name from the package relationships."""
+    try:
+        rels = etree.fromstring(zf.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels.iter(f"{{{_REL_NS}}}Relationship"):
+        if rel.get("Type") == _REL_OFFICE_DOCUMENT:
+            return rel.get("Target", "word/document.xml").lstrip("/")
+    return "word/document.xml"
+
+
+def _load_paragraph_styles(
+    zf: zipfile.ZipFile, document_part: str
+) -> tuple[dict[str, str], str]:
+    """Map paragraph styleId → lowercased style name, plus the default style name."""
+    part_path = PurePosixPath(document_part)
+    rels_name = str(part_path.parent / "_rels" / f"{part_path.name}.rels")
+    styles_part = str(part_path.parent / "styles.xml")
+    try:
+        rels = etree.fromstring(zf.read(rels_name))
+        for rel in rels.iter(f"{{{_REL_NS}}}Relationship"):
+            if rel.get("Type") == _REL_STYLES:
+                target = rel.get("Target", "styles.xml")
+                if target.startswith("/"):
+                    styles_part = target.lstrip("/")
+                else:
+                    styles_part = str(part_path.parent / target)
+                break
+    except KeyError:
+        pass
+
+    try:
+        root = etree.fromstring(zf.read(styles_part))
+    except KeyError:
+        return {}, ""
+
+    styles: dict[str, str] = {}
+    default_style = ""
+    for style in root.iter(_w("style")):
+        if style.get(_w("type")) != "paragraph":
+            continue
+        name_el = style.find(_w("name"))
+        name = (name_el.get(_VAL) or "") if name_el is not None else ""
+        name = name.lower()
+        style_id = style.get(_w("styleId"))
+        if style_id:
+            styles[style_id] = name
+        if style.get(_w("default")) in ("1", "true", "on"):
+            default_style = name
+    return styles, default_style
+
+
+def _iter_body_blocks(fh: BinaryIO) -> Iterator[etree._Element]:
+    """Yield each body-level element once fully parsed, then free it."""
+    depth = 0
+    for event, elem in etree.iterparse(
+        fh, events=("start", "end"), resolve_entities=False
+    ):
+        if event == "start":
+            depth += 1
+            continue
+        if depth == _BLOCK_DEPTH:
+            yield elem
+            # Drop the rendered block and any already-processed siblings
+            elem.clear()
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+        depth -= 1
+
+
+# ── Rendering ─────────────────────────────────────────────────────────────────
+
+
+def _run_text(run: etree._Element, out: list[str]) -> None:
+    for child in run:
+        tag = child.tag
+        if tag == _T:
+            out.append(child.text or "")
+        elif tag == _BR:
+            # Only line breaks map to text; page/column breaks are dropped
+            if child.get(_w("type"), "textWrapping") == "textWrapping":
+                out.append("\n")
+        else:
+            text = _RUN_TEXT.get(tag)
+            if text is not None:
+                out.append(text)
+
+
+def _paragraph_text(p: etree._Element) -> str:
+    out: list[str] = []
+    for child in p:
+        if child.tag == _R:
+            _run_text(child, out)
+        elif child.tag == _HYPERLINK:
+            for run in child:
+                if run.tag == _R:
+                    _run_text(run, out)
+    return "".join(out)
+
+
+def _paragraph_style(
+    p: etree._Element, styles: dict[str, str], default_style: str
+) -> str:
+    ppr = p.find(_PPR)
+    if ppr is not None:
+        pstyle = ppr.find(_PSTYLE)
+        if pstyle is not None:
+            return styles.get(pstyle.get(_VAL, ""), default_style)
+    return default_style
+
+
+def _render_paragraph(
+    p: etree._Element,
+    styles: dict[str, str],
+    default_style: str,
+    parts: list[str],
+) -> None:
+    text = _paragraph_text(p).strip()
+    if not text:
+        return
+
+    style_name = _paragraph_style(p, styles, default_style)
+
+    if "heading 1" in style_name:
+        parts.append(f"# {text}")
+    elif "heading 2" in style_name:
+        parts.append(f"## {text}")
+    elif "heading 3" in style_name:
+        parts.append(f"### {text}")
+    elif "heading" in style_name:
+        parts.append(f"#### {text}")
+    elif "list" in style_name or "bullet" in style_name:
+        parts.append(f"- {text}")
+    else:
+        parts.append(text)
+
+
+def _int_prop(parent: etree._Element | None, tag: str, default: int) -> int:
+    if parent is None:
+        return default
+    el = parent.find(_w(tag))
+    if el is None:
+        return default
+    try:
+        return int(el.get(_VAL, default))
+    except ValueError:
+        return default
+
+
+def _table_rows(tbl: etree._Element) -> list[list[str]]:
+    """Build the cell-text matrix, repeating spanned and vertically merged cells.
+
+    Mirrors python-docx ``_Row.cells``: a horizontal span repeats its cell once
+    per grid column, and a ``vMerge="continue"`` cell takes the text of the cell
+    above it in the same grid column.
+    """
+    rows: list[list[str]] = []
+    above: dict[int, tuple[str, int]] = {}
+
+    for tr in tbl.iterchildren(_TR):
+        cells: list[str] = []
+        current: dict[int, tuple[str, int]] = {}
+        offset = _int_prop(tr.find(_TRPR), "gridBefore", 0)
+
+        for tc in tr.iterchildren(_TC):
+            tcpr = tc.find(_TCPR)
+            span = max(_int_prop(tcpr, "gridSpan", 1), 1)
+
+            merged = None
+            if tcpr is not None:
+                vmerge = tcpr.find(_w("vMerge"))
+                if vmerge is not None and vmerge.get(_VAL, "continue") == "continue":
+                    merged = above.get(offset)
+
+            if merged is not None:
+                text, span = merged
+            else:
+                text = "\n".join(_paragraph_text(p) for p in tc.iterchildren(_P))
+                text = text.strip().replace("\n", " ")
+
+            current[offset] = (text, span)
+            cells.extend([text] * span)
+            offset += span
+
+        rows.append(cells)
+        above = current
+
+    return rows
+
+
+def _render_table(tbl: etree._Element, parts: list[str]) -> None:
+    """Render a w:tbl element as markdown."""
+    rows = _table_rows(tbl)
+
+    if not rows:
+        return
+
+    # Header row
+    parts.append("| " + " | ".join(rows[0]) + " |")
+    parts.append("| " + " | ".join("---" for _ in rows[0]) + " |")
+
+    # Data rows
+    for row in rows[1:]:
+        # Pad row to match header column count
+        while len(row) < len(rows[0]):
+            row.append("")
+        parts.append("| " + " | ".join(row[: len(rows[0])]) + " |")
@@ -0,0 +1,99 @@
+# backend/app/services/event_buffer.py
+# Write-behind buffer for the pipeline progress events of one analysis
+# Events are numbered and queued in memory the moment they happen (emit() is
+# synchronous, so parse/extract callbacks call it directly) and written with
+# one bulk append every event_flush_interval_ms, or as soon as
+# event_flush_batch of them are waiting. A single flusher task per analysis
+# writes the batches one after another, so events land in index order.
+# The pipeline flushes before every terminal status — the SSE stream stops
+# reading events once it sees one — and closes the buffer when it ends.
+# Related: pipeline.py (_emit_event), convex_client.py (append_events),
+#          routers/analyze.py (SSE stream reads the events)
+
+import asyncio
+import logging
+import time
+
+from app.convex_client import ConvexDB
+
+logger = logging.getLogger(__name__)
+
+
+class EventBuffer:
+    """Progress events of one analysis, written to the DB in batches."""
+
+    def __init__(
+        self,
+        db: ConvexDB,
+        analysis_id: str,
+        *,
+        max_batch: int = 50,
+        interval_ms: int = 250,
+    ) -> None:
+        self.db = db
+        self.analysis_id = analysis_id
+        self.max_batch = max(1, max_batch)
+        self.interval = max(0, interval_ms) / 1000
+        self.next_index = 0  # index of the next event (continues an earlier run's log)
+        self.batches_written = 0
+        self._pending: list[dict] = []
+        self._flusher: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._write_lock = asyncio.Lock()  # one write at a time keeps batches in order
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def emit(self, event_type: str, data: dict) -> None:
+        """Queue an event (call from the event loop); it is written shortly."""
+        self._pending.append({
+            "timestamp": time.time(),
+            "event_type": event_type,
+            "data": data,
+            "index": self.next_index,
+        })
+        self.next_index += 1
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write every event emitted so far (failed writes stay queued)."""
+        async with self._write_lock:
+            while self._pending:
+                batch = self._pending[: self.max_batch]
+                try:
+                    await self.db.append_events(self.analysis_id, batch)
+                except Exception as e:
+                    logger.warning(
+                        "Writing %d events for %s failed, will retry: %s",
+                        len(batch), self.analysis_id, e,
+                    )
+                    return
+                # emit() only appends, so the batch is still the head of the queue
+                del self._pending[: len(batch)]
+                self.batches_written += 1
+
+    async def close(self) -> None:
+        """Final flush; events that still cannot be written are dropped."""
+        await self.flush()
+        if self._pending:
+            logger.error(
+                "Dropping %d unwritten events for %s", len(self._pending), self.analysis_id,
+            )
+            self._pending.clear()
+        if self._flusher is not None:
+            self._wakeup.set()
+            await self._flusher
+
+    async def _run(self) -> None:
+        # Flush every interval, or right away when a batch fills up; stop when idle
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
@@ -14,6 +14,7 @@ from app.models.schemas import (
     EstimatedValue,
     QAEvaluation,
 )
+from app.services.workspace import scratch_root
 
 logger = logging.getLogger(__name__)
 
@@ -152,7 +153,7 @@ async def export_pdf(
 ) -> Path:
     """
     Generate PDF report using reportlab.
-    Returns path to generated PDF file.
+    Returns path to generated PDF file (in scratch — the caller deletes it).
     """
     from reportlab.lib.pagesizes import A4
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -266,7 +267,7 @@ async def export_pdf(
 
     # Create temp file
     tmp = tempfile.NamedTemporaryFile(
-        suffix=".pdf", prefix="procurement_report_", delete=False
+        suffix=".pdf", prefix="procurement_report_", dir=scratch_root(), delete=False
     )
     tmp.close()
     pdf_path = Path(tmp.name)
@@ -769,14 +770,14 @@ async def export_docx(
 ) -> Path:
     """
     Generate DOCX report using python-docx.
-    Returns path to generated DOCX file.
+    Returns path to generated DOCX file (in scratch — the caller deletes it).
     """
     from docx import Document
     from docx.shared import Inches, Pt, RGBColor
     from docx.enum.text import WD_ALIGN_PARAGRAPH
 
     tmp = tempfile.NamedTemporaryFile(
-        suffix=".docx", prefix="procurement_report_", delete=False
+        suffix=".docx", prefix="procurement_report_", dir=scratch_root(), delete=False
     )
     tmp.close()
     docx_path = Path(tmp.name)
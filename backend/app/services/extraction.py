@@ -1,19 +1,44 @@
 # backend/app/services/extraction.py
 # Per-document LLM extraction orchestrator
-# Extracts structured procurement data from parsed documents
-# Related: llm.py, parser.py, prompts/extraction.py, models/schemas.py
+# Extracts structured procurement data from parsed documents; identical
+# document/chunk prompts are answered from the cross-analysis extraction cache
+# Related: llm.py, parser.py, prompts/extraction.py, models/schemas.py,
+#          extraction_cache.py
 
 import asyncio
+import dataclasses
+import hashlib
 import json
 import logging
+import shutil
+from collections.abc import AsyncIterable, Iterable
+from pathlib import Path
 from typing import Awaitable, Callable, Optional
 
 from app.models.schemas import ExtractionResult
 from app.prompts.extraction import EXTRACTION_SYSTEM, EXTRACTION_USER
 from app.prompts.analysis_types import get_extraction_prompts
 from app.prompts.extraction_ocr import EXTRACTION_OCR_USER
-from app.services.llm import OPENROUTER_MAX_FILE_SIZE, LLMClient, build_multimodal_content
+from app.services.channel import aiter_items
+from app.services import extraction_cache
+from app.services.checkpoint import AnalysisCheckpoint
+from app.services.image_prep import get_preset, prepare_image_upload
+from app.services.llm import (
+    OPENROUTER_MAX_FILE_SIZE,
+    LLMClient,
+    build_multimodal_content,
+    build_multimodal_images,
+)
+from app.services.ocr_pages import (
+    format_ranges,
+    render_pages_jpeg,
+    replace_markers,
+    scanned_ranges,
+    write_pdf_subset,
+)
+from app.services.parse_pool import run_parser
 from app.services.parser import ParsedDocument
+from app.services.workspace import scratch_dir
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +56,16 @@ def calculate_max_chars(context_length: int) -> int:
     return safe_tokens * 4  # ~4 chars per token
 
 
+def _sum_usage(usages: Iterable[dict]) -> dict:
+    """Add up usage dicts — tokens plus extraction cache hits and savings."""
+    total = {"input_tokens": 0, "output_tokens": 0}
+    for usage in usages:
+        for key, value in usage.items():
+            if isinstance(value, int):
+                total[key] = total.get(key, 0) + value
+    return total
+
+
 def _find_structure_break(content: str, search_start: int, search_end: int) -> int:
     """Find best structure-aware break point within the search window.
 
@@ -164,6 +199,9 @@ async def _extract_single(
     JSON extraction where reasoning tokens add cost (~15-20%) without
     improving output quality. The UI thinking slider applies only to
     aggregation where the model must resolve conflicts and prioritise.
+
+    Results are cached across analyses by prompt + model; a cache hit returns
+    zero usage plus ``saved_input_tokens`` / ``saved_output_tokens``.
     """
     system_prompt, user_template = get_extraction_prompts(analysis_type, custom_instructions)
     thinking = "off"  # hardcoded: reasoning adds no value for structured extraction
@@ -174,6 +212,13 @@ async def _extract_single(
         page_count=doc.page_count,
         content=doc.content,
     )
+    cache_key = extraction_cache.extraction_cache_key(
+        system_prompt, user_prompt, model, analysis_type, custom_instructions,
+    )
+    cached = await extraction_cache.lookup(cache_key)
+    if cached is not None:
+        logger.info("Extraction cache hit for %s", doc.filename)
+        return cached
 
     if use_streaming:
         result, usage = await llm.complete_structured_streaming(
@@ -195,6 +240,7 @@ async def _extract_single(
             thinking=thinking,
             max_tokens=32000,
         )
+    await extraction_cache.store(cache_key, result, usage)  # type: ignore[arg-type]
     return result, usage  # type: ignore[return-value]
 
 
@@ -204,15 +250,27 @@ async def _extract_single_multimodal(
     model: str,
     on_thinking: Callable[[str], Awaitable[None]] | None = None,
     cancel_event: Optional[asyncio.Event] = None,
+    images: list[bytes] | None = None,
 ) -> tuple[ExtractionResult, dict]:
-    """Extract structured data from a scanned PDF/image via OpenRouter multimodal API."""
+    """Extract structured data from a scanned PDF/image via OpenRouter multimodal API.
+
+    ``images`` (pre-rendered page JPEGs) replace the file attachment when the
+    original is too large to send. Image scans are preprocessed (image_prep.py)
+    before upload unless ocr_image_preset is "off".
+    """
+    if images is None and doc.file_path is not None:
+        images = await _prepare_upload_images(doc.file_path)
+
     user_prompt = EXTRACTION_OCR_USER.format(
         filename=doc.filename,
         document_type=doc.doc_type.value,
         page_count=doc.page_count,
     )
 
-    content_parts, plugins = build_multimodal_content(user_prompt, doc.file_path)
+    if images:
+        content_parts, plugins = build_multimodal_images(user_prompt, images), None
+    else:
+        content_parts, plugins = build_multimodal_content(user_prompt, doc.file_path)
 
     logger.info(
         "Multimodal extraction for %s (%dKB, %d parts, plugins=%s)",
@@ -242,18 +300,19 @@ async def _extract_single_local_ocr(
     model: str,
     on_thinking: Callable[[str], Awaitable[None]] | None = None,
     cancel_event: Optional[asyncio.Event] = None,
+    on_ocr_progress: Optional[Callable[[int, int], None]] = None,
 ) -> tuple[ExtractionResult, dict]:
     """Extract from large scanned file using local Docling OCR fallback."""
-    from app.services.parser import parse_with_ocr
+    from app.services.parser import run_local_ocr
 
     logger.info(
         "Local OCR fallback for %s (%dKB, too large for multimodal)",
         doc.filename, doc.file_size_bytes // 1024,
     )
 
-    loop = asyncio.get_running_loop()
-    ocr_text, page_count = await loop.run_in_executor(
-        None, parse_with_ocr, doc.file_path
+    ocr_text, page_count = await run_local_ocr(
+        doc.file_path, doc.content_hash,
+        on_progress=on_ocr_progress, cancel_event=cancel_event,
     )
 
     ocr_doc = ParsedDocument(
@@ -265,10 +324,180 @@ async def _extract_single_local_ocr(
         token_estimate=len(ocr_text) // 4,
         file_path=doc.file_path,
         is_scanned=False,  # OCR text is now available
+        content_hash=doc.content_hash,
     )
     return await _extract_single(ocr_doc, llm, model, on_thinking=on_thinking, cancel_event=cancel_event)
 
 
+async def _prepare_upload_images(file_path: Path) -> list[bytes] | None:
+    """Preprocessed pages of an image scan (PNG/TIFF/JPG) for upload, or None."""
+    from app.config import get_settings
+
+    if file_path.suffix.lower() == ".pdf" or get_preset() is None:
+        return None
+    try:
+        images, stats = await run_parser(
+            prepare_image_upload, file_path, timeout=get_settings().parser_doc_timeout,
+        )
+    except Exception as e:
+        logger.warning("Scan preprocessing failed for %s — sending the original: %s", file_path.name, e)
+        return None
+    logger.info("Scan preprocessing of %s for multimodal: %s", file_path.name, stats.summary())
+    return images
+
+
+async def _render_for_multimodal(file_path: Path, pages: list[int]) -> list[bytes] | None:
+    """Downscaled JPEGs of ``pages`` that fit OPENROUTER_MAX_FILE_SIZE, or None.
+
+    Image scans use their preprocessed pages when those fit.
+    """
+    from app.config import get_settings
+
+    if file_path.suffix.lower() != ".pdf":
+        images = await _prepare_upload_images(file_path)
+        if images and sum(map(len, images)) <= OPENROUTER_MAX_FILE_SIZE:
+            return images
+        return None
+    try:
+        return await run_parser(
+            render_pages_jpeg, file_path, pages, OPENROUTER_MAX_FILE_SIZE,
+            timeout=get_settings().parser_doc_timeout,
+        )
+    except Exception as e:
+        logger.warning("Page rendering failed for %s: %s", file_path.name, e)
+        return None
+
+
+async def _extract_scanned(
+    doc: ParsedDocument,
+    llm: LLMClient,
+    model: str,
+    on_thinking: Callable[[str], Awaitable[None]] | None = None,
+    cancel_event: Optional[asyncio.Event] = None,
+    on_ocr_progress: Optional[Callable[[int, int], None]] = None,
+) -> tuple[ExtractionResult, dict]:
+    """Fully scanned file: multimodal file → downscaled page images → local OCR."""
+    if doc.file_size_bytes <= OPENROUTER_MAX_FILE_SIZE:
+        return await _extract_single_multimodal(
+            doc, llm, model, on_thinking=on_thinking, cancel_event=cancel_event,
+        )
+    images = await _render_for_multimodal(doc.file_path, list(range(1, doc.page_count + 1)))
+    if images:
+        logger.info(
+            "Scanned %s too large for multimodal (%dKB) — sending %d page images (%dKB)",
+            doc.filename, doc.file_size_bytes // 1024, len(images), sum(map(len, images)) // 1024,
+        )
+        return await _extract_single_multimodal(
+            doc, llm, model, on_thinking=on_thinking, cancel_event=cancel_event, images=images,
+        )
+    return await _extract_single_local_ocr(
+        doc, llm, model, on_thinking=on_thinking, cancel_event=cancel_event,
+        on_ocr_progress=on_ocr_progress,
+    )
+
+
+async def _resolve_scanned_pages(
+    doc: ParsedDocument,
+    llm: LLMClient,
+    model: str,
+    on_thinking: Callable[[str], Awaitable[None]] | None = None,
+    cancel_event: Optional[asyncio.Event] = None,
+    on_ocr_progress: Optional[Callable[[int, int], None]] = None,
+) -> tuple[ParsedDocument, list[tuple[ExtractionResult, dict]]]:
+    """Handle the image-only pages of a mixed PDF; only those pages are OCR'd.
+
+    Subset PDF ≤ OPENROUTER_MAX_FILE_SIZE → one multimodal extraction of the
+    subset; else downscaled page images if they fit; else local OCR of all page
+    ranges at once (ocr_scheduler.py) with the text merged into the markers in
+    page order. Returns the
+    document with markers resolved plus any separate scanned-page results.
+    """
+    from app.config import get_settings
+    from app.services.parser import run_local_ocr
+
+    ranges = scanned_ranges(doc.content)
+    pages = [page for start, end in ranges for page in range(start, end + 1)]
+    label = format_ranges(ranges)
+    timeout = get_settings().parser_doc_timeout
+
+    def _resolved(render: Callable[[int, int], str]) -> ParsedDocument:
+        content = replace_markers(doc.content, render)
+        return dataclasses.replace(
+            doc, content=content, token_estimate=len(content) // 4, scanned_pages=[],
+        )
+
+    def _noted(note: str) -> Callable[[int, int], str]:
+        return lambda a, b: f"[Puslapiai {format_ranges([(a, b)])}: {note}]"
+
+    if not (doc.file_path and doc.file_path.exists()):
+        return _resolved(_noted("skenuoti, tekstas neatpažintas")), []
+
+    workdir = scratch_dir("scanned_pages_")
+    try:
+        subset = workdir / f"{doc.file_path.stem}_p{pages[0]}-{pages[-1]}.pdf"
+        subset_size = await run_parser(
+            write_pdf_subset, doc.file_path, pages, subset, timeout=timeout,
+        )
+        subset_doc = dataclasses.replace(
+            doc,
+            filename=f"{doc.filename} (skenuoti puslapiai {label})",
+            page_count=len(pages),
+            file_path=subset,
+            file_size_bytes=subset_size,
+            is_scanned=True,
+            scanned_pages=[],
+        )
+
+        images = None
+        if subset_size > OPENROUTER_MAX_FILE_SIZE:
+            images = await _render_for_multimodal(doc.file_path, pages)
+        if subset_size <= OPENROUTER_MAX_FILE_SIZE or images:
+            logger.info(
+                "Mixed PDF %s: multimodal OCR of pages %s (%s)",
+                doc.filename, label,
+                f"{len(images)} images" if images else f"subset PDF {subset_size // 1024}KB",
+            )
+            scan_result = await _extract_single_multimodal(
+                subset_doc, llm, model, on_thinking=on_thinking,
+                cancel_event=cancel_event, images=images,
+            )
+            return _resolved(_noted("skenuoti, turinys išgautas atskirai")), [scan_result]
+
+        logger.info("Mixed PDF %s: local OCR of pages %s", doc.filename, label)
+        pages_done: dict[tuple[int, int], int] = {}
+
+        async def _ocr_range(start: int, end: int) -> str:
+            def _progress(done: int, _total: int) -> None:
+                pages_done[(start, end)] = done
+                if on_ocr_progress is not None:
+                    on_ocr_progress(sum(pages_done.values()), len(pages))
+
+            range_pdf = workdir / f"p{start}-{end}.pdf"
+            await run_parser(
+                write_pdf_subset, doc.file_path, list(range(start, end + 1)), range_pdf,
+                timeout=timeout,
+            )
+            range_hash = (
+                hashlib.sha256(f"{doc.content_hash}:pages:{start}-{end}".encode()).hexdigest()
+                if doc.content_hash else None
+            )
+            text, _ = await run_local_ocr(
+                range_pdf, range_hash, on_progress=_progress, cancel_event=cancel_event,
+            )
+            return text
+
+        texts = await asyncio.gather(*(_ocr_range(start, end) for start, end in ranges))
+        ocr_text = dict(zip(ranges, texts))
+        return _resolved(lambda a, b: ocr_text[(a, b)].strip()), []
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning("Scanned-page OCR failed for %s (pages %s): %s", doc.filename, label, e)
+        return _resolved(_noted("skenuoti, tekstas neatpažintas")), []
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
 async def extract_document(
     doc: ParsedDocument,
     llm: LLMClient,
@@ -279,11 +508,61 @@ async def extract_document(
     custom_instructions: str = "",
     thinking_override: str = "",
     cancel_event: Optional[asyncio.Event] = None,
+    on_ocr_progress: Optional[Callable[[int, int], None]] = None,
+    checkpoint: AnalysisCheckpoint | None = None,
 ) -> tuple[ExtractionResult, dict]:
     """
     Extract structured data from a single parsed document.
     Returns (ExtractionResult, usage_dict).
 
+    Mixed PDFs first get their image-only pages OCR'd (_resolve_scanned_pages);
+    a separate scanned-page result is merged after the text result.
+    ``on_ocr_progress(pages_done, pages_total)`` reports local OCR progress.
+    With a ``checkpoint``, chunks extracted by an interrupted run are reused.
+    """
+    scan_results: list[tuple[ExtractionResult, dict]] = []
+    if doc.scanned_pages and not doc.is_scanned:
+        doc, scan_results = await _resolve_scanned_pages(
+            doc, llm, model, on_thinking=on_thinking, cancel_event=cancel_event,
+            on_ocr_progress=on_ocr_progress,
+        )
+
+    result, usage = await _extract_parsed(
+        doc, llm, model,
+        context_length=context_length,
+        on_thinking=on_thinking,
+        analysis_type=analysis_type,
+        custom_instructions=custom_instructions,
+        thinking_override=thinking_override,
+        cancel_event=cancel_event,
+        on_ocr_progress=on_ocr_progress,
+        checkpoint=checkpoint,
+    )
+    if not scan_results:
+        return result, usage
+
+    total_usage = _sum_usage([usage, *(part_usage for _, part_usage in scan_results)])
+    merged = merge_chunk_extractions([result, *(r for r, _ in scan_results)])
+    return merged, total_usage
+
+
+async def _extract_parsed(
+    doc: ParsedDocument,
+    llm: LLMClient,
+    model: str,
+    context_length: int = 200_000,
+    on_thinking: Callable[[str], Awaitable[None]] | None = None,
+    analysis_type: str = "detailed",
+    custom_instructions: str = "",
+    thinking_override: str = "",
+    cancel_event: Optional[asyncio.Event] = None,
+    on_ocr_progress: Optional[Callable[[int, int], None]] = None,
+    checkpoint: AnalysisCheckpoint | None = None,
+) -> tuple[ExtractionResult, dict]:
+    """
+    Extract structured data from a parsed document (scanned pages resolved).
+    Returns (ExtractionResult, usage_dict).
+
     Uses context_length to dynamically calculate chunk size.
     For documents that fit — single-pass extraction (better quality).
     For long documents — splits into overlapping chunks with parallel processing.
@@ -302,14 +581,10 @@ async def extract_document(
     try:
         # Multimodal routing for scanned documents
         if doc.is_scanned and doc.file_path and doc.file_path.exists():
-            if doc.file_size_bytes <= OPENROUTER_MAX_FILE_SIZE:
-                result, usage = await _extract_single_multimodal(
-                    doc, llm, model, on_thinking=on_thinking, cancel_event=cancel_event,
-                )
-            else:
-                result, usage = await _extract_single_local_ocr(
-                    doc, llm, model, on_thinking=on_thinking, cancel_event=cancel_event,
-                )
+            result, usage = await _extract_scanned(
+                doc, llm, model, on_thinking=on_thinking, cancel_event=cancel_event,
+                on_ocr_progress=on_ocr_progress,
+            )
             logger.info(
                 "Scanned extraction complete for %s: in=%d out=%d tokens",
                 doc.filename,
@@ -356,6 +631,17 @@ async def extract_document(
         chunk_semaphore = asyncio.Semaphore(3)
 
         async def _extract_chunk(i: int, chunk: str) -> tuple[ExtractionResult, dict]:
+            if checkpoint is not None:
+                restored = await checkpoint.load_chunk(doc.filename, i, len(chunks), chunk)
+                if restored is not None:
+                    logger.info("Chunk %d/%d of %s restored from checkpoint", i + 1, len(chunks), doc.filename)
+                    return restored
+            result, usage = await _extract_chunk_llm(i, chunk)
+            if checkpoint is not None:
+                checkpoint.save_chunk(doc.filename, i, len(chunks), chunk, result, usage)
+            return result, usage
+
+        async def _extract_chunk_llm(i: int, chunk: str) -> tuple[ExtractionResult, dict]:
             async with chunk_semaphore:
                 chunk_doc = ParsedDocument(
                     filename=f"{doc.filename} (dalis {i + 1}/{len(chunks)})",
@@ -385,12 +671,8 @@ async def extract_document(
             *[_extract_chunk(i, chunk) for i, chunk in enumerate(chunks)]
         )
 
-        partial_results = []
-        total_usage = {"input_tokens": 0, "output_tokens": 0}
-        for result, usage in chunk_results:
-            partial_results.append(result)
-            total_usage["input_tokens"] += usage.get("input_tokens", 0)
-            total_usage["output_tokens"] += usage.get("output_tokens", 0)
+        partial_results = [result for result, _ in chunk_results]
+        total_usage = _sum_usage(usage for _, usage in chunk_results)
 
         merged = merge_chunk_extractions(partial_results)
         logger.info(
@@ -414,7 +696,7 @@ async def extract_document(
 
 
 async def extract_all(
-    docs: list[ParsedDocument],
+    docs: Iterable[ParsedDocument] | AsyncIterable[ParsedDocument],
     llm: LLMClient,
     model: str,
     context_length: int = 200_000,
@@ -427,44 +709,44 @@ async def extract_all(
     custom_instructions: str = "",
     thinking_override: str = "",
     cancel_event: Optional[asyncio.Event] = None,
+    on_ocr_progress: Optional[Callable[[int, str, int, int], None]] = None,
+    checkpoint: AnalysisCheckpoint | None = None,
 ) -> list[tuple[ParsedDocument, ExtractionResult, dict]]:
     """
     Parallel extraction with concurrency limit.
     Uses asyncio.Semaphore(max_concurrent).
 
+    ``docs`` may be a list or an async iterable (the pipeline's Channel of
+    parsed documents); each document is queued for extraction as soon as it
+    arrives, so extraction overlaps with parsing of the remaining files.
+
     Returns list of (doc, result, usage) tuples in the same order as input docs.
     Individual failures don't crash the batch — returns partial ExtractionResult.
+    With a ``checkpoint``, each successful result is saved as it completes and
+    documents (or chunks) saved by an interrupted run are not sent again.
 
     Callbacks:
         on_started(index, filename)   — fires when extraction begins for a doc
         on_completed(index, filename, usage) — fires on successful extraction
         on_error(index, filename, error_msg) — fires on extraction failure
+        on_ocr_progress(index, filename, pages_done, pages_total) — local OCR progress
     """
-    if not docs:
-        return []
-
-    # Filter out documents with parse errors (content starts with [ERROR])
-    extractable_docs: list[tuple[int, ParsedDocument]] = []
-    results: list[tuple[int, tuple[ParsedDocument, ExtractionResult, dict]]] = []
+    semaphore = asyncio.Semaphore(max_concurrent)
 
-    for i, doc in enumerate(docs):
+    async def _extract_one(
+        index: int, doc: ParsedDocument
+    ) -> tuple[ParsedDocument, ExtractionResult, dict]:
+        # Documents with parse errors (content starts with [ERROR]) are skipped
         if doc.content.startswith("[ERROR]"):
             logger.warning("Skipping error document: %s", doc.filename)
             error_result = ExtractionResult(
                 confidence_notes=[f"Document skipped (parse failure): {doc.content[:200]}"],
                 source_documents=[],
             )
-            results.append((i, (doc, error_result, {"input_tokens": 0, "output_tokens": 0})))
             if on_error:
-                on_error(i, doc.filename, doc.content[:200])
-        else:
-            extractable_docs.append((i, doc))
+                on_error(index, doc.filename, doc.content[:200])
+            return (doc, error_result, {"input_tokens": 0, "output_tokens": 0})
 
-    semaphore = asyncio.Semaphore(max_concurrent)
-
-    async def _extract_one(
-        index: int, doc: ParsedDocument
-    ) -> tuple[int, tuple[ParsedDocument, ExtractionResult, dict]]:
         async with semaphore:
             # Check cancellation before starting this document
             if cancel_event and cancel_event.is_set():
@@ -472,15 +754,26 @@ async def extract_all(
                 empty = ExtractionResult(
                     confidence_notes=["Extraction skipped: analysis cancelled"],
                 )
-                return (index, (doc, empty, {"input_tokens": 0, "output_tokens": 0}))
+                return (doc, empty, {"input_tokens": 0, "output_tokens": 0})
+
+            if checkpoint is not None:
+                restored = await checkpoint.load_extraction(doc)
+                if restored is not None:
+                    logger.info("Extraction restored from checkpoint: %s", doc.filename)
+                    return (doc, *restored)
 
             if on_started:
                 on_started(index, doc.filename)
+            doc_ocr_progress = None
+            if on_ocr_progress:
+                def doc_ocr_progress(done: int, total: int) -> None:
+                    on_ocr_progress(index, doc.filename, done, total)
             try:
                 result, usage = await extract_document(
                     doc, llm, model, context_length=context_length, on_thinking=on_thinking,
                     analysis_type=analysis_type, custom_instructions=custom_instructions, thinking_override=thinking_override,
-                    cancel_event=cancel_event,
+                    cancel_event=cancel_event, on_ocr_progress=doc_ocr_progress,
+                    checkpoint=checkpoint,
                 )
 
                 # Check if extract_document already handled the error internally
@@ -492,17 +785,19 @@ async def extract_all(
                     if on_error:
                         on_error(index, doc.filename, result.confidence_notes[0])
                 else:
+                    if checkpoint is not None:
+                        checkpoint.save_extraction(doc, result, usage)
                     if on_completed:
                         on_completed(index, doc.filename, usage)
 
-                return (index, (doc, result, usage))
+                return (doc, result, usage)
 
             except asyncio.CancelledError:
                 logger.info("Extraction aborted (cancelled): %s", doc.filename)
                 empty = ExtractionResult(
                     confidence_notes=["Extraction aborted: analysis cancelled"],
                 )
-                return (index, (doc, empty, {"input_tokens": 0, "output_tokens": 0}))
+                return (doc, empty, {"input_tokens": 0, "output_tokens": 0})
 
             except Exception as e:
                 logger.error("Extraction failed for %s: %s", doc.filename, e)
@@ -511,12 +806,10 @@ async def extract_all(
                 empty = ExtractionResult(
                     confidence_notes=[f"Extraction failed: {e}"],
                 )
-                return (index, (doc, empty, {"input_tokens": 0, "output_tokens": 0}))
-
-    tasks = [_extract_one(orig_idx, doc) for orig_idx, doc in extractable_docs]
-    extracted = await asyncio.gather(*tasks)
-    results.extend(extracted)
+                return (doc, empty, {"input_tokens": 0, "output_tokens": 0})
 
-    # Sort by original index to preserve document ordering
-    results.sort(key=lambda x: x[0])
-    return [item for _, item in results]
+    tasks: list[asyncio.Task[tuple[ParsedDocument, ExtractionResult, dict]]] = []
+    async with asyncio.TaskGroup() as group:
+        async for doc in aiter_items(docs):
+            tasks.append(group.create_task(_extract_one(len(tasks), doc)))
+    return [task.result() for task in tasks]
@@ -0,0 +1,120 @@
+# backend/app/services/extraction_cache.py
+# Cross-analysis cache of LLM extraction results (one entry per document or chunk)
+# The same tender analysed twice — by another user, or again with a different
+# aggregation model — reuses every extraction whose prompt would be identical:
+# key = rendered document prompt (content + metadata) + extraction model +
+# analysis type + custom instructions + prompt/schema version. Entries are
+# shared by all workers through DiskCache (size-bounded LRU + TTL).
+# Related: disk_cache.py, extraction.py (_extract_single), pipeline.py (metrics),
+#          prompts/analysis_types.py (get_extraction_prompts)
+
+import asyncio
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from app.models.schemas import ExtractionResult
+from app.services.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# Bump when cached results must not be reused (e.g. post-processing changed)
+EXTRACTION_CACHE_VERSION = "1"
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@lru_cache
+def _schema_version() -> str:
+    """Changes whenever the ExtractionResult schema sent to the model changes."""
+    return _sha(json.dumps(ExtractionResult.model_json_schema(), sort_keys=True))
+
+
+def extraction_cache_key(
+    system_prompt: str,
+    user_prompt: str,
+    model: str,
+    analysis_type: str,
+    custom_instructions: str = "",
+) -> str:
+    """Cache key for one extraction call.
+
+    ``user_prompt`` is the rendered template (document content, filename, type,
+    page count); ``system_prompt`` carries the prompt version, the analysis type
+    focus and the custom instructions.
+    """
+    return _sha(":".join((
+        "extract",
+        EXTRACTION_CACHE_VERSION,
+        _schema_version(),
+        _sha(system_prompt),
+        model,
+        analysis_type,
+        _sha(custom_instructions.strip()),
+        _sha(user_prompt),
+    )))
+
+
+async def lookup(key: str) -> tuple[ExtractionResult, dict] | None:
+    """Cached (result, usage) for ``key``, usage reporting the tokens saved."""
+    cache = get_extraction_cache()
+    if cache is None:
+        return None
+    entry = await asyncio.get_running_loop().run_in_executor(None, cache.get, key)
+    if entry is None:
+        return None
+    try:
+        result = ExtractionResult.model_validate(entry["result"])
+    except (KeyError, ValidationError):
+        logger.warning("Extraction cache entry %s is invalid — ignoring", key[:12])
+        return None
+    return result, {
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "saved_input_tokens": entry.get("input_tokens", 0),
+        "saved_output_tokens": entry.get("output_tokens", 0),
+        "cache_hits": 1,
+    }
+
+
+async def store(key: str, result: ExtractionResult, usage: dict) -> None:
+    cache = get_extraction_cache()
+    if cache is None:
+        return
+    try:
+        entry = {
+            "result": result.model_dump(mode="json"),
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+        }
+        await asyncio.get_running_loop().run_in_executor(None, cache.put, key, entry)
+    except (TypeError, ValueError):
+        # A cache write must never fail the extraction it would have saved
+        logger.warning("Extraction result for %s not cacheable", key[:12], exc_info=True)
+
+
+@lru_cache
+def get_extraction_cache() -> DiskCache | None:
+    """Process-wide extraction cache, or None when disabled in settings."""
+    from app.config import get_settings
+
+    settings = get_settings()
+    if not settings.extraction_cache_enabled:
+        return None
+    root = Path(settings.extraction_cache_dir or Path(settings.temp_dir) / "extraction_cache")
+    logger.info(
+        "Extraction cache at %s (max %d MB, ttl %d h)",
+        root, settings.extraction_cache_max_mb, settings.extraction_cache_ttl_hours,
+    )
+    return DiskCache(
+        root,
+        settings.extraction_cache_max_mb * 1024 * 1024,
+        name="extraction-cache",
+        ttl_seconds=settings.extraction_cache_ttl_hours * 3600,
+    )
@@ -0,0 +1,363 @@
+# backend/app/services/image_prep.py
+# Scan preprocessing before OCR and multimodal upload — vectorized in NumPy
+# Grayscale (BT.601 luma), Otsu binarization, projection-profile deskew and
+# DPI normalization / area downscaling run on uint8 arrays; Pillow only decodes,
+# rotates and encodes. Presets (ocr_image_preset) trade size for fidelity.
+# Every call returns PrepStats (bytes and pixels before/after, seconds) so the
+# caller can report bytes saved and OCR time saved per page.
+# Related: ocr_scheduler.py (local OCR jobs), ocr_pages.py (page rendering),
+#          extraction.py (multimodal), config.py (ocr_image_preset)
+
+import io
+import logging
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Preset:
+    name: str
+    dpi: int  # scans above this resolution are downscaled to it
+    max_side: int  # longest side cap in pixels (covers scans without DPI metadata)
+    deskew: bool
+    binarize: bool  # 1-bit output: smallest files, loses grey detail (stamps, photos)
+    jpeg_quality: int  # multimodal upload of non-binarized pages
+
+
+PRESETS: dict[str, Preset] = {
+    "fast": Preset("fast", dpi=150, max_side=1754, deskew=True, binarize=True, jpeg_quality=60),
+    "balanced": Preset("balanced", dpi=200, max_side=2339, deskew=True, binarize=False, jpeg_quality=70),
+    "quality": Preset("quality", dpi=300, max_side=3508, deskew=True, binarize=False, jpeg_quality=85),
+}
+
+_STRIP_ROWS = 512  # rows converted per step — bounds the uint32 scratch buffer
+_SKEW_SAMPLE_SIDE = 1000  # deskew estimated on a copy no larger than this
+_SKEW_MAX_INK = 60_000  # ink pixels sampled for the projection profile
+_SKEW_MIN_DEGREES = 0.3  # smaller angles are left alone (rotation blurs)
+
+
+@dataclass
+class PrepStats:
+    """Before/after totals for one or more preprocessed pages."""
+
+    pages: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    pixels_in: int = 0
+    pixels_out: int = 0
+    seconds: float = 0.0
+    skew_degrees: list[float] = field(default_factory=list)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    def add(self, other: "PrepStats") -> None:
+        self.pages += other.pages
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.pixels_in += other.pixels_in
+        self.pixels_out += other.pixels_out
+        self.seconds += other.seconds
+        self.skew_degrees.extend(other.skew_degrees)
+
+    def ocr_seconds_saved(self, ocr_seconds: float) -> float:
+        """Estimated OCR time saved — RapidOCR detection scales with pixel count."""
+        if not self.pixels_out or self.pixels_in <= self.pixels_out:
+            return 0.0
+        return ocr_seconds * (self.pixels_in / self.pixels_out - 1)
+
+    def summary(self, ocr_seconds: float | None = None) -> str:
+        pages = max(self.pages, 1)
+        text = (
+            f"{self.pages} pages, {self.bytes_in // 1024}KB -> {self.bytes_out // 1024}KB "
+            f"({self.bytes_saved // pages // 1024}KB/page saved), "
+            f"{self.pixels_in / 1e6:.1f} -> {self.pixels_out / 1e6:.1f} Mpx, "
+            f"prep {self.seconds / pages:.2f}s/page"
+        )
+        if ocr_seconds is not None:
+            text += (
+                f", OCR {ocr_seconds / pages:.2f}s/page "
+                f"(~{self.ocr_seconds_saved(ocr_seconds) / pages:.2f}s/page saved)"
+            )
+        return text
+
+
+def get_preset(name: str | None = None) -> Preset | None:
+    """Preset for ``name`` (default: ocr_image_preset); None when preprocessing is off."""
+    if name is None:
+        from app.config import get_settings
+
+        name = get_settings().ocr_image_preset
+    name = (name or "off").lower()
+    if name == "off":
+        return None
+    if name not in PRESETS:
+        logger.warning("Unknown ocr_image_preset %r — using 'balanced'", name)
+        return PRESETS["balanced"]
+    return PRESETS[name]
+
+
+# ── Array operations ─────────────────────────────────────────────────────────
+
+
+def to_grayscale(pixels: np.ndarray) -> np.ndarray:
+    """BT.601 luma of an HxW, HxWx3 or HxWx4 uint8 array (alpha over white)."""
+    if pixels.ndim == 2:
+        return pixels
+    height = pixels.shape[0]
+    gray = np.empty(pixels.shape[:2], dtype=np.uint8)
+    for top in range(0, height, _STRIP_ROWS):
+        strip = pixels[top:top + _STRIP_ROWS].astype(np.uint32)
+        luma = (strip[..., 0] * 299 + strip[..., 1] * 587 + strip[..., 2] * 114 + 500) // 1000
+        if strip.shape[2] == 4:
+            alpha = strip[..., 3]
+            luma = (luma * alpha + 255 * (255 - alpha) + 127) // 255
+        gray[top:top + _STRIP_ROWS] = luma
+    return gray
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Global Otsu threshold from the 256-bin histogram."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256, dtype=np.float64)
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    mass_bg = np.cumsum(hist * levels)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mass_bg[-1] * weight_bg - mass_bg * weight_bg[-1]) ** 2 / (weight_bg * weight_fg)
+    between[~np.isfinite(between)] = 0.0
+    return int(np.argmax(between))
+
+
+def binarize(gray: np.ndarray, threshold: int | None = None) -> np.ndarray:
+    """Black text on white: 0 where gray <= threshold, 255 elsewhere."""
+    if threshold is None:
+        threshold = otsu_threshold(gray)
+    return np.where(gray > threshold, np.uint8(255), np.uint8(0))
+
+
+def area_resize(gray: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Downscale by averaging every source pixel into its output cell (box filter)."""
+    src_h, src_w = gray.shape
+    if (height, width) == (src_h, src_w):
+        return gray
+    rows = (np.arange(height) * src_h) // height
+    cols = (np.arange(width) * src_w) // width
+    sums = np.add.reduceat(gray, rows, axis=0, dtype=np.uint32)
+    sums = np.add.reduceat(sums, cols, axis=1, dtype=np.uint32)
+    counts = np.diff(np.append(rows, src_h))[:, None] * np.diff(np.append(cols, src_w))[None, :]
+    return ((sums + counts // 2) // counts).astype(np.uint8)
+
+
+def estimate_skew(gray: np.ndarray, max_degrees: float = 5.0) -> float:
+    """Text-line angle in degrees; ``Image.rotate(angle)`` straightens the page.
+
+    Ink pixels are projected onto rows along each candidate angle; level text
+    lines give the sharpest row histogram (largest sum of squares). A 0.5°
+    sweep is refined in 0.1° steps around the best candidate.
+    """
+    side = max(gray.shape)
+    if side > _SKEW_SAMPLE_SIDE:
+        scale = _SKEW_SAMPLE_SIDE / side
+        gray = area_resize(gray, max(1, int(gray.shape[0] * scale)), max(1, int(gray.shape[1] * scale)))
+    ys, xs = np.nonzero(gray <= otsu_threshold(gray))
+    if ys.size < 200 or ys.size > gray.size * 0.5:
+        return 0.0  # blank page or inverted/photo — nothing reliable to align
+    if ys.size > _SKEW_MAX_INK:
+        pick = np.random.default_rng(0).choice(ys.size, _SKEW_MAX_INK, replace=False)
+        ys, xs = ys[pick], xs[pick]
+
+    def _best(angles: np.ndarray) -> float:
+        slopes = np.tan(np.radians(angles))[:, None]
+        rows = np.rint(ys[None, :] - xs[None, :] * slopes).astype(np.int64)
+        rows -= rows.min()
+        span = int(rows.max()) + 1
+        offsets = (np.arange(len(angles)) * span)[:, None]
+        hist = np.bincount((rows + offsets).ravel(), minlength=span * len(angles))
+        hist = hist.reshape(len(angles), span).astype(np.float64)
+        return float(angles[int(np.argmax((hist * hist).sum(axis=1)))])
+
+    coarse = _best(np.arange(-max_degrees, max_degrees + 0.25, 0.5))
+    return round(_best(np.arange(coarse - 0.5, coarse + 0.55, 0.1)), 1)
+
+
+# ── Pages ────────────────────────────────────────────────────────────────────
+
+
+def _source_dpi(image) -> float | None:
+    dpi = image.info.get("dpi")
+    try:
+        value = float(dpi[0]) if isinstance(dpi, (tuple, list)) else float(dpi)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return value if value >= 50 else None  # 1 or 72 "dpi" tags are meaningless on scans
+
+
+def prepare_page(image, preset: Preset, dpi: float | None = None):
+    """Preprocess one page — returns (PIL image "L" or "1", output dpi, skew degrees).
+
+    ``dpi`` overrides the image's own metadata (pages rendered from a PDF).
+    """
+    from PIL import Image
+
+    if image.mode in ("L", "RGB", "RGBA"):
+        pixels = np.asarray(image)
+    elif image.mode in ("LA", "PA") or "transparency" in image.info:
+        pixels = np.asarray(image.convert("RGBA"))
+    elif image.mode in ("1", "P", "I;16", "I", "F"):
+        pixels = np.asarray(image.convert("L"))
+    else:  # CMYK, YCbCr, ...
+        pixels = np.asarray(image.convert("RGB"))
+    gray = to_grayscale(pixels)
+
+    src_dpi = dpi or _source_dpi(image)
+    height, width = gray.shape
+    scale = 1.0
+    if src_dpi and src_dpi > preset.dpi * 1.1:
+        scale = preset.dpi / src_dpi
+    scale = min(scale, preset.max_side / max(height, width))
+    if scale < 1.0:
+        gray = area_resize(gray, max(1, round(height * scale)), max(1, round(width * scale)))
+    out_dpi = round(src_dpi * scale) if src_dpi else preset.dpi
+
+    skew = estimate_skew(gray) if preset.deskew else 0.0
+    page = Image.fromarray(gray)
+    if abs(skew) >= _SKEW_MIN_DEGREES:
+        page = page.rotate(skew, resample=Image.Resampling.BICUBIC, expand=True, fillcolor=255)
+    if preset.binarize:
+        page = Image.fromarray(binarize(np.asarray(page))).convert("1", dither=Image.Dither.NONE)
+    return page, out_dpi, skew
+
+
+def _prepare_frames(source: Path, preset: Preset) -> tuple[list, int, PrepStats]:
+    """Preprocess every frame of an image file — (pages, output dpi, stats)."""
+    from PIL import Image, ImageSequence
+
+    t0 = time.perf_counter()
+    stats = PrepStats(bytes_in=source.stat().st_size)
+    pages = []
+    dpi = preset.dpi
+    with Image.open(source) as image:
+        for frame in ImageSequence.Iterator(image):
+            stats.pixels_in += frame.width * frame.height
+            page, dpi, skew = prepare_page(frame, preset)
+            stats.pixels_out += page.width * page.height
+            stats.skew_degrees.append(skew)
+            pages.append(page)
+    stats.pages = len(pages)
+    stats.seconds = time.perf_counter() - t0
+    return pages, dpi, stats
+
+
+def encode_page(page, preset: Preset, dpi: int) -> bytes:
+    """Upload encoding: 1-bit PNG for binarized pages, grayscale JPEG otherwise."""
+    buffer = io.BytesIO()
+    if page.mode == "1":
+        page.save(buffer, format="PNG", optimize=True, dpi=(dpi, dpi))
+    else:
+        page.save(buffer, format="JPEG", quality=preset.jpeg_quality, optimize=True, dpi=(dpi, dpi))
+    return buffer.getvalue()
+
+
+def ocr_suffix(source: Path) -> str:
+    """Suffix prepare_image_for_ocr writes for ``source`` (multi-page TIFF stays TIFF)."""
+    from PIL import Image
+
+    with Image.open(source) as image:
+        return ".tiff" if getattr(image, "n_frames", 1) > 1 else ".png"
+
+
+def prepare_image_for_ocr(source: Path, dest: Path, preset_name: str | None = None) -> PrepStats:
+    """Write a preprocessed, lossless copy of an image scan to ``dest`` for OCR.
+
+    Single-page images become PNG; multi-page TIFFs stay TIFF (CCITT G4 when
+    binarized, deflate otherwise) — take ``dest``'s suffix from ocr_suffix().
+    """
+    preset = get_preset(preset_name) or PRESETS["balanced"]
+    pages, dpi, stats = _prepare_frames(source, preset)
+    t0 = time.perf_counter()
+    if len(pages) == 1:
+        pages[0].save(dest, format="PNG", compress_level=3, dpi=(dpi, dpi))
+    else:
+        compression = "group4" if pages[0].mode == "1" else "tiff_deflate"
+        pages[0].save(
+            dest, format="TIFF", save_all=True, append_images=pages[1:],
+            compression=compression, dpi=(dpi, dpi),
+        )
+    stats.bytes_out = dest.stat().st_size
+    stats.seconds += time.perf_counter() - t0
+    return stats
+
+
+def prepare_image_upload(
+    source: Path, preset_name: str | None = None
+) -> tuple[list[bytes], PrepStats]:
+    """Preprocessed page images of an image scan for the multimodal API."""
+    preset = get_preset(preset_name) or PRESETS["balanced"]
+    pages, dpi, stats = _prepare_frames(source, preset)
+    t0 = time.perf_counter()
+    images = [encode_page(page, preset, dpi) for page in pages]
+    stats.bytes_out = sum(map(len, images))
+    stats.seconds += time.perf_counter() - t0
+    return images, stats
+
+
+def render_pdf_pages(source: Path, pages: list[int], dpi: float) -> Iterator:
+    """Yield 1-based ``pages`` of ``source`` as grayscale PIL images, one at a time.
+
+    PDFIUM_LOCK is held only while a page renders, so callers preprocess each
+    page without it; stop iterating to skip rendering the rest.
+    """
+    import pypdfium2 as pdfium
+
+    from app.services.pdf_engines import PDFIUM_LOCK
+
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(str(source))
+    try:
+        for page_no in pages:
+            with PDFIUM_LOCK:
+                page = pdf[page_no - 1]
+                try:
+                    image = page.render(scale=dpi / 72, grayscale=True).to_pil()
+                finally:
+                    page.close()
+            yield image
+    finally:
+        with PDFIUM_LOCK:
+            pdf.close()
+
+
+def prepare_pdf_pages(
+    source: Path, pages: list[int], dest: Path, preset_name: str | None = None
+) -> PrepStats:
+    """Render 1-based ``pages`` at the preset DPI, preprocess and save an image PDF for OCR.
+
+    ``bytes_in`` is the size of the plain page subset the OCR would otherwise get.
+    """
+    from app.services.ocr_pages import write_pdf_subset
+
+    preset = get_preset(preset_name) or PRESETS["balanced"]
+    t0 = time.perf_counter()
+    stats = PrepStats(pages=len(pages), bytes_in=write_pdf_subset(source, pages, dest))
+    prepared = []
+    for image in render_pdf_pages(source, pages, preset.dpi):
+        stats.pixels_in += image.width * image.height
+        prepped, _, skew = prepare_page(image, preset, dpi=preset.dpi)
+        stats.pixels_out += prepped.width * prepped.height
+        stats.skew_degrees.append(skew)
+        prepared.append(prepped)
+        del image  # keep only the prepared page
+    prepared[0].save(
+        dest, format="PDF", save_all=True, append_images=prepared[1:], resolution=preset.dpi,
+    )
+    stats.bytes_out = dest.stat().st_size
+    stats.seconds = time.perf_counter() - t0
+    return stats
@@ -0,0 +1,285 @@
+# backend/app/services/job_queue.py
+# Durable analysis job queue backed by SQLite (no external services needed)
+# The API enqueues one job per analysis; pipeline workers (embedded in the API
+# process or started with ``python -m app.worker``) claim jobs, heartbeat while
+# they run them and mark them finished. A job whose worker stops heartbeating
+# for job_lease_seconds is handed to another worker, up to job_max_attempts.
+# The queue is single-host: SQLite's WAL mode needs shared memory, so every
+# worker must run on the machine that holds job_queue_path (never put it on
+# a network filesystem), with the same temp_dir for uploads.
+# Related: pipeline_worker.py (claims + runs jobs), routers/analyze.py (enqueue,
+#          cancel, resume, amend, queue position), worker.py (standalone worker), config.py (job_*)
+
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELED = "canceled"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    user_id      TEXT NOT NULL DEFAULT '',
+    priority     INTEGER NOT NULL DEFAULT 0,
+    payload      TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    worker_id    TEXT,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    enqueued_at  REAL NOT NULL,
+    claimed_at   REAL,
+    heartbeat_at REAL,
+    finished_at  REAL,
+    error        TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority, enqueued_at);
+"""
+
+
+@dataclass
+class Job:
+    id: str  # the analysis id
+    user_id: str
+    priority: int
+    payload: dict
+    attempts: int
+
+
+class SQLiteJobQueue:
+    """Job queue in one SQLite file; safe for many processes on one host.
+
+    Every method opens its own connection, so the queue can be used from
+    executor threads. Claims run in a write transaction (BEGIN IMMEDIATE),
+    so two workers never get the same job.
+    """
+
+    def __init__(self, path: Path, lease_seconds: float = 60.0, max_attempts: int = 3) -> None:
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ── Producer side ──────────────────────────────────────────────────────
+
+    def enqueue(self, job_id: str, payload: dict, *, user_id: str = "", priority: int = 0) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, user_id, priority, payload, status, enqueued_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, user_id or "", priority, json.dumps(payload), QUEUED, time.time()),
+            )
+        logger.info("Enqueued analysis job %s (priority %d)", job_id, priority)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that no worker has claimed yet."""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELED, time.time(), job_id, QUEUED),
+            )
+            return cur.rowcount == 1
+
+    def resume(self, job_id: str) -> bool:
+        """Queue a finished or failed job again with fresh attempts (resume endpoint)."""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = NULL, attempts = 0, error = NULL,"
+                " enqueued_at = ?, claimed_at = NULL, heartbeat_at = NULL, finished_at = NULL"
+                " WHERE id = ? AND status IN (?, ?)",
+                (QUEUED, time.time(), job_id, DONE, FAILED),
+            )
+            return cur.rowcount == 1
+
+    def rerun(self, job_id: str, payload: dict, *, user_id: str = "", priority: int = 0) -> bool:
+        """Queue another run of an analysis with a new payload (amend endpoint).
+
+        False while the analysis still has a queued or running job.
+        """
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is not None and row["status"] in (QUEUED, RUNNING):
+                    conn.execute("COMMIT")
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs (id, user_id, priority, payload, status, enqueued_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, user_id or "", priority, json.dumps(payload), QUEUED, time.time()),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info("Re-enqueued analysis job %s (priority %d)", job_id, priority)
+        return True
+
+    def position(self, job_id: str) -> int | None:
+        """Queued jobs that will be claimed before this one (None if not queued)."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT priority, enqueued_at FROM jobs WHERE id = ? AND status = ?",
+                (job_id, QUEUED),
+            ).fetchone()
+            if row is None:
+                return None
+            (ahead,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?"
+                " AND (priority < ? OR (priority = ? AND enqueued_at < ?))",
+                (QUEUED, row["priority"], row["priority"], row["enqueued_at"]),
+            ).fetchone()
+            return ahead
+
+    # ── Worker side ────────────────────────────────────────────────────────
+
+    def claim(self, worker_id: str, *, max_priority: int | None = None, per_user: int = 0) -> Job | None:
+        """Take the next job: lowest priority class, then the user with the
+        fewest running jobs, then oldest. Jobs of users already running
+        ``per_user`` jobs (0 = no cap) are skipped."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._requeue_expired(conn, now)
+                row = conn.execute(
+                    """
+                    SELECT j.*, (
+                        SELECT COUNT(*) FROM jobs r WHERE r.status = :running AND r.user_id = j.user_id
+                    ) AS user_running
+                    FROM jobs j
+                    WHERE j.status = :queued AND (:max_priority IS NULL OR j.priority <= :max_priority)
+                      AND (:per_user = 0 OR user_running < :per_user)
+                    ORDER BY j.priority, user_running, j.enqueued_at
+                    LIMIT 1
+                    """,
+                    {
+                        "running": RUNNING,
+                        "queued": QUEUED,
+                        "max_priority": max_priority,
+                        "per_user": per_user,
+                    },
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = ?, attempts = attempts + 1,"
+                    " claimed_at = ?, heartbeat_at = ? WHERE id = ?",
+                    (RUNNING, worker_id, now, now, row["id"]),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return Job(
+            id=row["id"],
+            user_id=row["user_id"],
+            priority=row["priority"],
+            payload=json.loads(row["payload"]),
+            attempts=row["attempts"] + 1,
+        )
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; False if the job is no longer this worker's."""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (time.time(), job_id, worker_id, RUNNING),
+            )
+            return cur.rowcount == 1
+
+    def finish(self, job_id: str, worker_id: str, *, error: str | None = None) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ?"
+                " WHERE id = ? AND worker_id = ? AND status = ?",
+                (FAILED if error else DONE, time.time(), error, job_id, worker_id, RUNNING),
+            )
+
+    def requeue(self, job_id: str, worker_id: str) -> None:
+        """Give a running job back (worker shutting down); the attempt is not counted."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = NULL, attempts = MAX(attempts - 1, 0)"
+                " WHERE id = ? AND worker_id = ? AND status = ?",
+                (QUEUED, job_id, worker_id, RUNNING),
+            )
+
+    def reap(self) -> list[Job]:
+        """Fail jobs whose lease expired on their last attempt and return them,
+        so the caller can mark their analyses failed."""
+        cutoff = time.time() - self.lease_seconds
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+                    (RUNNING, cutoff, self.max_attempts),
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                    [(FAILED, time.time(), "worker lost", row["id"]) for row in rows],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return [
+            Job(row["id"], row["user_id"], row["priority"], json.loads(row["payload"]), row["attempts"])
+            for row in rows
+        ]
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        cur = conn.execute(
+            "UPDATE jobs SET status = ?, worker_id = NULL"
+            " WHERE status = ? AND heartbeat_at < ? AND attempts < ?",
+            (QUEUED, RUNNING, now - self.lease_seconds, self.max_attempts),
+        )
+        if cur.rowcount:
+            logger.warning("Re-queued %d analysis jobs whose worker stopped heartbeating", cur.rowcount)
+
+    # ── Inspection ─────────────────────────────────────────────────────────
+
+    def get(self, job_id: str) -> dict | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def stats(self) -> dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED, CANCELED)}
+        counts.update({status: n for status, n in rows})
+        return counts
+
+
+@lru_cache
+def get_job_queue() -> SQLiteJobQueue:
+    """Process-wide queue at job_queue_path (default ``{temp_dir}/jobs.sqlite3``)."""
+    settings = get_settings()
+    path = Path(settings.job_queue_path or Path(settings.temp_dir) / "jobs.sqlite3")
+    return SQLiteJobQueue(
+        path,
+        lease_seconds=settings.job_lease_seconds,
+        max_attempts=settings.job_max_attempts,
+    )
@@ -1,7 +1,8 @@
 # backend/app/services/llm.py
 # OpenRouter API client for structured and streaming LLM completions
 # Handles retries, structured JSON output, and model listing
-# Related: config.py, models/schemas.py
+# Every completion attempt holds a slot of the process-wide LLM governor
+# Related: config.py, models/schemas.py, llm_governor.py
 
 import asyncio
 import base64
@@ -9,12 +10,14 @@ import json
 import logging
 import mimetypes
 import random
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import AsyncIterator, Awaitable, Callable
 
 import httpx
 from pydantic import BaseModel
 
+from app.services.llm_governor import Permit, get_llm_governor
 from app.services.providers import get_provider
 from app.services.schema_utils import extract_json as _extract_json_util
 from app.services.schema_utils import repair_json_safe as _repair_json
@@ -99,6 +102,27 @@ def build_multimodal_content(
     return content_parts, plugins
 
 
+def build_multimodal_images(text: str, images: list[bytes], mime: str = "image/jpeg") -> list[dict]:
+    """Build content blocks for pre-rendered page images (one image_url part per page).
+
+    PNG pages (binarized scans from image_prep.py) are detected by signature.
+    """
+    content_parts: list[dict] = [{"type": "text", "text": text}]
+    for image in images:
+        b64 = base64.b64encode(image).decode("ascii")
+        part_mime = "image/png" if image.startswith(b"\x89PNG") else mime
+        content_parts.append({
+            "type": "image_url",
+            "image_url": {"url": f"data:{part_mime};base64,{b64}"},
+        })
+    logger.info(
+        "Built multimodal content from %d page images (%dKB)",
+        len(images),
+        sum(len(i) for i in images) // 1024,
+    )
+    return content_parts
+
+
 class LLMError(Exception):
     """Base exception for LLM client errors."""
 
@@ -146,9 +170,18 @@ def _extract_json(raw: str) -> str:
 
 
 class LLMClient:
-    def __init__(self, api_key: str, default_model: str = "anthropic/claude-sonnet-4"):
+    def __init__(
+        self,
+        api_key: str,
+        default_model: str = "anthropic/claude-sonnet-4",
+        analysis_id: str | None = None,
+        priority: int = 0,
+    ):
         self.api_key = api_key
         self.default_model = default_model
+        self.analysis_id = analysis_id  # fair-queuing key in the LLM governor
+        self.priority = priority  # governor priority class, lower is served first
+        self.queue_wait_seconds = 0.0  # time this client's requests waited for a governor slot
         self._client = httpx.AsyncClient(
             base_url=OPENROUTER_BASE,
             headers={
@@ -161,6 +194,24 @@ class LLMClient:
 
     # ── Internal helpers ───────────────────────────────────────────────────
 
+    @asynccontextmanager
+    async def _slot(self, model: str | None) -> AsyncIterator[Permit | None]:
+        """Hold a governor slot for one completion attempt (no-op without a model)."""
+        if model is None:
+            yield None
+            return
+        async with get_llm_governor().slot(model, self.analysis_id, self.priority) as permit:
+            self.queue_wait_seconds += permit.wait_seconds
+            yield permit
+
+    @asynccontextmanager
+    async def _stream(self, body: dict) -> AsyncIterator[httpx.Response]:
+        """Open a streaming completion while holding a governor slot."""
+        async with self._slot(body["model"]) as permit:
+            async with self._client.stream("POST", "/chat/completions", json=body) as response:
+                permit.observe(response.status_code)
+                yield response
+
     async def _request_with_retry(
         self,
         method: str,
@@ -170,12 +221,18 @@ class LLMClient:
         """
         Execute an HTTP request with retry logic.
         Retries up to MAX_RETRIES times on 429 / 5xx with exponential backoff.
+        Completion requests (JSON body with a model) hold a governor slot per
+        attempt; the slot is released before the backoff sleep.
         """
         last_exc: Exception | None = None
+        model = (kwargs.get("json") or {}).get("model")
 
         for attempt in range(MAX_RETRIES):
             try:
-                response = await self._client.request(method, url, **kwargs)
+                async with self._slot(model) as permit:
+                    response = await self._client.request(method, url, **kwargs)
+                    if permit is not None:
+                        permit.observe(response.status_code)
 
                 if response.status_code == 429:
                     body = response.text
@@ -470,19 +527,14 @@ class LLMClient:
             _chunk_count = 0
             _reasoning_count = 0
 
-            async with self._client.stream(
-                "POST", "/chat/completions", json=body,
-            ) as response:
+            async with self._stream(body) as response:
                 if response.status_code != 200:
+                    # Leave the stream (and its governor slot) before the
+                    # non-streaming fallback in the handler below
                     await response.aread()
-                    logger.warning(
-                        "Streaming request failed (%d), falling back to non-streaming",
-                        response.status_code,
-                    )
-                    return await self.complete_structured(
-                        system=system, user=user, response_schema=response_schema,
-                        model=model, temperature=temperature, thinking=thinking,
-                        max_tokens=max_tokens, plugins=plugins,
+                    raise LLMError(
+                        f"Streaming request failed ({response.status_code})",
+                        status_code=response.status_code,
                     )
 
                 line_aiter = response.aiter_lines().__aiter__()
@@ -800,11 +852,7 @@ class LLMClient:
 
         logger.debug("Streaming completion request: model=%s", body["model"])
 
-        async with self._client.stream(
-            "POST",
-            "/chat/completions",
-            json=body,
-        ) as response:
+        async with self._stream(body) as response:
             if response.status_code != 200:
                 body_text = await response.aread()
                 raise LLMError(
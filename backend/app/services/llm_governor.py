@@ -0,0 +1,298 @@
+# backend/app/services/llm_governor.py
+# Process-wide LLM concurrency governor shared by every LLMClient
+# Each request attempt holds one slot of its provider (e.g. "anthropic") and
+# one of its model. Slot limits adapt AIMD-style: +1 per window of successful
+# calls while latency stays near its baseline, halved on HTTP 429. Requests
+# that must wait are queued per analysis and granted round-robin, so one
+# large tender cannot starve the others; lower priority classes (from the
+# analysis scheduler) are served first.
+# Related: llm.py (LLMClient._request_with_retry, streaming calls), config.py (llm_*),
+#          pipeline.py (queue wait in PipelineMetrics), main.py (/health)
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import AsyncIterator
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the latency moving average
+_LATENCY_ALPHA = 0.2
+
+# How fast the latency baseline follows a slower provider (per sample)
+_BASELINE_DRIFT = 0.01
+
+# Minimum spacing of two decreases — one burst of 429s halves the limit once
+_MIN_DECREASE_INTERVAL = 1.0
+
+
+def provider_of(model: str) -> str:
+    """Provider key of an OpenRouter model id ("anthropic/claude-sonnet-4" → "anthropic")."""
+    return model.split("/", 1)[0] if "/" in model else model
+
+
+class AIMDLimit:
+    """Concurrency limit adapted by additive increase / multiplicative decrease.
+
+    Every success adds ``1 / limit`` (about +1 per window of ``limit`` calls)
+    unless the latency moving average has grown past ``latency_tolerance``
+    times its baseline — a sign the provider is queueing. A 429 multiplies
+    the limit by ``backoff``, at most once per window.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        ceiling: float,
+        *,
+        floor: float = 1.0,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        self.ceiling = max(floor, ceiling)
+        self.floor = floor
+        self.limit = min(max(initial, floor), self.ceiling)
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.latency: float | None = None  # moving average, seconds
+        self.baseline: float | None = None
+        self.rate_limited = 0
+        self._last_decrease = float("-inf")
+
+    @property
+    def slots(self) -> int:
+        return int(self.limit)
+
+    def on_success(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += _LATENCY_ALPHA * (latency - self.latency)
+        if self.baseline is None or self.latency < self.baseline:
+            self.baseline = self.latency
+        else:
+            self.baseline += _BASELINE_DRIFT * (self.latency - self.baseline)
+        if self.latency <= self.latency_tolerance * self.baseline:
+            self.limit = min(self.ceiling, self.limit + 1.0 / self.limit)
+
+    def on_rate_limited(self, now: float) -> None:
+        self.rate_limited += 1
+        window = max(_MIN_DECREASE_INTERVAL, self.latency or 0.0)
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self.limit = max(self.floor, self.limit * self.backoff)
+
+
+@dataclass
+class _Waiter:
+    provider: str
+    model: str
+    future: asyncio.Future
+
+
+@dataclass
+class Permit:
+    """One granted slot; ``wait_seconds`` is the time spent queued for it."""
+
+    provider: str
+    model: str
+    wait_seconds: float
+    started: float = field(default_factory=time.monotonic)
+    status_code: int | None = None
+
+    def observe(self, status_code: int) -> None:
+        """Record the HTTP status of the attempt (429 shrinks the limits)."""
+        self.status_code = status_code
+
+
+class LLMGovernor:
+    """Grants LLM request slots under adaptive per-provider and per-model limits.
+
+    Waiters are kept in one FIFO per analysis; a free slot goes to the next
+    analysis in round-robin order that has a request the slot can serve,
+    trying the lowest priority class first. Requests without an analysis
+    share one queue.
+    """
+
+    def __init__(
+        self,
+        provider_ceiling: int,
+        model_ceiling: int,
+        initial: int,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        self.provider_ceiling = provider_ceiling
+        self.model_ceiling = model_ceiling
+        self.initial = initial
+        self.latency_tolerance = latency_tolerance
+        self._limits: dict[tuple[str, str], AIMDLimit] = {}
+        self._inflight: dict[tuple[str, str], int] = {}
+        self._queues: dict[str, deque[_Waiter]] = {}  # insertion order = round-robin order
+        self._priorities: dict[str, int] = {}  # per queue, lower is served first
+        self.granted = 0
+        self.queued = 0
+        self.queue_wait_seconds = 0.0
+
+    # ── Slots ──────────────────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def slot(
+        self, model: str, analysis_id: str | None = None, priority: int = 0,
+    ) -> AsyncIterator[Permit]:
+        """Hold a provider + model slot for one request attempt.
+
+        Call ``permit.observe(status_code)`` inside the block; a 429 lowers
+        both limits, a success (latency measured from the grant) may raise them.
+        """
+        permit = await self.acquire(model, analysis_id, priority)
+        try:
+            yield permit
+        finally:
+            self.release(permit)
+
+    async def acquire(
+        self, model: str, analysis_id: str | None = None, priority: int = 0,
+    ) -> Permit:
+        provider = provider_of(model)
+        start = time.monotonic()
+        if not self._has_waiters() and self._free(provider, model):
+            self._take(provider, model)
+            return Permit(provider, model, wait_seconds=0.0)
+
+        waiter = _Waiter(provider, model, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(analysis_id or "", deque()).append(waiter)
+        self._priorities[analysis_id or ""] = priority
+        self._dispatch()  # others may only be waiting on a different, full model
+        if waiter.future.done():
+            return Permit(provider, model, wait_seconds=0.0)
+        self.queued += 1
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted while being cancelled — hand the slot on
+                self._give_back(provider, model)
+            else:
+                self._remove(analysis_id or "", waiter)
+            raise
+        waited = time.monotonic() - start
+        self.queue_wait_seconds += waited
+        return Permit(provider, model, wait_seconds=waited)
+
+    def release(self, permit: Permit) -> None:
+        now = time.monotonic()
+        for key in ((permit.provider, ""), (permit.provider, permit.model)):
+            limit = self._limit(key)
+            if permit.status_code == 429:
+                limit.on_rate_limited(now)
+            elif permit.status_code is not None and permit.status_code < 400:
+                limit.on_success(now - permit.started)
+        if permit.status_code == 429:
+            logger.warning(
+                "429 from %s — concurrency limits now provider=%.1f model=%.1f",
+                permit.model,
+                self._limit((permit.provider, "")).limit,
+                self._limit((permit.provider, permit.model)).limit,
+            )
+        self._give_back(permit.provider, permit.model)
+
+    # ── Internals ──────────────────────────────────────────────────────────
+
+    def _limit(self, key: tuple[str, str]) -> AIMDLimit:
+        limit = self._limits.get(key)
+        if limit is None:
+            ceiling = self.model_ceiling if key[1] else self.provider_ceiling
+            limit = AIMDLimit(
+                min(self.initial, ceiling), ceiling, latency_tolerance=self.latency_tolerance,
+            )
+            self._limits[key] = limit
+        return limit
+
+    def _free(self, provider: str, model: str) -> bool:
+        return all(
+            self._inflight.get(key, 0) < self._limit(key).slots
+            for key in ((provider, ""), (provider, model))
+        )
+
+    def _take(self, provider: str, model: str) -> None:
+        for key in ((provider, ""), (provider, model)):
+            self._inflight[key] = self._inflight.get(key, 0) + 1
+        self.granted += 1
+
+    def _give_back(self, provider: str, model: str) -> None:
+        for key in ((provider, ""), (provider, model)):
+            self._inflight[key] -= 1
+        self._dispatch()
+
+    def _has_waiters(self) -> bool:
+        return any(self._queues.values())
+
+    def _remove(self, queue_key: str, waiter: _Waiter) -> None:
+        queue = self._queues.get(queue_key)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+        self._dispatch()  # a blocked head may have been holding others back
+
+    def _dispatch(self) -> None:
+        """Grant free slots round-robin across analyses (FIFO within one)."""
+        progress = True
+        while progress:
+            progress = False
+            for queue_key in sorted(self._queues, key=lambda k: self._priorities.get(k, 0)):
+                queue = self._queues[queue_key]
+                waiter = next(
+                    (w for w in queue if not w.future.done() and self._free(w.provider, w.model)),
+                    None,
+                )
+                if waiter is None:
+                    if not queue:
+                        del self._queues[queue_key]
+                        self._priorities.pop(queue_key, None)
+                    continue
+                queue.remove(waiter)
+                self._take(waiter.provider, waiter.model)
+                waiter.future.set_result(None)
+                # Served analyses move to the back of the rotation
+                self._queues.pop(queue_key)
+                if queue:
+                    self._queues[queue_key] = queue
+                else:
+                    self._priorities.pop(queue_key, None)
+                progress = True
+                break  # restart from the most urgent class
+
+    def stats(self) -> dict:
+        return {
+            "granted": self.granted,
+            "queued": self.queued,
+            "waiting": sum(len(q) for q in self._queues.values()),
+            "queue_wait_seconds": round(self.queue_wait_seconds, 2),
+            "limits": {
+                f"{provider}/*" if not model else model: {
+                    "limit": round(limit.limit, 2),
+                    "inflight": self._inflight.get((provider, model), 0),
+                    "rate_limited": limit.rate_limited,
+                    "latency_s": round(limit.latency, 2) if limit.latency is not None else None,
+                }
+                for (provider, model), limit in self._limits.items()
+            },
+        }
+
+
+@lru_cache
+def get_llm_governor() -> LLMGovernor:
+    """Process-wide governor built from the llm_* settings."""
+    settings = get_settings()
+    return LLMGovernor(
+        provider_ceiling=settings.llm_provider_max_concurrent,
+        model_ceiling=settings.llm_model_max_concurrent,
+        initial=settings.llm_initial_concurrent,
+        latency_tolerance=settings.llm_latency_tolerance,
+    )
@@ -0,0 +1,172 @@
+# backend/app/services/ocr_pages.py
+# Per-page scanned detection and page-subset OCR helpers for mixed PDFs
+# The PDF fast path replaces runs of image-only pages (short on text AND carrying
+# image objects) in the markdown with "scanned-pages" markers; extraction.py sends only those pages (subset PDF or
+# downscaled JPEGs) to multimodal/local OCR and merges results back in page order.
+# Related: parser.py, pdf_engines.py, extraction.py, llm.py (OPENROUTER_MAX_FILE_SIZE),
+#          image_prep.py (deskew/binarize of rendered pages)
+
+import io
+import re
+from collections.abc import Collection
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+_MARKER = "<!-- scanned-pages:{start}-{end} -->"
+_MARKER_RE = re.compile(r"<!-- scanned-pages:(\d+)-(\d+) -->")
+
+# Smallest useful JPEG of an A4 page; below this budget per page, don't render
+_MIN_JPEG_PAGE_BYTES = 24 * 1024
+# (dpi, jpeg quality) tried in order until the pages fit the byte budget
+_RENDER_LADDER = ((150, 75), (120, 60), (100, 50), (80, 40))
+
+
+# ── Markers ──────────────────────────────────────────────────────────────────
+
+
+def short_pages(page_texts: list[str], threshold: int, first_page: int = 1) -> list[int]:
+    """1-based pages with < ``threshold`` chars — scan candidates, see image_pages."""
+    if threshold <= 0:
+        return []
+    return [first_page + i for i, text in enumerate(page_texts) if len(text.strip()) < threshold]
+
+
+def mark_scanned_pages(
+    page_texts: list[str],
+    threshold: int,
+    first_page: int = 1,
+    images: Collection[int] | None = None,
+) -> list[str]:
+    """Replace each run of scanned pages by one marker block.
+
+    A page is scanned when it has < ``threshold`` chars and is in ``images``
+    (pages with image objects, from image_pages) — blank separators and short
+    signature or cover pages keep their text. ``images`` None marks on text
+    length alone. Returns the page blocks in order (text pages unchanged);
+    feed them to pages_to_markdown. ``threshold`` 0 disables marking.
+    """
+    if threshold <= 0:
+        return page_texts
+    blocks: list[str] = []
+    run_start: int | None = None
+    for offset, text in enumerate(page_texts):
+        page = first_page + offset
+        if len(text.strip()) < threshold and (images is None or page in images):
+            if run_start is None:
+                run_start = page
+            continue
+        if run_start is not None:
+            blocks.append(_MARKER.format(start=run_start, end=page - 1))
+            run_start = None
+        blocks.append(text)
+    if run_start is not None:
+        blocks.append(_MARKER.format(start=run_start, end=first_page + len(page_texts) - 1))
+    return blocks
+
+
+def scanned_ranges(content: str) -> list[tuple[int, int]]:
+    """Inclusive 1-based page ranges marked as scanned, in document order."""
+    return [(int(m.group(1)), int(m.group(2))) for m in _MARKER_RE.finditer(content)]
+
+
+def scanned_pages(content: str) -> list[int]:
+    return [page for start, end in scanned_ranges(content) for page in range(start, end + 1)]
+
+
+def strip_markers(content: str) -> str:
+    return _MARKER_RE.sub("", content)
+
+
+def replace_markers(content: str, render: Callable[[int, int], str]) -> str:
+    """Substitute every marker with ``render(start, end)`` — keeps page order."""
+    return _MARKER_RE.sub(lambda m: render(int(m.group(1)), int(m.group(2))), content)
+
+
+def format_ranges(ranges: list[tuple[int, int]]) -> str:
+    return ", ".join(str(a) if a == b else f"{a}–{b}" for a, b in ranges)
+
+
+# ── Page subsets (run in parse workers via run_parser) ───────────────────────
+
+
+def image_pages(source: Path | bytes, pages: list[int]) -> set[int] | None:
+    """The 1-based ``pages`` of ``source`` that draw at least one image.
+
+    None when pypdfium2 is not installed (mark_scanned_pages then goes by
+    text length alone).
+    """
+    from app.services.pdf_engines import HAS_PDFIUM, PDFIUM_LOCK
+
+    if not HAS_PDFIUM:
+        return None
+    if not pages:
+        return set()
+
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+
+    found: set[int] = set()
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(str(source) if isinstance(source, Path) else source)
+        try:
+            for page_no in pages:
+                page = pdf[page_no - 1]
+                try:
+                    # Descends into form XObjects, where scanners often put the image
+                    if next(page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE,)), None) is not None:
+                        found.add(page_no)
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+    return found
+
+
+def write_pdf_subset(source: Path, pages: list[int], dest: Path) -> int:
+    """Copy 1-based ``pages`` of ``source`` into a new PDF — returns its size in bytes."""
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(str(source))
+    writer = PdfWriter()
+    for page in pages:
+        writer.add_page(reader.pages[page - 1])
+    writer.compress_identical_objects()
+    with open(dest, "wb") as fh:
+        writer.write(fh)
+    return dest.stat().st_size
+
+
+def render_pages_jpeg(
+    source: Path, pages: list[int], max_total_bytes: int, preset_name: str | None = None
+) -> list[bytes] | None:
+    """Render 1-based ``pages`` as grayscale JPEGs whose total fits ``max_total_bytes``.
+
+    Walks down the dpi/quality ladder until the pages fit; returns None when
+    even the smallest setting is too big (caller falls back to local OCR).
+    Pages are deskewed (and binarized) per the ocr_image_preset (image_prep.py).
+    """
+    if not pages or len(pages) * _MIN_JPEG_PAGE_BYTES > max_total_bytes:
+        return None
+
+    from app.services.image_prep import get_preset, prepare_page, render_pdf_pages
+
+    preset = get_preset(preset_name)
+
+    for dpi, quality in _RENDER_LADDER:
+        images: list[bytes] = []
+        total = 0
+        # One page at a time: over budget stops rendering the rest at this dpi
+        with closing(render_pdf_pages(source, pages, dpi)) as rendered:
+            for image in rendered:
+                if preset is not None:
+                    image = prepare_page(image, preset, dpi=dpi)[0].convert("L")
+                buffer = io.BytesIO()
+                image.save(buffer, format="JPEG", quality=quality, optimize=True)
+                images.append(buffer.getvalue())
+                total += len(images[-1])
+                if total > max_total_bytes:
+                    break
+            else:
+                return images
+    return None
@@ -0,0 +1,419 @@
+# backend/app/services/ocr_scheduler.py
+# CPU-aware scheduler for local (Docling/RapidOCR) OCR
+# Every scan is split into page-range jobs that share one global CPU budget
+# (ocr_cpu_budget). Slots are handed out round-robin across documents, so a
+# 300-page scan cannot starve a 3-page one, and OCR never takes the cores the
+# API and the parse pool need. Jobs run in a dedicated worker pool with one
+# RapidOCR thread each; progress is reported per finished job and pending jobs
+# are dropped as soon as the pipeline's cancel_event is set.
+# Related: parser.py (run_local_ocr, parse_with_ocr), extraction.py, parse_pool.py,
+#          image_prep.py (scan preprocessing inside each job),
+#          config.py (ocr_cpu_budget, ocr_pages_per_job, ocr_threads_per_job, ocr_image_preset)
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, TypeVar
+
+from app.services.image_prep import PrepStats
+from app.services.workspace import scratch_dir
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Scans in these formats are OCR'd page range by page range; anything else
+# (images, multi-page TIFF) is a single job.
+_SPLITTABLE_EXTS = {".pdf"}
+
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+_scheduler: "OcrScheduler | None" = None
+
+
+def cpu_budget() -> int:
+    """Cores local OCR may use at once (ocr_cpu_budget, 0 = half the machine)."""
+    from app.config import get_settings
+
+    budget = get_settings().ocr_cpu_budget
+    return budget if budget > 0 else max(1, (os.cpu_count() or 2) // 2)
+
+
+def threads_per_job() -> int:
+    """RapidOCR/Docling threads inside one OCR job."""
+    from app.config import get_settings
+
+    return max(1, get_settings().ocr_threads_per_job)
+
+
+def job_slots() -> int:
+    """OCR jobs allowed to run at once — the CPU budget in whole jobs."""
+    return max(1, cpu_budget() // threads_per_job())
+
+
+# ── Job function (runs in OCR workers) ──────────────────────────────────────
+
+
+class OcrJobResult(NamedTuple):
+    text: str
+    pages: int
+    prep: PrepStats | None = None  # image_prep.py stats when the scan was preprocessed
+    ocr_seconds: float = 0.0
+
+
+def _warm_ocr_worker() -> None:
+    """Worker initializer — load the OCR models once per process."""
+    from app.services import parser
+
+    if parser.DOCLING_AVAILABLE and not parser.docling_client.service_configured():
+        parser._get_ocr_converter()
+
+
+def ocr_page_range(file_path: Path, start: int, end: int, page_count: int) -> OcrJobResult:
+    """OCR 1-based pages ``start``..``end`` of ``file_path``.
+
+    With an ocr_image_preset the pages are first preprocessed (image_prep.py)
+    into an image PDF / PNG / TIFF; otherwise a range is copied into a subset
+    PDF and the whole file is converted directly.
+    """
+    from app.services.image_prep import get_preset
+    from app.services.ocr_pages import write_pdf_subset
+    from app.services.parser import parse_with_ocr
+
+    pages = list(range(start, end + 1))
+    whole = start == 1 and end >= page_count
+    preset = get_preset()
+    if preset is None and whole:
+        return OcrJobResult(*parse_with_ocr(file_path))
+
+    workdir = scratch_dir(f"ocr_p{start}-{end}_")
+    try:
+        prepared = _prepare(file_path, pages, workdir) if preset is not None else None
+        if prepared is not None:
+            target, prep = prepared
+        elif whole:
+            return OcrJobResult(*parse_with_ocr(file_path))
+        else:
+            target, prep = workdir / "subset.pdf", None
+            write_pdf_subset(file_path, pages, target)
+        t0 = time.perf_counter()
+        text, pages_done = parse_with_ocr(target)
+        return OcrJobResult(text, pages_done, prep, time.perf_counter() - t0)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _prepare(file_path: Path, pages: list[int], workdir: Path) -> tuple[Path, PrepStats] | None:
+    """Preprocessed copy of the pages in ``workdir`` — None falls back to the original."""
+    from app.services.image_prep import ocr_suffix, prepare_image_for_ocr, prepare_pdf_pages
+
+    try:
+        if file_path.suffix.lower() == ".pdf":
+            target = workdir / "prepared.pdf"
+            return target, prepare_pdf_pages(file_path, pages, target)
+        target = workdir / f"prepared{ocr_suffix(file_path)}"
+        return target, prepare_image_for_ocr(file_path, target)
+    except Exception as e:
+        logger.warning("Scan preprocessing failed for %s (%s) — OCR of the original", file_path.name, e)
+        return None
+
+
+def _count_pages(file_path: Path) -> int:
+    from app.services.pdf_engines import count_pdf_pages, resolve_engine_chain
+
+    return count_pdf_pages(file_path, resolve_engine_chain("auto"))
+
+
+def page_jobs(page_count: int, pages_per_job: int) -> list[tuple[int, int]]:
+    """Inclusive 1-based page ranges of at most ``pages_per_job`` pages."""
+    step = max(1, pages_per_job)
+    return [(start, min(start + step - 1, page_count)) for start in range(1, page_count + 1, step)]
+
+
+# ── Worker pool ──────────────────────────────────────────────────────────────
+
+
+def _get_executor() -> Executor:
+    """Dedicated OCR workers, separate from the parse pool (parser_backend)."""
+    global _executor
+    from app.services.parse_pool import uses_process_pool
+
+    with _executor_lock:
+        if _executor is None:
+            slots = job_slots()
+            if uses_process_pool():
+                _executor = ProcessPoolExecutor(
+                    max_workers=slots,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_ocr_worker,
+                )
+            else:
+                _executor = ThreadPoolExecutor(max_workers=slots, thread_name_prefix="ocr")
+            logger.info(
+                "OCR workers started: %d jobs x %d threads (%s)",
+                slots, threads_per_job(), type(_executor).__name__,
+            )
+        return _executor
+
+
+def _discard_executor(executor: Executor, *, kill: bool) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    if kill and isinstance(executor, ProcessPoolExecutor):
+        for proc in list((getattr(executor, "_processes", None) or {}).values()):
+            try:
+                proc.kill()
+            except Exception:
+                pass
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_ocr_pool() -> None:
+    """Stop the OCR workers (app shutdown); the next job starts a fresh pool."""
+    global _executor, _scheduler
+    with _executor_lock:
+        executor, _executor = _executor, None
+        _scheduler = None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ── Scheduler ────────────────────────────────────────────────────────────────
+
+
+class OcrScheduler:
+    """Hands ``slots`` job slots out round-robin across documents.
+
+    Each document queues its own jobs; when a slot frees, the next document in
+    rotation gets it. A slot is held until the job has really stopped running
+    in its worker — cancelling the awaiting task never oversubscribes the CPU.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.running = 0
+        self.completed = 0
+        self._waiting: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._waiting.values())
+
+    def stats(self) -> dict:
+        return {
+            "slots": self.slots,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "documents": len(self._waiting),
+        }
+
+    async def _acquire(self, key: str) -> None:
+        if self.running < self.slots and not self._waiting:
+            self.running += 1
+            return
+        grant = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(key, deque()).append(grant)
+        try:
+            await grant
+        except asyncio.CancelledError:
+            if grant.done() and not grant.cancelled():
+                self._release()  # slot was granted just before the cancel landed
+            else:
+                queue = self._waiting.get(key)
+                if queue is not None and grant in queue:
+                    queue.remove(grant)
+                    if not queue:
+                        del self._waiting[key]
+            raise
+
+    def _release(self) -> None:
+        self.running -= 1
+        self._grant()
+
+    def _grant(self) -> None:
+        while self.running < self.slots and self._waiting:
+            key, queue = self._waiting.popitem(last=False)
+            grant = queue.popleft()
+            if queue:
+                self._waiting[key] = queue  # back of the rotation
+            if grant.done():
+                continue
+            self.running += 1
+            grant.set_result(None)
+
+    async def _run_job(
+        self,
+        key: str,
+        func: Callable[..., T],
+        args: tuple,
+        timeout: float | None,
+        cancel_event: Optional[asyncio.Event],
+    ) -> T:
+        await self._acquire(key)
+        loop = asyncio.get_running_loop()
+        released = False
+
+        def _release_soon(_: Future | None = None) -> None:
+            nonlocal released
+            if not released:
+                released = True
+                try:
+                    loop.call_soon_threadsafe(self._release)
+                except RuntimeError:
+                    pass  # loop already closed — nothing left to schedule
+
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                raise asyncio.CancelledError("OCR cancelled")
+            executor = _get_executor()
+            job = executor.submit(func, *args)
+            # The slot frees when the worker is done — not when we stop waiting
+            job.add_done_callback(_release_soon)
+        except BaseException:
+            _release_soon()
+            raise
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+        except BrokenProcessPool:
+            _discard_executor(executor, kill=False)
+            raise
+        except asyncio.TimeoutError:
+            logger.error("OCR job %s%s exceeded %ss — restarting OCR workers", key, args[1:3], timeout)
+            _discard_executor(executor, kill=True)
+            raise TimeoutError(f"OCR exceeded {timeout}s") from None
+        self.completed += 1
+        return result
+
+    async def run_ranges(
+        self,
+        key: str,
+        func: Callable[..., T],
+        file_path: Path,
+        ranges: list[tuple[int, int]],
+        page_count: int,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[asyncio.Event] = None,
+        timeout: float | None = None,
+    ) -> list[T]:
+        """Run ``func(file_path, start, end, page_count)`` for every range.
+
+        Returns the results in range order. ``on_progress(pages_done, page_count)``
+        fires after each finished job. Setting ``cancel_event`` drops the jobs
+        that have not started and raises CancelledError.
+        """
+        done_pages = 0
+
+        async def _one(start: int, end: int) -> T:
+            nonlocal done_pages
+            args = (file_path, start, end, page_count)
+            try:
+                result = await self._run_job(key, func, args, timeout, cancel_event)
+            except BrokenProcessPool:
+                logger.warning("OCR worker crashed on %s pages %d-%d — retrying once", key, start, end)
+                result = await self._run_job(key, func, args, timeout, cancel_event)
+            done_pages += end - start + 1
+            if on_progress is not None:
+                on_progress(done_pages, page_count)
+            return result
+
+        tasks = [asyncio.ensure_future(_one(start, end)) for start, end in ranges]
+        jobs = asyncio.gather(*tasks)
+        waiter = asyncio.ensure_future(cancel_event.wait()) if cancel_event is not None else None
+        try:
+            if waiter is None:
+                return list(await jobs)
+            await asyncio.wait({jobs, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if not jobs.done():
+                raise asyncio.CancelledError("OCR cancelled")
+            return list(jobs.result())
+        finally:
+            # Error, cancel_event or caller cancelled: drop every job not yet running
+            if waiter is not None:
+                waiter.cancel()
+            for task in tasks:
+                task.cancel()
+            if not jobs.done():
+                jobs.cancel()
+
+
+def get_scheduler() -> OcrScheduler:
+    global _scheduler
+    with _executor_lock:
+        if _scheduler is None:
+            _scheduler = OcrScheduler(job_slots())
+        return _scheduler
+
+
+async def ocr_document(
+    file_path: Path,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    cancel_event: Optional[asyncio.Event] = None,
+) -> tuple[str, int]:
+    """OCR a scan through the scheduler — returns (markdown_text, page_count).
+
+    PDFs are split into ``ocr_pages_per_job`` page jobs whose text is joined
+    back in page order; other formats run as one job.
+    """
+    from app.config import get_settings
+    from app.services.parse_pool import run_parser
+
+    settings = get_settings()
+    split = file_path.suffix.lower() in _SPLITTABLE_EXTS
+    if split:
+        try:
+            page_count = await run_parser(
+                _count_pages, file_path, timeout=settings.parser_doc_timeout,
+            )
+        except Exception as e:
+            logger.warning("Cannot count pages of %s (%s) — OCR as one job", file_path.name, e)
+            split = False
+    if split:
+        ranges = page_jobs(page_count, settings.ocr_pages_per_job)
+    else:
+        page_count, ranges = 1, [(1, 1)]
+
+    scheduler = get_scheduler()
+    t0 = time.monotonic()
+    results = await scheduler.run_ranges(
+        f"{file_path.name}#{id(file_path)}",
+        ocr_page_range,
+        file_path,
+        ranges,
+        page_count,
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+        timeout=settings.parser_doc_timeout,
+    )
+    markdown_text = "\n\n".join(r.text.strip() for r in results if r.text.strip())
+    if not split:
+        page_count = results[0].pages  # Docling's count — multi-page TIFFs
+    logger.info(
+        "OCR of %s: %d pages in %d jobs, %.1fs (%s)",
+        file_path.name, page_count, len(ranges), time.monotonic() - t0, scheduler.stats(),
+    )
+    _log_prep(file_path, results)
+    return markdown_text, page_count
+
+
+def _log_prep(file_path: Path, results: list[OcrJobResult]) -> None:
+    """Bytes and OCR time saved by preprocessing, per page, for the whole scan."""
+    prepared = [r for r in results if r.prep is not None]
+    if not prepared:
+        return
+    total = PrepStats()
+    for r in prepared:
+        total.add(r.prep)
+    ocr_seconds = sum(r.ocr_seconds for r in prepared)
+    logger.info("OCR preprocessing of %s: %s", file_path.name, total.summary(ocr_seconds))
@@ -0,0 +1,71 @@
+# backend/app/services/parse_cache.py
+# Content-addressed parse cache — SHA-256 of file bytes + parser version → parse result
+# Re-uploaded tender documents (standard forms, annexes) skip pypdf, Docling and
+# RapidOCR entirely; entries are shared by all workers through DiskCache.
+# Related: disk_cache.py, parser.py (parse_document), extraction.py (local OCR)
+
+import hashlib
+import logging
+from functools import lru_cache
+from pathlib import Path
+
+from app.services.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever parser output for the same bytes changes (new engine, new markdown)
+PARSER_VERSION = "4"
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_sha256(file_path: Path) -> str:
+    """SHA-256 hex digest of a file, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as fh:
+        while chunk := fh.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _key(*parts: str) -> str:
+    return hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()
+
+
+def parse_cache_key(content_hash: str, file_ext: str) -> str:
+    """Cache key for a parse result — file bytes + every setting that shapes output."""
+    from app.config import get_settings
+    from app.services.pdf_engines import resolve_engine_chain
+
+    settings = get_settings()
+    return _key(
+        "parse",
+        content_hash,
+        PARSER_VERSION,
+        file_ext,
+        ",".join(resolve_engine_chain(settings.parser_pdf_engine)) or "docling",
+        str(settings.ocr_enabled),
+        str(settings.ocr_scanned_threshold),
+    )
+
+
+def ocr_cache_key(content_hash: str) -> str:
+    """Cache key for local OCR (RapidOCR) text of a scanned file — bytes + scan preprocessing."""
+    from app.config import get_settings
+
+    return _key("ocr", content_hash, PARSER_VERSION, get_settings().ocr_image_preset.lower())
+
+
+@lru_cache
+def get_parse_cache() -> DiskCache | None:
+    """Process-wide parse cache, or None when disabled in settings."""
+    from app.config import get_settings
+
+    settings = get_settings()
+    if not settings.parse_cache_enabled:
+        return None
+    root = Path(settings.parse_cache_dir or Path(settings.temp_dir) / "parse_cache")
+    logger.info(
+        "Parse cache at %s (max %d MB)", root, settings.parse_cache_max_mb,
+    )
+    return DiskCache(root, settings.parse_cache_max_mb * 1024 * 1024, name="parse-cache")
@@ -0,0 +1,146 @@
+# backend/app/services/parse_pool.py
+# Execution backend for CPU-bound parsers — process pool or default thread executor
+# pypdf and the DOCX parser are pure Python and hold the GIL, so threads serialize
+# them and starve the event loop; a warmed process pool runs them on real cores.
+# Related: parser.py, config.py (parser_backend, parser_max_concurrent), main.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _warm_worker() -> None:
+    """Worker initializer — import parser dependencies once per process."""
+    import openpyxl  # noqa: F401
+    import pptx  # noqa: F401
+    import pypdf  # noqa: F401
+
+    import app.services.docx_parser  # noqa: F401
+    import app.services.parser  # noqa: F401
+    import app.services.pdf_engines  # noqa: F401
+    import app.services.pptx_parser  # noqa: F401
+    import app.services.xlsx_parser  # noqa: F401
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def pool_size() -> int:
+    """Number of parse worker processes (parser_max_concurrent, 0 = all cores)."""
+    from app.config import get_settings
+
+    size = get_settings().parser_max_concurrent
+    return size if size > 0 else (os.cpu_count() or 2)
+
+
+def uses_process_pool() -> bool:
+    from app.config import get_settings
+
+    return get_settings().parser_backend == "process"
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            size = pool_size()
+            # spawn: never fork a process that already runs an event loop + threads
+            _pool = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            logger.info("Parse process pool started: %d workers", size)
+        return _pool
+
+
+def _discard_pool(pool: Executor, *, kill: bool) -> None:
+    """Drop a broken or hung pool so the next call builds a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    if kill and isinstance(pool, ProcessPoolExecutor):
+        # Hung workers never return — terminate them instead of waiting
+        for proc in list((getattr(pool, "_processes", None) or {}).values()):
+            try:
+                proc.kill()
+            except Exception:
+                pass
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def start_pool() -> None:
+    """Start and warm the worker processes (called from the app lifespan)."""
+    if not uses_process_pool():
+        return
+    pool = _get_pool()
+    loop = asyncio.get_running_loop()
+    pids = await asyncio.gather(
+        *(loop.run_in_executor(pool, _ping) for _ in range(pool_size()))
+    )
+    logger.info("Parse workers warmed: %s", sorted(set(pids)))
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_in_pool(func: Callable[..., T], args: tuple, timeout: float | None) -> T:
+    pool = _get_pool()
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(pool, func, *args), timeout)
+    except BrokenProcessPool:
+        _discard_pool(pool, kill=False)
+        raise
+    except asyncio.TimeoutError:
+        logger.error(
+            "Parse worker hung on %s for >%ss — killing and restarting pool",
+            getattr(func, "__name__", func), timeout,
+        )
+        _discard_pool(pool, kill=True)
+        raise TimeoutError(f"Parsing exceeded {timeout}s") from None
+
+
+async def run_parser(
+    func: Callable[..., T],
+    *args,
+    timeout: float | None = None,
+) -> T:
+    """Run a picklable top-level parser function on the configured backend.
+
+    Process backend: a crashed pool (BrokenProcessPool) is rebuilt and the job
+    retried once; a job exceeding ``timeout`` kills the pool's workers, the pool
+    is rebuilt for later jobs and TimeoutError is raised.
+    Thread backend: plain ``run_in_executor(None, ...)``, ``timeout`` ignored.
+    """
+    if not uses_process_pool():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    try:
+        return await _run_in_pool(func, args, timeout)
+    except BrokenProcessPool:
+        logger.warning(
+            "Parse worker crashed running %s — pool restarted, retrying once",
+            getattr(func, "__name__", func),
+        )
+        return await _run_in_pool(func, args, timeout)
@@ -1,17 +1,44 @@
 # backend/app/services/parser.py
-# Document parsing service — fast parsers (PyMuPDF, python-docx) with Docling fallback
+# Document parsing service — fast parsers (pypdfium2/pypdf, DOCX, XLSX, PPTX) with Docling fallback
 # Converts PDF, DOCX, XLSX, PPTX, images to markdown text
-# Related: models/schemas.py, services/zip_extractor.py
+# Docling/OCR run in-process or in the shared docling_service.py process
+# Inputs are DocumentSources: files on disk or small archive members in memory
+# Related: models/schemas.py, services/zip_extractor.py, services/document_source.py
 
 import asyncio
 import logging
 import re
 import time
-from dataclasses import dataclass
+from collections.abc import AsyncIterable, Iterable
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Callable, Optional
 
 from app.models.schemas import DocumentType
+from app.services import docling_client
+from app.services.channel import aiter_items
+from app.services.document_source import DocumentSource, ParseInput, open_input
+from app.services.parse_cache import (
+    file_sha256,
+    get_parse_cache,
+    ocr_cache_key,
+    parse_cache_key,
+)
+from app.services.ocr_pages import (
+    image_pages,
+    mark_scanned_pages,
+    scanned_pages,
+    short_pages,
+    strip_markers,
+)
+from app.services.parse_pool import pool_size, run_parser, uses_process_pool
+from app.services.pdf_engines import (
+    count_pdf_pages,
+    extract_pdf_pages,
+    pages_to_markdown,
+    resolve_engine_chain,
+    split_page_ranges,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -50,112 +77,77 @@ class ParsedDocument:
     token_estimate: int  # len(content) // 4 rough estimate
     file_path: Optional[Path] = None  # original file path for multimodal OCR
     is_scanned: bool = False  # True = empty text, needs vision/OCR extraction
+    scanned_pages: list[int] = field(default_factory=list)  # 1-based image-only pages of a text PDF
+    content_hash: Optional[str] = None  # SHA-256 of the source file bytes
+    parser_used: str = ""  # engine that produced content, e.g. "pypdfium2", "cache(pypdf)"
 
 
-# ── Fast parsers (pypdf for PDF, python-docx for DOCX) ───────────────────────
+# ── Fast parsers (PDF engine registry, DOCX, XLSX, PPTX) ────────────────────
 
 
-def _parse_pdf_fast(file_path: Path) -> tuple[str, int]:
-    """Parse PDF using pypdf — returns (markdown_text, page_count).
+def _parse_pdf_fast(
+    file_path: ParseInput, engines: tuple[str, ...], scanned_threshold: int = 0
+) -> tuple[str, int, str]:
+    """Parse PDF with the configured text engine chain.
 
-    Pure Python, no native DLLs — avoids Windows Application Control blocks.
-    Fast for text-based PDFs.
+    Returns (markdown_text, page_count, engine_used). Engines live in
+    pdf_engines.py (pypdfium2, pypdf); the chain comes from
+    ``parser_pdf_engine`` and is passed in so worker processes need no settings.
+    Pages under ``scanned_threshold`` chars that carry images become
+    scanned-page markers (ocr_pages.py).
     """
-    from pypdf import PdfReader
-
-    reader = PdfReader(str(file_path))
-    page_count = len(reader.pages)
+    page_texts, page_count, engine_used = extract_pdf_pages(file_path, engines)
+    images = image_pages(file_path, short_pages(page_texts, scanned_threshold))
+    return (
+        pages_to_markdown(mark_scanned_pages(page_texts, scanned_threshold, images=images)),
+        page_count,
+        engine_used,
+    )
 
-    parts: list[str] = []
-    for i, page in enumerate(reader.pages):
-        text = page.extract_text() or ""
-        if text.strip():
-            parts.append(text.strip())
 
-    markdown_text = "\n\n".join(parts)
-    return markdown_text, page_count
+def _parse_pdf_range(
+    file_path: ParseInput, engines: tuple[str, ...], start: int, end: int
+) -> tuple[list[str], str, float]:
+    """Extract pages [start, end) in a parse worker — returns (page_texts, engine, seconds)."""
+    began = time.perf_counter()
+    page_texts, _, engine_used = extract_pdf_pages(file_path, engines, start, end)
+    return page_texts, engine_used, time.perf_counter() - began
 
 
-def _parse_docx_fast(file_path: Path) -> tuple[str, int]:
-    """Parse DOCX using python-docx — returns (markdown_text, page_count).
+def _parse_docx_fast(file_path: ParseInput) -> tuple[str, int]:
+    """Parse DOCX in a single streaming pass — returns (markdown_text, page_count).
 
-    Extracts paragraphs, tables, and basic formatting as markdown.
+    Extracts paragraphs, tables, and basic formatting as markdown without
+    building the python-docx object graph (see docx_parser.py).
     """
-    from docx import Document
-
-    doc = Document(str(file_path))
-    parts: list[str] = []
-
-    for element in doc.element.body:
-        tag = element.tag.split("}")[-1] if "}" in element.tag else element.tag
-
-        if tag == "p":
-            # Paragraph
-            para = None
-            for p in doc.paragraphs:
-                if p._element is element:
-                    para = p
-                    break
-            if para is None:
-                continue
-
-            text = para.text.strip()
-            if not text:
-                continue
-
-            style_name = (para.style.name or "").lower() if para.style else ""
-
-            if "heading 1" in style_name:
-                parts.append(f"# {text}")
-            elif "heading 2" in style_name:
-                parts.append(f"## {text}")
-            elif "heading 3" in style_name:
-                parts.append(f"### {text}")
-            elif "heading" in style_name:
-                parts.append(f"#### {text}")
-            elif "list" in style_name or "bullet" in style_name:
-                parts.append(f"- {text}")
-            else:
-                parts.append(text)
-
-        elif tag == "tbl":
-            # Table
-            for table in doc.tables:
-                if table._element is element:
-                    _render_table(table, parts)
-                    break
-
-    markdown_text = "\n\n".join(parts)
-
-    # Estimate pages from content length (~3000 chars per page)
-    page_count = max(len(markdown_text) // 3000, 1)
+    from app.services.docx_parser import parse_docx
 
-    return markdown_text, page_count
+    return parse_docx(open_input(file_path))
 
 
-def _render_table(table, parts: list[str]) -> None:
-    """Render a python-docx table as markdown."""
-    rows = []
-    for row in table.rows:
-        cells = [cell.text.strip().replace("\n", " ") for cell in row.cells]
-        rows.append(cells)
+def _parse_xlsx_fast(file_path: ParseInput) -> tuple[str, int]:
+    """Parse XLSX with a read-only row stream — returns (markdown_text, page_count).
 
-    if not rows:
-        return
+    One "## <sheet>" markdown table per worksheet, one page per sheet
+    (see xlsx_parser.py). Works without Docling.
+    """
+    from app.services.xlsx_parser import parse_xlsx
 
-    # Header row
-    parts.append("| " + " | ".join(rows[0]) + " |")
-    parts.append("| " + " | ".join("---" for _ in rows[0]) + " |")
+    return parse_xlsx(open_input(file_path))
+
+
+def _parse_pptx_fast(file_path: ParseInput) -> tuple[str, int]:
+    """Parse PPTX slide by slide — returns (markdown_text, page_count).
+
+    Titles, text frames, tables and speaker notes; one page per slide
+    (see pptx_parser.py). Works without Docling.
+    """
+    from app.services.pptx_parser import parse_pptx
 
-    # Data rows
-    for row in rows[1:]:
-        # Pad row to match header column count
-        while len(row) < len(rows[0]):
-            row.append("")
-        parts.append("| " + " | ".join(row[: len(rows[0])]) + " |")
+    return parse_pptx(open_input(file_path))
 
 
-# ── Docling fallback (for images, PPTX, and complex formats) ─────────────────
+# ── Docling fallback (for images and when fast parsing fails) ────────────────
 
 _converter = None
 
@@ -164,7 +156,7 @@ def _get_converter():
     """Lazily initialize and cache the Docling DocumentConverter.
 
     Only used as fallback for formats not handled by fast parsers
-    (images, PPTX, or when fast parsing fails).
+    (images, or when fast parsing fails).
     """
     if not DOCLING_AVAILABLE:
         raise RuntimeError("Docling is not installed — cannot parse this format")
@@ -225,14 +217,13 @@ def _get_ocr_converter():
     """Lazily initialize Docling converter with OCR enabled (RapidOCR).
 
     Used ONLY as fallback for scanned files > 5MB that can't be sent via
-    OpenRouter multimodal API.
+    OpenRouter multimodal API. Threads per conversion come from
+    ocr_threads_per_job — ocr_scheduler.py runs several conversions at once.
     """
     if not DOCLING_AVAILABLE:
         raise RuntimeError("Docling is not installed — OCR not available")
     global _ocr_converter
     if _ocr_converter is None:
-        import os
-
         from docling.datamodel.base_models import InputFormat
         from docling.datamodel.pipeline_options import (
             AcceleratorOptions,
@@ -248,9 +239,10 @@ def _get_ocr_converter():
         )
 
         from app.config import get_settings
+        from app.services.ocr_scheduler import threads_per_job
 
         settings = get_settings()
-        cpu_threads = os.cpu_count() or 4
+        cpu_threads = threads_per_job()
 
         table_opts = TableStructureOptions(mode=TableFormerMode.FAST)
         accel_opts = AcceleratorOptions(num_threads=cpu_threads, device="cpu")
@@ -281,11 +273,35 @@ def _get_ocr_converter():
     return _ocr_converter
 
 
+def _use_docling_service() -> bool:
+    """Route Docling/OCR conversions to the shared service (docling_service_url)?
+
+    A configured but unhealthy service is bypassed when Docling is installed
+    locally; without local Docling the service is still tried so its error surfaces.
+    """
+    if not docling_client.service_configured():
+        return False
+    if docling_client.check_health():
+        return True
+    if DOCLING_AVAILABLE:
+        logger.warning("Docling service unavailable — converting in-process")
+        return False
+    return True
+
+
 def parse_with_ocr(file_path: Path) -> tuple[str, int]:
     """Parse a scanned document using Docling with OCR enabled.
 
     Used as fallback for files > 5MB. Returns (markdown_text, page_count).
+    Runs in the shared Docling service when one is configured.
     """
+    if _use_docling_service():
+        return docling_client.convert(file_path, "ocr")
+    return _convert_with_ocr(file_path)
+
+
+def _convert_with_ocr(file_path: Path) -> tuple[str, int]:
+    """In-process Docling OCR conversion (also what the Docling service runs)."""
     converter = _get_ocr_converter()
     result = converter.convert(str(file_path))
 
@@ -312,8 +328,55 @@ def parse_with_ocr(file_path: Path) -> tuple[str, int]:
     return markdown_text, page_count
 
 
+async def run_local_ocr(
+    file_path: Path,
+    content_hash: Optional[str] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    cancel_event: Optional[asyncio.Event] = None,
+) -> tuple[str, int]:
+    """OCR a scan through the OCR scheduler with the parse cache in front.
+
+    A re-uploaded scan is OCR'd once; later runs read the cached text.
+    ``on_progress(pages_done, page_count)`` fires as page jobs finish;
+    ``cancel_event`` drops the jobs that have not started yet.
+    """
+    from app.services.ocr_scheduler import ocr_document
+
+    loop = asyncio.get_running_loop()
+    cache = get_parse_cache()
+    cache_key = None
+    if cache is not None:
+        if content_hash is None:
+            content_hash = await loop.run_in_executor(None, file_sha256, file_path)
+        cache_key = ocr_cache_key(content_hash)
+        cached = await loop.run_in_executor(None, cache.get, cache_key)
+        if cached is not None:
+            logger.info("Local OCR cache hit for %s", file_path.name)
+            return cached["content"], cached["page_count"]
+
+    markdown_text, page_count = await ocr_document(
+        file_path, on_progress=on_progress, cancel_event=cancel_event,
+    )
+    if cache is not None and cache_key is not None:
+        await loop.run_in_executor(None, cache.put, cache_key, {
+            "content": markdown_text,
+            "page_count": page_count,
+        })
+    return markdown_text, page_count
+
+
 def _parse_with_docling(file_path: Path, file_ext: str) -> tuple[str, int]:
-    """Parse using Docling — fallback for images, PPTX, and complex formats."""
+    """Parse using Docling — images, and fallback when a fast parser fails.
+
+    Runs in the shared Docling service when one is configured.
+    """
+    if _use_docling_service():
+        return docling_client.convert(file_path, "docling")
+    return _convert_with_docling(file_path, file_ext)
+
+
+def _convert_with_docling(file_path: Path, file_ext: str) -> tuple[str, int]:
+    """In-process Docling conversion (also what the Docling service runs)."""
     converter = _get_converter()
     result = converter.convert(str(file_path))
 
@@ -341,23 +404,181 @@ def _parse_with_docling(file_path: Path, file_ext: str) -> tuple[str, int]:
 # Extensions handled by fast parsers (no Docling needed)
 _FAST_PDF_EXTS = {".pdf"}
 _FAST_DOCX_EXTS = {".docx"}
-# Extensions that need Docling (images, PPTX, XLSX)
-_DOCLING_EXTS = {".pptx", ".png", ".tiff", ".jpg", ".jpeg", ".xlsx"}
+_FAST_XLSX_EXTS = {".xlsx"}
+_FAST_PPTX_EXTS = {".pptx"}
+# Office formats: extension → (picklable parse function, parser_used label)
+_FAST_PARSERS: dict[str, tuple[Callable[[ParseInput], tuple[str, int]], str]] = {
+    **{ext: (_parse_docx_fast, "docx-stream") for ext in _FAST_DOCX_EXTS},
+    **{ext: (_parse_xlsx_fast, "xlsx-stream") for ext in _FAST_XLSX_EXTS},
+    **{ext: (_parse_pptx_fast, "pptx-native") for ext in _FAST_PPTX_EXTS},
+}
+# Extensions that need Docling (images)
+_DOCLING_EXTS = {".png", ".tiff", ".jpg", ".jpeg"}
 # Image extensions — always treated as scanned (need vision/OCR)
 _IMAGE_EXTS = {".png", ".tiff", ".jpg", ".jpeg"}
 
 
-async def parse_document(file_path: Path, filename: str) -> ParsedDocument:
+async def _parse_pdf_text(
+    file_path: ParseInput, filename: str, engines: tuple[str, ...]
+) -> tuple[str, int, str]:
+    """PDF text-engine parse; large PDFs are split into page ranges across workers.
+
+    Splitting only happens on the process backend with 2+ workers and when the
+    document exceeds ``parser_pdf_split_pages``. Ranges are reassembled in page
+    order, so the output is identical to a single-call parse.
+    """
+    from app.config import get_settings
+    settings = get_settings()
+    timeout = settings.parser_doc_timeout
+    workers = pool_size()
+    threshold = settings.ocr_scanned_threshold if settings.ocr_enabled else 0
+
+    if settings.parser_pdf_split_pages <= 0 or workers < 2 or not uses_process_pool():
+        return await run_parser(_parse_pdf_fast, file_path, engines, threshold, timeout=timeout)
+
+    page_count = await run_parser(count_pdf_pages, file_path, engines, timeout=timeout)
+    if page_count <= settings.parser_pdf_split_pages:
+        return await run_parser(_parse_pdf_fast, file_path, engines, threshold, timeout=timeout)
+
+    ranges = split_page_ranges(page_count, workers)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        run_parser(_parse_pdf_range, file_path, engines, first, last, timeout=timeout)
+        for first, last in ranges
+    ))
+    wall = time.perf_counter() - start
+
+    page_texts: list[str] = []
+    engines_used: list[str] = []
+    for texts, engine_used, _ in results:
+        page_texts.extend(texts)
+        if engine_used not in engines_used:
+            engines_used.append(engine_used)
+
+    logger.info(
+        "Split %s: %d pages in %d ranges, wall=%.2fs [%s]",
+        filename,
+        page_count,
+        len(ranges),
+        wall,
+        ", ".join(
+            f"{first + 1}-{last}: {seconds:.2f}s {engine_used}"
+            for (first, last), (_, engine_used, seconds) in zip(ranges, results)
+        ),
+    )
+    images = await run_parser(
+        image_pages, file_path, short_pages(page_texts, threshold), timeout=timeout,
+    )
+    markdown_text = pages_to_markdown(mark_scanned_pages(page_texts, threshold, images=images))
+    return markdown_text, page_count, "+".join(engines_used)
+
+
+async def _parse_uncached(
+    source: DocumentSource, filename: str, file_ext: str
+) -> tuple[str, int, str]:
+    """Dispatch to the fast parser for the format, Docling as fallback.
+
+    Fast parsers read in-memory sources straight from their buffer; Docling
+    needs a file, so an in-memory source is spilled to disk first.
+    Returns (markdown_text, page_count, parser_used).
+    """
+    from app.config import get_settings
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+
+    async def docling(parser_used: str) -> tuple[str, int, str]:
+        file_path = await loop.run_in_executor(None, source.spill)
+        markdown_text, page_count = await loop.run_in_executor(
+            None, _parse_with_docling, file_path, file_ext
+        )
+        return markdown_text, page_count, parser_used
+
+    engines = resolve_engine_chain(settings.parser_pdf_engine)
+    if file_ext in _FAST_PDF_EXTS and engines:
+        # Fast path: PDF text engine chain (parse worker process)
+        try:
+            return await _parse_pdf_text(source.parse_input(), filename, engines)
+        except Exception as e:
+            logger.warning(
+                "PDF text engines %s failed for %s (%s), falling back to Docling",
+                engines, filename, e,
+            )
+            return await docling("docling-fallback")
+
+    fast_parser = _FAST_PARSERS.get(file_ext)
+    if fast_parser is not None:
+        # Fast path: streaming office parser (parse worker process)
+        parse_func, parser_name = fast_parser
+        try:
+            markdown_text, page_count = await run_parser(
+                parse_func, source.parse_input(), timeout=settings.parser_doc_timeout
+            )
+            return markdown_text, page_count, parser_name
+        except Exception as e:
+            logger.warning(
+                "%s fast parser failed for %s (%s), falling back to Docling",
+                file_ext.lstrip(".").upper(),
+                filename,
+                e,
+            )
+            return await docling("docling-fallback")
+
+    # Docling for everything else (images, PDF with parser_pdf_engine=docling)
+    return await docling("docling")
+
+
+def _detect_scanned(
+    filename: str, file_ext: str, markdown_text: str, page_count: int
+) -> bool:
+    """Detect fully scanned documents (images, or PDFs with empty/near-empty text).
+
+    Mixed PDFs with only some image-only pages are not scanned as a whole;
+    those pages are listed in ParsedDocument.scanned_pages instead.
+    """
+    from app.config import get_settings
+    settings = get_settings()
+
+    if file_ext in _IMAGE_EXTS:
+        return True
+    if file_ext in _FAST_PDF_EXTS and settings.ocr_enabled:
+        char_threshold = page_count * settings.ocr_scanned_threshold
+        text_chars = len(strip_markers(markdown_text).strip())
+        if text_chars < char_threshold or len(scanned_pages(markdown_text)) >= page_count > 0:
+            logger.info(
+                "Detected scanned PDF: %s (%d pages, %d chars, threshold=%d)",
+                filename, page_count, text_chars, char_threshold,
+            )
+            return True
+    return False
+
+
+async def parse_document(
+    file_path: Path | DocumentSource, filename: str | None = None
+) -> ParsedDocument:
     """Parse a single document — uses fast parser when possible, Docling as fallback.
 
+    Accepts a path (with ``filename``) or a DocumentSource. In-memory sources
+    are parsed from their buffer and spilled to disk only when the document
+    turns out to need OCR/vision (ParsedDocument.file_path is then set);
+    the buffer is released once parsing is done.
+
     Strategy:
-    - PDF → pypdf (fast, pure Python, ~0.1-0.5s)
-    - DOCX → python-docx (fast, ~0.1s)
-    - XLSX/PPTX/images → Docling (slow but necessary)
+    - PDF → pypdfium2 / pypdf text engine chain (parser_pdf_engine); PDFs over
+      parser_pdf_split_pages are extracted as page ranges in parallel workers
+    - DOCX → streaming XML walk (fast, linear in document size)
+    - XLSX → openpyxl read-only row stream, one page per sheet
+    - PPTX → python-pptx slide walk, one page per slide
+    - Images → Docling (slow but necessary)
     - If fast parser fails → automatic Docling fallback
+    - Same file bytes parsed before → served from the parse cache
     """
+    if isinstance(file_path, DocumentSource):
+        source = file_path
+    else:
+        source = DocumentSource(filename=filename or file_path.name, path=file_path)
+    filename = source.filename
     try:
-        file_size = file_path.stat().st_size
+        file_size = source.size
     except (FileNotFoundError, OSError) as e:
         logger.warning("File not found or inaccessible: %s — %s", filename, e)
         error_content = f"[ERROR] File not found: {filename}"
@@ -369,57 +590,49 @@ async def parse_document(file_path: Path, filename: str) -> ParsedDocument:
             file_size_bytes=0,
             doc_type=doc_type,
             token_estimate=len(error_content) // 4,
-            file_path=file_path,
+            file_path=source.path,
         )
 
-    file_ext = file_path.suffix.lower()
+    file_ext = source.suffix
     start = time.perf_counter()
 
     try:
         loop = asyncio.get_running_loop()
 
-        if file_ext in _FAST_PDF_EXTS:
-            # Fast path: pypdf
-            try:
-                markdown_text, page_count = await loop.run_in_executor(
-                    None, _parse_pdf_fast, file_path
-                )
-                parser_used = "pypdf"
-            except Exception as e:
-                logger.warning(
-                    "pypdf failed for %s (%s), falling back to Docling", filename, e
-                )
-                markdown_text, page_count = await loop.run_in_executor(
-                    None, _parse_with_docling, file_path, file_ext
-                )
-                parser_used = "docling-fallback"
-
-        elif file_ext in _FAST_DOCX_EXTS:
-            # Fast path: python-docx
-            try:
-                markdown_text, page_count = await loop.run_in_executor(
-                    None, _parse_docx_fast, file_path
-                )
-                parser_used = "python-docx"
-            except Exception as e:
-                logger.warning(
-                    "python-docx failed for %s (%s), falling back to Docling",
-                    filename,
-                    e,
-                )
-                markdown_text, page_count = await loop.run_in_executor(
-                    None, _parse_with_docling, file_path, file_ext
-                )
-                parser_used = "docling-fallback"
-
+        # Content-addressed cache: identical bytes skip every parser and OCR
+        content_hash = await loop.run_in_executor(None, source.sha256)
+        cache = get_parse_cache()
+        cache_key = parse_cache_key(content_hash, file_ext)
+        cached = await loop.run_in_executor(None, cache.get, cache_key) if cache else None
+
+        if cached is not None:
+            markdown_text = cached["content"]
+            page_count = cached["page_count"]
+            is_scanned = cached["is_scanned"]
+            parser_used = f"cache({cached.get('parser', '?')})"
         else:
-            # Docling for everything else (images, PPTX, XLSX)
-            markdown_text, page_count = await loop.run_in_executor(
-                None, _parse_with_docling, file_path, file_ext
+            markdown_text, page_count, parser_used = await _parse_uncached(
+                source, filename, file_ext
             )
-            parser_used = "docling"
+            is_scanned = _detect_scanned(filename, file_ext, markdown_text, page_count)
+            if cache is not None:
+                await loop.run_in_executor(None, cache.put, cache_key, {
+                    "content": markdown_text,
+                    "page_count": page_count,
+                    "is_scanned": is_scanned,
+                    "parser": parser_used,
+                })
 
         elapsed = time.perf_counter() - start
+        page_subset = [] if is_scanned else scanned_pages(markdown_text)
+        if page_subset:
+            logger.info(
+                "Mixed PDF %s: %d of %d pages image-only — page-subset OCR",
+                filename, len(page_subset), page_count,
+            )
+        if source.in_memory and (is_scanned or page_subset):
+            # OCR and multimodal extraction read the original file
+            await loop.run_in_executor(None, source.spill)
 
         # Classify document type
         content_preview = markdown_text[:2000]
@@ -428,21 +641,6 @@ async def parse_document(file_path: Path, filename: str) -> ParsedDocument:
         # Token estimate (~4 chars per token)
         token_estimate = len(markdown_text) // 4
 
-        # Detect scanned documents (empty/near-empty text)
-        from app.config import get_settings
-        settings = get_settings()
-        is_scanned = False
-        if file_ext in _IMAGE_EXTS:
-            is_scanned = True
-        elif file_ext in _FAST_PDF_EXTS and settings.ocr_enabled:
-            char_threshold = page_count * settings.ocr_scanned_threshold
-            if len(markdown_text.strip()) < char_threshold:
-                is_scanned = True
-                logger.info(
-                    "Detected scanned PDF: %s (%d pages, %d chars, threshold=%d)",
-                    filename, page_count, len(markdown_text.strip()), char_threshold,
-                )
-
         logger.info(
             "Parsed %s: %d pages, %d chars, %d est. tokens, type=%s, "
             "parser=%s, scanned=%s, time=%.2fs",
@@ -463,8 +661,11 @@ async def parse_document(file_path: Path, filename: str) -> ParsedDocument:
             file_size_bytes=file_size,
             doc_type=doc_type,
             token_estimate=token_estimate,
-            file_path=file_path,
+            file_path=None if source.in_memory else source.path,
             is_scanned=is_scanned,
+            scanned_pages=page_subset,
+            content_hash=content_hash,
+            parser_used=parser_used,
         )
 
     except Exception as exc:
@@ -478,54 +679,63 @@ async def parse_document(file_path: Path, filename: str) -> ParsedDocument:
             file_size_bytes=file_size,
             doc_type=doc_type,
             token_estimate=len(error_content) // 4,
-            file_path=file_path,
+            file_path=None if source.in_memory else source.path,
         )
+    finally:
+        source.close()
 
 
 async def parse_all(
-    file_paths: list[tuple[Path, str]],
+    file_paths: Iterable[DocumentSource | tuple[Path, str]]
+    | AsyncIterable[DocumentSource | tuple[Path, str]],
     on_parsed: Optional[Callable[[ParsedDocument], None]] = None,
     max_concurrent: int | None = None,
 ) -> list[ParsedDocument]:
     """Parse all documents with bounded concurrency.
 
     Uses asyncio.Semaphore to limit parallel parsing.
-    With fast parsers, concurrency limit is raised to 5.
+    Process backend: limit = worker count, so per-document timeouts measure
+    parse time rather than time queued in the pool. Thread backend: 5.
     Calls on_parsed callback after each file for SSE streaming progress.
+    Accepts DocumentSources (from extract_files) or legacy (path, filename) tuples,
+    as a list or as an async iterable (the pipeline's Channel) — each file is
+    then queued for parsing the moment it arrives. Results follow input order.
     """
-    if not file_paths:
-        return []
-
+    total = len(file_paths) if isinstance(file_paths, list) else "?"
     if max_concurrent is None:
-        # Fast parsers can handle higher concurrency
-        max_concurrent = 5
+        max_concurrent = pool_size() if uses_process_pool() else 5
 
     semaphore = asyncio.Semaphore(max_concurrent)
 
-    async def _parse_one(
-        index: int, file_path: Path, filename: str
-    ) -> tuple[int, ParsedDocument]:
+    async def _parse_one(index: int, source: DocumentSource) -> ParsedDocument:
         async with semaphore:
             logger.info(
-                "Parsing document %d/%d: %s",
+                "Parsing document %d/%s: %s%s",
                 index + 1,
-                len(file_paths),
-                filename,
+                total,
+                source.filename,
+                " (in memory)" if source.in_memory else "",
             )
-            parsed = await parse_document(file_path, filename)
+            parsed = await parse_document(source)
             if on_parsed is not None:
                 on_parsed(parsed)
-            return (index, parsed)
-
-    tasks = [_parse_one(i, fp, fn) for i, (fp, fn) in enumerate(file_paths)]
-    indexed_results = await asyncio.gather(*tasks)
-    indexed_results_sorted = sorted(indexed_results, key=lambda x: x[0])
-    results = [doc for _, doc in indexed_results_sorted]
+            return parsed
+
+    tasks: list[asyncio.Task[ParsedDocument]] = []
+    async with asyncio.TaskGroup() as group:
+        async for item in aiter_items(file_paths):
+            source = DocumentSource.from_item(item)
+            tasks.append(group.create_task(_parse_one(len(tasks), source)))
+    if not tasks:
+        return []
+    results = [task.result() for task in tasks]
 
+    cache = get_parse_cache()
     logger.info(
-        "Parsing complete: %d documents, %d total tokens",
+        "Parsing complete: %d documents, %d total tokens, cache=%s",
         len(results),
         sum(d.token_estimate for d in results),
+        cache.stats() if cache else "off",
     )
     return results
 
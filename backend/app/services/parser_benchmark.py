@@ -0,0 +1,503 @@
+# backend/app/services/parser_benchmark.py
+# Parser benchmark command — compares parsing engines on a local corpus
+# Usage: python -m app.services.parser_benchmark docx --corpus ./samples
+#        python -m app.services.parser_benchmark docx --synthetic 3000
+#        python -m app.services.parser_benchmark pdf --synthetic 800 --workers 4
+#        python -m app.services.parser_benchmark xlsx --synthetic 50000
+#        python -m app.services.parser_benchmark prep --synthetic 4
+# Related: parser.py, docx_parser.py, pdf_engines.py, xlsx_parser.py, image_prep.py
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+
+# ── Baselines ────────────────────────────────────────────────────────────────
+
+
+def legacy_parse_docx(file_path: Path) -> tuple[str, int]:
+    """Previous python-docx implementation — kept only as a benchmark baseline.
+
+    For every body element it scans doc.paragraphs / doc.tables to find the
+    wrapper object, so run time grows quadratically with document size.
+    """
+    from docx import Document
+
+    doc = Document(str(file_path))
+    parts: list[str] = []
+
+    for element in doc.element.body:
+        tag = element.tag.split("}")[-1] if "}" in element.tag else element.tag
+
+        if tag == "p":
+            para = None
+            for p in doc.paragraphs:
+                if p._element is element:
+                    para = p
+                    break
+            if para is None:
+                continue
+
+            text = para.text.strip()
+            if not text:
+                continue
+
+            style_name = (para.style.name or "").lower() if para.style else ""
+
+            if "heading 1" in style_name:
+                parts.append(f"# {text}")
+            elif "heading 2" in style_name:
+                parts.append(f"## {text}")
+            elif "heading 3" in style_name:
+                parts.append(f"### {text}")
+            elif "heading" in style_name:
+                parts.append(f"#### {text}")
+            elif "list" in style_name or "bullet" in style_name:
+                parts.append(f"- {text}")
+            else:
+                parts.append(text)
+
+        elif tag == "tbl":
+            for table in doc.tables:
+                if table._element is element:
+                    rows = [
+                        [cell.text.strip().replace("\n", " ") for cell in row.cells]
+                        for row in table.rows
+                    ]
+                    if not rows:
+                        break
+                    parts.append("| " + " | ".join(rows[0]) + " |")
+                    parts.append("| " + " | ".join("---" for _ in rows[0]) + " |")
+                    for row in rows[1:]:
+                        while len(row) < len(rows[0]):
+                            row.append("")
+                        parts.append("| " + " | ".join(row[: len(rows[0])]) + " |")
+                    break
+
+    markdown_text = "\n\n".join(parts)
+    page_count = max(len(markdown_text) // 3000, 1)
+    return markdown_text, page_count
+
+
+# ── Corpus helpers ───────────────────────────────────────────────────────────
+
+
+def make_synthetic_docx(path: Path, paragraphs: int, table_every: int = 20) -> Path:
+    """Write a technical-spec-like DOCX with headings, lists and tables."""
+    from docx import Document
+
+    doc = Document()
+    for i in range(paragraphs):
+        if i % 50 == 0:
+            doc.add_heading(f"{i // 50 + 1}. Skyrius", level=1)
+        elif i % 10 == 0:
+            doc.add_heading(f"{i // 50 + 1}.{i % 50 // 10} Poskyris", level=2)
+        elif i % 3 == 0:
+            doc.add_paragraph(f"Reikalavimas {i}: įranga turi atitikti standartą.", style="List Bullet")
+        else:
+            doc.add_paragraph(f"Pastraipa {i}. " + "Tiekėjas privalo užtikrinti kokybę. " * 4)
+        if table_every and i % table_every == table_every - 1:
+            table = doc.add_table(rows=4, cols=3)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"R{r}C{c} / {i}"
+    doc.save(str(path))
+    return path
+
+
+def make_synthetic_pdf(path: Path, pages: int) -> Path:
+    """Write a text-layer PDF with ``pages`` pages of tender-like prose."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+    _, height = A4
+    for page in range(pages):
+        pdf.setFont("Helvetica-Bold", 14)
+        pdf.drawString(60, height - 60, f"Section {page + 1}. Technical requirements")
+        pdf.setFont("Helvetica", 10)
+        for line in range(45):
+            pdf.drawString(
+                60, height - 90 - line * 15,
+                f"{page + 1}.{line + 1} The supplier shall ensure compliance with EN standard {line}.",
+            )
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+def make_synthetic_xlsx(path: Path, rows: int, sheets: int = 3) -> Path:
+    """Write a bill-of-quantities-like workbook with ``rows`` rows per sheet."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for s in range(sheets):
+        sheet = workbook.create_sheet(f"Lotas {s + 1}")
+        sheet.append(["Nr.", "Pavadinimas", "Mato vnt.", "Kiekis", "Kaina, EUR"])
+        for r in range(rows):
+            sheet.append([r + 1, f"Darbų pozicija {r + 1}", "m2", r % 97 + 0.5, (r * 13) % 1000 / 4])
+    workbook.save(str(path))
+    return path
+
+
+def make_synthetic_scan(path: Path, pages: int, skew: float = 2.0) -> Path:
+    """Write a 300 dpi colour "scan" (multi-page TIFF when ``pages`` > 1), tilted by ``skew``°."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.load_default(size=36)
+    frames = []
+    for page in range(pages):
+        image = Image.new("RGB", (2480, 3508), (246, 241, 228))  # yellowed A4 paper
+        draw = ImageDraw.Draw(image)
+        draw.text((180, 160), f"{page + 1} skyrius. Techninė specifikacija", fill=(10, 10, 40), font=font)
+        for line in range(58):
+            draw.text(
+                (180, 260 + line * 54),
+                f"{page + 1}.{line + 1} Tiekėjas privalo užtikrinti atitiktį standartui EN {line}.",
+                fill=(25, 25, 60), font=font,
+            )
+        frames.append(image.rotate(skew, expand=True, fillcolor=(246, 241, 228)))
+    if pages == 1:
+        frames[0].save(path, dpi=(300, 300))
+    else:
+        frames[0].save(path, save_all=True, append_images=frames[1:], dpi=(300, 300), compression="tiff_lzw")
+    return path
+
+
+def _collect(corpus: Path, suffix: str) -> list[Path]:
+    if corpus.is_file():
+        return [corpus]
+    return sorted(p for p in corpus.rglob(f"*{suffix}") if not p.name.startswith("~$"))
+
+
+def _time_call(func: Callable[[Path], tuple[str, int]], path: Path, repeat: int) -> tuple[float, str, int]:
+    timings: list[float] = []
+    text, pages = "", 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text, pages = func(path)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), text, pages
+
+
+# ── Benchmarks ───────────────────────────────────────────────────────────────
+
+
+def benchmark_docx(paths: list[Path], repeat: int = 1) -> list[dict]:
+    """Time the legacy python-docx walk against the streaming parser per file."""
+    from app.services.docx_parser import parse_docx
+
+    rows: list[dict] = []
+    for path in paths:
+        legacy_s, legacy_text, _ = _time_call(legacy_parse_docx, path, repeat)
+        stream_s, stream_text, pages = _time_call(parse_docx, path, repeat)
+        rows.append({
+            "file": path.name,
+            "pages": pages,
+            "legacy_s": legacy_s,
+            "stream_s": stream_s,
+            "speedup": legacy_s / stream_s if stream_s > 0 else float("inf"),
+            "identical": legacy_text == stream_text,
+        })
+    return rows
+
+
+def benchmark_pdf(paths: list[Path], repeat: int = 1) -> list[dict]:
+    """Time every available PDF text engine (and Docling, if installed) per file."""
+    from app.services import parser as parser_module
+    from app.services.pdf_engines import available_engines, pages_to_markdown, PDF_ENGINES
+
+    engines: dict[str, Callable[[Path], tuple[str, int]]] = {}
+    for name in available_engines():
+        def run(path: Path, _engine=PDF_ENGINES[name]) -> tuple[str, int]:
+            texts, page_count = _engine(path, 0, None)
+            return pages_to_markdown(texts), page_count
+        engines[name] = run
+    if parser_module.DOCLING_AVAILABLE:
+        engines["docling"] = lambda path: parser_module._parse_with_docling(path, ".pdf")
+
+    rows: list[dict] = []
+    for path in paths:
+        for name, func in engines.items():
+            seconds, text, pages = _time_call(func, path, repeat)
+            rows.append({
+                "file": path.name,
+                "engine": name,
+                "pages": pages,
+                "seconds": seconds,
+                "pages_per_s": pages / seconds if seconds > 0 else float("inf"),
+                "chars": len(text),
+            })
+    return rows
+
+
+def benchmark_pdf_split(paths: list[Path], workers: int, repeat: int = 1) -> list[dict]:
+    """Time page-range parallel extraction (as parse_document does) per file."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from app.services.parse_pool import _warm_worker
+    from app.services.parser import _parse_pdf_range
+    from app.services.pdf_engines import count_pdf_pages, resolve_engine_chain, split_page_ranges
+
+    engines = resolve_engine_chain("auto")
+    rows: list[dict] = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_worker,
+    ) as pool:
+        list(pool.map(abs, range(workers)))  # start every worker before timing
+        for path in paths:
+            ranges = split_page_ranges(count_pdf_pages(path, engines), workers)
+            timings: list[float] = []
+            range_seconds: list[float] = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                futures = [pool.submit(_parse_pdf_range, path, engines, a, b) for a, b in ranges]
+                results = [f.result() for f in futures]
+                timings.append(time.perf_counter() - start)
+                range_seconds = [seconds for _, _, seconds in results]
+            wall = statistics.median(timings)
+            pages = ranges[-1][1] if ranges else 0
+            rows.append({
+                "file": path.name,
+                "engine": f"{results[0][1]} x{len(ranges)}" if ranges else "-",
+                "pages": pages,
+                "seconds": wall,
+                "pages_per_s": pages / wall if wall > 0 else float("inf"),
+                "ranges": ", ".join(
+                    f"{a + 1}-{b}: {sec:.2f}s" for (a, b), sec in zip(ranges, range_seconds)
+                ),
+            })
+    return rows
+
+
+def _print_pdf_rows(rows: list[dict]) -> None:
+    print(f"{'file':<40} {'engine':<14} {'pages':>6} {'seconds':>9} {'pages/s':>9} {'chars':>9}")
+    for row in rows:
+        print(
+            f"{row['file'][:40]:<40} {row['engine']:<14} {row['pages']:>6} "
+            f"{row['seconds']:>9.3f} {row['pages_per_s']:>9.1f} {row.get('chars', ''):>9}"
+        )
+        if row.get("ranges"):
+            print(f"{'':<55} ranges: {row['ranges']}")
+
+
+def benchmark_xlsx(paths: list[Path], repeat: int = 1) -> list[dict]:
+    """Time the streaming XLSX parser (and Docling, if installed), with peak memory."""
+    from app.services import parser as parser_module
+    from app.services.xlsx_parser import parse_xlsx
+
+    engines: dict[str, Callable[[Path], tuple[str, int]]] = {"xlsx-stream": parse_xlsx}
+    if parser_module.DOCLING_AVAILABLE:
+        engines["docling"] = lambda path: parser_module._parse_with_docling(path, ".xlsx")
+
+    rows: list[dict] = []
+    for path in paths:
+        for name, func in engines.items():
+            seconds, text, pages = _time_call(func, path, repeat)
+            tracemalloc.start()
+            func(path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rows.append({
+                "file": path.name,
+                "engine": name,
+                "pages": pages,
+                "seconds": seconds,
+                "chars": len(text),
+                "peak_mb": peak / (1024 * 1024),
+            })
+    return rows
+
+
+def _print_xlsx_rows(rows: list[dict]) -> None:
+    print(f"{'file':<40} {'engine':<12} {'sheets':>6} {'seconds':>9} {'chars':>10} {'peak MB':>8}")
+    for row in rows:
+        print(
+            f"{row['file'][:40]:<40} {row['engine']:<12} {row['pages']:>6} "
+            f"{row['seconds']:>9.3f} {row['chars']:>10} {row['peak_mb']:>8.1f}"
+        )
+
+
+def benchmark_prep(paths: list[Path], presets: list[str]) -> list[dict]:
+    """Bytes, pixels and time per page for every preprocessing preset.
+
+    With Docling installed, OCR of the original and of the prepared file is
+    timed as well, so "OCR saved" is measured rather than estimated.
+    """
+    from app.services import parser as parser_module
+    from app.services.image_prep import ocr_suffix, prepare_image_for_ocr, prepare_image_upload
+
+    rows: list[dict] = []
+    for path in paths:
+        ocr_original = None
+        if parser_module.DOCLING_AVAILABLE:
+            ocr_original, _, _ = _time_call(parser_module._convert_with_ocr, path, 1)
+        for name in presets:
+            images, stats = prepare_image_upload(path, name)
+            row = {
+                "file": path.name,
+                "preset": name,
+                "pages": stats.pages,
+                "mpx_in": stats.pixels_in / 1e6 / stats.pages,
+                "mpx_out": stats.pixels_out / 1e6 / stats.pages,
+                "kb_in": stats.bytes_in / 1024 / stats.pages,
+                "kb_upload": stats.bytes_out / 1024 / stats.pages,
+                "prep_s": stats.seconds / stats.pages,
+                "skew": ", ".join(f"{a:+.1f}" for a in stats.skew_degrees),
+                "ocr_saved_s": None,
+            }
+            if ocr_original is not None:
+                with tempfile.TemporaryDirectory() as tmp:
+                    target = Path(tmp) / f"prepared{ocr_suffix(path)}"
+                    prepare_image_for_ocr(path, target, name)
+                    ocr_prepared, _, _ = _time_call(parser_module._convert_with_ocr, target, 1)
+                row["ocr_saved_s"] = (ocr_original - ocr_prepared) / stats.pages
+            rows.append(row)
+    return rows
+
+
+def _print_prep_rows(rows: list[dict]) -> None:
+    print(
+        f"{'file':<32} {'preset':<9} {'pages':>5} {'Mpx in':>7} {'Mpx out':>8} {'KB in':>8} "
+        f"{'KB up':>8} {'prep s':>7} {'OCR saved s':>12}  skew"
+    )
+    for row in rows:
+        saved = "-" if row["ocr_saved_s"] is None else f"{row['ocr_saved_s']:.2f}"
+        print(
+            f"{row['file'][:32]:<32} {row['preset']:<9} {row['pages']:>5} {row['mpx_in']:>7.1f} "
+            f"{row['mpx_out']:>8.1f} {row['kb_in']:>8.0f} {row['kb_upload']:>8.0f} "
+            f"{row['prep_s']:>7.2f} {saved:>12}  {row['skew']}"
+        )
+    print("(per page; OCR saved is measured only when Docling is installed)")
+
+
+def _print_docx_rows(rows: list[dict]) -> None:
+    print(f"{'file':<40} {'pages':>6} {'legacy s':>10} {'stream s':>10} {'speedup':>8}  same")
+    for row in rows:
+        print(
+            f"{row['file'][:40]:<40} {row['pages']:>6} {row['legacy_s']:>10.3f} "
+            f"{row['stream_s']:>10.3f} {row['speedup']:>7.1f}x  {'yes' if row['identical'] else 'NO'}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.parser_benchmark",
+        description="Benchmark document parsing engines on a local corpus.",
+    )
+    sub = parser.add_subparsers(dest="format", required=True)
+
+    docx_cmd = sub.add_parser("docx", help="legacy python-docx walk vs streaming parser")
+    docx_cmd.add_argument("--corpus", type=Path, help="DOCX file or directory to scan")
+    docx_cmd.add_argument(
+        "--synthetic", type=int, default=0, metavar="N",
+        help="generate a synthetic DOCX with N paragraphs instead of using a corpus",
+    )
+    docx_cmd.add_argument("--repeat", type=int, default=1)
+
+    pdf_cmd = sub.add_parser("pdf", help="pages/sec of every available PDF text engine")
+    pdf_cmd.add_argument("--corpus", type=Path, help="PDF file or directory to scan")
+    pdf_cmd.add_argument(
+        "--synthetic", type=int, default=0, metavar="N",
+        help="generate a synthetic N-page PDF instead of using a corpus",
+    )
+    pdf_cmd.add_argument("--repeat", type=int, default=1)
+    pdf_cmd.add_argument(
+        "--workers", type=int, default=0, metavar="N",
+        help="also time page-range parallel extraction across N worker processes",
+    )
+
+    xlsx_cmd = sub.add_parser("xlsx", help="streaming XLSX parser vs Docling")
+    xlsx_cmd.add_argument("--corpus", type=Path, help="XLSX file or directory to scan")
+    xlsx_cmd.add_argument(
+        "--synthetic", type=int, default=0, metavar="N",
+        help="generate a synthetic 3-sheet XLSX with N rows per sheet instead of using a corpus",
+    )
+    xlsx_cmd.add_argument("--repeat", type=int, default=1)
+
+    prep_cmd = sub.add_parser("prep", help="scan preprocessing presets: size, pixels, OCR time")
+    prep_cmd.add_argument("--corpus", type=Path, help="image file or directory (png/jpg/tif) to scan")
+    prep_cmd.add_argument(
+        "--synthetic", type=int, default=0, metavar="N",
+        help="generate a synthetic N-page 300 dpi scan instead of using a corpus",
+    )
+    prep_cmd.add_argument(
+        "--presets", default="fast,balanced,quality", help="comma-separated ocr_image_preset names",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.format == "docx":
+        if args.synthetic:
+            tmp = Path(tempfile.mkdtemp(prefix="docx_bench_"))
+            paths = [make_synthetic_docx(tmp / f"synthetic_{args.synthetic}.docx", args.synthetic)]
+        elif args.corpus:
+            paths = _collect(args.corpus, ".docx")
+        else:
+            parser.error("docx: pass --corpus or --synthetic")
+        if not paths:
+            print("No DOCX files found", file=sys.stderr)
+            return 1
+        rows = benchmark_docx(paths, repeat=args.repeat)
+        _print_docx_rows(rows)
+        return 0 if all(r["identical"] for r in rows) else 2
+
+    if args.format == "pdf":
+        if args.synthetic:
+            tmp = Path(tempfile.mkdtemp(prefix="pdf_bench_"))
+            paths = [make_synthetic_pdf(tmp / f"synthetic_{args.synthetic}.pdf", args.synthetic)]
+        elif args.corpus:
+            paths = _collect(args.corpus, ".pdf")
+        else:
+            parser.error("pdf: pass --corpus or --synthetic")
+        if not paths:
+            print("No PDF files found", file=sys.stderr)
+            return 1
+        rows = benchmark_pdf(paths, repeat=args.repeat)
+        if args.workers > 1:
+            rows += benchmark_pdf_split(paths, args.workers, repeat=args.repeat)
+        _print_pdf_rows(rows)
+        return 0
+
+    if args.format == "xlsx":
+        if args.synthetic:
+            tmp = Path(tempfile.mkdtemp(prefix="xlsx_bench_"))
+            paths = [make_synthetic_xlsx(tmp / f"synthetic_{args.synthetic}.xlsx", args.synthetic)]
+        elif args.corpus:
+            paths = _collect(args.corpus, ".xlsx")
+        else:
+            parser.error("xlsx: pass --corpus or --synthetic")
+        if not paths:
+            print("No XLSX files found", file=sys.stderr)
+            return 1
+        _print_xlsx_rows(benchmark_xlsx(paths, repeat=args.repeat))
+        return 0
+
+    if args.format == "prep":
+        if args.synthetic:
+            tmp = Path(tempfile.mkdtemp(prefix="prep_bench_"))
+            suffix = ".png" if args.synthetic == 1 else ".tiff"
+            paths = [make_synthetic_scan(tmp / f"synthetic_{args.synthetic}{suffix}", args.synthetic)]
+        elif args.corpus:
+            paths = [p for ext in (".png", ".jpg", ".jpeg", ".tif", ".tiff") for p in _collect(args.corpus, ext)]
+        else:
+            parser.error("prep: pass --corpus or --synthetic")
+        if not paths:
+            print("No image scans found", file=sys.stderr)
+            return 1
+        _print_prep_rows(benchmark_prep(paths, [p.strip() for p in args.presets.split(",") if p.strip()]))
+        return 0
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
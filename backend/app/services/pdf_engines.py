@@ -0,0 +1,178 @@
+# backend/app/services/pdf_engines.py
+# PDF text engine registry — pypdf (pure Python) and pypdfium2 (native PDFium)
+# Engines extract per-page text for a page range; parser.py joins pages into
+# markdown, splits large PDFs across parse workers and falls back along the
+# configured chain, with Docling as the last resort. Sources are a path or the
+# PDF bytes of an archive member held in memory (document_source.py).
+# Related: parser.py, parse_pool.py, parser_benchmark.py, config.py (parser_pdf_engine)
+
+import io
+import logging
+import threading
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pypdfium2  # noqa: F401
+    HAS_PDFIUM = True
+except ImportError:
+    HAS_PDFIUM = False
+
+# PDFium is not thread-safe: every pypdfium2 call in this process goes through
+# this lock (uncontended in single-threaded parse worker processes)
+PDFIUM_LOCK = threading.RLock()
+
+# A PDF on disk, or its bytes
+PdfSource = Path | bytes
+
+# An engine returns (page_texts for pages [start, end), total page count)
+PdfEngine = Callable[[PdfSource, int, int | None], tuple[list[str], int]]
+
+
+def _label(source: PdfSource) -> str:
+    return source.name if isinstance(source, Path) else f"<{len(source)} bytes in memory>"
+
+
+def _pypdf_reader(source: PdfSource):
+    from pypdf import PdfReader
+
+    return PdfReader(str(source) if isinstance(source, Path) else io.BytesIO(source))
+
+
+def _pdfium_document(source: PdfSource):
+    import pypdfium2 as pdfium
+
+    return pdfium.PdfDocument(str(source) if isinstance(source, Path) else source)
+
+
+def _pypdf_pages(file_path: PdfSource, start: int = 0, end: int | None = None) -> tuple[list[str], int]:
+    """pypdf — pure Python, no native DLLs (avoids Windows Application Control blocks)."""
+    reader = _pypdf_reader(file_path)
+    page_count = len(reader.pages)
+    stop = page_count if end is None else min(end, page_count)
+    texts = [(reader.pages[i].extract_text() or "") for i in range(start, stop)]
+    return texts, page_count
+
+
+def _pypdfium2_pages(file_path: PdfSource, start: int = 0, end: int | None = None) -> tuple[list[str], int]:
+    """pypdfium2 — PDFium text layer, several times faster than pypdf on long PDFs."""
+    with PDFIUM_LOCK:
+        pdf = _pdfium_document(file_path)
+        try:
+            page_count = len(pdf)
+            stop = page_count if end is None else min(end, page_count)
+            texts: list[str] = []
+            for i in range(start, stop):
+                page = pdf[i]
+                try:
+                    textpage = page.get_textpage()
+                    try:
+                        text = textpage.get_text_range()
+                    finally:
+                        textpage.close()
+                finally:
+                    page.close()
+                texts.append(text.replace("\r\n", "\n").replace("\r", "\n"))
+            return texts, page_count
+        finally:
+            pdf.close()
+
+
+PDF_ENGINES: dict[str, PdfEngine] = {
+    "pypdfium2": _pypdfium2_pages,
+    "pypdf": _pypdf_pages,
+}
+
+# Preferred order for "auto": fastest first
+_AUTO_ORDER = ("pypdfium2", "pypdf")
+
+
+def available_engines() -> list[str]:
+    """Registered engines whose dependencies are importable."""
+    return [name for name in PDF_ENGINES if name != "pypdfium2" or HAS_PDFIUM]
+
+
+def resolve_engine_chain(setting: str) -> tuple[str, ...]:
+    """Turn the ``parser_pdf_engine`` setting into an ordered fallback chain.
+
+    - "auto"      → every available text engine, fastest first
+    - "<engine>"  → that engine first, then the remaining available ones
+    - "docling"   → empty chain (parser.py goes straight to Docling)
+    Unknown or unavailable names degrade to "auto" with a warning.
+    """
+    if setting == "docling":
+        return ()
+    available = available_engines()
+    auto = tuple(name for name in _AUTO_ORDER if name in available)
+    if setting == "auto":
+        return auto
+    if setting not in available:
+        logger.warning("PDF engine %r unavailable — using auto (%s)", setting, ", ".join(auto))
+        return auto
+    return (setting,) + tuple(name for name in auto if name != setting)
+
+
+def extract_pdf_pages(
+    file_path: PdfSource,
+    engines: tuple[str, ...],
+    start: int = 0,
+    end: int | None = None,
+) -> tuple[list[str], int, str]:
+    """Extract page texts with the first engine in the chain that succeeds.
+
+    Returns (page_texts, total_page_count, engine_used). Raises the last
+    engine error when every engine fails, so the caller can try Docling.
+    """
+    if not engines:
+        raise RuntimeError("No PDF text engine configured")
+
+    last_error: Exception | None = None
+    for name in engines:
+        try:
+            texts, page_count = PDF_ENGINES[name](file_path, start, end)
+            return texts, page_count, name
+        except Exception as e:
+            logger.warning("PDF engine %s failed for %s: %s", name, _label(file_path), e)
+            last_error = e
+    assert last_error is not None
+    raise last_error
+
+
+def count_pdf_pages(file_path: PdfSource, engines: tuple[str, ...]) -> int:
+    """Page count only — opens the document without extracting any text."""
+    last_error: Exception | None = None
+    for name in engines:
+        try:
+            if name == "pypdfium2":
+                with PDFIUM_LOCK:
+                    pdf = _pdfium_document(file_path)
+                    try:
+                        return len(pdf)
+                    finally:
+                        pdf.close()
+            return len(_pypdf_reader(file_path).pages)
+        except Exception as e:
+            last_error = e
+    if last_error is None:
+        raise RuntimeError("No PDF text engine configured")
+    raise last_error
+
+
+def split_page_ranges(page_count: int, parts: int) -> list[tuple[int, int]]:
+    """Split [0, page_count) into at most ``parts`` contiguous, near-equal ranges."""
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges: list[tuple[int, int]] = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def pages_to_markdown(page_texts: list[str]) -> str:
+    """Join page texts the way the fast parser always has (blank pages dropped)."""
+    return "\n\n".join(text.strip() for text in page_texts if text.strip())
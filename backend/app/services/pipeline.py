@@ -1,27 +1,49 @@
 # backend/app/services/pipeline.py
 # Full analysis pipeline orchestrator with streaming events and metrics
 # Ties together: ZIP extraction → parsing → LLM extraction → aggregation → evaluation
-# Manages state transitions, emits SSE progress events, tracks metrics
+# Unpacking, parsing and LLM extraction run as overlapping streaming stages
+# joined by Channels; aggregation waits for every extraction. Stage results are
+# checkpointed so a re-run of an interrupted analysis picks up where it stopped.
+# An amendment run (amendment.py) processes only the added/replaced files and
+# aggregates them with the analysis' stored documents.
+# Manages state transitions, emits SSE progress events (batched through
+# event_buffer.py), tracks metrics
 # Related: all other services, convex_client.py, models/schemas.py
 
 import asyncio
 import logging
 import time
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TypeVar
 
+from app.config import get_settings
 from app.convex_client import ConvexDB
-from app.models.schemas import AnalysisStatus, SourceDocument
+from app.models.schemas import (
+    AggregatedReport,
+    AnalysisStatus,
+    ExtractionResult,
+    SourceDocument,
+)
 from app.services.aggregation import aggregate_results
+from app.services.amendment import Amendment, stored_extraction
+from app.services.channel import Channel
+from app.services.checkpoint import AnalysisCheckpoint, extractions_key
+from app.services.document_source import DocumentSource
+from app.services.event_buffer import EventBuffer
 from app.services.evaluator import evaluate_report
 from app.services.extraction import extract_all
 from app.services.llm import LLMClient
 from app.services.parser import ParsedDocument, parse_all
 from app.services.stream_store import create_stream, remove_stream
-from app.services.zip_extractor import extract_files
+from app.services.workspace import get_workspace_manager
+from app.services.zip_extractor import ExtractionBudget, extract_files
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 # ── Active pipeline registry (for cancellation from API) ─────────────────────
 # Maps analysis_id → AnalysisPipeline instance
 _active_pipelines: dict[str, "AnalysisPipeline"] = {}
@@ -66,6 +88,11 @@ class PipelineMetrics:
 
     total_files: int = 0
     total_pages: int = 0
+    archive_files_skipped: int = 0  # archive members never extracted (unsupported, limits)
+    archive_bytes_skipped: int = 0  # their declared uncompressed size
+    archive_files_in_memory: int = 0  # archive members parsed from memory, never written
+    llm_queue_wait_seconds: float = 0.0  # time LLM requests waited for a governor slot
+    checkpoints_restored: int = 0  # stage results reused from an interrupted run
     start_time: float = 0.0
     elapsed_seconds: float = 0.0
     tokens_extraction_input: int = 0
@@ -74,6 +101,11 @@ class PipelineMetrics:
     tokens_aggregation_output: int = 0
     tokens_evaluation_input: int = 0
     tokens_evaluation_output: int = 0
+    extraction_cache_hits: int = 0  # documents/chunks answered from the extraction cache
+    tokens_saved_input: int = 0  # tokens those hits did not send again
+    tokens_saved_output: int = 0
+    documents_reused: int = 0  # amendment: stored extractions used as is
+    sections_reextracted: int = 0  # amendment: changed sections of replaced documents
     estimated_cost_usd: float = 0.0
     model_used: str = ""
 
@@ -89,6 +121,11 @@ class AnalysisPipeline:
         1. PARSING    — parse all documents with Docling
         2. EXTRACTING — per-document LLM extraction (parallel)
         3. AGGREGATING — merge all extractions into one report
+
+    Stages 0–2 overlap: each file is parsed as soon as it is unpacked and
+    extracted as soon as it is parsed (see _unpack_parse_extract). The
+    status moves to PARSING / EXTRACTING when the first file reaches that
+    stage.
         4. EVALUATING — QA completeness check
         5. COMPLETED  — save results
 
@@ -116,10 +153,16 @@ class AnalysisPipeline:
         self.custom_instructions = custom_instructions
         self.thinking_override = thinking_override
         self.metrics = PipelineMetrics(model_used=model)
-        self._event_index = 0
+        settings = get_settings()
+        self._events = EventBuffer(
+            db, analysis_id,
+            max_batch=settings.event_flush_batch,
+            interval_ms=settings.event_flush_interval_ms,
+        )
         self._stream_queue = create_stream(analysis_id)
         self._cancel_event = asyncio.Event()
         self._eval_task: asyncio.Task | None = None
+        self._checkpoint: AnalysisCheckpoint | None = None
 
     async def _resolve_context_length(self) -> int:
         """Resolve the context window size for the selected model.
@@ -148,8 +191,12 @@ class AnalysisPipeline:
         logger.info("Model %s context_length=%d (default fallback)", self.model, DEFAULT_CONTEXT_LENGTH)
         return DEFAULT_CONTEXT_LENGTH
 
-    async def run(self, upload_paths: list[Path]) -> None:
-        """Execute the full analysis pipeline."""
+    async def run(self, upload_paths: list[Path], amend: bool = False) -> None:
+        """Execute the full analysis pipeline.
+
+        With ``amend``, ``upload_paths`` are files added to a completed
+        analysis; its stored documents are reused (see amendment.py).
+        """
         _active_pipelines[self.analysis_id] = self
         self.metrics.start_time = time.time()
 
@@ -164,101 +211,54 @@ class AnalysisPipeline:
             await self._push_thinking("evaluation", text)
 
         try:
-            # Step 0: Unpack ZIPs → flat file list
-            await self._check_cancellation()
-            await self._update_status(AnalysisStatus.UNPACKING)
-            file_list = await extract_files(upload_paths)
-            self.metrics.total_files = len(file_list)
-
-            if not file_list:
-                upload_names = [p.name for p in upload_paths]
-                raise ValueError(
-                    f"No supported files found in uploads. "
-                    f"Uploaded files: {upload_names}. "
-                    f"This may be caused by corrupt archives or unsupported file formats. "
-                    f"Supported formats: PDF, DOCX, XLSX, PPTX, PNG, TIFF, JPG, ZIP, 7z."
-                )
+            # Stage results of an interrupted run live in the analysis workspace
+            self._checkpoint = AnalysisCheckpoint.for_analysis(self.analysis_id)
+            if self._checkpoint is not None:
+                await self._resume_events()
+            amendment = await self._start_amendment() if amend else None
 
-            # Step 1: Parse all documents
+            # Steps 0–2: Unpack → parse → extract, streamed per file
             await self._check_cancellation()
-            await self._update_status(AnalysisStatus.PARSING)
-            parsed_docs = await parse_all(
-                file_list,
-                on_parsed=self._on_file_parsed_sync,
-            )
-            self.metrics.total_pages = sum(d.page_count for d in parsed_docs)
-
-            # Save parsed docs to DB (parallel)
-            await asyncio.gather(*(
-                self.db.add_document(
-                    analysis_id=self.analysis_id,
-                    filename=doc.filename,
-                    doc_type=doc.doc_type.value,
-                    page_count=doc.page_count,
-                    content_text=doc.content,
-                )
-                for doc in parsed_docs
-            ))
-
-            # Resolve model context window for dynamic chunking
-            context_length = await self._resolve_context_length()
-
-            # Step 2: Extract per-document (parallel with concurrency limit)
-            # Anthropic models: use Haiku for extraction (fast/cheap),
-            # UI-selected model used for aggregation/evaluation only
-            if self.model.startswith("anthropic/"):
-                extraction_model = ANTHROPIC_EXTRACTION_MODEL
-                extraction_context = ANTHROPIC_EXTRACTION_CONTEXT
-                logger.info("Anthropic model selected — using %s for extraction", extraction_model)
-            else:
-                extraction_model = self.model
-                extraction_context = context_length
-
-            await self._check_cancellation()
-            await self._update_status(AnalysisStatus.EXTRACTING)
-            extractions = await extract_all(
-                docs=parsed_docs,
-                llm=self.llm,
-                model=extraction_model,
-                context_length=extraction_context,
-                max_concurrent=min(len(parsed_docs), 5),
-                on_started=self._on_extraction_started_sync,
-                on_completed=self._on_extraction_completed_sync,
-                on_thinking=extraction_thinking,
-                analysis_type=self.analysis_type,
-                custom_instructions=self.custom_instructions,
-                thinking_override=self.thinking_override,
-                cancel_event=self._cancel_event,
+            await self._update_status(AnalysisStatus.UNPACKING)
+            parsed_docs, extractions, context_length = await self._unpack_parse_extract(
+                upload_paths, extraction_thinking, amendment,
             )
             await self._push_thinking_done()
+            if amendment is not None:
+                extractions = amendment.combine(extractions)
+                parsed_docs = [doc for doc, _result, _usage in extractions]
+                self.metrics.total_files = len(parsed_docs)
+                self.metrics.total_pages = sum(d.page_count for d in parsed_docs)
+                self.metrics.documents_reused = amendment.documents_reused
+                self.metrics.sections_reextracted = amendment.sections_reextracted
+            await self._save_extractions(extractions)
 
             # Accumulate extraction token metrics from results
             for _doc, _result, usage in extractions:
                 self.metrics.tokens_extraction_input += usage.get("input_tokens", 0)
                 self.metrics.tokens_extraction_output += usage.get("output_tokens", 0)
+                self.metrics.extraction_cache_hits += usage.get("cache_hits", 0)
+                self.metrics.tokens_saved_input += usage.get("saved_input_tokens", 0)
+                self.metrics.tokens_saved_output += usage.get("saved_output_tokens", 0)
 
             # Step 3: Aggregate all extractions into one report
             await self._check_cancellation()
             await self._update_status(AnalysisStatus.AGGREGATING)
-            await self._emit_event("aggregation_started", {})
-            report, agg_usage = await aggregate_results(
-                extractions, self.llm, self.model,
-                context_length=context_length,
-                on_thinking=aggregation_thinking,
-                analysis_type=self.analysis_type,
-                custom_instructions=self.custom_instructions,
-                thinking_override=self.thinking_override,
-                cancel_event=self._cancel_event,
+            report, agg_usage = await self._aggregate(
+                extractions, context_length, aggregation_thinking,
             )
-            await self._push_thinking_done()
-            self.metrics.tokens_aggregation_input = agg_usage.get("input_tokens", 0)
-            self.metrics.tokens_aggregation_output = agg_usage.get("output_tokens", 0)
-            await self._emit_event("aggregation_completed", agg_usage)
+            self.metrics.tokens_aggregation_input += agg_usage.get("input_tokens", 0)
+            self.metrics.tokens_aggregation_output += agg_usage.get("output_tokens", 0)
 
             # Step 4: Mark as COMPLETED immediately with report (evaluation runs in background)
             self.metrics.elapsed_seconds = time.time() - self.metrics.start_time
+            self.metrics.llm_queue_wait_seconds = self.llm.queue_wait_seconds
+            self._count_restored()
             self._calculate_total_cost()
 
+            # Events first: the SSE stream stops reading them at a terminal status
+            self._emit_event("metrics_update", self.metrics.to_dict())
+            await self._events.flush()
             await self.db.update_analysis(
                 self.analysis_id,
                 status=AnalysisStatus.COMPLETED.value,
@@ -266,8 +266,6 @@ class AnalysisPipeline:
                 metrics_json=self.metrics.to_dict(),
             )
 
-            await self._emit_event("metrics_update", self.metrics.to_dict())
-
             # Step 5: Evaluate report quality in background (non-blocking)
             source_docs = [
                 SourceDocument(
@@ -294,18 +292,288 @@ class AnalysisPipeline:
             )
 
             self.metrics.elapsed_seconds = time.time() - self.metrics.start_time
+            self.metrics.llm_queue_wait_seconds = self.llm.queue_wait_seconds
+            self._count_restored()
+            self._emit_event("error", {"message": str(e)})
+            await self._events.flush()
             await self.db.update_analysis(
                 self.analysis_id,
                 status=AnalysisStatus.FAILED.value,
                 error=str(e),
                 metrics_json=self.metrics.to_dict(),
             )
-            await self._emit_event("error", {"message": str(e)})
 
         finally:
+            await self._events.close()
             _active_pipelines.pop(self.analysis_id, None)
             remove_stream(self.analysis_id)
 
+    async def _aggregate(
+        self,
+        extractions: list[tuple[ParsedDocument, ExtractionResult, dict]],
+        context_length: int,
+        aggregation_thinking: Callable[[str], Awaitable[None]],
+    ) -> tuple[AggregatedReport, dict]:
+        """Step 3, or its checkpoint when an interrupted run got that far."""
+        key = extractions_key(extractions)
+        if self._checkpoint is not None:
+            restored = await self._checkpoint.load_aggregation(key)
+            if restored is not None:
+                logger.info("Aggregation restored from checkpoint for %s", self.analysis_id)
+                return restored
+
+        self._emit_event("aggregation_started", {})
+        report, agg_usage = await aggregate_results(
+            extractions, self.llm, self.model,
+            context_length=context_length,
+            on_thinking=aggregation_thinking,
+            analysis_type=self.analysis_type,
+            custom_instructions=self.custom_instructions,
+            thinking_override=self.thinking_override,
+            cancel_event=self._cancel_event,
+        )
+        await self._push_thinking_done()
+        if self._checkpoint is not None:
+            self._checkpoint.save_aggregation(key, report, agg_usage)
+        self._emit_event("aggregation_completed", agg_usage)
+        return report, agg_usage
+
+    # ── Checkpoints ────────────────────────────────────────────────────────
+
+    async def _resume_events(self) -> None:
+        """Continue the event log of an earlier, interrupted run of this analysis."""
+        self._events.next_index = len(await self.db.get_events(self.analysis_id))
+        if self._events.next_index and self._checkpoint.exists():
+            logger.info("Resuming analysis %s from checkpoints", self.analysis_id)
+            self._emit_event("analysis_resumed", {})
+
+    def _count_restored(self) -> None:
+        if self._checkpoint is not None:
+            self.metrics.checkpoints_restored = self._checkpoint.restored
+
+    # ── Amendments ─────────────────────────────────────────────────────────
+
+    async def _start_amendment(self) -> Amendment:
+        """Load the documents being amended; keep counting the tokens they cost."""
+        amendment = await Amendment.load(self.db, self.analysis_id)
+        record = await self.db.get_analysis(self.analysis_id)
+        previous = (record or {}).get("metrics_json") or {}
+        for key in self.metrics.to_dict():
+            if key.startswith("tokens_"):
+                setattr(self.metrics, key, previous.get(key, 0))
+        logger.info(
+            "Amending analysis %s (%d stored documents)", self.analysis_id, len(amendment.previous),
+        )
+        self._emit_event("analysis_amended", {"documents": len(amendment.previous)})
+        return amendment
+
+    async def _save_extractions(
+        self, extractions: list[tuple[ParsedDocument, ExtractionResult, dict]]
+    ) -> None:
+        """Store each extraction on its document record (amendments build on them);
+        documents added or replaced by an amendment are written here too."""
+        records = {r["filename"]: r for r in await self.db.get_documents(self.analysis_id)}
+        writes = []
+        for doc, result, _usage in extractions:
+            extraction_json = stored_extraction(result)
+            record = records.get(doc.filename)
+            if record is None:
+                writes.append(self.db.add_document(
+                    analysis_id=self.analysis_id,
+                    filename=doc.filename,
+                    doc_type=doc.doc_type.value,
+                    page_count=doc.page_count,
+                    content_text=doc.content,
+                    extraction_json=extraction_json,
+                ))
+                continue
+            fields: dict = {}
+            if record.get("content_text") != doc.content:
+                fields.update(
+                    doc_type=doc.doc_type.value, page_count=doc.page_count, content_text=doc.content,
+                )
+            if record.get("extraction_json") != extraction_json:
+                fields["extraction_json"] = extraction_json
+            if fields:
+                writes.append(self.db.update_document(record["_id"], **fields))
+        await asyncio.gather(*writes)
+
+    # ── Streaming stages ───────────────────────────────────────────────────
+
+    async def _unpack_parse_extract(
+        self,
+        upload_paths: list[Path],
+        extraction_thinking: Callable[[str], Awaitable[None]],
+        amendment: Amendment | None = None,
+    ) -> tuple[list[ParsedDocument], list[tuple[ParsedDocument, ExtractionResult, dict]], int]:
+        """Steps 0–2 as concurrent stages joined by Channels.
+
+        extract_files announces every file the moment it is unpacked,
+        parse_all starts parsing it right away and hands each parsed document
+        to extract_all, so one slow parse no longer delays every extraction.
+        parse_all bounds parsing (parse worker count); extract_all bounds LLM
+        calls (extraction_max_concurrent). A failing stage cancels the others.
+        Documents and extractions checkpointed by an interrupted run are
+        restored instead of being parsed or sent to the LLM again. For an
+        ``amendment`` only what changed against the stored documents is
+        extracted (Amendment.plan / merge).
+
+        Returns (parsed_docs, extractions, context_length), both lists in
+        extract_files order.
+        """
+        sources: Channel[DocumentSource] = Channel()
+        parsed: Channel[ParsedDocument] = Channel()
+        unpack_budget = ExtractionBudget.from_settings()
+        workspace = get_workspace_manager().get(self.analysis_id)
+        checkpoint = self._checkpoint
+        source_of: dict[int, DocumentSource] = {}  # id(doc) → the source it came from
+
+        async def unpack() -> list[DocumentSource]:
+            try:
+                file_list = await extract_files(
+                    upload_paths,
+                    on_event=self._on_archive_event_sync,
+                    on_source=sources.put,
+                    budget=unpack_budget,
+                    work_dir=workspace.unpack if workspace else None,
+                )
+            finally:
+                sources.close()
+            self.metrics.total_files = len(file_list)
+            self.metrics.archive_files_skipped = unpack_budget.files_skipped
+            self.metrics.archive_bytes_skipped = unpack_budget.bytes_skipped
+            self.metrics.archive_files_in_memory = unpack_budget.files_in_memory
+
+            if not file_list:
+                upload_names = [p.name for p in upload_paths]
+                raise ValueError(
+                    f"No supported files found in uploads. "
+                    f"Uploaded files: {upload_names}. "
+                    f"This may be caused by corrupt archives or unsupported file formats. "
+                    f"Supported formats: PDF, DOCX, XLSX, PPTX, PNG, TIFF, JPG, ZIP, 7z."
+                )
+            return file_list
+
+        def on_parsed(doc: ParsedDocument) -> None:
+            self._on_file_parsed_sync(doc)
+            if checkpoint is not None:
+                checkpoint.save_parsed(doc)
+            parsed.put(doc)
+
+        restored: list[ParsedDocument] = []
+        to_parse: list[DocumentSource] = []
+
+        async def unparsed() -> AsyncIterator[DocumentSource]:
+            # Checkpointed documents skip parse_all and go straight to extraction
+            async for source in self._stage_input(sources, AnalysisStatus.PARSING):
+                doc = None
+                if checkpoint is not None:
+                    doc = await checkpoint.load_parsed(
+                        source.filename, None if source.in_memory else source.path,
+                    )
+                if doc is None:
+                    to_parse.append(source)
+                    yield source
+                    continue
+                source.close()
+                source_of[id(doc)] = source
+                restored.append(doc)
+                parsed.put(doc)
+
+        async def parse() -> list[ParsedDocument]:
+            try:
+                docs = await parse_all(unparsed(), on_parsed=on_parsed)
+            finally:
+                parsed.close()
+            # parse_all returns documents in input order
+            source_of.update((id(doc), source) for source, doc in zip(to_parse, docs))
+            docs += restored
+            self.metrics.total_pages = sum(d.page_count for d in docs)
+
+            # Save parsed docs to DB (parallel, while extraction runs)
+            if amendment is not None:
+                return docs  # written with their extractions (_save_extractions)
+            if checkpoint is not None and await checkpoint.marked("documents_saved"):
+                return docs  # saved by the interrupted run
+            await asyncio.gather(*(
+                self.db.add_document(
+                    analysis_id=self.analysis_id,
+                    filename=doc.filename,
+                    doc_type=doc.doc_type.value,
+                    page_count=doc.page_count,
+                    content_text=doc.content,
+                )
+                for doc in docs
+            ))
+            if checkpoint is not None:
+                checkpoint.mark("documents_saved")
+            return docs
+
+        async def extract() -> tuple[list[tuple[ParsedDocument, ExtractionResult, dict]], int]:
+            # Resolve model context window for dynamic chunking (overlaps unpacking)
+            context_length = await self._resolve_context_length()
+
+            # Anthropic models: use Haiku for extraction (fast/cheap),
+            # UI-selected model used for aggregation/evaluation only
+            if self.model.startswith("anthropic/"):
+                extraction_model = ANTHROPIC_EXTRACTION_MODEL
+                extraction_context = ANTHROPIC_EXTRACTION_CONTEXT
+                logger.info("Anthropic model selected — using %s for extraction", extraction_model)
+            else:
+                extraction_model = self.model
+                extraction_context = context_length
+
+            docs = self._stage_input(parsed, AnalysisStatus.EXTRACTING)
+            extractions = await extract_all(
+                docs=amendment.plan(docs) if amendment is not None else docs,
+                llm=self.llm,
+                model=extraction_model,
+                context_length=extraction_context,
+                max_concurrent=get_settings().extraction_max_concurrent,
+                on_started=self._on_extraction_started_sync,
+                on_completed=self._on_extraction_completed_sync,
+                on_thinking=extraction_thinking,
+                analysis_type=self.analysis_type,
+                custom_instructions=self.custom_instructions,
+                thinking_override=self.thinking_override,
+                cancel_event=self._cancel_event,
+                on_ocr_progress=self._on_ocr_progress_sync,
+                checkpoint=checkpoint,
+            )
+            return extractions, context_length
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                unpack_task = group.create_task(unpack())
+                parse_task = group.create_task(parse())
+                extract_task = group.create_task(extract())
+        except BaseExceptionGroup as errors:
+            # Surface the stage's own error (status/event text, CancelledError)
+            raise errors.exceptions[0] from None
+
+        # Stages see files in completion order; report them in archive order
+        position = {source: i for i, source in enumerate(unpack_task.result())}
+        parsed_docs = parse_task.result()
+        order = {id(doc): position[source_of[id(doc)]] for doc in parsed_docs}
+        parsed_docs.sort(key=lambda doc: order[id(doc)])
+        extractions, context_length = extract_task.result()
+        if amendment is not None:
+            extractions = amendment.merge(extractions)
+        extractions.sort(key=lambda item: order[id(item[0])])
+        return parsed_docs, extractions, context_length
+
+    async def _stage_input(
+        self, items: AsyncIterable[T], status: AnalysisStatus
+    ) -> AsyncIterator[T]:
+        """Feed a stage, moving the analysis to ``status`` when its first item arrives."""
+        entered = False
+        async for item in items:
+            if not entered:
+                entered = True
+                await self._check_cancellation()
+                await self._update_status(status)
+            yield item
+
     # ── Background evaluation ─────────────────────────────────────────────
 
     async def _run_evaluation_background(
@@ -319,7 +587,12 @@ class AnalysisPipeline:
         Creates its own LLMClient to avoid using the main pipeline's client
         which gets closed after pipeline.run() returns.
         """
-        bg_llm = LLMClient(api_key=self._api_key, default_model=self.model)
+        bg_llm = LLMClient(
+            api_key=self._api_key,
+            default_model=self.model,
+            analysis_id=self.analysis_id,
+            priority=self.llm.priority,
+        )
         try:
             # Check cancellation before starting expensive evaluation
             if self._cancel_event.is_set():
@@ -330,8 +603,9 @@ class AnalysisPipeline:
                 report, source_docs, bg_llm, self.model,
                 on_thinking=evaluation_thinking,
             )
-            self.metrics.tokens_evaluation_input = eval_usage.get("input_tokens", 0)
-            self.metrics.tokens_evaluation_output = eval_usage.get("output_tokens", 0)
+            self.metrics.tokens_evaluation_input += eval_usage.get("input_tokens", 0)
+            self.metrics.tokens_evaluation_output += eval_usage.get("output_tokens", 0)
+            self.metrics.llm_queue_wait_seconds += bg_llm.queue_wait_seconds
             self._calculate_total_cost()
 
             await self.db.update_analysis(
@@ -359,16 +633,9 @@ class AnalysisPipeline:
         """Update analysis status in DB."""
         await self.db.update_analysis(self.analysis_id, status=status.value)
 
-    async def _emit_event(self, event_type: str, data: dict) -> None:
-        """Append a timestamped event to the DB events list."""
-        event = {
-            "timestamp": time.time(),
-            "event_type": event_type,
-            "data": data,
-            "index": self._event_index,
-        }
-        self._event_index += 1
-        await self.db.append_event(self.analysis_id, event)
+    def _emit_event(self, event_type: str, data: dict) -> None:
+        """Queue a timestamped event for the DB events list (written in batches)."""
+        self._events.emit(event_type, data)
 
     async def _push_thinking(self, phase: str, text: str) -> None:
         """Push a thinking chunk to the in-memory stream queue."""
@@ -417,18 +684,19 @@ class AnalysisPipeline:
             self._cancel_event.set()
             raise asyncio.CancelledError("Analysis canceled by user")
 
-    # ── Sync callbacks (bridge to async event emission) ────────────────────
+    # ── Sync callbacks (event emission) ───────────────────────────────────
     #
     # parse_all and extract_all call callbacks synchronously from within
-    # async code. We use asyncio.create_task to schedule DB writes without
-    # blocking the caller.
+    # async code. _emit_event only queues the event; the EventBuffer's single
+    # flusher task writes it, so callbacks never spawn tasks of their own.
 
-    def _on_file_parsed_sync(self, doc: ParsedDocument) -> None:
-        """Sync callback for parse_all — schedules file_parsed event."""
-        asyncio.create_task(self._on_file_parsed(doc))
+    def _on_archive_event_sync(self, event_type: str, data: dict) -> None:
+        """Sync callback for extract_files — queues archive_limit events."""
+        self._emit_event(event_type, data)
 
-    async def _on_file_parsed(self, doc: ParsedDocument) -> None:
-        await self._emit_event(
+    def _on_file_parsed_sync(self, doc: ParsedDocument) -> None:
+        """Sync callback for parse_all — queues file_parsed event."""
+        self._emit_event(
             "file_parsed",
             {
                 "filename": doc.filename,
@@ -440,30 +708,40 @@ class AnalysisPipeline:
         )
 
     def _on_extraction_started_sync(self, index: int, filename: str) -> None:
-        """Sync callback for extract_all — schedules extraction_started event."""
-        asyncio.create_task(
-            self._emit_event(
-                "extraction_started",
-                {
-                    "filename": filename,
-                    "doc_index": index,
-                },
-            )
+        """Sync callback for extract_all — queues extraction_started event."""
+        self._emit_event(
+            "extraction_started",
+            {
+                "filename": filename,
+                "doc_index": index,
+            },
         )
 
     def _on_extraction_completed_sync(
         self, index: int, filename: str, usage: dict
     ) -> None:
-        """Sync callback for extract_all — schedules extraction_completed event."""
-        asyncio.create_task(
-            self._emit_event(
-                "extraction_completed",
-                {
-                    "filename": filename,
-                    "tokens_in": usage.get("input_tokens", 0),
-                    "tokens_out": usage.get("output_tokens", 0),
-                },
-            )
+        """Sync callback for extract_all — queues extraction_completed event."""
+        self._emit_event(
+            "extraction_completed",
+            {
+                "filename": filename,
+                "tokens_in": usage.get("input_tokens", 0),
+                "tokens_out": usage.get("output_tokens", 0),
+            },
+        )
+
+    def _on_ocr_progress_sync(
+        self, index: int, filename: str, pages_done: int, pages_total: int
+    ) -> None:
+        """Sync callback for extract_all — queues ocr_progress event."""
+        self._emit_event(
+            "ocr_progress",
+            {
+                "filename": filename,
+                "doc_index": index,
+                "pages_done": pages_done,
+                "pages_total": pages_total,
+            },
         )
 
     # ── Cost estimation ────────────────────────────────────────────────────
@@ -0,0 +1,274 @@
+# backend/app/services/pipeline_worker.py
+# Pipeline worker — claims analysis jobs from the durable queue and runs them
+# One worker runs inside the API process unless job_worker_embedded is off;
+# more can run as separate processes (``python -m app.worker``) on the same
+# host. Each claimed job is admitted by the analysis scheduler,
+# heartbeats while it runs, and is handed back to the queue if the worker
+# shuts down before it finishes. The next run of a handed-back (or resumed
+# failed) job restores the stage checkpoints the interrupted one left behind.
+# Related: job_queue.py, analysis_scheduler.py, pipeline.py, worker.py,
+#          routers/analyze.py (enqueue), main.py (embedded worker + drain)
+
+import asyncio
+import logging
+import os
+import shutil
+import socket
+import uuid
+from functools import lru_cache, partial
+
+from app.config import get_settings
+from app.convex_client import ConvexDB, get_db
+from app.services.analysis_scheduler import (
+    AdmissionCanceled,
+    get_analysis_scheduler,
+    priority_of,
+)
+from app.services.job_queue import Job, SQLiteJobQueue, get_job_queue
+from app.services.workspace import get_workspace_manager
+
+logger = logging.getLogger(__name__)
+
+
+async def run_analysis(db: ConvexDB, analysis_id: str, params: dict) -> str | None:
+    """Run one analysis job to completion (failures end up on the DB record).
+
+    Returns the error of a failed analysis (None when it completed or was
+    canceled) for the job row.
+
+    ``params`` is the job payload written by the upload endpoint: user_id,
+    model, analysis_type, custom_instructions, thinking, origin and the
+    upload paths relative to the workspace; ``amend`` marks files added to
+    a completed analysis (POST /api/analyze/{id}/amend). The workspace is
+    removed once the analysis completes; after a failure it stays (uploads +
+    checkpoints) so the analysis can be resumed until workspace GC collects it.
+    """
+    from app.services.llm import LLMClient
+    from app.services.pipeline import AnalysisPipeline
+
+    settings = get_settings()
+    workspaces = get_workspace_manager()
+    workspace = workspaces.create(analysis_id)  # re-attach; uploads are already there
+    # Archives are unpacked again; drop what an interrupted run left behind
+    await asyncio.get_running_loop().run_in_executor(
+        None, partial(shutil.rmtree, workspace.unpack, ignore_errors=True),
+    )
+    upload_paths = [workspace.uploads / name for name in params.get("uploads", [])]
+    analysis_type = params.get("analysis_type", "detailed")
+    origin = params.get("origin", "interactive")
+    model = params["model"]
+    error: str | None = None
+    try:
+        # Wait for a run slot (priority lane + per-user fair share)
+        async with get_analysis_scheduler().admit(
+            analysis_id, params.get("user_id", ""), analysis_type=analysis_type, origin=origin,
+        ):
+            api_key = settings.openrouter_api_key
+            # Check if API key is in DB settings
+            if not api_key:
+                db_key = await db.get_setting("openrouter_api_key")
+                if db_key:
+                    api_key = db_key
+
+            if not api_key:
+                error = "OpenRouter API key not configured. Set it in Settings."
+                await db.update_analysis(analysis_id, status="failed", error=error)
+                return error
+
+            llm = LLMClient(
+                api_key=api_key,
+                default_model=model,
+                analysis_id=analysis_id,
+                priority=priority_of(analysis_type, origin),
+            )
+            try:
+                pipeline = AnalysisPipeline(
+                    analysis_id=analysis_id,
+                    db=db,
+                    llm=llm,
+                    model=model,
+                    api_key=api_key,
+                    analysis_type=analysis_type,
+                    custom_instructions=params.get("custom_instructions", ""),
+                    thinking_override=params.get("thinking", ""),
+                )
+                await pipeline.run(upload_paths, amend=params.get("amend", False))
+            finally:
+                await llm.close()
+    except AdmissionCanceled:
+        logger.info("Analysis %s canceled before it started", analysis_id)
+    except Exception as e:
+        logger.error("Pipeline failed for %s: %s", analysis_id, e, exc_info=True)
+        try:
+            await db.update_analysis(
+                analysis_id,
+                status="failed",
+                error=str(e),
+            )
+        except Exception:
+            logger.error("Failed to update analysis status to failed")
+    finally:
+        task = asyncio.current_task()
+        if task is not None and task.cancelling():
+            pass  # worker shutdown — the job is re-queued and resumes from this workspace
+        elif (error := await _failure(db, analysis_id)) is not None:
+            workspaces.detach(analysis_id)  # kept for POST /api/analyze/{id}/resume
+        else:
+            workspaces.release(analysis_id)
+    return error
+
+
+async def _failure(db: ConvexDB, analysis_id: str) -> str | None:
+    """The error of a failed analysis record, None if it did not fail."""
+    try:
+        record = await db.get_analysis(analysis_id)
+    except Exception:
+        return None
+    if record is None or record.get("status") != "failed":
+        return None
+    return record.get("error") or "Analysis failed"
+
+
+class PipelineWorker:
+    """Claims jobs while the analysis scheduler has free slots and runs them."""
+
+    def __init__(
+        self,
+        queue: SQLiteJobQueue,
+        db: ConvexDB,
+        *,
+        worker_id: str | None = None,
+        poll_seconds: float = 1.0,
+    ) -> None:
+        self.queue = queue
+        self.db = db
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.poll_seconds = poll_seconds
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    @property
+    def running(self) -> int:
+        return len(self._tasks)
+
+    def wake(self) -> None:
+        """Poll the queue now instead of at the next interval (new job enqueued)."""
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        """Claim and start jobs until drain() is called."""
+        logger.info("Pipeline worker %s polling %s", self.worker_id, self.queue.path)
+        while not self._stopping:
+            try:
+                await self._poll()
+            except Exception:
+                logger.warning("Job queue poll failed", exc_info=True)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except TimeoutError:
+                pass
+
+    async def drain(self, timeout: float) -> None:
+        """Stop claiming, give running jobs ``timeout`` seconds, then hand the
+        rest back to the queue for another worker once their checkpoints are
+        on disk."""
+        from app.services.checkpoint import flush_checkpoints
+
+        self._stopping = True
+        self.wake()
+        if self._tasks:
+            logger.info("Draining %d running analyses (up to %.0fs)", len(self._tasks), timeout)
+            _done, pending = await asyncio.wait(list(self._tasks.values()), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await flush_checkpoints()  # the next worker resumes from them
+
+    # ── Internals ──────────────────────────────────────────────────────────
+
+    async def _poll(self) -> None:
+        loop = asyncio.get_running_loop()
+        scheduler = get_analysis_scheduler()
+        per_user = get_settings().analysis_max_per_user
+
+        for job in await loop.run_in_executor(None, self.queue.reap):
+            logger.error("Analysis %s lost its worker %d times — failing it", job.id, job.attempts)
+            try:
+                await self.db.update_analysis(
+                    job.id, status="failed", error="Analysis worker stopped responding",
+                )
+            except Exception:
+                logger.error("Failed to update analysis status to failed")
+
+        while not self._stopping:
+            max_priority = scheduler.claimable_priority()
+            if max_priority is None:
+                return
+            job = await loop.run_in_executor(
+                None,
+                partial(self.queue.claim, self.worker_id, max_priority=max_priority, per_user=per_user),
+            )
+            if job is None:
+                return
+            self._tasks[job.id] = asyncio.create_task(self._run_job(job))
+            # Let the job enter scheduler admission before the next capacity check
+            await asyncio.sleep(0)
+
+    async def _run_job(self, job: Job) -> None:
+        logger.info("Worker %s running analysis %s (attempt %d)", self.worker_id, job.id, job.attempts)
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        error: str | None = None
+        try:
+            error = await run_analysis(self.db, job.id, job.payload)
+        except Exception as e:
+            error = str(e)
+        finally:
+            heartbeat.cancel()
+            self._tasks.pop(job.id, None)
+            self.wake()
+            if asyncio.current_task().cancelling():
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.queue.requeue, job.id, self.worker_id,
+                )
+                logger.info("Analysis %s handed back to the queue", job.id)
+        if asyncio.current_task().cancelling():
+            raise asyncio.CancelledError  # the pipeline swallowed our cancel
+        await asyncio.get_running_loop().run_in_executor(
+            None, partial(self.queue.finish, job.id, self.worker_id, error=error),
+        )
+
+    async def _heartbeat(self, job: Job) -> None:
+        """Extend the lease; relay cancellation requested through the DB."""
+        from app.services.pipeline import get_active_pipeline
+
+        loop = asyncio.get_running_loop()
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                owned = await loop.run_in_executor(
+                    None, self.queue.heartbeat, job.id, self.worker_id,
+                )
+                record = await self.db.get_analysis(job.id)
+            except Exception:
+                logger.warning("Heartbeat for %s failed", job.id, exc_info=True)
+                continue
+            canceled = record is not None and record.get("status") == "canceled"
+            if not owned:
+                logger.warning("Worker %s lost the lease on %s — stopping it", self.worker_id, job.id)
+            if canceled or not owned:
+                get_analysis_scheduler().cancel(job.id)
+                pipeline = get_active_pipeline(job.id)
+                if pipeline:
+                    pipeline.request_cancel()
+                return
+
+
+@lru_cache
+def get_pipeline_worker() -> PipelineWorker:
+    """This process' worker (started by main.py lifespan or app.worker)."""
+    return PipelineWorker(
+        get_job_queue(), get_db(), poll_seconds=get_settings().job_poll_seconds,
+    )
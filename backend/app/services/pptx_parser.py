@@ -0,0 +1,104 @@
+# backend/app/services/pptx_parser.py
+# PPTX → markdown parser built on python-pptx (no Docling needed)
+# Walks slides in order: title, text frames (group shapes included, reading
+# order by position), tables and speaker notes; one page per slide.
+# Related: parser.py (fast-path dispatch), parser_benchmark.py
+
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from pptx.enum.shapes import MSO_SHAPE_TYPE, PP_PLACEHOLDER
+
+# Placeholder types whose paragraphs are bullet lists in the slide layout
+_BULLET_PLACEHOLDERS = {PP_PLACEHOLDER.BODY, PP_PLACEHOLDER.OBJECT}
+_TITLE_PLACEHOLDERS = {PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE}
+
+
+def parse_pptx(source: Path | BinaryIO) -> tuple[str, int]:
+    """Parse a PPTX presentation into markdown — returns (markdown_text, page_count).
+
+    Every slide becomes a "## Slide N: <title>" section; page_count is the
+    number of slides.
+    """
+    from pptx import Presentation
+
+    presentation = Presentation(str(source) if isinstance(source, Path) else source)
+    sections = [
+        "\n\n".join(_render_slide(slide, number))
+        for number, slide in enumerate(presentation.slides, start=1)
+    ]
+    return "\n\n".join(sections), len(sections)
+
+
+def _render_slide(slide, number: int) -> list[str]:
+    title_shape = slide.shapes.title
+    title = _clean(title_shape.text_frame.text) if title_shape is not None else ""
+    parts = [f"## Slide {number}: {title}" if title else f"## Slide {number}"]
+
+    for shape in _ordered(slide.shapes):
+        if title_shape is not None and shape.shape_id == title_shape.shape_id:
+            continue
+        _render_shape(shape, parts)
+
+    if slide.has_notes_slide:
+        notes_frame = slide.notes_slide.notes_text_frame
+        notes = notes_frame.text.strip() if notes_frame is not None else ""
+        if notes:
+            parts.append("> Notes: " + " ".join(_clean(line) for line in notes.splitlines() if line.strip()))
+    return parts
+
+
+def _ordered(shapes: Iterable) -> list:
+    """Shapes in reading order — top to bottom, then left to right."""
+    return sorted(shapes, key=lambda s: (s.top or 0, s.left or 0))
+
+
+def _render_shape(shape, parts: list[str]) -> None:
+    if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+        for child in _ordered(shape.shapes):
+            _render_shape(child, parts)
+        return
+    if getattr(shape, "has_table", False):
+        _render_table(shape.table, parts)
+        return
+    if not shape.has_text_frame:
+        return
+
+    bullets = False
+    if shape.is_placeholder:
+        placeholder_type = shape.placeholder_format.type
+        if placeholder_type in _TITLE_PLACEHOLDERS:
+            text = _clean(shape.text_frame.text)
+            if text:
+                parts.append(f"### {text}")
+            return
+        bullets = placeholder_type in _BULLET_PLACEHOLDERS
+
+    lines: list[str] = []
+    for paragraph in shape.text_frame.paragraphs:
+        text = _clean(paragraph.text)
+        if not text:
+            continue
+        if bullets or paragraph.level > 0:
+            lines.append("  " * paragraph.level + f"- {text}")
+        else:
+            lines.append(text)
+    if lines:
+        parts.append("\n".join(lines))
+
+
+def _render_table(table, parts: list[str]) -> None:
+    rows = [[_clean(cell.text).replace("|", "\\|") for cell in row.cells] for row in table.rows]
+    if not rows:
+        return
+    width = len(rows[0])
+    lines = ["| " + " | ".join(rows[0]) + " |", "| " + " | ".join("---" for _ in range(width)) + " |"]
+    for row in rows[1:]:
+        row = (row + [""] * width)[:width]
+        lines.append("| " + " | ".join(row) + " |")
+    parts.append("\n".join(lines))
+
+
+def _clean(text: str) -> str:
+    # python-pptx reports soft line breaks (<a:br>) as vertical tabs
+    return " ".join(text.replace("\x0b", " ").split())
@@ -0,0 +1,112 @@
+# backend/app/services/tender_fingerprint.py
+# Whole-tender fingerprints — identical uploads + settings reuse a finished analysis
+# Teams upload the same CVP IS package several times a day. The upload endpoint
+# fingerprints the set of upload content hashes (sorted, names ignored) together
+# with the analysis settings; when the user already has a completed analysis
+# with that fingerprint, the new one is copied from it instead of running the
+# pipeline. ``force=true`` on the upload skips the lookup.
+# Related: routers/analyze.py (create_analysis), convex_client.py
+#          (find_completed_analysis), pipeline.py (PipelineMetrics)
+
+import asyncio
+import hashlib
+import logging
+import time
+
+from app.convex_client import ConvexDB
+from app.models.schemas import AnalysisStatus
+from app.services.pipeline import PipelineMetrics
+
+logger = logging.getLogger(__name__)
+
+# Bump when a pipeline change makes earlier reports unfit for reuse
+FINGERPRINT_VERSION = "1"
+
+
+def tender_fingerprint(
+    file_hashes: list[str],
+    *,
+    model: str,
+    analysis_type: str,
+    custom_instructions: str = "",
+    thinking: str = "",
+) -> str:
+    """Fingerprint of an upload set (SHA-256 per file) and the analysis settings."""
+    parts = [
+        "tender",
+        FINGERPRINT_VERSION,
+        model,
+        analysis_type,
+        hashlib.sha256(custom_instructions.strip().encode("utf-8")).hexdigest(),
+        thinking,
+        *sorted(file_hashes),
+    ]
+    return hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()
+
+
+def _reused_metrics(source_id: str, source: dict) -> dict:
+    """Metrics of a copied analysis — no tokens spent, the source's tokens saved."""
+    metrics = PipelineMetrics(
+        model_used=source.get("model_used", ""),
+        total_files=source.get("total_files", 0),
+        total_pages=source.get("total_pages", 0),
+        tokens_saved_input=sum(
+            source.get(f"tokens_{phase}_input", 0)
+            for phase in ("extraction", "aggregation", "evaluation")
+        ),
+        tokens_saved_output=sum(
+            source.get(f"tokens_{phase}_output", 0)
+            for phase in ("extraction", "aggregation", "evaluation")
+        ),
+    )
+    return {**metrics.to_dict(), "reused_from": source_id}
+
+
+async def reuse_completed_analysis(
+    db: ConvexDB,
+    fingerprint: str,
+    user_id: str | None,
+    model: str,
+    params: dict | None = None,
+) -> str | None:
+    """Copy the user's completed analysis with ``fingerprint`` into a new record.
+
+    ``params`` are the request's run settings, stored on the copy like on any
+    analysis (it has no job to read them from). Returns the new analysis ID,
+    or None when there is nothing to reuse.
+    """
+    source = await db.find_completed_analysis(fingerprint, user_id)
+    if source is None or not source.get("report_json"):
+        return None
+    source_id = source["_id"]
+
+    analysis_id = await db.create_analysis(
+        model=model, user_id=user_id, fingerprint=fingerprint, params_json=params,
+    )
+    documents = await db.get_documents(source_id)
+    await asyncio.gather(*(
+        db.add_document(
+            analysis_id=analysis_id,
+            filename=doc["filename"],
+            doc_type=doc["doc_type"],
+            page_count=doc.get("page_count") or 0,
+            content_text=doc.get("content_text") or "",
+            extraction_json=doc.get("extraction_json"),
+        )
+        for doc in documents
+    ))
+    fields = {
+        "report_json": source["report_json"],
+        "metrics_json": _reused_metrics(source_id, source.get("metrics_json") or {}),
+    }
+    if source.get("qa_json"):
+        fields["qa_json"] = source["qa_json"]
+    await db.update_analysis(analysis_id, status=AnalysisStatus.COMPLETED.value, **fields)
+    await db.append_event(analysis_id, {
+        "timestamp": time.time(),
+        "event_type": "analysis_reused",
+        "data": {"source_id": source_id},
+        "index": 0,
+    })
+    logger.info("Analysis %s reused from identical analysis %s", analysis_id, source_id)
+    return analysis_id
@@ -0,0 +1,317 @@
+# backend/app/services/workspace.py
+# Per-analysis workspaces rooted at AppSettings.temp_dir with TTL garbage collection
+# Each analysis gets one directory tree (uploads, unpacked archives, stage
+# checkpoints) that is removed when its pipeline completes; failed analyses
+# keep theirs for a resume, and anything left behind (failures, crashes) is
+# collected after workspace_ttl_hours. A global disk quota holds back new
+# uploads until space frees up, and short-lived scratch files (page subsets,
+# OCR work, exports) can live on tmpfs via workspace_hot_dir.
+# Related: routers/analyze.py, zip_extractor.py, extraction.py, ocr_scheduler.py,
+#          exporter.py, main.py (GC loop)
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# How often a waiting upload re-measures disk usage
+_SPACE_POLL_SECONDS = 0.5
+
+# Disk usage is re-measured at most this often (stats endpoints poll)
+_USAGE_TTL_SECONDS = 2.0
+
+# Scratch falls back to disk when the hot dir has less free space than this
+_HOT_MIN_FREE = 64 * 1024 * 1024
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """The workspace disk quota stayed full for the whole backpressure wait."""
+
+
+def _tree_bytes(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:  # removed while walking
+                continue
+    return total
+
+
+def _age_seconds(path: Path, now: float) -> float:
+    try:
+        return now - path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+# ── Scratch ──────────────────────────────────────────────────────────────────
+
+
+def _workspaces_root() -> Path:
+    return Path(get_settings().temp_dir) / "workspaces"
+
+
+def _hot_root() -> Path | None:
+    hot_dir = get_settings().workspace_hot_dir
+    if not hot_dir:
+        return None
+    root = Path(hot_dir)
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        if shutil.disk_usage(root).free < _HOT_MIN_FREE:
+            return None
+    except OSError:
+        logger.warning("Hot workspace dir %s unusable — using disk", root, exc_info=True)
+        return None
+    return root
+
+
+def scratch_root() -> Path:
+    """Directory for short-lived files: tmpfs hot dir if configured and roomy, else disk."""
+    root = _hot_root() or _workspaces_root() / "scratch"
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def scratch_dir(prefix: str) -> Path:
+    """New scratch directory; callers remove it when done (GC catches leftovers)."""
+    return Path(tempfile.mkdtemp(prefix=prefix, dir=scratch_root()))
+
+
+# ── Workspaces ───────────────────────────────────────────────────────────────
+
+
+class Workspace:
+    """Directory tree owned by one analysis: ``uploads/`` and ``unpack/``."""
+
+    def __init__(self, analysis_id: str, root: Path) -> None:
+        self.analysis_id = analysis_id
+        self.root = root
+        self.uploads = root / "uploads"
+        self.unpack = root / "unpack"
+
+
+class WorkspaceManager:
+    """Creates, measures and removes analysis workspaces under ``root``.
+
+    ``quota_bytes`` bounds the whole tree (workspaces + disk scratch);
+    wait_for_space() is the backpressure point for new uploads. Workspaces of
+    running analyses are never collected; inactive ones and scratch entries
+    older than ``ttl_seconds`` are.
+    """
+
+    def __init__(self, root: Path, quota_bytes: int, ttl_seconds: float) -> None:
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._active: dict[str, Workspace] = {}
+        self._usage: tuple[float, int] | None = None  # (measured_at, bytes)
+        self.released = 0
+        self.collected = 0
+        self.reclaimed_bytes = 0
+        self.waits = 0
+        self.rejections = 0
+
+    # ── Lifecycle ──────────────────────────────────────────────────────────
+
+    def create(self, analysis_id: str) -> Workspace:
+        workspace = self._workspace(analysis_id)
+        workspace.uploads.mkdir(parents=True, exist_ok=True)
+        workspace.unpack.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._active[analysis_id] = workspace
+            self._usage = None
+        return workspace
+
+    def get(self, analysis_id: str) -> Workspace | None:
+        with self._lock:
+            return self._active.get(analysis_id)
+
+    def locate(self, analysis_id: str) -> Workspace | None:
+        """Workspace left on disk by an earlier run (uploads present), not attached."""
+        workspace = self._workspace(analysis_id)
+        return workspace if workspace.uploads.is_dir() else None
+
+    def detach(self, analysis_id: str) -> None:
+        """Stop tracking a workspace another process now owns; files stay."""
+        with self._lock:
+            self._active.pop(analysis_id, None)
+
+    def release(self, analysis_id: str) -> int:
+        """Delete an analysis workspace; returns the bytes freed."""
+        with self._lock:
+            workspace = self._active.pop(analysis_id, None)
+        if workspace is None:
+            return 0
+        freed = self._remove(workspace.root)
+        with self._lock:
+            self.released += 1
+        logger.info(
+            "Released workspace for %s (%.1f MB)", analysis_id, freed / (1024 * 1024),
+        )
+        return freed
+
+    def collect_garbage(self, now: float | None = None) -> int:
+        """Remove inactive workspaces and scratch entries older than the TTL."""
+        now = time.time() if now is None else now
+        with self._lock:
+            active = {w.root.name for w in self._active.values()}
+        candidates: list[Path] = []
+        roots = [self.root / "analyses", self.root / "scratch"]
+        hot = _hot_root()
+        if hot is not None:
+            roots.append(hot)
+        for parent in roots:
+            if not parent.is_dir():
+                continue
+            for entry in parent.iterdir():
+                if parent.name == "analyses" and entry.name in active:
+                    continue
+                if _age_seconds(entry, now) > self.ttl_seconds:
+                    candidates.append(entry)
+
+        freed = sum(self._remove(entry) for entry in candidates)
+        if candidates:
+            with self._lock:
+                self.collected += len(candidates)
+            logger.info(
+                "Workspace GC removed %d expired entries (%.1f MB)",
+                len(candidates),
+                freed / (1024 * 1024),
+            )
+        return freed
+
+    async def run_gc(self, interval: float | None = None) -> None:
+        """Collect garbage now and then every ``interval`` seconds (until cancelled)."""
+        interval = interval or min(self.ttl_seconds, 600.0)
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.collect_garbage)
+            except Exception:
+                logger.warning("Workspace GC failed", exc_info=True)
+            await asyncio.sleep(interval)
+
+    # ── Quota ──────────────────────────────────────────────────────────────
+
+    def bytes_used(self) -> int:
+        with self._lock:
+            if self._usage is not None and time.monotonic() - self._usage[0] < _USAGE_TTL_SECONDS:
+                return self._usage[1]
+        used = _tree_bytes(self.root) if self.root.is_dir() else 0
+        with self._lock:
+            self._usage = (time.monotonic(), used)
+        return used
+
+    async def wait_for_space(self, nbytes: int, timeout: float) -> None:
+        """Wait until ``nbytes`` more fit under the quota.
+
+        Expired workspaces are collected first; then the caller is held back
+        (polling) while running analyses finish and release their trees.
+        Raises WorkspaceQuotaExceeded if there is still no room after ``timeout``.
+        """
+        if self.quota_bytes <= 0:
+            return
+        if nbytes > self.quota_bytes:
+            with self._lock:
+                self.rejections += 1
+            raise WorkspaceQuotaExceeded(
+                f"Upload of {nbytes // (1024 * 1024)} MB exceeds the workspace quota "
+                f"of {self.quota_bytes // (1024 * 1024)} MB"
+            )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        collected = False
+        while True:
+            used = await loop.run_in_executor(None, self.bytes_used)
+            if used + nbytes <= self.quota_bytes:
+                return
+            if not collected:
+                collected = True
+                with self._lock:
+                    self.waits += 1
+                logger.warning(
+                    "Workspace quota full (%.1f / %.1f MB) — holding back upload of %.1f MB",
+                    used / (1024 * 1024),
+                    self.quota_bytes / (1024 * 1024),
+                    nbytes / (1024 * 1024),
+                )
+                await loop.run_in_executor(None, self.collect_garbage)
+                continue
+            if loop.time() >= deadline:
+                with self._lock:
+                    self.rejections += 1
+                raise WorkspaceQuotaExceeded(
+                    f"Workspace quota of {self.quota_bytes // (1024 * 1024)} MB is full"
+                )
+            await asyncio.sleep(_SPACE_POLL_SECONDS)
+
+    def stats(self) -> dict[str, int]:
+        used = self.bytes_used()
+        hot = _hot_root()
+        with self._lock:
+            return {
+                "active": len(self._active),
+                "bytes_used": used,
+                "quota_bytes": self.quota_bytes,
+                "hot_bytes_used": _tree_bytes(hot) if hot is not None else 0,
+                "released": self.released,
+                "collected": self.collected,
+                "reclaimed_bytes": self.reclaimed_bytes,
+                "waits": self.waits,
+                "rejections": self.rejections,
+            }
+
+    # ── Internals ──────────────────────────────────────────────────────────
+
+    def _workspace(self, analysis_id: str) -> Workspace:
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", analysis_id)
+        return Workspace(analysis_id, self.root / "analyses" / safe_id)
+
+    def _remove(self, path: Path) -> int:
+        size = _tree_bytes(path) if path.is_dir() else _file_bytes(path)
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self.reclaimed_bytes += size
+            self._usage = None
+        return size
+
+
+def _file_bytes(path: Path) -> int:
+    try:
+        return path.lstat().st_size
+    except OSError:
+        return 0
+
+
+@lru_cache
+def get_workspace_manager() -> WorkspaceManager:
+    """Process-wide workspace manager rooted at ``{temp_dir}/workspaces``."""
+    settings = get_settings()
+    root = _workspaces_root()
+    logger.info(
+        "Workspaces at %s (quota %d MB, TTL %d h)",
+        root, settings.workspace_quota_mb, settings.workspace_ttl_hours,
+    )
+    return WorkspaceManager(
+        root,
+        quota_bytes=settings.workspace_quota_mb * 1024 * 1024,
+        ttl_seconds=settings.workspace_ttl_hours * 3600,
+    )
@@ -0,0 +1,84 @@
+# backend/app/services/xlsx_parser.py
+# Streaming XLSX → markdown parser (openpyxl read-only, one row at a time)
+# Each worksheet becomes a "## <sheet>" section with a markdown table; cells are
+# rendered as rows stream past, so memory tracks the output text rather than a
+# full workbook object graph — bill-of-quantities sheets with 50k+ rows stay flat.
+# Related: parser.py (fast-path dispatch), parser_benchmark.py
+
+import datetime as dt
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable
+
+
+def parse_xlsx(source: Path | BinaryIO) -> tuple[str, int]:
+    """Parse an XLSX workbook into markdown — returns (markdown_text, page_count).
+
+    One page per non-empty worksheet. Formula cells use their cached values;
+    fully empty rows and trailing empty columns are dropped.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        parts: list[str] = []
+        sheets = 0
+        for sheet in workbook.worksheets:
+            table = _render_rows(sheet.iter_rows(values_only=True))
+            if not table:
+                continue
+            parts.append(f"## {sheet.title}")
+            parts.append(table)
+            sheets += 1
+    finally:
+        workbook.close()
+
+    return "\n\n".join(parts), max(sheets, 1)
+
+
+def _render_rows(rows: Iterable[tuple[Any, ...]]) -> str:
+    """Render streamed row tuples as a markdown table (first non-empty row = header)."""
+    lines: list[tuple[str, int]] = []
+    width = 0
+    for values in rows:
+        cells = [_cell_text(v) for v in values]
+        while cells and not cells[-1]:
+            cells.pop()
+        if not cells:
+            continue
+        width = max(width, len(cells))
+        lines.append(("| " + " | ".join(cells) + " |", len(cells)))
+
+    if not lines:
+        return ""
+
+    out: list[str] = []
+    for i, (line, cols) in enumerate(lines):
+        # Pad short rows to the widest row in the sheet
+        out.append(line + "  |" * (width - cols))
+        if i == 0:
+            out.append("| " + " | ".join("---" for _ in range(width)) + " |")
+    return "\n".join(out)
+
+
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return ""
+    kind = type(value)
+    if kind is str:
+        text = value.strip()
+        if "\n" in text or "|" in text:
+            text = text.replace("\r\n", " ").replace("\n", " ").replace("|", "\\|")
+        return text
+    if kind is int:
+        return str(value)
+    if kind is float:
+        return str(int(value)) if value.is_integer() else repr(value)
+    if kind is bool:
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, dt.datetime):
+        if value.time() == dt.time(0):
+            return value.date().isoformat()
+        return value.isoformat(sep=" ")
+    if isinstance(value, (dt.date, dt.time)):
+        return value.isoformat()
+    return str(value).strip()
@@ -1,14 +1,29 @@
 # backend/app/services/zip_extractor.py
 # Recursive archive extraction service (ZIP and 7z)
 # Unpacks nested archives and filters to supported file formats (PDF, DOCX, XLSX, etc.)
-# Handles: nested ZIPs/7z, unicode filenames, corrupt archives, path traversal attacks
-# Related: pipeline.py (called during UNPACKING phase)
-
+# Handles: nested ZIPs/7z, unicode filenames, corrupt archives, path traversal attacks,
+#          archive bombs (streamed copies under a per-upload byte/file/ratio budget)
+# All zipfile/py7zr work runs in worker threads; members and nested archives
+# decompress in parallel (archive_workers) and results keep archive order.
+# Small ZIP members of formats with in-memory parsers stay in memory as
+# DocumentSources; everything else is written to the extraction directory.
+# Each file is announced through on_source as soon as it is ready, so the
+# pipeline can start parsing before the whole upload is unpacked.
+# Related: pipeline.py (called during UNPACKING phase), config.py (archive_* limits),
+#          document_source.py
+
+import asyncio
 import logging
 import os
 import tempfile
+import threading
 import zipfile
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import IO, Callable, NamedTuple
+
+from app.config import get_settings
+from app.services.document_source import MEMORY_PARSEABLE_EXTENSIONS, DocumentSource
 
 try:
     import py7zr
@@ -23,6 +38,277 @@ SUPPORTED_EXTENSIONS: set[str] = {
     ".png", ".tiff", ".jpg", ".jpeg",
 }
 
+ARCHIVE_EXTENSIONS: set[str] = {".zip", ".7z"}
+
+# Members are copied in chunks of this size — memory stays flat for any member size
+_COPY_CHUNK = 1024 * 1024
+
+# Members smaller than this never trip the ratio limit (tiny text files compress well)
+_RATIO_MIN_BYTES = 1024 * 1024
+
+ArchiveEventCallback = Callable[[str, dict], None]
+SourceCallback = Callable[[DocumentSource], None]
+
+
+# ── Extraction budget ────────────────────────────────────────────────────────
+
+
+@dataclass
+class ExtractionBudget:
+    """Limits shared by every archive (nested ones included) of one upload.
+
+    ``max_bytes`` and ``max_files`` cap what one upload may unpack to disk;
+    ``max_ratio`` caps the uncompressed/compressed ratio of a single member.
+    Once the byte or file budget is spent, ``exhausted`` names the limit and
+    the remaining members are not extracted. Every violation is logged and
+    reported through ``on_event`` as an ``archive_limit`` event.
+
+    Members that are never extracted — unsupported formats, lock files,
+    limit violations — are tallied in ``files_skipped`` / ``bytes_skipped``
+    (declared uncompressed sizes) for the UNPACKING metrics.
+
+    Members no larger than ``memory_member_max`` are kept in memory instead
+    of being written, as long as the upload's in-memory total stays within
+    ``memory_max`` (both 0 = always write to disk). They still count
+    against ``max_bytes``.
+
+    Members are copied from several worker threads at once, so the counters
+    are only changed under ``_lock``.
+    """
+
+    max_bytes: int
+    max_files: int
+    max_ratio: float
+    on_event: ArchiveEventCallback | None = None
+    memory_member_max: int = 0
+    memory_max: int = 0
+    bytes_written: int = 0
+    files_written: int = 0
+    files_skipped: int = 0
+    bytes_skipped: int = 0
+    files_in_memory: int = 0
+    bytes_in_memory: int = 0
+    exhausted: str | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @classmethod
+    def from_settings(cls, on_event: ArchiveEventCallback | None = None) -> "ExtractionBudget":
+        settings = get_settings()
+        return cls(
+            max_bytes=settings.archive_max_total_mb * 1024 * 1024,
+            max_files=settings.archive_max_files,
+            max_ratio=settings.archive_max_ratio,
+            on_event=on_event,
+            memory_member_max=settings.archive_memory_member_kb * 1024,
+            memory_max=settings.archive_memory_total_mb * 1024 * 1024,
+        )
+
+    @property
+    def bytes_left(self) -> int:
+        return max(0, self.max_bytes - self.bytes_written)
+
+    def admit(
+        self,
+        archive: str,
+        member: str | None,
+        size: int,
+        compressed: int,
+        *,
+        files: int = 1,
+    ) -> bool:
+        """Pre-flight check of declared sizes; reserves ``size`` bytes and ``files`` slots.
+
+        False = do not extract. A reservation is handed back with release().
+        """
+        with self._lock:
+            if self.exhausted is not None:
+                return False
+            ratio = _member_ratio(size, compressed)
+            if self.files_written + files > self.max_files:
+                self.violation(
+                    "file_count", archive, member,
+                    self.files_written + files, self.max_files, stop=True,
+                )
+            elif size > self.bytes_left:
+                self.violation(
+                    "total_bytes", archive, member,
+                    self.bytes_written + size, self.max_bytes, stop=True,
+                )
+            elif size > _RATIO_MIN_BYTES and ratio > self.max_ratio:
+                self.violation("ratio", archive, member, round(ratio, 1), self.max_ratio)
+            else:
+                self.bytes_written += size
+                self.files_written += files
+                return True
+            self.files_skipped += files
+            self.bytes_skipped += size
+            return False
+
+    def charge(self, nbytes: int, archive: str, member: str | None) -> bool:
+        """Charge bytes read past a member's reservation. False = over budget."""
+        with self._lock:
+            if nbytes > self.bytes_left:
+                self.violation(
+                    "total_bytes", archive, member,
+                    self.bytes_written + nbytes, self.max_bytes, stop=True,
+                )
+                return False
+            self.bytes_written += nbytes
+            return True
+
+    def hold_in_memory(self, nbytes: int) -> bool:
+        """Reserve room to keep an admitted member in memory. False = write it to disk."""
+        with self._lock:
+            if nbytes > self.memory_member_max or self.bytes_in_memory + nbytes > self.memory_max:
+                return False
+            self.files_in_memory += 1
+            self.bytes_in_memory += nbytes
+            return True
+
+    def release_memory(self, nbytes: int) -> None:
+        """Hand back an in-memory reservation for a member that failed to read."""
+        with self._lock:
+            self.files_in_memory -= 1
+            self.bytes_in_memory -= nbytes
+
+    def skip(self, nbytes: int, files: int = 1) -> None:
+        """Tally members left in the archive."""
+        with self._lock:
+            self.files_skipped += files
+            self.bytes_skipped += nbytes
+
+    def release(self, nbytes: int, files: int = 1) -> None:
+        """Hand back a reservation for a member that was not (fully) written."""
+        with self._lock:
+            self.bytes_written -= nbytes
+            self.files_written -= files
+
+    def violation(
+        self,
+        limit: str,
+        archive: str,
+        member: str | None,
+        value: float,
+        maximum: float,
+        *,
+        stop: bool = False,
+    ) -> None:
+        """Record a limit violation; ``stop`` ends extraction for the whole upload."""
+        if stop:
+            self.exhausted = limit
+        logger.warning(
+            "Archive limit %s hit in %s%s (%s > %s) — %s",
+            limit,
+            archive,
+            f" [{member}]" if member else "",
+            _format_limit(value),
+            _format_limit(maximum),
+            "stopping extraction" if stop else "skipping member",
+        )
+        if self.on_event is not None:
+            self.on_event(
+                "archive_limit",
+                {
+                    "archive": archive,
+                    "member": member,
+                    "limit": limit,
+                    "value": value,
+                    "max": maximum,
+                    "stopped": stop,
+                },
+            )
+
+
+def _format_limit(value: float) -> str:
+    return f"{value:.0f}" if value >= 10 else f"{value:.1f}"
+
+
+def _member_ratio(uncompressed: int, compressed: int) -> float:
+    return uncompressed / max(compressed, 1)
+
+
+def _stream_member(
+    src: IO[bytes],
+    write: Callable[[bytes], object],
+    budget: ExtractionBudget,
+    archive: str,
+    member: str,
+    size: int,
+    compressed: int,
+) -> bool:
+    """Feed one admitted member to ``write`` in chunks, re-checking limits on the bytes read.
+
+    ``size`` is the declared size already reserved by ``budget.admit()``.
+    Declared sizes can lie, so bytes past the reservation are charged chunk
+    by chunk and the ratio is re-checked. A member that crosses either limit
+    (or fails to read) has its reservation released; the caller discards
+    whatever was written.
+    """
+    reserved = size
+    written = 0
+    ok = False
+    try:
+        while chunk := src.read(_COPY_CHUNK):
+            written += len(chunk)
+            if written > reserved:
+                if not budget.charge(written - reserved, archive, member):
+                    budget.skip(size)
+                    return False
+                reserved = written
+            ratio = _member_ratio(written, compressed)
+            if written > _RATIO_MIN_BYTES and ratio > budget.max_ratio:
+                budget.violation("ratio", archive, member, round(ratio, 1), budget.max_ratio)
+                budget.skip(size)
+                return False
+            write(chunk)
+        ok = True
+    finally:
+        if not ok:
+            budget.release(reserved)
+    if written < reserved:
+        budget.release(reserved - written, files=0)
+    return True
+
+
+def _copy_member(
+    src: IO[bytes],
+    target_path: Path,
+    budget: ExtractionBudget,
+    archive: str,
+    member: str,
+    size: int,
+    compressed: int,
+) -> bool:
+    """Stream one admitted member to disk; a member over the limits is deleted."""
+    ok = False
+    try:
+        with open(target_path, "wb") as dst:
+            ok = _stream_member(src, dst.write, budget, archive, member, size, compressed)
+    finally:
+        if not ok:
+            target_path.unlink(missing_ok=True)
+    return ok
+
+
+def _read_member(
+    src: IO[bytes],
+    budget: ExtractionBudget,
+    archive: str,
+    member: str,
+    size: int,
+    compressed: int,
+) -> bytes | None:
+    """Read one admitted member into memory under the same limits as _copy_member.
+
+    Only called for members whose declared size fits the in-memory limit;
+    zipfile stops reading at the declared size, so the buffer cannot grow
+    past it.
+    """
+    chunks: list[bytes] = []
+    if not _stream_member(src, chunks.append, budget, archive, member, size, compressed):
+        return None
+    return b"".join(chunks)
+
 
 def _sanitize_filename(filename: str) -> str | None:
     """Sanitize a filename from a ZIP archive to prevent path traversal attacks.
@@ -50,32 +336,181 @@ def _sanitize_filename(filename: str) -> str | None:
     return os.path.join(*parts)
 
 
+def _archive_workers() -> int:
+    return max(1, get_settings().archive_workers)
+
+
+def _wanted(name: str) -> bool:
+    """Whether an archive member is worth extracting: supported format or nested archive."""
+    ext = Path(name).suffix.lower()
+    return ext in SUPPORTED_EXTENSIONS or ext in ARCHIVE_EXTENSIONS
+
+
+# ── ZIP ──────────────────────────────────────────────────────────────────────
+
+
+class _ZipMember(NamedTuple):
+    info: zipfile.ZipInfo
+    name: str  # sanitized path inside the archive
+    target: Path  # where it is written (or spilled, for in-memory members)
+    in_memory: bool
+
+
+def _plan_zip(
+    zf: zipfile.ZipFile,
+    zip_path: Path,
+    dest_dir: Path,
+    budget: ExtractionBudget,
+) -> list[_ZipMember]:
+    """Pick the members worth extracting, in archive order (blocking).
+
+    Runs before any member is copied so that filtering and budget admission
+    happen sequentially — which members pass does not depend on thread timing.
+    """
+    members: list[_ZipMember] = []
+    for info in zf.infolist():
+        if budget.exhausted is not None:
+            break
+
+        # Skip directories
+        if info.is_dir():
+            continue
+
+        # Skip Office temp/lock files (~$filename.docx)
+        basename = info.filename.rsplit("/", 1)[-1]
+        if basename.startswith("~$"):
+            logger.debug("Skipping Office lock file: %s", info.filename)
+            budget.skip(info.file_size)
+            continue
+
+        # Sanitize the filename to prevent path traversal
+        safe_name = _sanitize_filename(info.filename)
+        if safe_name is None:
+            logger.warning(
+                "Skipping ZIP entry with invalid name: %r in %s",
+                info.filename,
+                zip_path.name,
+            )
+            continue
+
+        if not _wanted(safe_name):
+            logger.debug(
+                "Skipping unsupported file %r (%s) in %s",
+                safe_name,
+                Path(safe_name).suffix.lower(),
+                zip_path.name,
+            )
+            budget.skip(info.file_size)
+            continue
+
+        # Build a safe extraction path
+        target_path = dest_dir / safe_name
+
+        # Ensure the target is within dest_dir (belt-and-suspenders check)
+        try:
+            target_path.resolve().relative_to(dest_dir.resolve())
+        except ValueError:
+            logger.warning(
+                "Path traversal detected for %r in %s — skipping",
+                info.filename,
+                zip_path.name,
+            )
+            continue
+
+        if not budget.admit(zip_path.name, safe_name, info.file_size, info.compress_size):
+            continue
+
+        # Small documents with in-memory parsers are never written
+        in_memory = (
+            target_path.suffix.lower() in MEMORY_PARSEABLE_EXTENSIONS
+            and budget.hold_in_memory(info.file_size)
+        )
+        if not in_memory:
+            # Create parent directories
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+        members.append(_ZipMember(info, safe_name, target_path, in_memory))
+
+    return members
+
+
+def _unpack_zip_member(
+    zf: zipfile.ZipFile,
+    zip_path: Path,
+    member: _ZipMember,
+    budget: ExtractionBudget,
+) -> DocumentSource | None:
+    """Decompress one planned member to disk or memory (blocking; zlib releases the GIL).
+
+    ZipFile reads through a locked shared handle, so worker threads can
+    decompress different members of the same open archive concurrently.
+    Returns None when the member is skipped.
+    """
+    filename = Path(member.name).name
+    args = (budget, zip_path.name, member.name, member.info.file_size, member.info.compress_size)
+    data: bytes | None = None
+    try:
+        with zf.open(member.info) as src:
+            if member.in_memory:
+                data = _read_member(src, *args)
+                ok = data is not None
+            else:
+                ok = _copy_member(src, member.target, *args)
+    except Exception:
+        logger.warning(
+            "Failed to extract %r from %s — skipping",
+            member.info.filename,
+            zip_path.name,
+            exc_info=True,
+        )
+        ok = False
+    if not ok:
+        if member.in_memory:
+            budget.release_memory(member.info.file_size)
+        return None
+    return DocumentSource(filename=filename, path=member.target, data=data)
+
+
 async def _extract_zip(
     zip_path: Path,
     dest_dir: Path,
     *,
+    budget: ExtractionBudget | None = None,
+    on_source: SourceCallback | None = None,
+    _limiter: asyncio.Semaphore | None = None,
     _depth: int = 0,
     _max_depth: int = 10,
-) -> list[tuple[Path, str]]:
+) -> list[DocumentSource]:
     """Extract a ZIP file recursively, handling nested ZIPs.
 
     Args:
         zip_path: Path to the ZIP file to extract.
         dest_dir: Directory to extract files into.
+        budget: Byte/file/ratio limits shared with sibling and nested
+            archives of the same upload (fresh one from settings if None).
+        on_source: Called with each supported file as soon as it has been
+            decompressed (completion order, event loop thread).
+        _limiter: Worker-thread slots shared with nested archives (internal).
         _depth: Current recursion depth (internal).
         _max_depth: Maximum recursion depth to prevent ZIP bombs.
 
     Returns:
-        Flat list of (extracted_file_path, original_filename) tuples
-        containing only files with supported extensions.
+        Flat list of DocumentSources containing only files with supported
+        extensions, in archive order. Small members of memory-parseable
+        formats are in memory (see ExtractionBudget.hold_in_memory).
 
     Handles:
         - Nested ZIPs (ZIP inside ZIP) — recursively extracts
         - Unicode filenames
         - Corrupt ZIPs (logs warning, skips)
         - Path traversal attacks (sanitizes filenames)
-        - ZIP bomb protection via depth limit
+        - ZIP bomb protection via depth limit and the extraction budget
+        - Unsupported members are never written to disk
     """
+    if budget is None:
+        budget = ExtractionBudget.from_settings()
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(_archive_workers())
+
     if _depth > _max_depth:
         logger.warning(
             "Maximum ZIP nesting depth (%d) exceeded for %s — skipping",
@@ -84,144 +519,184 @@ async def _extract_zip(
         )
         return []
 
-    results: list[tuple[Path, str]] = []
+    loop = asyncio.get_running_loop()
 
-    try:
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            for info in zf.infolist():
-                # Skip directories
-                if info.is_dir():
-                    continue
-
-                # Skip Office temp/lock files (~$filename.docx)
-                basename = info.filename.rsplit("/", 1)[-1]
-                if basename.startswith("~$"):
-                    logger.debug("Skipping Office lock file: %s", info.filename)
-                    continue
-
-                # Sanitize the filename to prevent path traversal
-                safe_name = _sanitize_filename(info.filename)
-                if safe_name is None:
-                    logger.warning(
-                        "Skipping ZIP entry with invalid name: %r in %s",
-                        info.filename,
-                        zip_path.name,
-                    )
-                    continue
-
-                # Build a safe extraction path
-                target_path = dest_dir / safe_name
-
-                # Ensure the target is within dest_dir (belt-and-suspenders check)
-                try:
-                    target_path.resolve().relative_to(dest_dir.resolve())
-                except ValueError:
-                    logger.warning(
-                        "Path traversal detected for %r in %s — skipping",
-                        info.filename,
-                        zip_path.name,
-                    )
-                    continue
-
-                # Create parent directories
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-
-                # Extract the file
-                try:
-                    with zf.open(info) as src, open(target_path, "wb") as dst:
-                        dst.write(src.read())
-                except Exception:
-                    logger.warning(
-                        "Failed to extract %r from %s — skipping",
-                        info.filename,
-                        zip_path.name,
-                        exc_info=True,
-                    )
-                    continue
-
-                ext = target_path.suffix.lower()
-
-                # Nested ZIP: recurse into it
-                if ext == ".zip":
-                    nested_dest = Path(tempfile.mkdtemp(
-                        prefix=f"nested_zip_{_depth + 1}_",
-                    ))
-                    logger.debug(
-                        "Found nested ZIP %r (depth %d) — extracting to %s",
-                        safe_name,
-                        _depth + 1,
-                        nested_dest,
-                    )
-                    nested_results = await _extract_zip(
-                        target_path,
-                        nested_dest,
-                        _depth=_depth + 1,
-                        _max_depth=_max_depth,
-                    )
-                    results.extend(nested_results)
-
-                # Nested 7z inside ZIP: extract it
-                elif ext == ".7z":
-                    nested_dest = Path(tempfile.mkdtemp(
-                        prefix=f"nested_7z_{_depth + 1}_",
-                    ))
-                    logger.debug(
-                        "Found nested 7z %r (depth %d) — extracting to %s",
-                        safe_name,
-                        _depth + 1,
-                        nested_dest,
-                    )
-                    nested_results = await _extract_7z(
-                        target_path,
-                        nested_dest,
-                    )
-                    results.extend(nested_results)
-
-                # Supported extension: include in results
-                elif ext in SUPPORTED_EXTENSIONS:
-                    # Use just the base filename as the original name
-                    original_name = Path(safe_name).name
-                    results.append((target_path, original_name))
-                    logger.debug(
-                        "Extracted supported file: %s from %s",
-                        original_name,
-                        zip_path.name,
-                    )
-                else:
-                    logger.debug(
-                        "Skipping unsupported file %r (%s) in %s",
-                        safe_name,
-                        ext,
-                        zip_path.name,
-                    )
+    async def unpack(member: _ZipMember) -> DocumentSource | None:
+        async with _limiter:
+            source = await loop.run_in_executor(
+                None, _unpack_zip_member, zf, zip_path, member, budget,
+            )
+        if source is not None and on_source is not None and source.suffix not in ARCHIVE_EXTENSIONS:
+            on_source(source)
+        return source
 
+    try:
+        zf = await loop.run_in_executor(None, zipfile.ZipFile, zip_path, "r")
     except zipfile.BadZipFile:
         logger.warning(
             "Corrupt or invalid ZIP file: %s — skipping",
             zip_path.name,
         )
+        return []
     except Exception:
         logger.error(
             "Unexpected error processing ZIP file: %s — skipping",
             zip_path.name,
             exc_info=True,
         )
+        return []
 
-    return results
+    try:
+        members = await loop.run_in_executor(None, _plan_zip, zf, zip_path, dest_dir, budget)
+        unpacked = await asyncio.gather(*(unpack(member) for member in members))
+    except Exception:
+        logger.error(
+            "Unexpected error processing ZIP file: %s — skipping",
+            zip_path.name,
+            exc_info=True,
+        )
+        return []
+    finally:
+        zf.close()
+
+    async def collect(member: _ZipMember, source: DocumentSource) -> list[DocumentSource]:
+        ext = member.target.suffix.lower()
+
+        # Nested ZIP: recurse into it
+        if ext == ".zip":
+            nested_dest = Path(tempfile.mkdtemp(
+                prefix=f"nested_zip_{_depth + 1}_", dir=dest_dir.parent,
+            ))
+            logger.debug(
+                "Found nested ZIP %r (depth %d) — extracting to %s",
+                member.name,
+                _depth + 1,
+                nested_dest,
+            )
+            return await _extract_zip(
+                member.target,
+                nested_dest,
+                budget=budget,
+                on_source=on_source,
+                _limiter=_limiter,
+                _depth=_depth + 1,
+                _max_depth=_max_depth,
+            )
+
+        # Nested 7z inside ZIP: extract it
+        if ext == ".7z":
+            nested_dest = Path(tempfile.mkdtemp(
+                prefix=f"nested_7z_{_depth + 1}_", dir=dest_dir.parent,
+            ))
+            logger.debug(
+                "Found nested 7z %r (depth %d) — extracting to %s",
+                member.name,
+                _depth + 1,
+                nested_dest,
+            )
+            return await _extract_7z(
+                member.target,
+                nested_dest,
+                budget=budget,
+                on_source=on_source,
+                _limiter=_limiter,
+            )
+
+        # Supported extension: the source is named by the member's base filename
+        logger.debug(
+            "Extracted supported file: %s from %s%s",
+            source.filename,
+            zip_path.name,
+            " (in memory)" if source.in_memory else "",
+        )
+        return [source]
+
+    # Nested archives unpack concurrently; gather keeps archive order
+    groups = await asyncio.gather(*(
+        collect(member, source)
+        for member, source in zip(members, unpacked)
+        if source is not None
+    ))
+    return [item for group in groups for item in group]
+
+
+# ── 7z ───────────────────────────────────────────────────────────────────────
+
+
+def _unpack_7z(
+    archive_path: Path,
+    dest_dir: Path,
+    budget: ExtractionBudget,
+) -> list[Path] | None:
+    """Extract the wanted members of a 7z archive and list the files produced (blocking).
+
+    The archive is listed first and only supported formats and nested
+    archives are extracted — drawings, videos and executables never reach
+    the disk. (Members of a solid block still pass through the decompressor,
+    but skipped ones are not written.) py7zr extracts whole selections at
+    once, so the budget is enforced up front from the listing: the declared
+    sizes of the selected members must fit the remaining bytes and file
+    count, and their ratio to the archive size must stay under the limit.
+    Returns None when the archive is skipped.
+    """
+    with py7zr.SevenZipFile(archive_path, mode="r") as szf:
+        selected: list[str] = []
+        total = 0
+        for info in szf.list():
+            if info.is_directory:
+                continue
+            basename = info.filename.rsplit("/", 1)[-1]
+            if basename.startswith("~$") or not _wanted(info.filename):
+                logger.debug(
+                    "Skipping %r in %s without extracting it",
+                    info.filename,
+                    archive_path.name,
+                )
+                budget.skip(info.uncompressed or 0)
+                continue
+            selected.append(info.filename)
+            total += info.uncompressed or 0
+
+        if not selected:
+            return []
+        if not budget.admit(
+            archive_path.name, None, total, archive_path.stat().st_size, files=len(selected),
+        ):
+            return None
+        try:
+            szf.extract(path=str(dest_dir), targets=selected)
+        except Exception:
+            budget.release(total, files=len(selected))
+            raise
+
+    # Sorted walk so results do not depend on directory listing order
+    files: list[Path] = []
+    for root, dirs, filenames in os.walk(dest_dir):
+        dirs.sort()
+        files.extend(Path(root) / filename for filename in sorted(filenames))
+    return files
 
 
 async def _extract_7z(
     archive_path: Path,
     dest_dir: Path,
-) -> list[tuple[Path, str]]:
+    *,
+    budget: ExtractionBudget | None = None,
+    on_source: SourceCallback | None = None,
+    _limiter: asyncio.Semaphore | None = None,
+) -> list[DocumentSource]:
     """Extract a 7z archive and return supported files.
 
     Args:
         archive_path: Path to the .7z file.
         dest_dir: Directory to extract files into.
+        budget: Extraction limits shared with the rest of the upload.
+        on_source: Called with each supported file once the archive is
+            extracted (event loop thread).
+        _limiter: Worker-thread slots shared with nested archives (internal).
 
     Returns:
-        Flat list of (extracted_file_path, original_filename) tuples.
+        Flat list of on-disk DocumentSources (py7zr extracts to files).
     """
     if not HAS_7Z:
         logger.warning(
@@ -231,61 +706,86 @@ async def _extract_7z(
         )
         return []
 
-    results: list[tuple[Path, str]] = []
+    if budget is None:
+        budget = ExtractionBudget.from_settings()
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(_archive_workers())
+    if budget.exhausted is not None:
+        return []
 
+    loop = asyncio.get_running_loop()
     try:
-        with py7zr.SevenZipFile(archive_path, mode="r") as szf:
-            szf.extractall(path=str(dest_dir))
-
-        # Walk extracted directory and collect supported files
-        for root, _dirs, files in os.walk(dest_dir):
-            for filename in files:
-                # Skip Office temp/lock files (~$filename.docx)
-                if filename.startswith("~$"):
-                    logger.debug("Skipping Office lock file: %s", filename)
-                    continue
-
-                file_path = Path(root) / filename
-                ext = file_path.suffix.lower()
-
-                if ext == ".zip":
-                    # Nested ZIP inside 7z: extract it
-                    nested_dest = Path(tempfile.mkdtemp(prefix="nested_zip_from_7z_"))
-                    nested_results = await _extract_zip(file_path, nested_dest)
-                    results.extend(nested_results)
-                elif ext == ".7z":
-                    # Nested 7z
-                    nested_dest = Path(tempfile.mkdtemp(prefix="nested_7z_"))
-                    nested_results = await _extract_7z(file_path, nested_dest)
-                    results.extend(nested_results)
-                elif ext in SUPPORTED_EXTENSIONS:
-                    results.append((file_path, filename))
-                    logger.debug(
-                        "Extracted supported file: %s from %s",
-                        filename,
-                        archive_path.name,
-                    )
-                else:
-                    logger.debug(
-                        "Skipping unsupported file %r (%s) in %s",
-                        filename,
-                        ext,
-                        archive_path.name,
-                    )
-
+        async with _limiter:
+            files = await loop.run_in_executor(
+                None, _unpack_7z, archive_path, dest_dir, budget,
+            )
     except Exception:
         logger.warning(
             "Failed to extract 7z archive: %s — skipping",
             archive_path.name,
             exc_info=True,
         )
+        return []
+    if files is None:
+        return []
 
-    return results
+    async def collect(file_path: Path) -> list[DocumentSource]:
+        filename = file_path.name
+        ext = file_path.suffix.lower()
+
+        # Skip Office temp/lock files (~$filename.docx)
+        if filename.startswith("~$"):
+            logger.debug("Skipping Office lock file: %s", filename)
+            return []
+
+        if ext == ".zip":
+            # Nested ZIP inside 7z: extract it
+            nested_dest = Path(tempfile.mkdtemp(
+                prefix="nested_zip_from_7z_", dir=dest_dir.parent,
+            ))
+            return await _extract_zip(
+                file_path, nested_dest, budget=budget, on_source=on_source, _limiter=_limiter,
+            )
+        if ext == ".7z":
+            # Nested 7z
+            nested_dest = Path(tempfile.mkdtemp(prefix="nested_7z_", dir=dest_dir.parent))
+            return await _extract_7z(
+                file_path, nested_dest, budget=budget, on_source=on_source, _limiter=_limiter,
+            )
+        if ext in SUPPORTED_EXTENSIONS:
+            logger.debug(
+                "Extracted supported file: %s from %s",
+                filename,
+                archive_path.name,
+            )
+            source = DocumentSource(filename=filename, path=file_path)
+            if on_source is not None:
+                on_source(source)
+            return [source]
+
+        logger.debug(
+            "Skipping unsupported file %r (%s) in %s",
+            filename,
+            ext,
+            archive_path.name,
+        )
+        return []
+
+    groups = await asyncio.gather(*(collect(file_path) for file_path in files))
+    return [item for group in groups for item in group]
+
+
+# ── Uploads ──────────────────────────────────────────────────────────────────
 
 
 async def extract_files(
     upload_paths: list[Path],
-) -> list[tuple[Path, str]]:
+    on_event: ArchiveEventCallback | None = None,
+    *,
+    on_source: SourceCallback | None = None,
+    budget: ExtractionBudget | None = None,
+    work_dir: Path | None = None,
+) -> list[DocumentSource]:
     """Process uploaded files, extracting archives and filtering to supported formats.
 
     Takes a list of uploaded file paths (which may include ZIP/7z archives).
@@ -294,14 +794,55 @@ async def extract_files(
     - 7z files → extract recursively (handles nested archives)
     - Unsupported file types → filtered out with a warning
 
+    All archives of the upload share one ExtractionBudget (archive_* settings):
+    members are streamed to disk in chunks, a member whose compression ratio
+    exceeds the limit is skipped, and extraction stops once the total byte or
+    file budget is spent. ZIP members of parseable formats up to
+    ``archive_memory_member_kb`` (within ``archive_memory_total_mb`` per
+    upload) are returned in memory and never touch the disk unless a parser
+    needs a real file.
+
+    Decompression runs in worker threads, at most ``archive_workers`` at a
+    time, so the event loop keeps serving requests and SSE streams. Uploads
+    are handled one after another; members and nested archives within one
+    upload run in parallel. The result order follows upload and archive order.
+
     Args:
         upload_paths: List of paths to uploaded files.
+        on_event: Optional callback(event_type, data) receiving an
+            ``archive_limit`` event for every limit violation. Always
+            invoked on the event loop thread.
+        on_source: Optional callback receiving each supported file as soon
+            as it is available — direct uploads immediately, archive members
+            once decompressed (completion order, not archive order). Every
+            returned source is announced exactly once, on the event loop
+            thread, before extract_files returns.
+        budget: Optional budget to extract under (fresh one from settings
+            if None); callers pass their own to read the skipped-member
+            tallies afterwards.
+        work_dir: Directory that receives every extraction directory,
+            nested archives included (the analysis workspace). None = system
+            temp dir.
 
     Returns:
-        Flat list of (file_path, original_filename) tuples for all
-        supported files (both direct uploads and extracted from archives).
+        Flat list of DocumentSources for all supported files (both direct
+        uploads and extracted from archives).
     """
-    results: list[tuple[Path, str]] = []
+    loop = asyncio.get_running_loop()
+    notify: ArchiveEventCallback | None = None
+    if on_event is not None:
+        # Violations are detected in worker threads — hop back onto the loop
+        def notify(event_type: str, data: dict) -> None:
+            loop.call_soon_threadsafe(on_event, event_type, data)
+
+    results: list[DocumentSource] = []
+    if work_dir is not None:
+        work_dir.mkdir(parents=True, exist_ok=True)
+    if budget is None:
+        budget = ExtractionBudget.from_settings()
+    if notify is not None:
+        budget.on_event = notify
+    limiter = asyncio.Semaphore(_archive_workers())
 
     for path in upload_paths:
         if not path.exists():
@@ -312,13 +853,15 @@ async def extract_files(
 
         if ext == ".zip":
             # Extract ZIP to a temp directory
-            dest_dir = Path(tempfile.mkdtemp(prefix="zip_extract_"))
+            dest_dir = Path(tempfile.mkdtemp(prefix="zip_extract_", dir=work_dir))
             logger.info(
                 "Extracting ZIP file %s to %s",
                 path.name,
                 dest_dir,
             )
-            extracted = await _extract_zip(path, dest_dir)
+            extracted = await _extract_zip(
+                path, dest_dir, budget=budget, on_source=on_source, _limiter=limiter,
+            )
             results.extend(extracted)
             logger.info(
                 "Extracted %d supported files from %s",
@@ -328,13 +871,15 @@ async def extract_files(
 
         elif ext == ".7z":
             # Extract 7z to a temp directory
-            dest_dir = Path(tempfile.mkdtemp(prefix="7z_extract_"))
+            dest_dir = Path(tempfile.mkdtemp(prefix="7z_extract_", dir=work_dir))
             logger.info(
                 "Extracting 7z archive %s to %s",
                 path.name,
                 dest_dir,
             )
-            extracted = await _extract_7z(path, dest_dir)
+            extracted = await _extract_7z(
+                path, dest_dir, budget=budget, on_source=on_source, _limiter=limiter,
+            )
             results.extend(extracted)
             logger.info(
                 "Extracted %d supported files from %s",
@@ -344,7 +889,10 @@ async def extract_files(
 
         elif ext in SUPPORTED_EXTENSIONS:
             # Pass through supported files directly
-            results.append((path, path.name))
+            source = DocumentSource(filename=path.name, path=path)
+            results.append(source)
+            if on_source is not None:
+                on_source(source)
             logger.debug("Passing through supported file: %s", path.name)
 
         else:
@@ -355,8 +903,12 @@ async def extract_files(
             )
 
     logger.info(
-        "File extraction complete: %d input files → %d supported files",
+        "File extraction complete: %d input files → %d supported files "
+        "(%d in memory; %d archive members / %.1f MB skipped)",
         len(upload_paths),
         len(results),
+        budget.files_in_memory,
+        budget.files_skipped,
+        budget.bytes_skipped / (1024 * 1024),
     )
     return results
@@ -0,0 +1,52 @@
+# backend/app/worker.py
+# Standalone pipeline worker process: python -m app.worker
+# Claims analysis jobs from the durable queue and runs them, so parsing and LLM
+# work stay off the API process (set JOB_WORKER_EMBEDDED=false there). Several
+# can run at once; each runs up to max_concurrent_analyses analyses.
+# Related: services/pipeline_worker.py, services/job_queue.py, main.py
+
+import asyncio
+import logging
+import signal
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(name)s: %(message)s")
+
+logger = logging.getLogger("app.worker")
+
+
+async def serve() -> None:
+    from app.config import get_settings
+    from app.services import docling_client
+    from app.services.ocr_scheduler import shutdown_ocr_pool
+    from app.services.parse_pool import shutdown_pool, start_pool
+    from app.services.pipeline_worker import get_pipeline_worker
+    from app.services.workspace import get_workspace_manager
+
+    settings = get_settings()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await start_pool()
+    workspace_gc = asyncio.create_task(get_workspace_manager().run_gc())
+    worker = get_pipeline_worker()
+    worker_task = asyncio.create_task(worker.run())
+    logger.info("Worker %s ready", worker.worker_id)
+    try:
+        await stop.wait()
+        await worker.drain(settings.job_drain_seconds)
+    finally:
+        worker_task.cancel()
+        workspace_gc.cancel()
+        shutdown_pool()
+        shutdown_ocr_pool()
+        docling_client.close_client()
+
+
+def main() -> None:
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
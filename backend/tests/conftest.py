@@ -2,3 +2,79 @@
 # Pytest configuration and shared fixtures
 # Provides test client, mock DB, mock LLM, and sample data
 # Related: all test_*.py files
+
+import pytest
+
+from app.config import get_settings
+from app.services.analysis_scheduler import get_analysis_scheduler
+from app.services.extraction_cache import get_extraction_cache
+from app.services.job_queue import get_job_queue
+from app.services.llm_governor import get_llm_governor
+from app.services.parse_cache import get_parse_cache
+from app.services.pipeline_worker import get_pipeline_worker
+from app.services.workspace import get_workspace_manager
+
+
+@pytest.fixture(autouse=True)
+def _isolated_parse_cache(tmp_path_factory, monkeypatch):
+    """Point the on-disk parse cache at a per-test directory."""
+    cache_dir = tmp_path_factory.mktemp("parse_cache")
+    monkeypatch.setattr(get_settings(), "parse_cache_dir", str(cache_dir))
+    get_parse_cache.cache_clear()
+    yield cache_dir
+    get_parse_cache.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_extraction_cache(tmp_path_factory, monkeypatch):
+    """Point the on-disk extraction cache at a per-test directory."""
+    cache_dir = tmp_path_factory.mktemp("extraction_cache")
+    monkeypatch.setattr(get_settings(), "extraction_cache_dir", str(cache_dir))
+    get_extraction_cache.cache_clear()
+    yield cache_dir
+    get_extraction_cache.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_ocr_scheduler():
+    """OCR workers pick their pool type and slots on first use — reset per test."""
+    from app.services.ocr_scheduler import shutdown_ocr_pool
+
+    yield
+    shutdown_ocr_pool()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_workspaces(tmp_path_factory, monkeypatch):
+    """Root analysis workspaces and scratch under a per-test temp_dir."""
+    temp_dir = tmp_path_factory.mktemp("foxdoc")
+    monkeypatch.setattr(get_settings(), "temp_dir", str(temp_dir))
+    get_workspace_manager.cache_clear()
+    yield temp_dir
+    get_workspace_manager.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_llm_governor():
+    """Governor limits and queues are process-wide — start each test from the settings."""
+    get_llm_governor.cache_clear()
+    yield
+    get_llm_governor.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_analysis_scheduler():
+    """Run slots and queues are process-wide — start each test with an empty scheduler."""
+    get_analysis_scheduler.cache_clear()
+    yield
+    get_analysis_scheduler.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_job_queue(_isolated_workspaces):
+    """The job queue file lives under the per-test temp_dir; the worker wraps it."""
+    get_job_queue.cache_clear()
+    get_pipeline_worker.cache_clear()
+    yield
+    get_job_queue.cache_clear()
+    get_pipeline_worker.cache_clear()
@@ -0,0 +1,329 @@
+# backend/tests/test_amendment.py
+# Tests for incremental re-analysis of amended tenders
+# Covers: section diff, amendment plan (unchanged/replaced/added/kept documents),
+#         pipeline amend run re-extracting only changed sections, amend endpoint
+# Related: app/services/amendment.py, app/services/pipeline.py,
+#          app/routers/analyze.py (amend)
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.convex_client import ConvexDB
+from app.models.schemas import (
+    AggregatedReport,
+    Deadlines,
+    DocumentType,
+    EstimatedValue,
+    ExtractionResult,
+)
+from app.services.amendment import Amendment, diff_sections, merge_amended, split_sections
+from app.services.llm import LLMClient
+from app.services.parser import ParsedDocument
+from app.services.workspace import get_workspace_manager
+
+CONDITIONS = "\n\n".join([
+    "# 1. Bendrosios nuostatos\nPerkamos mokyklos renovacijos paslaugos.",
+    "# 2. Terminai\nPasiūlymai pateikiami iki 2026-05-01 10:00.",
+    "# 3. Kaina\nNumatoma vertė 100 000 EUR be PVM.",
+    "# 4. Kvalifikacija\nTiekėjas per 3 metus įvykdė bent vieną panašią sutartį.",
+])
+AMENDED = CONDITIONS.replace("2026-05-01 10:00", "2026-05-15 10:00")
+
+
+def _doc(filename: str, content: str) -> ParsedDocument:
+    return ParsedDocument(
+        filename=filename,
+        content=content,
+        page_count=2,
+        file_size_bytes=len(content),
+        doc_type=DocumentType.INVITATION,
+        token_estimate=len(content) // 4,
+    )
+
+
+def _record(filename: str, content: str, **extraction) -> dict:
+    return {
+        "_id": f"doc-{filename}",
+        "filename": filename,
+        "doc_type": "invitation",
+        "page_count": 2,
+        "content_text": content,
+        "extraction_json": ExtractionResult(**extraction).model_dump(mode="json") if extraction else None,
+    }
+
+
+async def _stream(*docs: ParsedDocument):
+    for doc in docs:
+        yield doc
+
+
+# ── Section diff ───────────────────────────────────────────────────────────
+
+
+def test_split_sections_by_heading_or_paragraph():
+    assert [s.splitlines()[0] for s in split_sections(CONDITIONS)] == [
+        "# 1. Bendrosios nuostatos", "# 2. Terminai", "# 3. Kaina", "# 4. Kvalifikacija",
+    ]
+    assert split_sections("Pirmas.\n\n  \n\nAntras.") == ["Pirmas.", "Antras."]
+
+
+def test_diff_finds_only_the_edited_section():
+    diff = diff_sections(CONDITIONS, AMENDED)
+    assert diff.changed == ["# 2. Terminai\nPasiūlymai pateikiami iki 2026-05-15 10:00."]
+    assert len(diff.removed) == 1
+    assert diff.total == 4
+    assert 0 < diff.changed_ratio < 0.5
+
+    added = diff_sections(CONDITIONS, CONDITIONS + "\n\n# 5. Nauja\nPapildyta.")
+    assert added.changed == ["# 5. Nauja\nPapildyta."]
+    assert added.removed == []
+
+
+def test_merge_keeps_nested_fields_the_delta_does_not_touch():
+    previous = ExtractionResult(
+        deadlines=Deadlines(submission_deadline="2026-05-01", questions_deadline="2026-04-20"),
+        estimated_value=EstimatedValue(amount=100_000, currency="USD", vat_included=False),
+    )
+    delta = ExtractionResult.model_validate({
+        "deadlines": {"submission_deadline": "2026-05-15"},
+        "estimated_value": {"amount": 120_000},
+    })
+    merged = merge_amended(previous, delta, diff_sections(CONDITIONS, AMENDED))
+    assert merged.deadlines.submission_deadline == "2026-05-15"
+    assert merged.deadlines.questions_deadline == "2026-04-20"
+    assert merged.estimated_value.amount == 120_000
+    assert merged.estimated_value.currency == "USD"  # default not extracted from the section
+    assert merged.estimated_value.vat_included is False
+
+
+# ── Amendment plan ─────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_plan_extracts_only_what_changed():
+    amendment = Amendment([
+        _record("salygos.pdf", CONDITIONS, project_summary="Renovacija", key_requirements=["A"]),
+        _record("sutartis.pdf", "Sutarties projektas", key_requirements=["B"]),
+        _record("priedas.pdf", "Priedas", key_requirements=["C"]),
+        _record("sugedes.pdf", "Neišanalizuotas"),
+    ])
+    amended = _doc("salygos.pdf", AMENDED)
+    same = _doc("sutartis.pdf", "Sutarties projektas")
+    added = _doc("patikslinimas.pdf", "Atsakymai į klausimus")
+
+    work = [doc async for doc in amendment.plan(_stream(amended, same, added))]
+    assert [d.filename for d in work] == ["salygos.pdf", "patikslinimas.pdf", "sugedes.pdf"]
+    assert work[0].content == "# 2. Terminai\nPasiūlymai pateikiami iki 2026-05-15 10:00."
+    assert amendment.sections_reextracted == 1
+
+    delta_result = ExtractionResult(project_summary="Terminų pakeitimas", key_requirements=["A2"])
+    uploads = amendment.merge([
+        (work[0], delta_result, {"input_tokens": 10, "output_tokens": 1}),
+        (added, ExtractionResult(key_requirements=["D"]), {"input_tokens": 5, "output_tokens": 1}),
+        (work[2], ExtractionResult(key_requirements=["E"]), {"input_tokens": 5, "output_tokens": 1}),
+    ])
+    combined = amendment.combine(uploads)
+
+    assert [d.filename for d, _r, _u in combined] == [
+        "salygos.pdf", "sutartis.pdf", "priedas.pdf", "sugedes.pdf", "patikslinimas.pdf",
+    ]
+    doc, merged, usage = combined[0]
+    assert doc is amended
+    assert merged.project_summary == "Renovacija"  # whole-document summary kept
+    assert merged.key_requirements == ["A2", "A"]
+    assert merged.confidence_notes[0].startswith("Amended document: 1 of 4 sections")
+    assert usage == {"input_tokens": 10, "output_tokens": 1}
+    assert combined[1][0] is same
+    assert combined[3][1].key_requirements == ["E"]
+    assert amendment.documents_reused == 2  # unchanged upload + kept annex
+
+
+@pytest.mark.asyncio
+async def test_mostly_rewritten_document_is_extracted_whole():
+    amendment = Amendment([_record("salygos.pdf", CONDITIONS, project_summary="Renovacija")])
+    rewritten = _doc("salygos.pdf", "# Nauja redakcija\nVisiškai kitas tekstas.")
+    assert [d async for d in amendment.plan(_stream(rewritten))] == [rewritten]
+    assert amendment.sections_reextracted == 0
+
+
+# ── Pipeline ───────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_pipeline_amend_run_reextracts_changed_sections_only(tmp_path):
+    from app.services.document_source import DocumentSource
+    from app.services.pipeline import AnalysisPipeline
+
+    db = ConvexDB(url="")
+    analysis_id = await db.create_analysis(model="openai/gpt-4o")
+    for filename, content in (("salygos.pdf", CONDITIONS), ("sutartis.pdf", "Sutarties projektas")):
+        await db.add_document(
+            analysis_id, filename, "invitation", 2, content,
+            extraction_json=ExtractionResult(project_summary=filename).model_dump(mode="json"),
+        )
+    await db.update_analysis(
+        analysis_id, status="completed",
+        metrics_json={"tokens_extraction_input": 5000, "tokens_aggregation_input": 700},
+    )
+
+    workspace = get_workspace_manager().create(analysis_id)
+    upload = workspace.uploads / "salygos.pdf"
+    upload.write_bytes(b"%PDF")
+
+    async def fake_extract_files(upload_paths, on_event=None, *, on_source=None, **kwargs):
+        sources = [DocumentSource(filename="salygos.pdf", path=upload)]
+        for source in sources:
+            on_source(source)
+        return sources
+
+    llm = MagicMock(spec=LLMClient)
+    llm.queue_wait_seconds = 0.0
+    llm.priority = 0
+    llm.complete_structured = llm.complete_structured_streaming = AsyncMock(return_value=(
+        ExtractionResult(key_requirements=["Terminas 2026-05-15"]),
+        {"input_tokens": 100, "output_tokens": 20},
+    ))
+    aggregate = AsyncMock(return_value=(
+        AggregatedReport(project_summary="Ataskaita"), {"input_tokens": 30, "output_tokens": 3},
+    ))
+    pipeline = AnalysisPipeline(analysis_id, db, llm, model="openai/gpt-4o")
+    with (
+        patch("app.services.pipeline.extract_files", side_effect=fake_extract_files),
+        patch("app.services.parser.parse_document", AsyncMock(return_value=_doc("salygos.pdf", AMENDED))),
+        patch("app.services.pipeline.aggregate_results", aggregate),
+        patch("app.services.pipeline.evaluate_report", AsyncMock(side_effect=RuntimeError)),
+    ):
+        await pipeline.run([upload], amend=True)
+        await asyncio.gather(pipeline._eval_task, return_exceptions=True)
+
+    # One LLM call, with the changed section only
+    assert llm.complete_structured_streaming.call_count == 1
+    prompt = llm.complete_structured_streaming.call_args.kwargs["user"]
+    assert "2026-05-15" in prompt and "Kvalifikacija" not in prompt
+
+    aggregated = aggregate.call_args.args[0]
+    assert [d.filename for d, _r, _u in aggregated] == ["salygos.pdf", "sutartis.pdf"]
+    assert aggregated[0][1].key_requirements == ["Terminas 2026-05-15"]
+
+    record = await db.get_analysis(analysis_id)
+    assert record["status"] == "completed"
+    metrics = record["metrics_json"]
+    assert metrics["tokens_extraction_input"] == 5100  # earlier runs keep counting
+    assert metrics["tokens_aggregation_input"] == 730
+    assert metrics["documents_reused"] == 1
+    assert metrics["sections_reextracted"] == 1
+    assert metrics["total_files"] == 2
+
+    documents = {d["filename"]: d for d in await db.get_documents(analysis_id)}
+    assert len(documents) == 2
+    assert documents["salygos.pdf"]["content_text"] == AMENDED
+    assert documents["salygos.pdf"]["extraction_json"]["key_requirements"] == ["Terminas 2026-05-15"]
+    events = [e["event_type"] for e in await db.get_events(analysis_id)]
+    assert "analysis_amended" in events
+
+
+# ── Amend endpoint ─────────────────────────────────────────────────────────
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    import app.convex_client as convex_module
+    from app.main import app
+    from app.middleware.auth import require_auth
+
+    async def _user():
+        return "test-user-id"
+
+    monkeypatch.setattr(convex_module, "_db_instance", ConvexDB(url=""))
+    app.dependency_overrides[require_auth] = _user
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(require_auth, None)
+
+
+@pytest.mark.asyncio
+async def test_amend_requeues_completed_analysis(client):
+    import json
+
+    from app.convex_client import get_db
+    from app.services.job_queue import QUEUED, get_job_queue
+
+    files = [("files", ("patikslinimas.pdf", b"%PDF-1.4 atsakymai", "application/pdf"))]
+    db = get_db()
+    analysis_id = await db.create_analysis(model="m", user_id="test-user-id", fingerprint="abc")
+    queue = get_job_queue()
+    queue.enqueue(analysis_id, {"model": "m", "analysis_type": "quick", "uploads": ["a.pdf"]})
+
+    assert (await client.post(f"/api/analyze/{analysis_id}/amend", files=files)).status_code == 409
+
+    queue.claim("w")
+    queue.finish(analysis_id, "w")
+    await db.update_analysis(analysis_id, status="completed")
+    response = await client.post(f"/api/analyze/{analysis_id}/amend", files=files)
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+
+    job = queue.get(analysis_id)
+    assert job["status"] == QUEUED
+    payload = json.loads(job["payload"])
+    assert payload["amend"] is True
+    assert payload["analysis_type"] == "quick"
+    [upload] = payload["uploads"]
+    assert upload.startswith("amend-") and upload.endswith("/patikslinimas.pdf")
+    assert (await db.get_analysis(analysis_id))["fingerprint"] == ""
+    assert (get_workspace_manager().get(analysis_id).uploads / upload).exists()
+
+    # A queued amendment cannot be amended again
+    await db.update_analysis(analysis_id, status="completed")
+    assert (await client.post(f"/api/analyze/{analysis_id}/amend", files=files)).status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_amend_losing_the_rerun_race_leaves_no_files(client):
+    from app.convex_client import get_db
+    from app.services.job_queue import get_job_queue
+
+    db = get_db()
+    analysis_id = await db.create_analysis(model="m", user_id="test-user-id")
+    await db.update_analysis(analysis_id, status="completed")
+    files = [("files", ("salygos.pdf", b"%PDF-1.4 kita", "application/pdf"))]
+
+    # Another amendment queues its rerun between our status check and ours
+    with patch.object(get_job_queue(), "rerun", return_value=False):
+        response = await client.post(f"/api/analyze/{analysis_id}/amend", files=files)
+    assert response.status_code == 409
+    uploads = get_workspace_manager().get(analysis_id).uploads
+    assert not any(path.is_file() for path in uploads.rglob("*"))
+
+
+@pytest.mark.asyncio
+async def test_amend_unknown_analysis(client):
+    files = [("files", ("a.pdf", b"%PDF", "application/pdf"))]
+    assert (await client.post("/api/analyze/missing/amend", files=files)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_amend_reused_analysis_keeps_original_settings(client):
+    import json
+
+    from app.convex_client import get_db
+    from app.services.job_queue import get_job_queue
+
+    files = [("files", ("salygos.pdf", b"%PDF-1.4 salygos", "application/pdf"))]
+    settings = {"analysis_type": "quick", "custom_instructions": "Tik terminai", "thinking": "high"}
+    first = (await client.post("/api/analyze", files=files, data=settings)).json()["id"]
+    get_job_queue().cancel(first)
+    await get_db().update_analysis(first, status="completed", report_json={"project_summary": "A"})
+
+    reused = (await client.post("/api/analyze", files=files, data=settings)).json()
+    assert reused["status"] == "completed" and reused["id"] != first
+
+    amend = [("files", ("patikslinimas.pdf", b"%PDF-1.4 atsakymai", "application/pdf"))]
+    assert (await client.post(f"/api/analyze/{reused['id']}/amend", files=amend)).status_code == 202
+    payload = json.loads(get_job_queue().get(reused["id"])["payload"])
+    assert {key: payload[key] for key in settings} == settings
+    assert payload["origin"] == "interactive"
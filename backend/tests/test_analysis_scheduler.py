@@ -0,0 +1,186 @@
+# backend/tests/test_analysis_scheduler.py
+# Tests for analysis admission (services/analysis_scheduler.py)
+# Covers: global and per-user caps, priority lanes, interactive reserve,
+#         weighted fair share, queue position / ETA, cancellation
+# Related: app/services/analysis_scheduler.py, app/routers/analyze.py
+
+import asyncio
+
+import pytest
+
+from app.services.analysis_scheduler import (
+    AdmissionCanceled,
+    AnalysisScheduler,
+    parse_user_weights,
+    priority_of,
+)
+
+
+class _Runner:
+    """Starts analyses against a scheduler and holds them until finish()."""
+
+    def __init__(self, scheduler: AnalysisScheduler):
+        self.scheduler = scheduler
+        self.started: list[str] = []
+        self._done: dict[str, asyncio.Event] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    def submit(self, analysis_id: str, user_id: str, analysis_type="detailed", origin="interactive"):
+        done = self._done[analysis_id] = asyncio.Event()
+
+        async def run():
+            async with self.scheduler.admit(analysis_id, user_id, analysis_type, origin):
+                self.started.append(analysis_id)
+                await done.wait()
+
+        self.tasks[analysis_id] = asyncio.create_task(run())
+
+    async def settle(self):
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def finish(self, analysis_id: str):
+        self._done[analysis_id].set()
+        await self.tasks[analysis_id]
+        await self.settle()
+
+
+def test_priority_of_orders_lanes_and_types():
+    assert priority_of("quick") < priority_of("detailed")
+    assert priority_of("detailed") < priority_of("quick", "batch")
+    assert priority_of("unknown") == priority_of("detailed")
+
+
+def test_parse_user_weights_skips_bad_entries():
+    assert parse_user_weights("a=2, b=0.5,c,d=x,e=-1") == {"a": 2.0, "b": 0.5}
+    assert parse_user_weights("") == {}
+
+
+@pytest.mark.asyncio
+async def test_caps_running_analyses():
+    runner = _Runner(AnalysisScheduler(max_running=2))
+    for i in range(3):
+        runner.submit(f"a{i}", f"u{i}")
+    await runner.settle()
+    assert runner.started == ["a0", "a1"]
+
+    await runner.finish("a0")
+    assert runner.started == ["a0", "a1", "a2"]
+    await runner.finish("a1")
+    await runner.finish("a2")
+
+
+@pytest.mark.asyncio
+async def test_per_user_cap_lets_other_users_through():
+    runner = _Runner(AnalysisScheduler(max_running=3, per_user=1))
+    runner.submit("big1", "heavy")
+    runner.submit("big2", "heavy")
+    runner.submit("small", "light")
+    await runner.settle()
+    assert runner.started == ["big1", "small"]
+
+    await runner.finish("big1")
+    assert runner.started[-1] == "big2"
+    for analysis_id in ("small", "big2"):
+        await runner.finish(analysis_id)
+
+
+@pytest.mark.asyncio
+async def test_quick_interactive_jumps_batch_queue():
+    runner = _Runner(AnalysisScheduler(max_running=1))
+    runner.submit("running", "u0")
+    await runner.settle()
+    runner.submit("batch", "u1", origin="batch")
+    runner.submit("detailed", "u2")
+    runner.submit("quick", "u3", analysis_type="quick")
+    await runner.settle()
+
+    for analysis_id in ("running", "quick", "detailed"):
+        await runner.finish(analysis_id)
+    assert runner.started == ["running", "quick", "detailed", "batch"]
+    await runner.finish("batch")
+
+
+@pytest.mark.asyncio
+async def test_batch_cannot_take_reserved_slot():
+    runner = _Runner(AnalysisScheduler(max_running=2, interactive_reserve=1))
+    runner.submit("b1", "u1", origin="batch")
+    runner.submit("b2", "u2", origin="batch")
+    await runner.settle()
+    assert runner.started == ["b1"]
+
+    runner.submit("i1", "u3")
+    await runner.settle()
+    assert runner.started == ["b1", "i1"]
+    for analysis_id in ("b1", "i1", "b2"):
+        await runner.finish(analysis_id)
+
+
+@pytest.mark.asyncio
+async def test_fair_share_prefers_user_with_fewer_running():
+    runner = _Runner(AnalysisScheduler(max_running=2))
+    runner.submit("a1", "alice")
+    await runner.settle()
+    runner.submit("blocker", "carol")
+    runner.submit("a2", "alice")
+    runner.submit("b1", "bob")
+    await runner.settle()
+    assert runner.started == ["a1", "blocker"]
+
+    # alice already runs one, bob none — bob goes first despite arriving later
+    await runner.finish("blocker")
+    assert runner.started[-1] == "b1"
+    for analysis_id in ("a1", "b1", "a2"):
+        await runner.finish(analysis_id)
+
+
+@pytest.mark.asyncio
+async def test_weights_scale_fair_share():
+    scheduler = AnalysisScheduler(max_running=3, user_weights={"alice": 4.0})
+    runner = _Runner(scheduler)
+    runner.submit("a1", "alice")
+    runner.submit("b1", "bob")
+    runner.submit("blocker", "carol")
+    await runner.settle()
+    runner.submit("b2", "bob")
+    runner.submit("a2", "alice")
+    await runner.settle()
+
+    # Both run one, but alice's weight makes her share smaller
+    await runner.finish("blocker")
+    assert runner.started[-1] == "a2"
+    for analysis_id in ("a1", "b1", "a2", "b2"):
+        await runner.finish(analysis_id)
+
+
+@pytest.mark.asyncio
+async def test_queue_info_reports_position_and_eta():
+    scheduler = AnalysisScheduler(max_running=1)
+    runner = _Runner(scheduler)
+    runner.submit("running", "u0")
+    runner.submit("second", "u1")
+    runner.submit("third", "u2")
+    await runner.settle()
+
+    assert scheduler.queue_info("running") is None
+    second, third = scheduler.queue_info("second"), scheduler.queue_info("third")
+    assert (second.position, third.position) == (0, 1)
+    assert 0 < second.eta_seconds < third.eta_seconds
+    for analysis_id in ("running", "second", "third"):
+        await runner.finish(analysis_id)
+
+
+@pytest.mark.asyncio
+async def test_cancel_removes_waiting_analysis():
+    scheduler = AnalysisScheduler(max_running=1)
+    runner = _Runner(scheduler)
+    runner.submit("running", "u0")
+    runner.submit("waiting", "u1")
+    await runner.settle()
+
+    assert scheduler.cancel("waiting") is True
+    with pytest.raises(AdmissionCanceled):
+        await runner.tasks["waiting"]
+    assert scheduler.cancel("running") is False
+    assert scheduler.stats()["waiting"] == 0
+    await runner.finish("running")
@@ -72,6 +72,15 @@ async def test_create_analysis_unsupported_format(client: AsyncClient):
     assert "Unsupported file format" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_create_analysis_invalid_origin(client: AsyncClient):
+    """Origin must be one of the scheduler lanes."""
+    files = [("files", ("test_doc.pdf", b"%PDF-1.4 fake", "application/pdf"))]
+    response = await client.post("/api/analyze", files=files, data={"origin": "cron"})
+    assert response.status_code == 400
+    assert "Invalid origin" in response.json()["detail"]
+
+
 @pytest.mark.asyncio
 async def test_create_analysis_success(client: AsyncClient):
     """Upload valid PDF should return 202 with analysis detail."""
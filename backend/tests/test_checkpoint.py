@@ -0,0 +1,244 @@
+# backend/tests/test_checkpoint.py
+# Tests for stage checkpoints and resuming failed analyses
+# Covers: parsed/extraction/aggregation round trips, extract_all and chunked
+#         extraction skipping checkpointed LLM work, pipeline re-run, resume endpoint
+# Related: app/services/checkpoint.py, app/services/extraction.py,
+#          app/routers/analyze.py (resume)
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.models.schemas import AggregatedReport, DocumentType, ExtractionResult
+from app.services.checkpoint import AnalysisCheckpoint, flush_checkpoints
+from app.services.extraction import extract_all, extract_document
+from app.services.llm import LLMClient
+from app.services.parser import ParsedDocument
+from app.services.workspace import get_workspace_manager
+
+
+def _doc(filename: str = "spec.pdf", content: str = "Techninė specifikacija", **kwargs) -> ParsedDocument:
+    return ParsedDocument(
+        filename=filename,
+        content=content,
+        page_count=3,
+        file_size_bytes=len(content),
+        doc_type=DocumentType.TECHNICAL_SPEC,
+        token_estimate=len(content) // 4,
+        **kwargs,
+    )
+
+
+def _llm() -> LLMClient:
+    llm = MagicMock(spec=LLMClient)
+    # Streaming and plain calls share one mock so call_count covers both
+    llm.complete_structured = llm.complete_structured_streaming = AsyncMock(return_value=(
+        ExtractionResult(project_summary="Santrauka"),
+        {"input_tokens": 1000, "output_tokens": 200},
+    ))
+    return llm
+
+
+@pytest.fixture
+def checkpoint(tmp_path: Path) -> AnalysisCheckpoint:
+    return AnalysisCheckpoint(tmp_path / "checkpoint")
+
+
+# ── Stage round trips ──────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_parsed_document_round_trip(checkpoint, tmp_path):
+    source = tmp_path / "spec.pdf"
+    source.write_bytes(b"%PDF")
+    checkpoint.save_parsed(_doc(file_path=source, content_hash="abc", parser_used="pypdf"))
+    await flush_checkpoints()
+
+    doc = await checkpoint.load_parsed("spec.pdf", source)
+    assert doc == _doc(file_path=source, content_hash="abc", parser_used="pypdf")
+    assert await checkpoint.load_parsed("other.pdf", source) is None
+    assert checkpoint.restored == 1
+
+
+@pytest.mark.asyncio
+async def test_scanned_document_needs_its_file(checkpoint, tmp_path):
+    checkpoint.save_parsed(_doc(content="", is_scanned=True))
+    await flush_checkpoints()
+
+    # In-memory source (no file): parse again so OCR has something to read
+    assert await checkpoint.load_parsed("spec.pdf", None) is None
+    source = tmp_path / "spec.pdf"
+    source.write_bytes(b"%PDF")
+    assert (await checkpoint.load_parsed("spec.pdf", source)).is_scanned
+
+
+@pytest.mark.asyncio
+async def test_aggregation_keyed_by_extractions(checkpoint):
+    report = AggregatedReport(project_summary="Ataskaita")
+    checkpoint.save_aggregation("k1", report, {"input_tokens": 5, "output_tokens": 7})
+    await flush_checkpoints()
+
+    assert await checkpoint.load_aggregation("k1") == (
+        report, {"input_tokens": 5, "output_tokens": 7},
+    )
+    assert await checkpoint.load_aggregation("k2") is None
+
+
+# ── Extraction ─────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_extract_all_restores_finished_documents(checkpoint):
+    docs = [_doc("a.pdf", "Pirmas"), _doc("b.pdf", "Antras")]
+    await extract_all(docs, _llm(), model="m", checkpoint=checkpoint)
+    await flush_checkpoints()
+
+    llm = _llm()
+    started: list[str] = []
+    results = await extract_all(
+        docs, llm, model="m", checkpoint=checkpoint,
+        on_started=lambda _i, name: started.append(name),
+    )
+    assert llm.complete_structured.call_count == 0
+    assert started == []
+    assert [r.project_summary for _d, r, _u in results] == ["Santrauka", "Santrauka"]
+    assert results[0][2] == {"input_tokens": 1000, "output_tokens": 200}
+
+    # Changed content is a different document — extracted again
+    await extract_all([_doc("a.pdf", "Pakeistas")], llm, model="m", checkpoint=checkpoint)
+    assert llm.complete_structured.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_extraction_is_not_checkpointed(checkpoint):
+    llm = _llm()
+    llm.complete_structured.side_effect = RuntimeError("boom")
+    await extract_all([_doc()], llm, model="m", checkpoint=checkpoint)
+    await flush_checkpoints()
+
+    assert not (checkpoint.root / "extraction").exists()
+
+
+@pytest.mark.asyncio
+async def test_chunks_restored_individually(checkpoint):
+    content = "\n\n".join(f"## Skyrius {i}\n" + "Tekstas. " * 500 for i in range(12))
+    doc = _doc(content=content)
+    _result, usage = await extract_document(
+        doc, _llm(), "m", context_length=8_000, checkpoint=checkpoint,
+    )
+    await flush_checkpoints()
+    chunks = len(list((checkpoint.root / "chunks").iterdir()))
+    assert chunks > 1
+
+    llm = _llm()
+    _result, restored_usage = await extract_document(
+        doc, llm, "m", context_length=8_000, checkpoint=checkpoint,
+    )
+    assert llm.complete_structured.call_count == 0
+    assert restored_usage == usage
+    assert checkpoint.restored == chunks
+
+
+# ── Pipeline ───────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_pipeline_resumes_after_failed_aggregation(tmp_path):
+    from app.convex_client import ConvexDB
+    from app.services.document_source import DocumentSource
+    from app.services.pipeline import AnalysisPipeline
+
+    db = ConvexDB(url="")
+    analysis_id = await db.create_analysis(model="openai/gpt-4o")
+    workspace = get_workspace_manager().create(analysis_id)
+    upload = workspace.uploads / "spec.pdf"
+    upload.write_bytes(b"%PDF")
+
+    async def fake_extract_files(upload_paths, on_event=None, *, on_source=None, **kwargs):
+        sources = [DocumentSource(filename="spec.pdf", path=upload)]
+        for source in sources:
+            on_source(source)
+        return sources
+
+    async def run(llm, aggregate) -> AnalysisPipeline:
+        llm.queue_wait_seconds = 0.0
+        llm.priority = 0
+        pipeline = AnalysisPipeline(analysis_id, db, llm, model="openai/gpt-4o")
+        with (
+            patch("app.services.pipeline.extract_files", side_effect=fake_extract_files),
+            patch("app.services.parser.parse_document", parse_document),
+            patch("app.services.pipeline.aggregate_results", aggregate),
+            patch("app.services.pipeline.evaluate_report", AsyncMock(side_effect=RuntimeError)),
+        ):
+            await pipeline.run([upload])
+            if pipeline._eval_task:
+                await asyncio.gather(pipeline._eval_task, return_exceptions=True)
+        await flush_checkpoints()
+        return pipeline
+
+    parse_document = AsyncMock(return_value=_doc(file_path=upload))
+    await run(_llm(), AsyncMock(side_effect=RuntimeError("aggregation crashed")))
+    assert (await db.get_analysis(analysis_id))["status"] == "failed"
+
+    llm = _llm()
+    report = AggregatedReport(project_summary="Ataskaita")
+    pipeline = await run(llm, AsyncMock(return_value=(report, {"input_tokens": 1, "output_tokens": 1})))
+
+    record = await db.get_analysis(analysis_id)
+    assert record["status"] == "completed"
+    assert parse_document.call_count == 1  # second run restored the parsed document
+    assert llm.complete_structured.call_count == 0
+    assert pipeline.metrics.checkpoints_restored == 2
+    assert pipeline.metrics.tokens_extraction_input == 1000
+    assert len(await db.get_documents(analysis_id)) == 1
+    events = await db.get_events(analysis_id)
+    assert [e["index"] for e in events] == list(range(len(events)))
+    assert "analysis_resumed" in [e["event_type"] for e in events]
+
+
+# ── Resume endpoint ────────────────────────────────────────────────────────
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    import app.convex_client as convex_module
+    from app.convex_client import ConvexDB
+    from app.main import app
+
+    monkeypatch.setattr(convex_module, "_db_instance", ConvexDB(url=""))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_resume_requeues_failed_analysis(client):
+    from app.convex_client import get_db
+    from app.services.job_queue import QUEUED, get_job_queue
+
+    db = get_db()
+    analysis_id = await db.create_analysis(model="m")
+    queue = get_job_queue()
+    queue.enqueue(analysis_id, {"model": "m", "uploads": []})
+
+    assert (await client.post(f"/api/analyze/{analysis_id}/resume")).status_code == 409
+
+    queue.claim("w")
+    queue.finish(analysis_id, "w")
+    await db.update_analysis(analysis_id, status="failed", error="boom")
+    assert (await client.post(f"/api/analyze/{analysis_id}/resume")).status_code == 410
+
+    get_workspace_manager().create(analysis_id)
+    get_workspace_manager().detach(analysis_id)
+    response = await client.post(f"/api/analyze/{analysis_id}/resume")
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+    assert queue.get(analysis_id)["status"] == QUEUED
+
+
+@pytest.mark.asyncio
+async def test_resume_unknown_analysis(client):
+    assert (await client.post("/api/analyze/missing/resume")).status_code == 404
@@ -0,0 +1,194 @@
+# backend/tests/test_docling_service.py
+# Tests for the shared Docling/OCR service and its client
+# Covers: job queue admission, /health and /convert, path checks, client routing
+#         from parser.py, in-process fallback when the service is down
+# Related: app/services/docling_service.py, app/services/docling_client.py
+
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.services import docling_client, parser
+from app.services.docling_client import DoclingServiceError
+from app.services.docling_service import JobQueue, QueueFull, create_app
+
+
+@pytest.fixture
+def docling_installed(monkeypatch):
+    monkeypatch.setattr(parser, "DOCLING_AVAILABLE", True)
+
+
+@pytest.fixture
+def scan(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(get_settings(), "temp_dir", str(tmp_path))
+    path = tmp_path / "scan.png"
+    path.write_bytes(b"\x89PNG fake")
+    return path
+
+
+@pytest.fixture
+def service(docling_installed):
+    with TestClient(create_app(workers=1, queue_size=2, warm=None)) as client:
+        yield client
+
+
+@pytest.fixture
+def use_service(service, monkeypatch):
+    """Point docling_client at the in-process test service."""
+    monkeypatch.setattr(get_settings(), "docling_service_url", "http://docling-test")
+    monkeypatch.setattr(docling_client, "_get_client", lambda: service)
+    monkeypatch.setattr(docling_client, "_health", (0.0, False))
+    yield service
+
+
+# ── Job queue ────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_queue_rejects_beyond_capacity():
+    queue = JobQueue(workers=1, max_waiting=1)
+    release = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def blocking() -> str:
+        asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+        return "done"
+
+    running = asyncio.create_task(queue.run(blocking))
+    waiting = asyncio.create_task(queue.run(lambda: "next"))
+    await asyncio.sleep(0.05)
+    assert (queue.running, queue.waiting) == (1, 1)
+
+    with pytest.raises(QueueFull):
+        await queue.run(lambda: "rejected")
+
+    release.set()
+    assert await running == "done"
+    assert await waiting == "next"
+    assert queue.stats()["completed"] == 2
+    assert queue.stats()["rejected"] == 1
+
+
+# ── Service endpoints ────────────────────────────────────────────────────────
+
+
+def test_health_reports_queue(service):
+    body = service.get("/health").json()
+    assert body["status"] == "ok"
+    assert body["workers"] == 1
+    assert body["max_waiting"] == 2
+
+
+def test_health_unavailable_without_docling(monkeypatch):
+    monkeypatch.setattr(parser, "DOCLING_AVAILABLE", False)
+    with TestClient(create_app(warm=None)) as client:
+        assert client.get("/health").status_code == 503
+        assert client.post("/convert", json={"path": "/tmp/x.png"}).status_code == 503
+
+
+def test_convert_during_warm_up_asks_to_retry(docling_installed, scan: Path):
+    import threading
+
+    warmed = threading.Event()
+    with TestClient(create_app(warm=lambda: warmed.wait(5))) as client:
+        response = client.post("/convert", json={"path": str(scan)})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+        assert client.get("/health").json()["status"] == "warming"
+        warmed.set()
+
+
+def test_convert_dispatches_by_mode(service, scan: Path):
+    with patch.object(parser, "_convert_with_docling", return_value=("# Docling", 1)) as docling, \
+            patch.object(parser, "_convert_with_ocr", return_value=("OCR tekstas", 2)) as ocr:
+        plain = service.post("/convert", json={"path": str(scan)}).json()
+        scanned = service.post("/convert", json={"path": str(scan), "mode": "ocr"}).json()
+    docling.assert_called_once_with(scan.resolve(), ".png")
+    ocr.assert_called_once_with(scan.resolve())
+    assert (plain["content"], plain["page_count"]) == ("# Docling", 1)
+    assert (scanned["content"], scanned["page_count"]) == ("OCR tekstas", 2)
+
+
+def test_convert_rejects_paths_outside_temp(service, scan: Path):
+    assert service.post("/convert", json={"path": "/etc/passwd"}).status_code == 400
+    assert service.post("/convert", json={"path": str(scan.with_name("gone.png"))}).status_code == 404
+
+
+def test_conversion_error_is_422(service, scan: Path):
+    with patch.object(parser, "_convert_with_docling", side_effect=RuntimeError("bad file")):
+        response = service.post("/convert", json={"path": str(scan)})
+    assert response.status_code == 422
+    assert "bad file" in response.json()["detail"]
+
+
+# ── Client routing from parser.py ────────────────────────────────────────────
+
+
+def test_parser_uses_service_when_configured(use_service, scan: Path):
+    with patch.object(parser, "_convert_with_ocr", return_value=("OCR per servisą", 3)):
+        assert parser.parse_with_ocr(scan) == ("OCR per servisą", 3)
+    with patch.object(parser, "_convert_with_docling", return_value=("# Vaizdas", 1)):
+        assert parser._parse_with_docling(scan, ".png") == ("# Vaizdas", 1)
+    assert docling_client.check_health() is True
+
+
+def test_service_error_surfaces_as_docling_service_error(use_service, scan: Path):
+    with patch.object(parser, "_convert_with_docling", side_effect=RuntimeError("corrupt")):
+        with pytest.raises(DoclingServiceError, match="corrupt"):
+            parser._parse_with_docling(scan, ".png")
+
+
+def _queue_full_service(monkeypatch, busy_answers: int) -> list[float]:
+    """Service answering 503 + Retry-After ``busy_answers`` times, then converting."""
+    busy = httpx.Response(503, headers={"Retry-After": "1"}, json={"detail": "queue full"})
+    answers = iter([busy] * busy_answers)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return next(answers, httpx.Response(200, json={"content": "OCR", "page_count": 1}))
+
+    client = httpx.Client(base_url="http://docling-test", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(get_settings(), "docling_service_url", "http://docling-test")
+    monkeypatch.setattr(docling_client, "_get_client", lambda: client)
+    sleeps: list[float] = []
+    monkeypatch.setattr(docling_client.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_full_service_queue_is_retried(monkeypatch, scan: Path):
+    sleeps = _queue_full_service(monkeypatch, busy_answers=3)
+    assert docling_client.convert(scan, "ocr") == ("OCR", 1)
+    assert sleeps == [1.0, 2.0, 4.0]  # Retry-After, then exponential backoff
+
+
+def test_full_service_queue_gives_up_at_the_timeout(monkeypatch, scan: Path):
+    _queue_full_service(monkeypatch, busy_answers=100)
+    monkeypatch.setattr(get_settings(), "docling_service_timeout", 10)
+    with pytest.raises(DoclingServiceError, match="503"):
+        docling_client.convert(scan, "ocr")
+
+
+def test_unreachable_service_falls_back_in_process(monkeypatch, docling_installed, scan: Path):
+    monkeypatch.setattr(get_settings(), "docling_service_url", "http://127.0.0.1:9")
+    monkeypatch.setattr(docling_client, "_health", (0.0, False))
+    try:
+        with patch.object(parser, "_convert_with_docling", return_value=("vietinis", 1)) as local:
+            assert parser._parse_with_docling(scan, ".png") == ("vietinis", 1)
+        local.assert_called_once()
+    finally:
+        docling_client.close_client()
+
+
+def test_unreachable_service_without_local_docling_raises(monkeypatch, scan: Path):
+    monkeypatch.setattr(parser, "DOCLING_AVAILABLE", False)
+    monkeypatch.setattr(get_settings(), "docling_service_url", "http://127.0.0.1:9")
+    monkeypatch.setattr(docling_client, "_health", (0.0, False))
+    try:
+        with pytest.raises(DoclingServiceError, match="unreachable"):
+            parser._parse_with_docling(scan, ".png")
+    finally:
+        docling_client.close_client()
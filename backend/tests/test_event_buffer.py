@@ -0,0 +1,157 @@
+# backend/tests/test_event_buffer.py
+# Tests for the write-behind pipeline event buffer (services/event_buffer.py)
+# Covers: batching by count and by time, index order, retry after a failed
+#         write, close() flushing, pipeline writing events in batches
+# Related: app/services/event_buffer.py, app/services/pipeline.py,
+#          app/convex_client.py (append_events)
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.convex_client import ConvexDB
+from app.models.schemas import AggregatedReport, DocumentType, ExtractionResult
+from app.services.document_source import DocumentSource
+from app.services.event_buffer import EventBuffer
+from app.services.llm import LLMClient
+from app.services.parser import ParsedDocument
+from app.services.pipeline import AnalysisPipeline
+
+
+async def _buffer(**kwargs) -> tuple[ConvexDB, str, EventBuffer]:
+    db = ConvexDB(url="")
+    analysis_id = await db.create_analysis(model="m")
+    return db, analysis_id, EventBuffer(db, analysis_id, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_written_at_once():
+    db, analysis_id, events = await _buffer(max_batch=3, interval_ms=60_000)
+    append = AsyncMock(wraps=db.append_events)
+    db.append_events = append
+
+    for i in range(4):
+        events.emit("file_parsed", {"n": i})
+    await asyncio.sleep(0.01)
+    assert [len(call.args[1]) for call in append.call_args_list] == [3, 1]
+
+    # Below the batch size nothing is written until the interval passes
+    for i in range(4, 6):
+        events.emit("file_parsed", {"n": i})
+    await asyncio.sleep(0.01)
+    assert append.call_count == 2
+    assert events.pending == 2
+
+    await events.close()
+    stored = await db.get_events(analysis_id)
+    assert [e["index"] for e in stored] == list(range(6))
+    assert [e["data"]["n"] for e in stored] == list(range(6))
+    assert events.batches_written == 3
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_written_after_the_interval():
+    db, analysis_id, events = await _buffer(max_batch=50, interval_ms=20)
+    events.emit("extraction_started", {})
+    events.emit("extraction_completed", {})
+    assert await db.get_events(analysis_id) == []
+
+    await asyncio.sleep(0.1)
+    assert len(await db.get_events(analysis_id)) == 2
+    assert events.batches_written == 1
+    await events.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried_in_order():
+    db, analysis_id, events = await _buffer(max_batch=50, interval_ms=60_000)
+    real_append = db.append_events
+    db.append_events = AsyncMock(side_effect=RuntimeError("db down"))
+
+    events.emit("file_parsed", {"n": 0})
+    await events.flush()
+    assert events.pending == 1
+
+    db.append_events = real_append
+    events.emit("file_parsed", {"n": 1})
+    await events.flush()
+    assert [e["index"] for e in await db.get_events(analysis_id)] == [0, 1]
+    await events.close()
+
+
+@pytest.mark.asyncio
+async def test_close_drops_events_it_cannot_write():
+    db, _analysis_id, events = await _buffer(interval_ms=60_000)
+    db.append_events = AsyncMock(side_effect=RuntimeError("db down"))
+    events.emit("error", {"message": "x"})
+    await events.close()
+    assert events.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_index_continues_an_earlier_log():
+    db, analysis_id, events = await _buffer()
+    await db.append_events(analysis_id, [{"event_type": "file_parsed", "index": 0}])
+    events.next_index = 1
+    events.emit("analysis_resumed", {})
+    await events.close()
+    assert [e["index"] for e in await db.get_events(analysis_id)] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_writes_events_in_batches():
+    db = ConvexDB(url="")
+    analysis_id = await db.create_analysis(model="openai/gpt-4o")
+    append_one = AsyncMock(wraps=db.append_event)
+    append_many = AsyncMock(wraps=db.append_events)
+    db.append_event, db.append_events = append_one, append_many
+
+    names = [f"doc{i}.pdf" for i in range(20)]
+    docs = [
+        ParsedDocument(
+            filename=name, content=name, page_count=1, file_size_bytes=10,
+            doc_type=DocumentType.OTHER, token_estimate=1,
+        )
+        for name in names
+    ]
+
+    async def fake_extract_files(upload_paths, on_event=None, *, on_source=None, **kwargs):
+        sources = [DocumentSource(filename=name, path=Path("/tmp") / name) for name in names]
+        for source in sources:
+            on_source(source)
+        return sources
+
+    async def fake_parse_all(sources, on_parsed=None, **kwargs):
+        async for _source in sources:
+            pass
+        for doc in docs:
+            on_parsed(doc)
+        return list(docs)
+
+    llm = MagicMock(spec=LLMClient)
+    llm.queue_wait_seconds = 0.0
+    llm.priority = 0
+    llm.complete_structured = llm.complete_structured_streaming = AsyncMock(return_value=(
+        ExtractionResult(), {"input_tokens": 1, "output_tokens": 1},
+    ))
+    pipeline = AnalysisPipeline(analysis_id, db, llm, model="openai/gpt-4o")
+    with (
+        patch("app.services.pipeline.extract_files", side_effect=fake_extract_files),
+        patch("app.services.pipeline.parse_all", side_effect=fake_parse_all),
+        patch("app.services.pipeline.aggregate_results", AsyncMock(return_value=(
+            AggregatedReport(), {"input_tokens": 1, "output_tokens": 1},
+        ))),
+        patch("app.services.pipeline.evaluate_report", AsyncMock(side_effect=RuntimeError)),
+    ):
+        await pipeline.run([Path("/tmp/upload.zip")])
+        await asyncio.gather(pipeline._eval_task, return_exceptions=True)
+
+    events = await db.get_events(analysis_id)
+    # 20 parsed + 20 started + 20 completed + aggregation + metrics
+    assert len(events) >= 63
+    assert [e["index"] for e in events] == list(range(len(events)))
+    assert events[-1]["event_type"] == "metrics_update"
+    assert append_one.call_count == 0
+    assert append_many.call_count < len(events) // 10
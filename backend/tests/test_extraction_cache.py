@@ -0,0 +1,101 @@
+# backend/tests/test_extraction_cache.py
+# Tests for the cross-analysis extraction cache (services/extraction_cache.py)
+# Covers: key inputs, cache hits skipping the LLM with token savings, partial
+#         reuse of chunked documents, disabled cache
+# Related: app/services/extraction_cache.py, app/services/extraction.py
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.config import get_settings
+from app.models.schemas import DocumentType, ExtractionResult
+from app.services.extraction import extract_all, extract_document
+from app.services.extraction_cache import extraction_cache_key, get_extraction_cache
+from app.services.llm import LLMClient
+from app.services.parser import ParsedDocument
+
+
+def _doc(content: str = "Techninė specifikacija", filename: str = "spec.pdf") -> ParsedDocument:
+    return ParsedDocument(
+        filename=filename,
+        content=content,
+        page_count=2,
+        file_size_bytes=len(content),
+        doc_type=DocumentType.TECHNICAL_SPEC,
+        token_estimate=len(content) // 4,
+    )
+
+
+def _llm() -> LLMClient:
+    llm = MagicMock(spec=LLMClient)
+    llm.complete_structured = llm.complete_structured_streaming = AsyncMock(return_value=(
+        ExtractionResult(project_summary="Santrauka"),
+        {"input_tokens": 1000, "output_tokens": 200},
+    ))
+    return llm
+
+
+def test_key_covers_model_type_instructions_and_prompt():
+    base = extraction_cache_key("system", "user", "m", "detailed", "")
+    assert base == extraction_cache_key("system", "user", "m", "detailed", "")
+    assert len({
+        base,
+        extraction_cache_key("system", "user", "other-model", "detailed", ""),
+        extraction_cache_key("system", "user", "m", "quick", ""),
+        extraction_cache_key("system", "user", "m", "detailed", "tik terminai"),
+        extraction_cache_key("system v2", "user", "m", "detailed", ""),
+        extraction_cache_key("system", "other content", "m", "detailed", ""),
+    }) == 6
+
+
+@pytest.mark.asyncio
+async def test_second_analysis_reuses_extraction():
+    await extract_all([_doc()], _llm(), model="m")
+
+    llm = _llm()
+    [(_doc_, result, usage)] = await extract_all([_doc()], llm, model="m")
+    assert llm.complete_structured.call_count == 0
+    assert result.project_summary == "Santrauka"
+    assert usage == {
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "saved_input_tokens": 1000,
+        "saved_output_tokens": 200,
+        "cache_hits": 1,
+    }
+
+    # Another model or analysis type is a different extraction
+    await extract_all([_doc()], llm, model="other-model")
+    await extract_all([_doc()], llm, model="m", analysis_type="quick")
+    assert llm.complete_structured.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_chunked_document_reuses_unchanged_chunks():
+    sections = [f"## Skyrius {i}\n" + f"Tekstas {i}. " * 450 for i in range(12)]
+    _result, first_usage = await extract_document(
+        _doc("\n\n".join(sections)), _llm(), "m", context_length=8_000,
+    )
+    chunks = first_usage["input_tokens"] // 1000
+    assert chunks > 2
+
+    # Amend the last section only — earlier chunks come from the cache
+    sections[-1] = "## Skyrius 11\n" + "Pakeista. " * 450
+    llm = _llm()
+    _result, usage = await extract_document(
+        _doc("\n\n".join(sections)), llm, "m", context_length=8_000,
+    )
+    assert 0 < llm.complete_structured.call_count < chunks
+    assert usage["cache_hits"] == chunks - llm.complete_structured.call_count
+    assert usage["saved_input_tokens"] == 1000 * usage["cache_hits"]
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_calls_llm(monkeypatch):
+    monkeypatch.setattr(get_settings(), "extraction_cache_enabled", False)
+    get_extraction_cache.cache_clear()
+    llm = _llm()
+    await extract_all([_doc()], llm, model="m")
+    await extract_all([_doc()], llm, model="m")
+    assert llm.complete_structured.call_count == 2
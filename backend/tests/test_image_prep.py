@@ -0,0 +1,199 @@
+# backend/tests/test_image_prep.py
+# Tests for NumPy scan preprocessing (services/image_prep.py)
+# Covers: grayscale/Otsu/area resize/deskew kernels, presets, image and PDF page
+#         preparation with stats, OCR job integration, multimodal upload of image scans
+# Related: app/services/image_prep.py, app/services/ocr_scheduler.py, app/services/extraction.py
+
+import base64
+import io
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from app.config import get_settings
+from app.models.schemas import DocumentType, ExtractionResult
+from app.services.extraction import _extract_single_multimodal
+from app.services.image_prep import (
+    PRESETS,
+    area_resize,
+    binarize,
+    estimate_skew,
+    get_preset,
+    otsu_threshold,
+    prepare_image_for_ocr,
+    prepare_image_upload,
+    prepare_pdf_pages,
+    to_grayscale,
+)
+from app.services.llm import LLMClient, build_multimodal_images
+from app.services.ocr_scheduler import ocr_page_range
+from app.services.parser import ParsedDocument
+
+
+def _text_page(skew: float = 0.0, size: tuple[int, int] = (1240, 1754)) -> Image.Image:
+    """Colour A4-ish page at 150 dpi with lines of text, tilted by ``skew``°."""
+    page = Image.new("RGB", size, (246, 241, 228))
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default(size=22)
+    for line in range(40):
+        draw.text((90, 90 + line * 38), f"{line + 1}. Tiekejas privalo pateikti dokumentus", fill=(20, 20, 60), font=font)
+    return page.rotate(skew, expand=True, fillcolor=(246, 241, 228)) if skew else page
+
+
+@pytest.fixture
+def scan_png(tmp_path: Path) -> Path:
+    path = tmp_path / "scan.png"
+    _text_page(skew=3.0, size=(2480, 3508)).save(path, dpi=(300, 300))
+    return path
+
+
+# ── Kernels ──────────────────────────────────────────────────────────────────
+
+
+def test_grayscale_luma_and_alpha():
+    rgba = np.array([[[255, 0, 0, 255], [0, 0, 0, 0]]], dtype=np.uint8)
+    assert to_grayscale(rgba).tolist() == [[76, 255]]  # red → BT.601 luma, transparent → white
+    rgb = np.asarray(_text_page())
+    assert np.abs(to_grayscale(rgb).astype(int) - np.asarray(Image.fromarray(rgb).convert("L"))).max() <= 1
+
+
+def test_otsu_separates_ink_from_paper():
+    gray = np.array([30] * 100 + [220] * 900, dtype=np.uint8).reshape(10, 100)
+    threshold = otsu_threshold(gray)
+    assert 30 <= threshold < 220
+    assert set(np.unique(binarize(gray)).tolist()) == {0, 255}
+
+
+def test_area_resize_averages_blocks():
+    gray = np.array([[0, 255, 10, 10], [255, 0, 10, 10]], dtype=np.uint8)
+    assert area_resize(gray, 1, 2).tolist() == [[128, 10]]
+    big = np.asarray(_text_page().convert("L"))
+    small = area_resize(big, 500, 354)
+    assert small.shape == (500, 354)
+    assert abs(float(small.mean()) - float(big.mean())) < 1.0
+
+
+@pytest.mark.parametrize("angle", [3.0, -2.0, 0.0])
+def test_estimate_skew_straightens(angle: float):
+    gray = np.asarray(_text_page(skew=angle).convert("L"))
+    assert estimate_skew(gray) == pytest.approx(-angle, abs=0.3)
+
+
+def test_blank_page_has_no_skew():
+    assert estimate_skew(np.full((800, 600), 250, dtype=np.uint8)) == 0.0
+
+
+def test_presets(monkeypatch):
+    monkeypatch.setattr(get_settings(), "ocr_image_preset", "off")
+    assert get_preset() is None
+    assert get_preset("FAST") is PRESETS["fast"]
+    assert get_preset("nonsense") is PRESETS["balanced"]
+
+
+# ── Pages ────────────────────────────────────────────────────────────────────
+
+
+def test_upload_downscaled_deskewed_and_smaller(scan_png: Path):
+    images, stats = prepare_image_upload(scan_png, "balanced")
+    assert len(images) == 1 and images[0][:2] == b"\xff\xd8"  # grayscale JPEG
+    page = Image.open(io.BytesIO(images[0]))
+    assert page.mode == "L"
+    assert max(page.size) <= PRESETS["balanced"].max_side + 100  # rotation may grow the canvas
+    assert stats.skew_degrees == [pytest.approx(-3.0, abs=0.3)]
+    assert stats.pixels_out < stats.pixels_in
+    assert stats.bytes_saved > 0
+    assert "KB/page saved" in stats.summary(ocr_seconds=2.0)
+
+
+def test_fast_preset_is_binarized_png(scan_png: Path):
+    images, stats = prepare_image_upload(scan_png, "fast")
+    assert images[0].startswith(b"\x89PNG")
+    assert Image.open(io.BytesIO(images[0])).mode == "1"
+    assert stats.ocr_seconds_saved(1.0) > 0
+
+
+def test_multipage_tiff_stays_tiff_for_ocr(tmp_path: Path):
+    source = tmp_path / "scan.tiff"
+    pages = [_text_page(), _text_page(skew=2.0)]
+    pages[0].save(source, save_all=True, append_images=pages[1:], dpi=(150, 150))
+    dest = tmp_path / "prepared.tiff"
+    stats = prepare_image_for_ocr(source, dest, "fast")
+    with Image.open(dest) as out:
+        assert out.n_frames == 2
+    assert stats.pages == 2
+    assert stats.bytes_out == dest.stat().st_size
+
+
+def test_pdf_pages_become_image_pdf(tmp_path: Path):
+    from pypdf import PdfReader
+    from reportlab.pdfgen import canvas
+
+    source = tmp_path / "scan.pdf"
+    pdf = canvas.Canvas(str(source))
+    for page in range(3):
+        pdf.drawString(72, 720, f"Puslapis {page + 1}")
+        pdf.showPage()
+    pdf.save()
+    dest = tmp_path / "prepared.pdf"
+    stats = prepare_pdf_pages(source, [2, 3], dest, "fast")
+    assert len(PdfReader(str(dest)).pages) == 2
+    assert stats.pages == 2 and stats.bytes_in > 0
+
+
+# ── Integration ──────────────────────────────────────────────────────────────
+
+
+def test_ocr_job_gets_prepared_image(scan_png: Path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ocr_image_preset", "fast")
+    seen: list[tuple[Path, str]] = []
+
+    def fake_ocr(path: Path) -> tuple[str, int]:
+        with Image.open(path) as image:
+            seen.append((path, image.mode))
+        return "OCR tekstas", 1
+
+    with patch("app.services.parser.parse_with_ocr", side_effect=fake_ocr):
+        result = ocr_page_range(scan_png, 1, 1, 1)
+    (prepared, mode), = seen
+    assert (prepared.suffix, mode) == (".png", "1")
+    assert not prepared.exists()  # temporary copy removed after the job
+    assert result.text == "OCR tekstas"
+    assert result.prep is not None and result.prep.bytes_saved > 0
+
+
+def test_ocr_job_falls_back_to_original_on_bad_image(tmp_path: Path):
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"\x89PNG not really")
+    with patch("app.services.parser.parse_with_ocr", return_value=("originalas", 1)) as ocr:
+        result = ocr_page_range(broken, 1, 1, 1)
+    ocr.assert_called_once_with(broken)
+    assert (result.text, result.prep) == ("originalas", None)
+
+
+def test_build_images_detects_png():
+    parts = build_multimodal_images("t", [b"\x89PNG....", b"\xff\xd8...."])
+    assert parts[1]["image_url"]["url"].startswith("data:image/png;base64,")
+    assert parts[2]["image_url"]["url"].startswith("data:image/jpeg;base64,")
+
+
+@pytest.mark.asyncio
+async def test_multimodal_uploads_prepared_scan(scan_png: Path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "parser_backend", "thread")
+    doc = ParsedDocument(
+        filename="scan.png", content="", page_count=1, file_size_bytes=scan_png.stat().st_size,
+        doc_type=DocumentType.OTHER, token_estimate=0, file_path=scan_png, is_scanned=True,
+    )
+    llm = MagicMock(spec=LLMClient)
+    llm.complete_structured_streaming = AsyncMock(
+        return_value=(ExtractionResult(), {"input_tokens": 1, "output_tokens": 1}),
+    )
+    await _extract_single_multimodal(doc, llm, "test-model")
+
+    parts = llm.complete_structured_streaming.call_args.kwargs["user"]
+    url = parts[1]["image_url"]["url"]
+    assert url.startswith("data:image/jpeg;base64,")
+    assert len(base64.b64decode(url.split(",", 1)[1])) < scan_png.stat().st_size
+    assert llm.complete_structured_streaming.call_args.kwargs["plugins"] is None
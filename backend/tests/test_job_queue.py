@@ -0,0 +1,221 @@
+# backend/tests/test_job_queue.py
+# Tests for the durable analysis job queue and pipeline worker
+# Covers: claim order (priority, per-user share, cap), leases + re-queue,
+#         reaping lost jobs, resume, cancel/position, worker run, finish and drain
+# Related: app/services/job_queue.py, app/services/pipeline_worker.py
+
+import asyncio
+import time
+
+import pytest
+
+from app.convex_client import ConvexDB
+from app.services import pipeline_worker as worker_module
+from app.services.job_queue import CANCELED, DONE, FAILED, QUEUED, RUNNING, SQLiteJobQueue
+from app.services.pipeline_worker import PipelineWorker
+
+
+@pytest.fixture
+def queue(tmp_path) -> SQLiteJobQueue:
+    return SQLiteJobQueue(tmp_path / "jobs.sqlite3", lease_seconds=60, max_attempts=2)
+
+
+def _enqueue(queue: SQLiteJobQueue, job_id: str, user_id: str = "u", priority: int = 2) -> None:
+    queue.enqueue(job_id, {"model": "m", "uploads": []}, user_id=user_id, priority=priority)
+    time.sleep(0.001)  # distinct enqueued_at
+
+
+def _expire(queue: SQLiteJobQueue, job_id: str) -> None:
+    with queue._connect() as conn:
+        conn.execute("UPDATE jobs SET heartbeat_at = 0 WHERE id = ?", (job_id,))
+
+
+# ── Queue ──────────────────────────────────────────────────────────────────
+
+
+class TestClaim:
+    def test_lower_priority_class_first(self, queue):
+        _enqueue(queue, "batch", priority=12)
+        _enqueue(queue, "quick", priority=0)
+        assert queue.claim("w1").id == "quick"
+        assert queue.claim("w1").id == "batch"
+        assert queue.claim("w1") is None
+
+    def test_each_job_claimed_once(self, queue):
+        _enqueue(queue, "a1")
+        job = queue.claim("w1")
+        assert job.payload == {"model": "m", "uploads": []}
+        assert job.attempts == 1
+        assert queue.claim("w2") is None
+        assert queue.get("a1")["worker_id"] == "w1"
+
+    def test_user_with_fewer_running_goes_first(self, queue):
+        _enqueue(queue, "a1", user_id="alice")
+        _enqueue(queue, "a2", user_id="alice")
+        _enqueue(queue, "b1", user_id="bob")
+        assert queue.claim("w").id == "a1"
+        assert queue.claim("w").id == "b1"
+
+    def test_per_user_cap_and_max_priority(self, queue):
+        _enqueue(queue, "a1", user_id="alice")
+        _enqueue(queue, "a2", user_id="alice")
+        _enqueue(queue, "batch", user_id="bob", priority=12)
+        assert queue.claim("w", per_user=1).id == "a1"
+        assert queue.claim("w", per_user=1, max_priority=9) is None
+        assert queue.claim("w", per_user=1).id == "batch"
+
+
+class TestLeases:
+    def test_expired_lease_is_reclaimed(self, queue):
+        _enqueue(queue, "a1")
+        queue.claim("w1")
+        _expire(queue, "a1")
+
+        job = queue.claim("w2")
+        assert job.id == "a1" and job.attempts == 2
+        assert queue.heartbeat("a1", "w1") is False
+        assert queue.heartbeat("a1", "w2") is True
+
+    def test_reap_fails_job_after_last_attempt(self, queue):
+        _enqueue(queue, "a1")
+        queue.claim("w1")
+        _expire(queue, "a1")
+        queue.claim("w2")
+        _expire(queue, "a1")
+
+        assert queue.claim("w3") is None
+        assert [job.id for job in queue.reap()] == ["a1"]
+        assert queue.get("a1")["error"] == "worker lost"
+        assert queue.reap() == []
+
+    def test_requeue_does_not_count_attempt(self, queue):
+        _enqueue(queue, "a1")
+        queue.claim("w1")
+        queue.requeue("a1", "w1")
+        assert queue.get("a1")["status"] == QUEUED
+        assert queue.claim("w2").attempts == 1
+
+    def test_finish_only_by_owner(self, queue):
+        _enqueue(queue, "a1")
+        queue.claim("w1")
+        queue.finish("a1", "w2")
+        assert queue.get("a1")["status"] == RUNNING
+        queue.finish("a1", "w1")
+        assert queue.get("a1")["status"] == DONE
+
+
+def test_resume_requeues_finished_job(queue):
+    _enqueue(queue, "a1")
+    assert queue.resume("a1") is False  # still queued
+    queue.claim("w1")
+    queue.finish("a1", "w1", error="boom")
+
+    assert queue.resume("a1") is True
+    job = queue.get("a1")
+    assert job["status"] == QUEUED and job["error"] is None
+    assert queue.claim("w2").attempts == 1
+
+
+def test_cancel_and_position(queue):
+    _enqueue(queue, "a1")
+    _enqueue(queue, "a2")
+    _enqueue(queue, "urgent", priority=0)
+    assert queue.position("urgent") == 0
+    assert queue.position("a2") == 2
+
+    assert queue.cancel("a1") is True
+    assert queue.get("a1")["status"] == CANCELED
+    assert queue.position("a2") == 1
+    queue.claim("w")
+    assert queue.cancel("urgent") is False  # already running
+    assert queue.stats()[CANCELED] == 1
+
+
+# ── Worker ─────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_and_finishes_jobs(queue, monkeypatch):
+    ran: list[str] = []
+
+    async def fake_run(db, analysis_id, params):
+        ran.append(analysis_id)
+
+    monkeypatch.setattr(worker_module, "run_analysis", fake_run)
+    _enqueue(queue, "a1")
+    _enqueue(queue, "a2")
+    worker = PipelineWorker(queue, ConvexDB(url=""), worker_id="w", poll_seconds=0.01)
+    task = asyncio.create_task(worker.run())
+    for _ in range(100):
+        if queue.stats()[DONE] == 2:
+            break
+        await asyncio.sleep(0.01)
+    await worker.drain(1)
+    task.cancel()
+
+    assert sorted(ran) == ["a1", "a2"]
+    assert queue.stats()[DONE] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_analysis_fails_its_job(queue, monkeypatch):
+    async def failing_run(db, analysis_id, params):
+        return "Parsing failed"
+
+    monkeypatch.setattr(worker_module, "run_analysis", failing_run)
+    _enqueue(queue, "a1")
+    worker = PipelineWorker(queue, ConvexDB(url=""), worker_id="w", poll_seconds=0.01)
+    task = asyncio.create_task(worker.run())
+    for _ in range(100):
+        if queue.stats()[FAILED] == 1:
+            break
+        await asyncio.sleep(0.01)
+    await worker.drain(1)
+    task.cancel()
+
+    job = queue.get("a1")
+    assert job["status"] == FAILED
+    assert job["error"] == "Parsing failed"
+
+
+@pytest.mark.asyncio
+async def test_drain_hands_unfinished_job_back(queue, monkeypatch):
+    started = asyncio.Event()
+
+    async def slow_run(db, analysis_id, params):
+        started.set()
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(worker_module, "run_analysis", slow_run)
+    _enqueue(queue, "a1")
+    worker = PipelineWorker(queue, ConvexDB(url=""), worker_id="w", poll_seconds=0.01)
+    task = asyncio.create_task(worker.run())
+    await asyncio.wait_for(started.wait(), 1)
+
+    await worker.drain(0.05)
+    task.cancel()
+    job = queue.get("a1")
+    assert job["status"] == QUEUED
+    assert job["attempts"] == 0
+    assert worker.running == 0
+
+
+@pytest.mark.asyncio
+async def test_run_analysis_without_api_key_fails_record(monkeypatch):
+    from app.config import get_settings
+    from app.services.workspace import get_workspace_manager
+
+    monkeypatch.setattr(get_settings(), "openrouter_api_key", "")
+    db = ConvexDB(url="")
+    analysis_id = await db.create_analysis(model="m")
+    get_workspace_manager().create(analysis_id)
+
+    error = await worker_module.run_analysis(db, analysis_id, {"model": "m", "uploads": []})
+
+    record = await db.get_analysis(analysis_id)
+    assert error == record["error"]
+    assert record["status"] == "failed"
+    assert "API key" in record["error"]
+    # Failed analyses keep their uploads (and checkpoints) for a resume
+    assert get_workspace_manager().get(analysis_id) is None
+    assert get_workspace_manager().locate(analysis_id) is not None
@@ -0,0 +1,228 @@
+# backend/tests/test_llm_governor.py
+# Tests for the process-wide LLM concurrency governor (services/llm_governor.py)
+# Covers: AIMD increase/decrease, per-model and per-provider caps,
+#         round-robin fairness across analyses, cancellation, LLMClient wiring
+# Related: app/services/llm_governor.py, app/services/llm.py
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.services.llm import LLMClient
+from app.services.llm_governor import AIMDLimit, LLMGovernor, get_llm_governor, provider_of
+
+
+def _governor(**overrides) -> LLMGovernor:
+    params = {"provider_ceiling": 4, "model_ceiling": 2, "initial": 2}
+    params.update(overrides)
+    return LLMGovernor(**params)
+
+
+# ── AIMDLimit ──────────────────────────────────────────────────────────────
+
+
+class TestAIMDLimit:
+    def test_grows_by_about_one_per_window(self):
+        limit = AIMDLimit(initial=2, ceiling=10)
+        for _ in range(2):
+            limit.on_success(1.0)
+        assert 2.8 < limit.limit < 3.1
+
+    def test_never_exceeds_ceiling(self):
+        limit = AIMDLimit(initial=2, ceiling=3)
+        for _ in range(50):
+            limit.on_success(1.0)
+        assert limit.limit == 3
+
+    def test_halves_once_per_burst_of_429s(self):
+        limit = AIMDLimit(initial=8, ceiling=8)
+        limit.on_rate_limited(now=100.0)
+        limit.on_rate_limited(now=100.1)
+        assert limit.limit == 4
+        assert limit.rate_limited == 2
+        limit.on_rate_limited(now=102.0)
+        assert limit.limit == 2
+
+    def test_floor_is_one(self):
+        limit = AIMDLimit(initial=1, ceiling=8)
+        limit.on_rate_limited(now=0.0)
+        assert limit.slots == 1
+
+    def test_stops_growing_when_latency_climbs(self):
+        limit = AIMDLimit(initial=2, ceiling=50, latency_tolerance=2.0)
+        limit.on_success(1.0)
+        for _ in range(20):
+            limit.on_success(20.0)
+        assert limit.latency > 2.0 * limit.baseline
+        before = limit.limit
+        limit.on_success(20.0)
+        assert limit.limit == before
+
+
+def test_provider_of():
+    assert provider_of("anthropic/claude-sonnet-4") == "anthropic"
+    assert provider_of("local-model") == "local-model"
+
+
+# ── LLMGovernor ────────────────────────────────────────────────────────────
+
+
+class TestGovernor:
+    @pytest.mark.asyncio
+    async def test_model_cap_queues_extra_requests(self):
+        gov = _governor()
+        a = await gov.acquire("openai/m1")
+        b = await gov.acquire("openai/m1")
+        third = asyncio.create_task(gov.acquire("openai/m1"))
+        await asyncio.sleep(0)
+        assert not third.done()
+
+        gov.release(a)
+        permit = await asyncio.wait_for(third, 1)
+        assert permit.wait_seconds >= 0
+        assert gov.queued == 1
+        gov.release(b)
+        gov.release(permit)
+
+    @pytest.mark.asyncio
+    async def test_other_model_not_blocked_by_full_model(self):
+        gov = _governor(provider_ceiling=4, initial=4)
+        held = [await gov.acquire("openai/m1") for _ in range(2)]
+        blocked = asyncio.create_task(gov.acquire("openai/m1"))
+        await asyncio.sleep(0)
+
+        other = await asyncio.wait_for(gov.acquire("openai/m2"), 1)
+        assert not blocked.done()
+        for permit in [*held, other]:
+            gov.release(permit)
+        gov.release(await blocked)
+
+    @pytest.mark.asyncio
+    async def test_provider_cap_spans_models(self):
+        gov = _governor(provider_ceiling=2, model_ceiling=2, initial=2)
+        a = await gov.acquire("openai/m1")
+        b = await gov.acquire("openai/m2")
+        third = asyncio.create_task(gov.acquire("openai/m3"))
+        await asyncio.sleep(0)
+        assert not third.done()
+
+        other_provider = await asyncio.wait_for(gov.acquire("google/g1"), 1)
+        gov.release(a)
+        gov.release(await asyncio.wait_for(third, 1))
+        gov.release(b)
+        gov.release(other_provider)
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_analyses(self):
+        gov = _governor(provider_ceiling=1, model_ceiling=1, initial=1)
+        holder = await gov.acquire("openai/m1", "big")
+        order: list[str] = []
+
+        async def request(analysis_id: str) -> None:
+            async with gov.slot("openai/m1", analysis_id):
+                order.append(analysis_id)
+
+        # The big analysis queues four requests before the small one arrives
+        tasks = [asyncio.create_task(request("big")) for _ in range(4)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("small")))
+        await asyncio.sleep(0)
+
+        gov.release(holder)
+        await asyncio.gather(*tasks)
+        assert order.index("small") == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        gov = _governor(provider_ceiling=1, model_ceiling=1, initial=1)
+        holder = await gov.acquire("openai/m1")
+        waiter = asyncio.create_task(gov.acquire("openai/m1", "a1"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert gov.stats()["waiting"] == 0
+        gov.release(holder)
+        permit = await asyncio.wait_for(gov.acquire("openai/m1"), 1)
+        assert permit.wait_seconds == 0.0
+        gov.release(permit)
+
+    @pytest.mark.asyncio
+    async def test_429_shrinks_limits(self):
+        gov = _governor(provider_ceiling=8, model_ceiling=8, initial=8)
+        async with gov.slot("openai/m1") as permit:
+            permit.observe(429)
+
+        limits = gov.stats()["limits"]
+        assert limits["openai/m1"]["limit"] == 4
+        assert limits["openai/*"]["limit"] == 4
+        assert limits["openai/m1"]["rate_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_success_grows_limits(self):
+        gov = _governor(provider_ceiling=8, model_ceiling=8, initial=2)
+        async with gov.slot("openai/m1") as permit:
+            permit.observe(200)
+        assert gov.stats()["limits"]["openai/m1"]["limit"] == 2.5
+
+
+# ── LLMClient wiring ───────────────────────────────────────────────────────
+
+
+class TestClientUsesGovernor:
+    @pytest.mark.asyncio
+    async def test_request_holds_a_slot_and_reports_429(self, monkeypatch):
+        monkeypatch.setattr("app.services.llm.BACKOFF_SECONDS", [0, 0, 0])
+        client = LLMClient(api_key="k", default_model="openai/m1", analysis_id="a1")
+        inflight: list[int] = []
+
+        async def fake_request(method, url, **kwargs):
+            inflight.append(get_llm_governor().stats()["limits"]["openai/m1"]["inflight"])
+            if len(inflight) == 1:
+                return httpx.Response(429, text="slow down")
+            return httpx.Response(200, json={"ok": True})
+
+        with patch.object(client._client, "request", AsyncMock(side_effect=fake_request)):
+            response = await client._request_with_retry(
+                "POST", "/chat/completions", json={"model": "openai/m1"},
+            )
+
+        assert response.status_code == 200
+        assert inflight == [1, 1]
+        stats = get_llm_governor().stats()
+        assert stats["limits"]["openai/m1"]["inflight"] == 0
+        assert stats["limits"]["openai/m1"]["rate_limited"] == 1
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_model_listing_bypasses_governor(self):
+        client = LLMClient(api_key="k")
+        with patch.object(
+            client._client, "request", AsyncMock(return_value=httpx.Response(200, json={})),
+        ):
+            await client._request_with_retry("GET", "/models")
+        assert get_llm_governor().stats()["granted"] == 0
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_lower_priority_class_served_first():
+    gov = _governor(provider_ceiling=1, model_ceiling=1, initial=1)
+    holder = await gov.acquire("openai/m1")
+    order: list[str] = []
+
+    async def request(analysis_id: str, priority: int) -> None:
+        async with gov.slot("openai/m1", analysis_id, priority):
+            order.append(analysis_id)
+
+    tasks = [
+        asyncio.create_task(request("batch", 10)),
+        asyncio.create_task(request("interactive", 0)),
+    ]
+    await asyncio.sleep(0)
+    gov.release(holder)
+    await asyncio.gather(*tasks)
+    assert order == ["interactive", "batch"]
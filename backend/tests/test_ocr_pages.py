@@ -0,0 +1,192 @@
+# backend/tests/test_ocr_pages.py
+# Tests for per-page scanned detection and page-subset OCR (services/ocr_pages.py)
+# Covers: scanned-page markers, subset PDFs, page rendering budget, parse_document
+#         mixed-PDF detection, extraction merge via local OCR and multimodal subset
+# Related: app/services/ocr_pages.py, app/services/parser.py, app/services/extraction.py
+
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pypdf import PdfReader
+
+from app.models.schemas import ExtractionResult
+from app.services import extraction
+from app.services.extraction import extract_document
+from app.services.llm import LLMClient
+from app.services.ocr_pages import (
+    mark_scanned_pages,
+    render_pages_jpeg,
+    replace_markers,
+    scanned_pages,
+    scanned_ranges,
+    strip_markers,
+    write_pdf_subset,
+)
+from app.services.parser import parse_document
+
+_LINE = "Tiekėjas privalo pateikti kvalifikacijos dokumentus ir garantijas. "
+
+
+def _make_pdf(
+    path: Path, text_pages: set[int], pages: int, blank_pages: frozenset[int] = frozenset()
+) -> Path:
+    """PDF where only ``text_pages`` (1-based) carry a text layer.
+
+    ``blank_pages`` get a short line of text and no image; the rest an image.
+    """
+    from PIL import Image
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    scan = ImageReader(Image.new("L", (60, 60), 200))  # stand-in for a scanned page
+    pdf = canvas.Canvas(str(path))
+    for page in range(1, pages + 1):
+        if page in text_pages:
+            for line in range(6):
+                pdf.drawString(50, 780 - line * 14, f"Puslapis {page}. {_LINE}")
+        elif page in blank_pages:
+            pdf.drawString(50, 780, f"Parašas {page}")
+        else:
+            pdf.drawImage(scan, 100, 300, 300, 300)
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+@pytest.fixture
+def mixed_pdf(tmp_path: Path) -> Path:
+    return _make_pdf(tmp_path / "mixed.pdf", text_pages={1, 4, 6}, pages=6)
+
+
+# ── Markers ──────────────────────────────────────────────────────────────────
+
+
+class TestMarkers:
+    def test_runs_collapse_into_one_marker(self):
+        blocks = mark_scanned_pages(["a" * 200, "", " ", "b" * 200, "x"], threshold=100)
+        content = "\n\n".join(blocks)
+        assert scanned_ranges(content) == [(2, 3), (5, 5)]
+        assert scanned_pages(content) == [2, 3, 5]
+        assert strip_markers(content).split() == ["a" * 200, "b" * 200]
+
+    def test_threshold_zero_is_noop(self):
+        texts = ["a", ""]
+        assert mark_scanned_pages(texts, threshold=0) is texts
+
+    def test_only_pages_with_images_are_scanned(self):
+        blocks = mark_scanned_pages(["a" * 200, "", "Parašas"], threshold=100, images={2})
+        content = "\n\n".join(blocks)
+        assert scanned_ranges(content) == [(2, 2)]
+        assert "Parašas" in content
+
+    def test_first_page_offset(self):
+        content = "\n\n".join(mark_scanned_pages(["", "a" * 200], threshold=10, first_page=41))
+        assert scanned_ranges(content) == [(41, 41)]
+
+    def test_replace_keeps_page_order(self):
+        content = "\n\n".join(mark_scanned_pages(["p1" * 60, "", "p3" * 60, ""], threshold=100))
+        merged = replace_markers(content, lambda a, b: f"OCR {a}-{b}")
+        assert merged.index("p1") < merged.index("OCR 2-2") < merged.index("p3") < merged.index("OCR 4-4")
+
+
+# ── Subsets and rendering ────────────────────────────────────────────────────
+
+
+def test_write_pdf_subset(mixed_pdf: Path, tmp_path: Path):
+    dest = tmp_path / "subset.pdf"
+    size = write_pdf_subset(mixed_pdf, [2, 3, 5], dest)
+    assert size == dest.stat().st_size > 0
+    assert len(PdfReader(str(dest)).pages) == 3
+
+
+def test_render_pages_fits_budget(mixed_pdf: Path):
+    images = render_pages_jpeg(mixed_pdf, [2, 3], max_total_bytes=2 * 1024 * 1024)
+    assert images is not None and len(images) == 2
+    assert all(img[:2] == b"\xff\xd8" for img in images)  # JPEG SOI
+    assert render_pages_jpeg(mixed_pdf, [2, 3], max_total_bytes=1024) is None
+
+
+# ── parse_document detection ─────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_mixed_pdf_lists_scanned_pages(mixed_pdf: Path):
+    result = await parse_document(mixed_pdf, "mixed.pdf")
+    assert result.is_scanned is False
+    assert result.scanned_pages == [2, 3, 5]
+    assert "Puslapis 6." in result.content
+
+
+@pytest.mark.asyncio
+async def test_short_text_only_page_is_not_scanned(tmp_path: Path):
+    path = _make_pdf(tmp_path / "signed.pdf", text_pages={1, 3}, pages=4, blank_pages=frozenset({2}))
+    result = await parse_document(path, "signed.pdf")
+    assert result.scanned_pages == [4]
+    assert "Parašas 2" in result.content
+
+
+@pytest.mark.asyncio
+async def test_fully_scanned_pdf_is_scanned(tmp_path: Path):
+    path = _make_pdf(tmp_path / "scan.pdf", text_pages=set(), pages=3)
+    result = await parse_document(path, "scan.pdf")
+    assert result.is_scanned is True
+    assert result.scanned_pages == []
+
+
+# ── Extraction merge ─────────────────────────────────────────────────────────
+
+
+def _mock_llm() -> MagicMock:
+    llm = MagicMock(spec=LLMClient)
+    usage = {"input_tokens": 100, "output_tokens": 10}
+    llm.complete_structured_streaming = AsyncMock(side_effect=[
+        (ExtractionResult(key_requirements=["Tekstinis reikalavimas"]), usage),
+        (ExtractionResult(key_requirements=["Skenuotas reikalavimas"]), usage),
+    ])
+    return llm
+
+
+@pytest.mark.asyncio
+async def test_local_ocr_text_merged_in_page_order(mixed_pdf: Path, monkeypatch):
+    doc = await parse_document(mixed_pdf, "mixed.pdf")
+    monkeypatch.setattr(extraction, "OPENROUTER_MAX_FILE_SIZE", 1)  # force local OCR
+    llm = _mock_llm()
+
+    async def fake_ocr(path: Path, content_hash=None, **kwargs):
+        pages = len(PdfReader(str(path)).pages)
+        return f"OCR {path.stem} ({pages} psl.)", pages
+
+    with patch("app.services.parser.run_local_ocr", side_effect=fake_ocr) as ocr:
+        result, usage = await extract_document(doc, llm, model="test-model")
+
+    assert ocr.await_count == 2
+    prompt = llm.complete_structured_streaming.call_args.kwargs["user"]
+    assert "scanned-pages" not in prompt
+    assert (
+        prompt.index("Puslapis 1.")
+        < prompt.index("OCR p2-3 (2 psl.)")
+        < prompt.index("Puslapis 4.")
+        < prompt.index("OCR p5-5 (1 psl.)")
+        < prompt.index("Puslapis 6.")
+    )
+    assert result.key_requirements == ["Tekstinis reikalavimas"]
+    assert usage["input_tokens"] == 100
+
+
+@pytest.mark.asyncio
+async def test_small_subset_goes_to_multimodal_and_merges(mixed_pdf: Path):
+    doc = await parse_document(mixed_pdf, "mixed.pdf")
+    llm = _mock_llm()
+
+    with patch("app.services.parser.run_local_ocr") as ocr:
+        result, usage = await extract_document(doc, llm, model="test-model")
+
+    ocr.assert_not_called()
+    calls = llm.complete_structured_streaming.call_args_list
+    scan_call = next(c for c in calls if isinstance(c.kwargs["user"], list))
+    text_call = next(c for c in calls if isinstance(c.kwargs["user"], str))
+    assert scan_call.kwargs["user"][1]["type"] == "file"  # subset PDF attached
+    assert "Puslapiai 2–3: skenuoti" in text_call.kwargs["user"]
+    assert sorted(result.key_requirements) == ["Skenuotas reikalavimas", "Tekstinis reikalavimas"]
+    assert usage["input_tokens"] == 200
@@ -0,0 +1,194 @@
+# backend/tests/test_ocr_scheduler.py
+# Tests for the CPU-aware local OCR scheduler (services/ocr_scheduler.py)
+# Covers: page jobs, CPU budget, round-robin fairness across documents,
+#         page-order merge + progress, cancellation via cancel_event, pipeline event
+# Related: app/services/ocr_scheduler.py, app/services/parser.py (run_local_ocr)
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from pypdf import PdfReader
+
+from app.config import get_settings
+from app.services import ocr_scheduler
+from app.services.ocr_scheduler import OcrScheduler, job_slots, ocr_document, page_jobs
+
+_log: list[tuple[str, int]] = []
+_log_lock = threading.Lock()
+_active = 0
+_peak = 0
+
+
+def _fake_job(file_path: Path, start: int, end: int, page_count: int) -> tuple[str, int]:
+    """Stand-in OCR job: records order and concurrency."""
+    global _active, _peak
+    with _log_lock:
+        _log.append((file_path.name, start))
+        _active += 1
+        _peak = max(_peak, _active)
+    time.sleep(0.02)
+    with _log_lock:
+        _active -= 1
+    return f"{file_path.name}:{start}-{end}", end - start + 1
+
+
+@pytest.fixture
+def thread_ocr(monkeypatch):
+    """OCR jobs in threads so patches and fakes apply; no preprocessing (text-layer fakes)."""
+    global _active, _peak
+    monkeypatch.setattr(get_settings(), "parser_backend", "thread")
+    monkeypatch.setattr(get_settings(), "ocr_image_preset", "off")
+    _log.clear()
+    _active = _peak = 0
+    yield get_settings()
+
+
+def _make_pdf(path: Path, pages: int) -> Path:
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(str(path))
+    for page in range(1, pages + 1):
+        pdf.drawString(50, 780, f"Puslapis {page}")
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+# ── Budget and jobs ──────────────────────────────────────────────────────────
+
+
+def test_page_jobs_cover_every_page():
+    assert page_jobs(20, 8) == [(1, 8), (9, 16), (17, 20)]
+    assert page_jobs(3, 8) == [(1, 3)]
+    assert page_jobs(0, 8) == []
+
+
+def test_job_slots_follow_budget(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ocr_cpu_budget", 8)
+    monkeypatch.setattr(settings, "ocr_threads_per_job", 2)
+    assert job_slots() == 4
+    monkeypatch.setattr(settings, "ocr_cpu_budget", 0)
+    monkeypatch.setattr(settings, "ocr_threads_per_job", 1)
+    assert job_slots() >= 1
+
+
+@pytest.mark.asyncio
+async def test_budget_never_exceeded(thread_ocr):
+    scheduler = OcrScheduler(slots=2)
+    docs = [Path(f"doc{i}.pdf") for i in range(3)]
+    await asyncio.gather(*(
+        scheduler.run_ranges(d.name, _fake_job, d, page_jobs(12, 3), 12) for d in docs
+    ))
+    assert _peak <= 2
+    assert len(_log) == 12
+    assert scheduler.stats() == {
+        "slots": 2, "running": 0, "waiting": 0, "completed": 12, "documents": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_slots_rotate_between_documents(thread_ocr):
+    scheduler = OcrScheduler(slots=1)
+    big, small = Path("big.pdf"), Path("small.pdf")
+    await asyncio.gather(
+        scheduler.run_ranges("big", _fake_job, big, page_jobs(4, 1), 4),
+        scheduler.run_ranges("small", _fake_job, small, page_jobs(2, 1), 2),
+    )
+    # The small scan is interleaved, not queued behind every page of the big one
+    assert _log == [
+        ("big.pdf", 1), ("big.pdf", 2), ("small.pdf", 1),
+        ("big.pdf", 3), ("small.pdf", 2), ("big.pdf", 4),
+    ]
+
+
+# ── Documents ────────────────────────────────────────────────────────────────
+
+
+def _ocr_first_line(path: Path) -> tuple[str, int]:
+    reader = PdfReader(str(path))
+    return f"OCR {reader.pages[0].extract_text().strip()}", len(reader.pages)
+
+
+@pytest.mark.asyncio
+async def test_document_split_into_page_jobs_and_merged_in_order(thread_ocr, tmp_path, monkeypatch):
+    monkeypatch.setattr(thread_ocr, "ocr_pages_per_job", 8)
+    scan = _make_pdf(tmp_path / "scan.pdf", pages=20)
+    progress: list[tuple[int, int]] = []
+
+    with patch("app.services.parser.parse_with_ocr", side_effect=_ocr_first_line) as ocr:
+        text, pages = await ocr_document(scan, on_progress=lambda d, t: progress.append((d, t)))
+
+    assert pages == 20
+    assert ocr.call_count == 3
+    assert text.split("\n\n") == ["OCR Puslapis 1", "OCR Puslapis 9", "OCR Puslapis 17"]
+    assert progress[-1] == (20, 20)
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+
+
+@pytest.mark.asyncio
+async def test_image_is_one_job_with_docling_page_count(thread_ocr, tmp_path):
+    image = tmp_path / "scan.tiff"
+    image.write_bytes(b"II*\x00fake")
+    with patch("app.services.parser.parse_with_ocr", return_value=("TIFF tekstas", 3)):
+        assert await ocr_document(image) == ("TIFF tekstas", 3)
+
+
+@pytest.mark.asyncio
+async def test_cancel_event_drops_pending_jobs(thread_ocr):
+    scheduler = OcrScheduler(slots=1)
+    cancel = asyncio.Event()
+
+    with pytest.raises(asyncio.CancelledError):
+        await scheduler.run_ranges(
+            "scan", _fake_job, Path("scan.pdf"), page_jobs(10, 1), 10,
+            on_progress=lambda done, total: cancel.set(), cancel_event=cancel,
+        )
+
+    await asyncio.sleep(0.05)  # let the running job's slot come back
+    assert len(_log) < 10
+    assert scheduler.stats()["running"] == 0
+    assert scheduler.stats()["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_local_ocr_reports_progress(thread_ocr, tmp_path, monkeypatch):
+    from app.services.parser import run_local_ocr
+
+    monkeypatch.setattr(thread_ocr, "ocr_pages_per_job", 2)
+    scan = _make_pdf(tmp_path / "scan.pdf", pages=5)
+    progress: list[tuple[int, int]] = []
+    with patch("app.services.parser.parse_with_ocr", side_effect=_ocr_first_line):
+        _, pages = await run_local_ocr(scan, on_progress=lambda d, t: progress.append((d, t)))
+    assert pages == 5
+    assert sorted(progress) == [(2, 5), (4, 5), (5, 5)]
+    assert ocr_scheduler.get_scheduler().stats()["completed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_extract_all_tags_progress_with_document():
+    from unittest.mock import MagicMock
+
+    from app.models.schemas import DocumentType, ExtractionResult
+    from app.services import extraction
+    from app.services.parser import ParsedDocument
+
+    doc = ParsedDocument(
+        filename="skenas.pdf", content="", page_count=10, file_size_bytes=1,
+        doc_type=DocumentType.OTHER, token_estimate=0,
+    )
+
+    async def fake_extract(doc, llm, model, on_ocr_progress=None, **kwargs):
+        on_ocr_progress(4, 10)
+        return ExtractionResult(), {"input_tokens": 0, "output_tokens": 0}
+
+    events: list[tuple] = []
+    with patch.object(extraction, "extract_document", side_effect=fake_extract):
+        await extraction.extract_all(
+            [doc], MagicMock(), "m", on_ocr_progress=lambda *a: events.append(a),
+        )
+    assert events == [(0, "skenas.pdf", 4, 10)]
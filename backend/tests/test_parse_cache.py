@@ -0,0 +1,140 @@
+# backend/tests/test_parse_cache.py
+# Tests for the content-addressed parse cache (services/disk_cache.py, services/parse_cache.py)
+# Covers: DiskCache get/put, LRU eviction, TTL, counters, parse_document and local OCR cache hits
+# Related: app/services/disk_cache.py, app/services/parse_cache.py, app/services/parser.py
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from docx import Document as DocxDocument
+
+from app.services.disk_cache import DiskCache
+from app.services.parse_cache import file_sha256, get_parse_cache
+from app.services.parser import parse_document, run_local_ocr
+
+
+# ── DiskCache ────────────────────────────────────────────────────────────────
+
+
+class TestDiskCache:
+    def test_put_then_get(self, tmp_path: Path):
+        cache = DiskCache(tmp_path, max_bytes=1024 * 1024)
+        cache.put("ab" * 32, {"content": "tekstas", "page_count": 3})
+        assert cache.get("ab" * 32) == {"content": "tekstas", "page_count": 3}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["writes"] == 1
+
+    def test_miss_is_counted(self, tmp_path: Path):
+        cache = DiskCache(tmp_path, max_bytes=1024)
+        assert cache.get("cd" * 32) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_no_temp_files_left_behind(self, tmp_path: Path):
+        cache = DiskCache(tmp_path, max_bytes=1024 * 1024)
+        cache.put("ef" * 32, {"x": 1})
+        leftovers = [p for p in tmp_path.rglob("*") if p.name.startswith(".tmp-")]
+        assert leftovers == []
+
+    def test_corrupt_entry_is_dropped(self, tmp_path: Path):
+        cache = DiskCache(tmp_path, max_bytes=1024 * 1024)
+        key = "12" * 32
+        cache.put(key, {"x": 1})
+        cache._path(key).write_text("{not json")
+        assert cache.get(key) is None
+        assert not cache._path(key).exists()
+
+    def test_lru_eviction_keeps_recently_used(self, tmp_path: Path):
+        cache = DiskCache(tmp_path, max_bytes=2500)
+        payload = {"content": "x" * 900}
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        for i, key in enumerate(keys[:2]):
+            cache.put(key, payload)
+            os.utime(cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+        cache.get(keys[0])  # keys[0] becomes most recently used
+        cache.put(keys[2], payload)
+
+        assert cache.get(keys[1]) is None  # least recently used → evicted
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[2]) is not None
+        assert cache.stats()["evictions"] >= 1
+
+    def test_ttl_expires_entries_by_age(self, tmp_path: Path):
+        cache = DiskCache(tmp_path, max_bytes=1024 * 1024, ttl_seconds=60)
+        cache.put("aa" * 32, {"x": 1})
+        assert cache.get("aa" * 32) == {"x": 1}
+
+        with patch("app.services.disk_cache.time.time", return_value=time.time() + 120):
+            assert cache.get("aa" * 32) is None
+        assert not cache._path("aa" * 32).exists()
+        assert cache.stats()["expired"] == 1
+
+
+# ── parse_document integration ───────────────────────────────────────────────
+
+
+@pytest.fixture
+def spec_docx(tmp_path: Path) -> Path:
+    doc = DocxDocument()
+    doc.add_heading("Techninė specifikacija", level=1)
+    doc.add_paragraph("Reikalavimai įrangai.")
+    path = tmp_path / "spec.docx"
+    doc.save(str(path))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_reupload_is_served_from_cache(spec_docx: Path, tmp_path: Path):
+    first = await parse_document(spec_docx, "spec.docx")
+
+    reupload = tmp_path / "kopija.docx"
+    reupload.write_bytes(spec_docx.read_bytes())
+    with patch("app.services.parser._parse_uncached") as parse_mock:
+        second = await parse_document(reupload, "kopija.docx")
+
+    parse_mock.assert_not_called()
+    assert second.content == first.content
+    assert second.page_count == first.page_count
+    assert second.content_hash == first.content_hash == file_sha256(spec_docx)
+    assert second.filename == "kopija.docx"
+    assert get_parse_cache().stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_parse_errors_are_not_cached(tmp_path: Path):
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf")
+    await parse_document(bad, "bad.pdf")
+    assert get_parse_cache().stats()["writes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_disabled(spec_docx: Path, monkeypatch):
+    from app.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "parse_cache_enabled", False)
+    get_parse_cache.cache_clear()
+    result = await parse_document(spec_docx, "spec.docx")
+    assert "[ERROR]" not in result.content
+    assert get_parse_cache() is None
+
+
+@pytest.mark.asyncio
+async def test_local_ocr_result_is_cached(tmp_path: Path, monkeypatch):
+    from app.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "parser_backend", "thread")  # OCR jobs see the patch
+    scan = tmp_path / "scan.pdf"
+    scan.write_bytes(b"%PDF-1.4 scanned bytes")
+
+    with patch("app.services.parser.parse_with_ocr", return_value=("OCR tekstas", 2)) as ocr:
+        assert await run_local_ocr(scan) == ("OCR tekstas", 2)
+        assert await run_local_ocr(scan, file_sha256(scan)) == ("OCR tekstas", 2)
+        assert ocr.call_count == 1
+
+        # Different scan preprocessing, different OCR text
+        monkeypatch.setattr(get_settings(), "ocr_image_preset", "quality")
+        assert await run_local_ocr(scan) == ("OCR tekstas", 2)
+        assert ocr.call_count == 2
@@ -0,0 +1,87 @@
+# backend/tests/test_parse_pool.py
+# Tests for the parser execution backend (services/parse_pool.py)
+# Covers: process/thread dispatch, crashed worker recovery, hung worker timeout
+# Related: app/services/parse_pool.py, app/services/parser.py
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from app.config import get_settings
+from app.services import parse_pool
+from app.services.parse_pool import run_parser, shutdown_pool, start_pool
+
+
+# ── Worker functions (top-level so they pickle into spawned workers) ─────────
+
+
+def _square(x: int) -> tuple[int, int]:
+    return x * x, os.getpid()
+
+
+def _crash_once(marker: str) -> str:
+    if not os.path.exists(marker):
+        Path(marker).write_text("crashed")
+        os._exit(1)
+    return "recovered"
+
+
+def _sleep(seconds: float) -> str:
+    time.sleep(seconds)
+    return "done"
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def process_backend(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "parser_backend", "process")
+    monkeypatch.setattr(settings, "parser_max_concurrent", 2)
+    yield settings
+    shutdown_pool()
+
+
+# ── Tests ────────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_process_backend_runs_out_of_process(process_backend):
+    await start_pool()
+    value, pid = await run_parser(_square, 7)
+    assert value == 49
+    assert pid != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_thread_backend_runs_in_process(monkeypatch):
+    monkeypatch.setattr(get_settings(), "parser_backend", "thread")
+    value, pid = await run_parser(_square, 3)
+    assert value == 9
+    assert pid == os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_replaced_and_job_retried(process_backend, tmp_path: Path):
+    marker = tmp_path / "crash_marker"
+    assert await run_parser(_crash_once, str(marker)) == "recovered"
+    assert marker.exists()
+
+
+@pytest.mark.asyncio
+async def test_hung_worker_times_out_and_pool_restarts(process_backend):
+    first_pool = parse_pool._get_pool()
+    with pytest.raises(TimeoutError):
+        await run_parser(_sleep, 30, timeout=1)
+    assert parse_pool._pool is not first_pool
+
+    value, _ = await run_parser(_square, 4, timeout=30)
+    assert value == 16
+
+
+def test_pool_size_zero_means_all_cores(monkeypatch):
+    monkeypatch.setattr(get_settings(), "parser_max_concurrent", 0)
+    assert parse_pool.pool_size() == (os.cpu_count() or 2)
@@ -1,8 +1,10 @@
 # backend/tests/test_parser.py
 # Tests for the document parsing service (services/parser.py)
-# Covers: Docling conversion, classification heuristics, page estimation, error handling
+# Covers: Docling conversion, DOCX/XLSX/PPTX fast parsers, classification heuristics,
+#         page estimation, error handling, in-memory document sources
 
 import asyncio
+import io
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -11,6 +13,16 @@ import pytest
 from docx import Document as DocxDocument
 
 from app.models.schemas import DocumentType
+from app.services.channel import Channel
+from app.services.document_source import DocumentSource
+from app.services.docx_parser import parse_docx
+from app.services.parser_benchmark import (
+    legacy_parse_docx,
+    make_synthetic_docx,
+    make_synthetic_xlsx,
+)
+from app.services.pptx_parser import parse_pptx
+from app.services.xlsx_parser import parse_xlsx
 from app.services.parser import (
     ParsedDocument,
     _estimate_pages,
@@ -150,6 +162,274 @@ async def test_parse_all_empty():
     assert results == []
 
 
+@pytest.mark.asyncio
+async def test_parse_all_streams_from_channel(sample_docx: Path, minimal_docx: Path):
+    """Files put on a Channel are parsed while the producer is still running."""
+    channel: Channel[tuple[Path, str]] = Channel()
+    parsed: list[str] = []
+    task = asyncio.create_task(parse_all(channel, on_parsed=lambda doc: parsed.append(doc.filename)))
+
+    channel.put((sample_docx, "first.docx"))
+    for _ in range(200):
+        if parsed:
+            break
+        await asyncio.sleep(0.01)
+    assert parsed == ["first.docx"] and not task.done()
+
+    channel.put((minimal_docx, "second.docx"))
+    channel.close()
+    results = await task
+    assert [r.filename for r in results] == ["first.docx", "second.docx"]
+
+
+# ── In-memory sources ────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_parse_in_memory_source(sample_docx: Path, tmp_path: Path):
+    """A buffered archive member is parsed without being written."""
+    target = tmp_path / "unpack" / "spec.docx"
+    source = DocumentSource("spec.docx", target, sample_docx.read_bytes())
+
+    result = await parse_document(source)
+
+    on_disk = await parse_document(sample_docx, "spec.docx")
+    assert result.content == on_disk.content
+    assert result.content_hash == on_disk.content_hash
+    assert result.file_size_bytes == sample_docx.stat().st_size
+    assert result.file_path is None
+    assert not target.exists()
+    assert source.data is None  # buffer released after parsing
+
+
+@pytest.mark.asyncio
+async def test_scanned_in_memory_source_spills(tmp_path: Path):
+    """Image-only PDFs need a file for OCR, so the buffer is spilled to its path."""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=595, height=842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    target = tmp_path / "unpack" / "scan.pdf"
+
+    result = await parse_document(DocumentSource("scan.pdf", target, buffer.getvalue()))
+
+    assert result.is_scanned
+    assert result.file_path == target
+    assert target.read_bytes() == buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_parse_all_mixes_sources_and_tuples(sample_docx: Path, minimal_docx: Path):
+    results = await parse_all([
+        DocumentSource("a.docx", sample_docx.with_name("a.docx"), sample_docx.read_bytes()),
+        (minimal_docx, "b.docx"),
+    ])
+    assert [r.filename for r in results] == ["a.docx", "b.docx"]
+    assert [r.file_path for r in results] == [None, minimal_docx]
+
+
+# ── Streaming DOCX parser tests ──────────────────────────────────────────────
+
+
+@pytest.fixture
+def rich_docx(tmp_path: Path) -> Path:
+    """DOCX with headings, list styles, tabs/line breaks and merged table cells."""
+    doc = DocxDocument()
+    doc.add_heading("Pirkimo sąlygos", level=1)
+    doc.add_heading("Bendrosios nuostatos", level=2)
+    doc.add_heading("Terminai", level=3)
+    doc.add_heading("Papildoma", level=4)
+    doc.add_paragraph("Pirmas punktas", style="List Bullet")
+    doc.add_paragraph("Antras punktas", style="List Number")
+    para = doc.add_paragraph("Eilutė su\tskirtuku")
+    para.add_run().add_break()
+    para.add_run("ir lūžiu")
+    doc.add_paragraph("   ")
+
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 1))  # horizontal span
+    table.cell(1, 2).merge(table.cell(2, 2))  # vertical merge
+    table.cell(0, 0).text = "Pavadinimas"
+    table.cell(0, 2).text = "Kiekis"
+    table.cell(1, 0).text = "Kompiuteris\nnešiojamas"
+    table.cell(1, 2).text = "10"
+    table.cell(2, 0).text = "Monitorius"
+    doc.add_paragraph("Pabaiga")
+
+    path = tmp_path / "rich.docx"
+    doc.save(str(path))
+    return path
+
+
+class TestStreamingDocxParser:
+    def test_matches_python_docx_renderer(self, rich_docx: Path):
+        assert parse_docx(rich_docx) == legacy_parse_docx(rich_docx)
+
+    def test_markdown_structure(self, rich_docx: Path):
+        text, pages = parse_docx(rich_docx)
+        assert "# Pirkimo sąlygos" in text
+        assert "## Bendrosios nuostatos" in text
+        assert "### Terminai" in text
+        assert "#### Papildoma" in text
+        assert "- Pirmas punktas" in text
+        assert "| Pavadinimas | Pavadinimas | Kiekis |" in text
+        assert "| Monitorius |  | 10 |" in text
+        assert pages == 1
+
+    def test_large_document_matches(self, tmp_path: Path):
+        path = make_synthetic_docx(tmp_path / "large.docx", paragraphs=300)
+        assert parse_docx(path) == legacy_parse_docx(path)
+
+    def test_accepts_file_object(self, sample_docx: Path):
+        with open(sample_docx, "rb") as fh:
+            assert parse_docx(fh) == parse_docx(sample_docx)
+
+
+# ── Streaming XLSX parser tests ──────────────────────────────────────────────
+
+
+@pytest.fixture
+def boq_xlsx(tmp_path: Path) -> Path:
+    """Workbook with two data sheets, an empty sheet and mixed cell types."""
+    import datetime as dt
+
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sąmata"
+    ws.append(["Nr.", "Pavadinimas", "Kiekis", "Kaina", "Terminas"])
+    ws.append([1, "Kabelis | 3x2.5", 120.0, 1.75, dt.datetime(2026, 3, 1)])
+    ws.append([])
+    ws.append([2, "Jungiklis\nvidaus", 4, None, None, None])
+    ws.append([3, "Iš viso", None, "=C2*D2"])
+    wb.create_sheet("Tuščias")
+    extra = wb.create_sheet("Priedas")
+    extra.append(["Pastaba"])
+    extra.append(["Taikoma", True])
+    path = tmp_path / "boq.xlsx"
+    wb.save(str(path))
+    return path
+
+
+class TestStreamingXlsxParser:
+    def test_sheet_sections_and_tables(self, boq_xlsx: Path):
+        text, pages = parse_xlsx(boq_xlsx)
+        assert pages == 2
+        assert text.startswith("## Sąmata\n\n| Nr. | Pavadinimas | Kiekis | Kaina | Terminas |")
+        assert "| --- | --- | --- | --- | --- |" in text
+        assert "| 1 | Kabelis \\| 3x2.5 | 120 | 1.75 | 2026-03-01 |" in text
+        assert "| 2 | Jungiklis vidaus | 4 |  |  |" in text
+        assert "## Tuščias" not in text
+        assert "## Priedas" in text
+        assert "| Taikoma | TRUE |" in text
+
+    def test_formula_without_cached_value_is_blank(self, boq_xlsx: Path):
+        text, _ = parse_xlsx(boq_xlsx)
+        assert "| 3 | Iš viso |  |  |  |" in text
+        assert "=C2*D2" not in text
+
+    def test_page_count_matches_estimate(self, tmp_path: Path):
+        path = make_synthetic_xlsx(tmp_path / "large.xlsx", rows=2000, sheets=3)
+        text, pages = parse_xlsx(path)
+        assert pages == 3 == _estimate_pages(text, ".xlsx")
+        assert text.count("\n") > 6000
+
+    @pytest.mark.asyncio
+    async def test_parse_document_uses_fast_path(self, boq_xlsx: Path):
+        with patch("app.services.parser._parse_with_docling") as docling:
+            result = await parse_document(boq_xlsx, "samata.xlsx")
+        docling.assert_not_called()
+        assert result.parser_used == "xlsx-stream"
+        assert result.page_count == 2
+        assert "Kabelis" in result.content
+
+    @pytest.mark.asyncio
+    async def test_docling_fallback_on_error(self, tmp_path: Path):
+        broken = tmp_path / "broken.xlsx"
+        broken.write_bytes(b"PK\x03\x04 not really a workbook")
+        with patch(
+            "app.services.parser._parse_with_docling", return_value=("## Sheet1", 1)
+        ) as docling:
+            result = await parse_document(broken, "broken.xlsx")
+        docling.assert_called_once()
+        assert result.parser_used == "docling-fallback"
+
+
+# ── PPTX parser tests ────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def deck_pptx(tmp_path: Path) -> Path:
+    """Three slides: bullets + notes, a table and grouped text, and an empty slide."""
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.shapes.title.text = "Pirkimo objektas"
+    body = slide.placeholders[1].text_frame
+    body.text = "Serverių įranga"
+    sub = body.add_paragraph()
+    sub.text = "2 vnt.\vsu garantija"
+    sub.level = 1
+    slide.notes_slide.notes_text_frame.text = "Pabrėžti terminus"
+
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = "Kainos"
+    table = slide.shapes.add_table(2, 2, Inches(1), Inches(2), Inches(4), Inches(1)).table
+    table.cell(0, 0).text = "Prekė"
+    table.cell(0, 1).text = "Kaina"
+    table.cell(1, 0).text = "Serveris"
+    table.cell(1, 1).text = "5000"
+    group = slide.shapes.add_group_shape()
+    box = group.shapes.add_textbox(Inches(1), Inches(5), Inches(4), Inches(1))
+    box.text_frame.text = "Kainos be PVM"
+
+    prs.slides.add_slide(prs.slide_layouts[6])
+
+    path = tmp_path / "deck.pptx"
+    prs.save(str(path))
+    return path
+
+
+class TestPptxParser:
+    def test_one_page_per_slide(self, deck_pptx: Path):
+        _, pages = parse_pptx(deck_pptx)
+        assert pages == 3
+
+    def test_slide_markdown(self, deck_pptx: Path):
+        text, _ = parse_pptx(deck_pptx)
+        assert "## Slide 1: Pirkimo objektas" in text
+        assert "- Serverių įranga\n  - 2 vnt. su garantija" in text
+        assert "> Notes: Pabrėžti terminus" in text
+        assert "## Slide 2: Kainos" in text
+        assert "| Prekė | Kaina |\n| --- | --- |\n| Serveris | 5000 |" in text
+        assert text.index("| Serveris | 5000 |") < text.index("Kainos be PVM")
+        assert text.endswith("## Slide 3")
+
+    @pytest.mark.asyncio
+    async def test_parse_document_uses_fast_path(self, deck_pptx: Path):
+        with patch("app.services.parser._parse_with_docling") as docling:
+            result = await parse_document(deck_pptx, "pristatymas.pptx")
+        docling.assert_not_called()
+        assert result.parser_used == "pptx-native"
+        assert result.page_count == 3
+
+    @pytest.mark.asyncio
+    async def test_docling_fallback_on_error(self, tmp_path: Path):
+        broken = tmp_path / "broken.pptx"
+        broken.write_bytes(b"not a presentation")
+        with patch(
+            "app.services.parser._parse_with_docling", return_value=("# Slide", 1)
+        ) as docling:
+            result = await parse_document(broken, "broken.pptx")
+        docling.assert_called_once()
+        assert result.parser_used == "docling-fallback"
+
+
 # ── Classification tests ─────────────────────────────────────────────────────
 
 
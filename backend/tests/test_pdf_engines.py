@@ -0,0 +1,166 @@
+# backend/tests/test_pdf_engines.py
+# Tests for the PDF text engine registry (services/pdf_engines.py)
+# Covers: engine chain resolution, engine agreement, page ranges, fallback order,
+#         parse_document engine selection, Docling bypass, page-parallel split
+# Related: app/services/pdf_engines.py, app/services/parser.py
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.config import get_settings
+from app.services import pdf_engines
+from app.services.parse_pool import shutdown_pool
+from app.services.parser import parse_document
+from app.services.parser_benchmark import make_synthetic_pdf
+from app.services.pdf_engines import (
+    HAS_PDFIUM,
+    available_engines,
+    count_pdf_pages,
+    extract_pdf_pages,
+    pages_to_markdown,
+    resolve_engine_chain,
+    split_page_ranges,
+)
+
+needs_pdfium = pytest.mark.skipif(not HAS_PDFIUM, reason="pypdfium2 not installed")
+
+
+@pytest.fixture
+def text_pdf(tmp_path: Path) -> Path:
+    return make_synthetic_pdf(tmp_path / "spec.pdf", pages=3)
+
+
+# ── Chain resolution ─────────────────────────────────────────────────────────
+
+
+class TestResolveEngineChain:
+    def test_auto_prefers_fastest_available(self):
+        chain = resolve_engine_chain("auto")
+        assert chain == tuple(available_engines())
+        assert chain[-1] == "pypdf"
+
+    def test_explicit_engine_goes_first(self):
+        assert resolve_engine_chain("pypdf")[0] == "pypdf"
+        assert sorted(resolve_engine_chain("pypdf")) == sorted(available_engines())
+
+    def test_docling_means_no_text_engine(self):
+        assert resolve_engine_chain("docling") == ()
+
+    def test_unknown_engine_degrades_to_auto(self):
+        assert resolve_engine_chain("pymupdf") == resolve_engine_chain("auto")
+
+    def test_missing_pdfium_is_skipped(self):
+        with patch.object(pdf_engines, "HAS_PDFIUM", False):
+            assert resolve_engine_chain("auto") == ("pypdf",)
+            assert resolve_engine_chain("pypdfium2") == ("pypdf",)
+
+
+# ── Extraction ───────────────────────────────────────────────────────────────
+
+
+class TestExtractPdfPages:
+    @needs_pdfium
+    def test_engines_agree(self, text_pdf: Path):
+        pdfium_texts, pdfium_pages, _ = extract_pdf_pages(text_pdf, ("pypdfium2",))
+        pypdf_texts, pypdf_pages, _ = extract_pdf_pages(text_pdf, ("pypdf",))
+        assert pdfium_pages == pypdf_pages == 3
+        assert pages_to_markdown(pdfium_texts) == pages_to_markdown(pypdf_texts)
+        assert "Section 2. Technical requirements" in pdfium_texts[1]
+
+    def test_page_range(self, text_pdf: Path):
+        for engine in available_engines():
+            texts, page_count, _ = extract_pdf_pages(text_pdf, (engine,), start=1, end=2)
+            assert page_count == 3
+            assert len(texts) == 1
+            assert "Section 2." in texts[0]
+
+    def test_falls_back_to_next_engine(self, text_pdf: Path):
+        def broken(*args):
+            raise ValueError("boom")
+
+        with patch.dict(pdf_engines.PDF_ENGINES, {"pypdfium2": broken}):
+            texts, _, engine = extract_pdf_pages(text_pdf, ("pypdfium2", "pypdf"))
+        assert engine == "pypdf"
+        assert len(texts) == 3
+
+    def test_raises_when_every_engine_fails(self, tmp_path: Path):
+        corrupt = tmp_path / "corrupt.pdf"
+        corrupt.write_bytes(b"not a pdf")
+        with pytest.raises(Exception):
+            extract_pdf_pages(corrupt, resolve_engine_chain("auto"))
+
+    def test_count_pages(self, text_pdf: Path):
+        for engine in available_engines():
+            assert count_pdf_pages(text_pdf, (engine,)) == 3
+
+    def test_reads_bytes(self, text_pdf: Path):
+        data = text_pdf.read_bytes()
+        for engine in available_engines():
+            assert extract_pdf_pages(data, (engine,))[:2] == extract_pdf_pages(text_pdf, (engine,))[:2]
+            assert count_pdf_pages(data, (engine,)) == 3
+
+    def test_blank_pages_dropped(self):
+        assert pages_to_markdown([" a ", "", "  \n", "b"]) == "a\n\nb"
+
+
+class TestSplitPageRanges:
+    def test_contiguous_and_balanced(self):
+        ranges = split_page_ranges(803, 4)
+        assert ranges == [(0, 201), (201, 402), (402, 603), (603, 803)]
+
+    def test_never_more_ranges_than_pages(self):
+        assert split_page_ranges(2, 8) == [(0, 1), (1, 2)]
+
+    def test_single_part(self):
+        assert split_page_ranges(10, 1) == [(0, 10)]
+
+
+# ── parse_document integration ───────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_parse_document_reports_engine(text_pdf: Path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "parser_pdf_engine", "pypdf")
+    result = await parse_document(text_pdf, "spec.pdf")
+    assert result.parser_used == "pypdf"
+    assert result.page_count == 3
+    assert "Section 3." in result.content
+
+
+@pytest.mark.asyncio
+async def test_docling_setting_skips_text_engines(text_pdf: Path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "parser_pdf_engine", "docling")
+    with patch(
+        "app.services.parser._parse_with_docling", return_value=("docling text", 3)
+    ) as docling:
+        result = await parse_document(text_pdf, "spec.pdf")
+    docling.assert_called_once()
+    assert result.parser_used == "docling"
+    assert result.content.startswith("docling text")
+
+
+@pytest.mark.asyncio
+async def test_large_pdf_split_matches_single_pass(tmp_path: Path, monkeypatch):
+    path = make_synthetic_pdf(tmp_path / "large.pdf", pages=9)
+    settings = get_settings()
+    monkeypatch.setattr(settings, "parser_pdf_engine", "pypdf")
+    monkeypatch.setattr(settings, "parse_cache_enabled", False)
+
+    monkeypatch.setattr(settings, "parser_pdf_split_pages", 0)
+    single = await parse_document(path, "large.pdf")
+
+    monkeypatch.setattr(settings, "parser_backend", "process")
+    monkeypatch.setattr(settings, "parser_max_concurrent", 2)
+    monkeypatch.setattr(settings, "parser_pdf_split_pages", 4)
+    try:
+        with patch("app.services.parser.split_page_ranges", wraps=split_page_ranges) as split:
+            parallel = await parse_document(path, "large.pdf")
+    finally:
+        shutdown_pool()
+
+    split.assert_called_once_with(9, 2)
+    assert parallel.content == single.content
+    assert parallel.page_count == 9
+    assert parallel.parser_used == "pypdf"
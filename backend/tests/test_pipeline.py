@@ -19,6 +19,7 @@ from app.models.schemas import (
     ExtractionResult,
     SourceDocument,
 )
+from app.services.document_source import DocumentSource
 from app.services.llm import LLMClient
 from app.services.parser import ParsedDocument
 from app.services.pipeline import AnalysisPipeline, PipelineMetrics
@@ -81,6 +82,47 @@ def _make_qa_evaluation(**kwargs) -> QAEvaluation:
     return QAEvaluation(**defaults)
 
 
+def _streaming(extract_files, parse_all, extract_all) -> None:
+    """Make return_value stage mocks behave like the pipeline's streaming stages.
+
+    The stages are joined by Channels: extract_files announces each file
+    through on_source, parse_all drains its input and reports documents
+    through on_parsed, extract_all drains its input. Mocks that already have
+    a side_effect are left alone.
+    """
+    if extract_files.side_effect is None:
+        sources = [DocumentSource.from_item(item) for item in extract_files.return_value]
+
+        async def fake_extract_files(upload_paths, on_event=None, *, on_source=None, **kwargs):
+            for source in sources:
+                on_source(source)
+            return sources
+
+        extract_files.side_effect = fake_extract_files
+
+    if parse_all.side_effect is None:
+        docs = parse_all.return_value
+
+        async def fake_parse_all(file_paths, on_parsed=None, **kwargs):
+            async for _source in file_paths:
+                pass
+            for doc in docs:
+                on_parsed(doc)
+            return docs
+
+        parse_all.side_effect = fake_parse_all
+
+    if extract_all.side_effect is None:
+        results = extract_all.return_value
+
+        async def fake_extract_all(docs, **kwargs):
+            async for _doc in docs:
+                pass
+            return results
+
+        extract_all.side_effect = fake_extract_all
+
+
 @pytest.fixture
 def mock_db():
     """In-memory ConvexDB instance (no Convex URL = in-memory)."""
@@ -92,6 +134,8 @@ def mock_db():
 def mock_llm():
     """Mocked LLM client."""
     llm = MagicMock(spec=LLMClient)
+    llm.queue_wait_seconds = 0.0
+    llm.priority = 0
     return llm
 
 
@@ -166,6 +210,11 @@ class TestPipelineMetrics:
         expected_keys = {
             "total_files",
             "total_pages",
+            "archive_files_skipped",
+            "archive_bytes_skipped",
+            "archive_files_in_memory",
+            "llm_queue_wait_seconds",
+            "checkpoints_restored",
             "start_time",
             "elapsed_seconds",
             "tokens_extraction_input",
@@ -174,6 +223,11 @@ class TestPipelineMetrics:
             "tokens_aggregation_output",
             "tokens_evaluation_input",
             "tokens_evaluation_output",
+            "extraction_cache_hits",
+            "tokens_saved_input",
+            "tokens_saved_output",
+            "documents_reused",
+            "sections_reextracted",
             "estimated_cost_usd",
             "model_used",
         }
@@ -193,7 +247,7 @@ class TestPipelineInit:
         assert pipeline.analysis_id == "test-123"
         assert pipeline.model == "anthropic/claude-sonnet-4"
         assert pipeline.metrics.model_used == "anthropic/claude-sonnet-4"
-        assert pipeline._event_index == 0
+        assert pipeline._events.next_index == 0
 
 
 class TestPipelineFullRun:
@@ -246,6 +300,7 @@ class TestPipelineFullRun:
         )
 
         # Run pipeline
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/tech_spec.pdf"), Path("/tmp/contract.pdf")])
 
         # Allow background tasks (create_task callbacks) to complete
@@ -323,6 +378,7 @@ class TestPipelineFullRun:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -376,6 +432,7 @@ class TestPipelineFullRun:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -471,6 +528,7 @@ class TestPipelineExtractionFailure:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -505,6 +563,7 @@ class TestPipelineExtractionFailure:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf"), Path("/tmp/b.pdf")])
         await asyncio.sleep(0.05)
 
@@ -544,6 +603,7 @@ class TestPipelineAggregationFailure:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -603,6 +663,7 @@ class TestPipelineMetricsAccumulation:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -653,6 +714,7 @@ class TestPipelineMetricsAccumulation:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -696,6 +758,7 @@ class TestPipelineMetricsAccumulation:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -745,6 +808,7 @@ class TestPipelineMetricsAccumulation:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -791,6 +855,7 @@ class TestPipelineEvents:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/test.pdf")])
         # Wait for background tasks
         await asyncio.sleep(0.1)
@@ -840,6 +905,8 @@ class TestPipelineEvents:
 
         # parse_all needs to actually invoke the callback
         async def fake_parse_all(file_paths, on_parsed=None):
+            async for _source in file_paths:
+                pass
             for doc in docs:
                 if on_parsed:
                     on_parsed(doc)
@@ -863,6 +930,7 @@ class TestPipelineEvents:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.1)
 
@@ -901,6 +969,7 @@ class TestPipelineEvents:
         async def fake_extract_all(
             docs, llm, model, max_concurrent=5, on_started=None, on_completed=None, on_error=None, **kwargs
         ):
+            docs = [d async for d in docs]
             for i, d in enumerate(docs):
                 if on_started:
                     on_started(i, d.filename)
@@ -926,6 +995,7 @@ class TestPipelineEvents:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/test.pdf")])
         await asyncio.sleep(0.1)
 
@@ -997,6 +1067,7 @@ class TestPipelineEvents:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -1045,6 +1116,7 @@ class TestPipelineEvaluationFailure:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.15)
 
@@ -1104,6 +1176,64 @@ class TestPipelineCostCalculation:
         assert pipeline.metrics.estimated_cost_usd == pytest.approx(expected)
 
 
+class TestPipelineStreaming:
+    """Unpack, parse and extract overlap; results still follow file order."""
+
+    @pytest.mark.asyncio
+    @patch("app.services.pipeline.extract_files")
+    @patch("app.services.pipeline.aggregate_results")
+    @patch("app.services.pipeline.evaluate_report")
+    async def test_extraction_starts_before_slow_parse_finishes(
+        self, mock_evaluate, mock_aggregate, mock_extract_files, mock_db, mock_llm,
+    ):
+        sources = [
+            DocumentSource("slow.pdf", Path("/tmp/slow.pdf")),
+            DocumentSource("fast.pdf", Path("/tmp/fast.pdf")),
+        ]
+        fast_extracting = asyncio.Event()
+
+        async def fake_extract_files(upload_paths, on_event=None, *, on_source=None, **kwargs):
+            for source in sources:
+                on_source(source)
+            return sources
+
+        async def fake_parse_document(source):
+            if source.filename == "slow.pdf":
+                # Only finishes once the fast document is already in LLM extraction
+                await asyncio.wait_for(fast_extracting.wait(), timeout=5)
+            return _make_parsed_doc(filename=source.filename)
+
+        async def fake_extract_document(doc, llm, model, **kwargs):
+            if doc.filename == "fast.pdf":
+                fast_extracting.set()
+            usage = {"input_tokens": 1, "output_tokens": 1}
+            return _make_extraction_result(project_summary=doc.filename), usage
+
+        mock_extract_files.side_effect = fake_extract_files
+        mock_aggregate.return_value = (_make_aggregated_report(), {"input_tokens": 0, "output_tokens": 0})
+        mock_evaluate.return_value = (_make_qa_evaluation(), {"input_tokens": 0, "output_tokens": 0})
+
+        analysis_id = await mock_db.create_analysis(model="test-model")
+        pipeline = AnalysisPipeline(
+            analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
+        )
+        with (
+            patch("app.services.parser.parse_document", side_effect=fake_parse_document),
+            patch("app.services.extraction.extract_document", side_effect=fake_extract_document),
+        ):
+            await pipeline.run([Path("/tmp/upload.zip")])
+        await asyncio.sleep(0.05)
+
+        analysis = await mock_db.get_analysis(analysis_id)
+        assert analysis["status"] == AnalysisStatus.COMPLETED.value
+        extractions = mock_aggregate.call_args.args[0]
+        assert [doc.filename for doc, _result, _usage in extractions] == ["slow.pdf", "fast.pdf"]
+        events = [e["event_type"] for e in await mock_db.get_events(analysis_id)]
+        assert events.index("extraction_started") < max(
+            i for i, event in enumerate(events) if event == "file_parsed"
+        )
+
+
 class TestPipelineServiceCalls:
     """Test that pipeline calls services with correct arguments."""
 
@@ -1144,10 +1274,13 @@ class TestPipelineServiceCalls:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run(upload_paths)
         await asyncio.sleep(0.05)
 
-        mock_extract_files.assert_called_once_with(upload_paths)
+        mock_extract_files.assert_called_once()
+        assert mock_extract_files.call_args.args == (upload_paths,)
+        assert mock_extract_files.call_args.kwargs["on_event"] == pipeline._on_archive_event_sync
 
     @pytest.mark.asyncio
     @patch("app.services.pipeline.extract_files")
@@ -1188,6 +1321,7 @@ class TestPipelineServiceCalls:
             llm=mock_llm,
             model="my-special-model",
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/a.pdf")])
         await asyncio.sleep(0.05)
 
@@ -1244,6 +1378,7 @@ class TestPipelineServiceCalls:
         pipeline = AnalysisPipeline(
             analysis_id=analysis_id, db=mock_db, llm=mock_llm, model="test-model"
         )
+        _streaming(mock_extract_files, mock_parse_all, mock_extract_all)
         await pipeline.run([Path("/tmp/spec.pdf")])
         # Background evaluation task needs time to start and call evaluate_report
         await asyncio.sleep(0.2)
@@ -0,0 +1,119 @@
+# backend/tests/test_tender_fingerprint.py
+# Tests for whole-tender fingerprinting and duplicate-upload reuse
+# Covers: fingerprint stability/order-insensitivity/settings sensitivity,
+#         reused upload skipping the pipeline, force bypass, per-user scoping
+# Related: app/services/tender_fingerprint.py, app/routers/analyze.py (create_analysis)
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.config import get_settings
+from app.services.job_queue import get_job_queue
+from app.services.tender_fingerprint import tender_fingerprint
+
+FILES = [
+    ("files", ("spec.pdf", b"%PDF-1.4 specifikacija", "application/pdf")),
+    ("files", ("sutartis.pdf", b"%PDF-1.4 sutartis", "application/pdf")),
+]
+
+
+def test_fingerprint_ignores_file_order_but_not_settings():
+    settings = {"model": "m", "analysis_type": "detailed", "custom_instructions": "", "thinking": ""}
+    base = tender_fingerprint(["a", "b"], **settings)
+    assert base == tender_fingerprint(["b", "a"], **settings)
+    assert base == tender_fingerprint(["a", "b"], **{**settings, "custom_instructions": "  "})
+    assert len({
+        base,
+        tender_fingerprint(["a", "c"], **settings),
+        tender_fingerprint(["a"], **settings),
+        tender_fingerprint(["a", "b"], **{**settings, "model": "other"}),
+        tender_fingerprint(["a", "b"], **{**settings, "analysis_type": "quick"}),
+        tender_fingerprint(["a", "b"], **{**settings, "custom_instructions": "terminai"}),
+        tender_fingerprint(["a", "b"], **{**settings, "thinking": "high"}),
+    }) == 7
+
+
+# ── API ──────────────────────────────────────────────────────────────────────
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    import app.convex_client as convex_module
+    from app.convex_client import ConvexDB
+    from app.main import app
+    from app.middleware.auth import require_auth
+
+    user = {"id": "user-a"}
+
+    async def _user():
+        return user["id"]
+
+    monkeypatch.setattr(convex_module, "_db_instance", ConvexDB(url=""))
+    monkeypatch.setattr(get_settings(), "openrouter_api_key", "test-key")
+    app.dependency_overrides[require_auth] = _user
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        ac.user = user
+        yield ac
+    app.dependency_overrides.pop(require_auth, None)
+
+
+async def _complete_first_upload(client) -> str:
+    """Upload FILES and finish the analysis as the pipeline would."""
+    from app.convex_client import get_db
+
+    response = await client.post("/api/analyze", files=FILES)
+    assert response.status_code == 202
+    source_id = response.json()["id"]
+    db = get_db()
+    await db.add_document(source_id, "spec.pdf", "technical_spec", 3, "Tekstas")
+    await db.update_analysis(
+        source_id,
+        status="completed",
+        report_json={"project_summary": "Ataskaita"},
+        metrics_json={"tokens_extraction_input": 1000, "tokens_aggregation_output": 50},
+    )
+    return source_id
+
+
+@pytest.mark.asyncio
+async def test_identical_upload_reuses_completed_analysis(client):
+    from app.convex_client import get_db
+
+    source_id = await _complete_first_upload(client)
+
+    response = await client.post("/api/analyze", files=list(reversed(FILES)))
+    assert response.status_code == 202
+    body = response.json()
+    assert body["id"] != source_id
+    assert body["status"] == "completed"
+    assert body["report"]["project_summary"] == "Ataskaita"
+    assert [d["filename"] for d in body["documents"]] == ["spec.pdf"]
+    assert get_job_queue().get(body["id"]) is None  # the pipeline never ran
+
+    record = await get_db().get_analysis(body["id"])
+    assert record["metrics_json"]["reused_from"] == source_id
+    assert record["metrics_json"]["tokens_extraction_input"] == 0
+    assert record["metrics_json"]["tokens_saved_input"] == 1000
+    events = await get_db().get_events(body["id"])
+    assert [e["event_type"] for e in events] == ["analysis_reused"]
+
+
+@pytest.mark.asyncio
+async def test_changed_settings_or_force_run_pipeline(client):
+    await _complete_first_upload(client)
+
+    quick = await client.post("/api/analyze", files=FILES, data={"analysis_type": "quick"})
+    forced = await client.post("/api/analyze", files=FILES, data={"force": "true"})
+    for response in (quick, forced):
+        assert response.json()["status"] == "pending"
+        assert get_job_queue().get(response.json()["id"]) is not None
+
+
+@pytest.mark.asyncio
+async def test_other_users_analysis_is_not_reused(client):
+    await _complete_first_upload(client)
+
+    client.user["id"] = "user-b"
+    response = await client.post("/api/analyze", files=FILES)
+    assert response.json()["status"] == "pending"
@@ -0,0 +1,186 @@
+# backend/tests/test_workspace.py
+# Tests for per-analysis workspaces (services/workspace.py)
+# Covers: create/release, TTL garbage collection, quota backpressure,
+#         tmpfs scratch placement, upload endpoint + export cleanup
+# Related: app/services/workspace.py, app/routers/analyze.py
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.config import get_settings
+from app.services import workspace as workspace_module
+from app.services.pipeline_worker import get_pipeline_worker
+from app.services.workspace import (
+    WorkspaceManager,
+    WorkspaceQuotaExceeded,
+    get_workspace_manager,
+    scratch_dir,
+    scratch_root,
+)
+
+
+@pytest.fixture
+def manager(tmp_path: Path) -> WorkspaceManager:
+    return WorkspaceManager(tmp_path / "workspaces", quota_bytes=1024 * 1024, ttl_seconds=3600)
+
+
+def _age(path: Path, seconds: float) -> None:
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+# ── Lifecycle ────────────────────────────────────────────────────────────────
+
+
+def test_workspace_tree_and_release(manager: WorkspaceManager):
+    ws = manager.create("abc/123")
+    assert ws.root.name == "abc_123"
+    (ws.uploads / "a.pdf").write_bytes(b"x" * 1000)
+    (ws.unpack / "b.pdf").write_bytes(b"y" * 500)
+
+    assert manager.get("abc/123") is ws
+    assert manager.release("abc/123") == 1500
+    assert not ws.root.exists()
+    assert manager.get("abc/123") is None
+    assert manager.release("abc/123") == 0
+    assert manager.stats()["reclaimed_bytes"] == 1500
+
+
+def test_gc_removes_expired_but_not_active(manager: WorkspaceManager):
+    active = manager.create("running")
+    stale = manager.root / "analyses" / "crashed"
+    stale.mkdir(parents=True)
+    (stale / "upload.zip").write_bytes(b"z" * 100)
+    leftover = manager.root / "scratch" / "ocr_p1-8_x"
+    leftover.mkdir(parents=True)
+    fresh = manager.root / "scratch" / "scanned_pages_y"
+    fresh.mkdir()
+    for path in (active.root, stale, leftover):
+        _age(path, 7200)
+
+    assert manager.collect_garbage() == 100
+    assert active.root.exists() and fresh.exists()
+    assert not stale.exists() and not leftover.exists()
+    assert manager.stats()["collected"] == 2
+
+
+# ── Quota ────────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_upload_waits_until_space_is_released(manager: WorkspaceManager, monkeypatch):
+    monkeypatch.setattr(workspace_module, "_SPACE_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(workspace_module, "_USAGE_TTL_SECONDS", 0.0)
+    ws = manager.create("busy")
+    (ws.unpack / "big.pdf").write_bytes(b"x" * 900 * 1024)
+
+    async def finish_later():
+        await asyncio.sleep(0.05)
+        manager.release("busy")
+
+    releaser = asyncio.create_task(finish_later())
+    await manager.wait_for_space(300 * 1024, timeout=5)
+    await releaser
+    assert manager.stats()["waits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_quota_timeout_and_oversized_upload(manager: WorkspaceManager, monkeypatch):
+    monkeypatch.setattr(workspace_module, "_SPACE_POLL_SECONDS", 0.01)
+    ws = manager.create("busy")
+    (ws.unpack / "big.pdf").write_bytes(b"x" * 900 * 1024)
+
+    with pytest.raises(WorkspaceQuotaExceeded):
+        await manager.wait_for_space(300 * 1024, timeout=0.05)
+    with pytest.raises(WorkspaceQuotaExceeded):
+        await manager.wait_for_space(2 * 1024 * 1024, timeout=5)
+    assert manager.stats()["rejections"] == 2
+
+
+# ── Scratch ──────────────────────────────────────────────────────────────────
+
+
+def test_scratch_on_hot_dir_when_configured(tmp_path: Path, monkeypatch):
+    assert scratch_root() == Path(get_settings().temp_dir) / "workspaces" / "scratch"
+    hot = tmp_path / "shm"
+    monkeypatch.setattr(get_settings(), "workspace_hot_dir", str(hot))
+    assert scratch_dir("ocr_").parent == hot
+    monkeypatch.setattr(workspace_module, "_HOT_MIN_FREE", 1 << 62)  # hot dir "full"
+    assert scratch_root().parent.name == "workspaces"
+
+
+# ── API ──────────────────────────────────────────────────────────────────────
+
+
+@pytest_asyncio.fixture
+async def client():
+    from app.main import app
+    from app.middleware.auth import require_auth
+
+    async def _user():
+        return "test-user-id"
+
+    app.dependency_overrides[require_auth] = _user
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(require_auth, None)
+
+
+@pytest.mark.asyncio
+async def test_upload_lands_in_workspace_and_is_released(client: AsyncClient, monkeypatch):
+    import app.convex_client as convex_module
+    from app.convex_client import ConvexDB
+    from app.services.pipeline import AnalysisPipeline
+
+    async def completed_run(self, upload_paths, amend=False):
+        await self.db.update_analysis(self.analysis_id, status="completed")
+
+    monkeypatch.setattr(convex_module, "_db_instance", ConvexDB(url=""))
+    monkeypatch.setattr(get_settings(), "openrouter_api_key", "test-key")
+    monkeypatch.setattr(AnalysisPipeline, "run", completed_run)
+    files = [("files", ("doc.pdf", b"%PDF-1.4 fake", "application/pdf"))]
+
+    response = await client.post("/api/analyze", files=files)
+    assert response.status_code == 202
+    analysis_id = response.json()["id"]
+    manager = get_workspace_manager()
+    ws_root = manager.root / "analyses" / analysis_id
+    assert (ws_root / "uploads" / "doc.pdf").exists()
+
+    # The embedded worker (started by lifespan in the app) claims the job
+    worker = get_pipeline_worker()
+    worker_task = asyncio.create_task(worker.run())
+    try:
+        for _ in range(100):
+            if manager.get(analysis_id) is None:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await worker.drain(1)
+        worker_task.cancel()
+    assert manager.get(analysis_id) is None
+    assert not ws_root.exists()
+    assert manager.stats()["released"] == 1
+
+
+@pytest.mark.asyncio
+async def test_upload_rejected_when_quota_full(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(get_settings(), "workspace_quota_mb", 1)
+    get_workspace_manager.cache_clear()
+    files = [("files", ("doc.pdf", b"x" * (2 * 1024 * 1024), "application/pdf"))]
+
+    response = await client.post("/api/analyze", files=files)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "60"
+
+
+@pytest.mark.asyncio
+async def test_health_reports_disk_usage(client: AsyncClient):
+    response = await client.get("/health")
+    assert response.json()["workspaces"]["quota_bytes"] == get_settings().workspace_quota_mb * 1024 * 1024
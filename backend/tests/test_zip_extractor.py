@@ -6,13 +6,21 @@
 import io
 import os
 import tempfile
+import threading
+import time
 import zipfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from app.config import get_settings
+from app.services import zip_extractor
+from app.services.document_source import DocumentSource
 from app.services.zip_extractor import (
     SUPPORTED_EXTENSIONS,
+    ExtractionBudget,
+    _copy_member,
     _extract_zip,
     _sanitize_filename,
     extract_files,
@@ -92,6 +100,12 @@ def tmp_dir(tmp_path: Path) -> Path:
     return tmp_path
 
 
+@pytest.fixture(autouse=True)
+def _members_on_disk(monkeypatch) -> None:
+    """Write every member to disk; TestInMemoryMembers opts back in."""
+    monkeypatch.setattr(get_settings(), "archive_memory_member_kb", 0)
+
+
 # ── Tests: _sanitize_filename ────────────────────────────────────────────────
 
 
@@ -156,8 +170,8 @@ class TestExtractFilesPassThrough:
         results = await extract_files([pdf_file, docx_file])
 
         assert len(results) == 2
-        paths = {r[0] for r in results}
-        names = {r[1] for r in results}
+        paths = {r.path for r in results}
+        names = {r.filename for r in results}
         assert pdf_file in paths
         assert docx_file in paths
         assert "report.pdf" in names
@@ -220,12 +234,12 @@ class TestExtractFilesZip:
         results = await extract_files([zip_path])
 
         assert len(results) == 3
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert names == {"report.pdf", "spec.docx", "data.xlsx"}
 
         # Verify extracted files exist and have correct content
-        for path, _name in results:
-            assert path.exists()
+        for source in results:
+            assert source.path.exists()
 
     @pytest.mark.asyncio
     async def test_zip_filters_unsupported_files(self, tmp_dir: Path) -> None:
@@ -241,7 +255,7 @@ class TestExtractFilesZip:
         results = await extract_files([zip_path])
 
         assert len(results) == 2
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert names == {"report.pdf", "image.png"}
 
     @pytest.mark.asyncio
@@ -265,7 +279,7 @@ class TestExtractFilesZip:
         results = await extract_files([zip_path])
 
         assert len(results) == 3
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert names == {"report.pdf", "photo.jpg", "spec.docx"}
 
 
@@ -294,7 +308,7 @@ class TestExtractFilesNestedZip:
         results = await extract_files([zip_path])
 
         assert len(results) == 3
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert "outer_doc.pdf" in names
         assert "inner_doc.docx" in names
         assert "inner_image.png" in names
@@ -324,7 +338,7 @@ class TestExtractFilesNestedZip:
         results = await extract_files([outer_path])
 
         assert len(results) == 3
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert names == {"outer_file.docx", "middle_file.xlsx", "deep_file.pdf"}
 
     @pytest.mark.asyncio
@@ -347,7 +361,7 @@ class TestExtractFilesNestedZip:
         results = await extract_files([zip_path])
 
         assert len(results) == 2
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert names == {"keep.pdf", "keep_inner.docx"}
 
 
@@ -382,7 +396,7 @@ class TestExtractFilesCorruptZip:
         results = await extract_files([corrupt_path, valid_pdf, valid_zip])
 
         assert len(results) == 2
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert names == {"good.pdf", "inside.docx"}
 
     @pytest.mark.asyncio
@@ -423,7 +437,7 @@ class TestExtractFilesMixed:
         results = await extract_files([pdf, zip_path, xlsx])
 
         assert len(results) == 4
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert names == {"direct.pdf", "direct.xlsx", "from_zip.docx", "from_zip.png"}
 
     @pytest.mark.asyncio
@@ -448,7 +462,7 @@ class TestExtractFilesMixed:
         ])
 
         assert len(results) == 3
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert names == {"report.pdf", "spec.docx", "photo.jpeg"}
 
 
@@ -470,7 +484,7 @@ class TestPathTraversalProtection:
 
         # The traversal entry should either be sanitized or skipped
         # The normal file should be extracted
-        names = {r[1] for r in results}
+        names = {r.filename for r in results}
         assert "normal.docx" in names
 
         # No file should exist outside the temp extraction directory
@@ -486,8 +500,8 @@ class TestPathTraversalProtection:
         results = await extract_files([zip_path])
 
         # Should extract with sanitized name, not to /tmp/
-        for path, _name in results:
-            assert str(path.resolve()).startswith(
+        for source in results:
+            assert str(source.path.resolve()).startswith(
                 str(Path(tempfile.gettempdir()).resolve())
             )
 
@@ -511,8 +525,8 @@ class TestExtractZipDirect:
         results = await _extract_zip(zip_path, dest)
 
         assert len(results) == 2
-        for path, name in results:
-            assert path.exists()
+        for source in results:
+            assert source.path.exists()
 
     @pytest.mark.asyncio
     async def test_depth_limit_protection(self, tmp_dir: Path) -> None:
@@ -547,6 +561,294 @@ class TestExtractZipDirect:
         assert results == []
 
 
+# ── Tests: Extraction budget (archive bombs) ─────────────────────────────────
+
+
+def _budget(**overrides) -> ExtractionBudget:
+    limits = {"max_bytes": 64 * 1024 * 1024, "max_files": 100, "max_ratio": 100}
+    limits.update(overrides)
+    return ExtractionBudget(**limits)
+
+
+class TestExtractionBudget:
+    """Streaming copies under the per-upload byte, file and ratio limits."""
+
+    @pytest.mark.asyncio
+    async def test_ratio_bomb_member_skipped(self, tmp_dir: Path) -> None:
+        """A highly compressible member is skipped, its siblings still extracted."""
+        zip_path = _create_zip(tmp_dir, "bomb.zip", {
+            "bomb.pdf": b"\0" * (8 * 1024 * 1024),
+            "real.pdf": os.urandom(4096),
+        })
+        dest = tmp_dir / "output"
+        dest.mkdir()
+        budget = _budget()
+
+        results = await _extract_zip(zip_path, dest, budget=budget)
+
+        assert [r.filename for r in results] == ["real.pdf"]
+        assert not (dest / "bomb.pdf").exists()
+        assert budget.exhausted is None
+
+    def test_ratio_checked_on_bytes_read(self, tmp_dir: Path) -> None:
+        """Declared sizes are not trusted — the stream is cut once it crosses the ratio."""
+        budget = _budget()
+        target = tmp_dir / "bomb.pdf"
+        assert budget.admit("liar.zip", "bomb.pdf", 1024, 8 * 1024)  # header claims 1 KB
+
+        ok = _copy_member(
+            io.BytesIO(b"\0" * (8 * 1024 * 1024)), target, budget, "liar.zip", "bomb.pdf",
+            size=1024, compressed=8 * 1024,
+        )
+
+        assert ok is False
+        assert not target.exists()
+        assert (budget.bytes_written, budget.files_written) == (0, 0)
+
+    @pytest.mark.asyncio
+    async def test_total_bytes_budget_stops_upload(self, tmp_dir: Path) -> None:
+        """Once the byte budget is spent, later archives are not unpacked."""
+        first = _create_zip(tmp_dir, "a.zip", {"a.pdf": os.urandom(600 * 1024)})
+        second = _create_zip(tmp_dir, "b.zip", {"b.pdf": os.urandom(600 * 1024)})
+        events: list[tuple[str, dict]] = []
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(get_settings(), "archive_max_total_mb", 1)
+            results = await extract_files(
+                [first, second], on_event=lambda t, d: events.append((t, d)),
+            )
+
+        assert [r.filename for r in results] == ["a.pdf"]
+        assert events == [("archive_limit", {
+            "archive": "b.zip", "member": "b.pdf", "limit": "total_bytes",
+            "value": 1200 * 1024, "max": 1024 * 1024, "stopped": True,
+        })]
+
+    @pytest.mark.asyncio
+    async def test_file_count_shared_with_nested_archives(self, tmp_dir: Path) -> None:
+        """Nested archives draw from the same file budget as their parent."""
+        zip_path = _create_nested_zip(
+            tmp_dir, "outer.zip",
+            {"a.pdf": b"a", "b.pdf": b"b"},
+            "inner.zip", {"c.pdf": b"c", "d.pdf": b"d"},
+        )
+        events: list[tuple[str, dict]] = []
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(get_settings(), "archive_max_files", 4)
+            results = await extract_files([zip_path], on_event=lambda t, d: events.append((t, d)))
+
+        # a.pdf, b.pdf, inner.zip and c.pdf use the four slots
+        assert sorted(r.filename for r in results) == ["a.pdf", "b.pdf", "c.pdf"]
+        assert [(d["limit"], d["member"]) for _, d in events] == [("file_count", "d.pdf")]
+
+    @pytest.mark.asyncio
+    async def test_unsupported_members_not_written(self, tmp_dir: Path) -> None:
+        """Members that would be filtered out never reach the disk or the budget."""
+        zip_path = _create_zip(tmp_dir, "mixed.zip", {
+            "doc.pdf": b"pdf",
+            "movie.mp4": os.urandom(256 * 1024),
+        })
+        dest = tmp_dir / "output"
+        dest.mkdir()
+        budget = _budget()
+
+        await _extract_zip(zip_path, dest, budget=budget)
+
+        assert not (dest / "movie.mp4").exists()
+        assert (budget.files_written, budget.bytes_written) == (1, 3)
+        assert (budget.files_skipped, budget.bytes_skipped) == (1, 256 * 1024)
+
+
+# ── Tests: Selective 7z extraction ───────────────────────────────────────────
+
+
+def _create_7z(directory: Path, name: str, files: dict[str, bytes]) -> Path:
+    py7zr = pytest.importorskip("py7zr")
+    path = directory / name
+    with py7zr.SevenZipFile(path, "w") as szf:
+        for member, content in files.items():
+            szf.writestr(content, member)
+    return path
+
+
+class TestSelective7z:
+    """Only supported formats and nested archives leave a 7z archive."""
+
+    @pytest.mark.asyncio
+    async def test_unsupported_members_never_extracted(self, tmp_dir: Path) -> None:
+        archive = _create_7z(tmp_dir, "tender.7z", {
+            "docs/spec.pdf": b"pdf",
+            "docs/~$spec.docx": b"lock",
+            "drawings/plan.dwg": os.urandom(64 * 1024),
+            "video/site.mp4": os.urandom(32 * 1024),
+        })
+        budget = _budget()
+
+        results = await extract_files([archive], budget=budget)
+
+        assert [r.filename for r in results] == ["spec.pdf"]
+        extracted_dir = results[0].path.parents[1]
+        assert sorted(p.name for p in extracted_dir.rglob("*") if p.is_file()) == ["spec.pdf"]
+        assert budget.files_skipped == 3
+        assert budget.bytes_skipped == 96 * 1024 + 4
+        assert (budget.files_written, budget.bytes_written) == (1, 3)
+
+    @pytest.mark.asyncio
+    async def test_nested_zip_in_7z_extracted(self, tmp_dir: Path) -> None:
+        inner = io.BytesIO()
+        with zipfile.ZipFile(inner, "w") as zf:
+            zf.writestr("inner.pdf", b"inner")
+            zf.writestr("setup.exe", b"MZ")
+        archive = _create_7z(tmp_dir, "outer.7z", {"a.pdf": b"a", "inner.zip": inner.getvalue()})
+        budget = _budget()
+
+        results = await extract_files([archive], budget=budget)
+
+        assert [r.filename for r in results] == ["a.pdf", "inner.pdf"]
+        assert budget.files_skipped == 1
+
+    @pytest.mark.asyncio
+    async def test_selection_must_fit_budget(self, tmp_dir: Path) -> None:
+        archive = _create_7z(tmp_dir, "big.7z", {
+            "a.pdf": os.urandom(600 * 1024),
+            "b.pdf": os.urandom(600 * 1024),
+        })
+        events: list[tuple[str, dict]] = []
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(get_settings(), "archive_max_total_mb", 1)
+            results = await extract_files([archive], on_event=lambda t, d: events.append((t, d)))
+
+        assert results == []
+        assert [(d["archive"], d["limit"]) for _, d in events] == [("big.7z", "total_bytes")]
+
+
+# ── Tests: In-memory members ─────────────────────────────────────────────────
+
+
+class TestInMemoryMembers:
+    """Small members of memory-parseable formats are returned as buffers, never written."""
+
+    @pytest.mark.asyncio
+    async def test_small_documents_stay_in_memory(self, tmp_dir: Path) -> None:
+        zip_path = _create_zip(tmp_dir, "docs.zip", {
+            "spec.pdf": b"%PDF small",
+            "big.pdf": os.urandom(32 * 1024),
+            "scan.png": b"png bytes",
+        })
+        dest = tmp_dir / "output"
+        dest.mkdir()
+        budget = _budget(memory_member_max=16 * 1024, memory_max=1024 * 1024)
+
+        results = await _extract_zip(zip_path, dest, budget=budget)
+
+        spec, big, scan = results
+        assert (spec.filename, spec.in_memory, spec.data) == ("spec.pdf", True, b"%PDF small")
+        assert not spec.path.exists()
+        assert not big.in_memory and big.path.exists()  # over the member limit
+        assert not scan.in_memory and scan.path.exists()  # images need a path for OCR
+        assert (budget.files_in_memory, budget.bytes_in_memory) == (1, 10)
+        assert budget.files_written == 3  # in-memory members still count
+
+    @pytest.mark.asyncio
+    async def test_total_memory_cap_spills_to_disk(self, tmp_dir: Path) -> None:
+        zip_path = _create_zip(tmp_dir, "docs.zip", {
+            "a.docx": os.urandom(600),
+            "b.docx": os.urandom(600),
+        })
+        dest = tmp_dir / "output"
+        dest.mkdir()
+        budget = _budget(memory_member_max=1024, memory_max=1000)
+
+        results = await _extract_zip(zip_path, dest, budget=budget)
+
+        assert [r.in_memory for r in results] == [True, False]
+        assert results[1].path.exists()
+        assert budget.bytes_in_memory == 600
+
+    @pytest.mark.asyncio
+    async def test_settings_enable_memory_for_uploads(self, tmp_dir: Path, monkeypatch) -> None:
+        monkeypatch.setattr(get_settings(), "archive_memory_member_kb", 64)
+        zip_path = _create_zip(tmp_dir, "docs.zip", {"a.pdf": b"a", "b.xlsx": b"b"})
+        work_dir = tmp_dir / "work"
+
+        results = await extract_files([zip_path], work_dir=work_dir)
+
+        assert [(r.filename, r.data) for r in results] == [("a.pdf", b"a"), ("b.xlsx", b"b")]
+        assert not [p for p in work_dir.rglob("*") if p.is_file()]
+
+    def test_spill_writes_planned_path(self, tmp_dir: Path) -> None:
+        source = DocumentSource("a.pdf", tmp_dir / "nested" / "a.pdf", b"%PDF")
+        assert source.spill().read_bytes() == b"%PDF"
+        assert not source.in_memory and source.size == 4
+
+
+# ── Tests: Worker threads and ordering ───────────────────────────────────────
+
+
+class TestConcurrentExtraction:
+    """Decompression runs off the event loop; results keep archive order."""
+
+    @pytest.mark.asyncio
+    async def test_members_decompress_in_worker_threads(self, tmp_dir: Path) -> None:
+        zip_path = _create_zip(tmp_dir, "docs.zip", {"a.pdf": b"a", "b.pdf": b"b"})
+        loop_thread = threading.get_ident()
+        seen: list[int] = []
+        original = zip_extractor._copy_member
+
+        def recording_copy(*args, **kwargs):
+            seen.append(threading.get_ident())
+            return original(*args, **kwargs)
+
+        with patch.object(zip_extractor, "_copy_member", side_effect=recording_copy):
+            results = await extract_files([zip_path])
+
+        assert len(results) == 2
+        assert len(seen) == 2 and loop_thread not in seen
+
+    @pytest.mark.asyncio
+    async def test_order_kept_when_members_finish_out_of_order(self, tmp_dir: Path) -> None:
+        inner = io.BytesIO()
+        with zipfile.ZipFile(inner, "w") as zf:
+            zf.writestr("c.pdf", b"c")
+            zf.writestr("d.pdf", b"d")
+        zip_path = _create_zip(tmp_dir, "outer.zip", {
+            "a.pdf": b"a",
+            "b.pdf": b"b",
+            "inner.zip": inner.getvalue(),
+            "e.pdf": b"e",
+        })
+        original = zip_extractor._copy_member
+
+        def slow_first_copy(src, target_path, *args, **kwargs):
+            # Earlier members finish last
+            time.sleep({"a.pdf": 0.06, "b.pdf": 0.04, "inner.zip": 0.02}.get(target_path.name, 0))
+            return original(src, target_path, *args, **kwargs)
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(get_settings(), "archive_workers", 4)
+            with patch.object(zip_extractor, "_copy_member", side_effect=slow_first_copy):
+                results = await extract_files([zip_path])
+
+        assert [r.filename for r in results] == ["a.pdf", "b.pdf", "c.pdf", "d.pdf", "e.pdf"]
+
+    @pytest.mark.asyncio
+    async def test_limit_events_arrive_on_loop_thread(self, tmp_dir: Path) -> None:
+        zip_path = _create_zip(tmp_dir, "many.zip", {f"{i}.pdf": b"x" for i in range(3)})
+        loop_thread = threading.get_ident()
+        threads: list[int] = []
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(get_settings(), "archive_max_files", 2)
+            results = await extract_files(
+                [zip_path], on_event=lambda t, d: threads.append(threading.get_ident()),
+            )
+
+        assert len(results) == 2
+        assert threads == [loop_thread]
+
+
 # ── Tests: Edge cases ────────────────────────────────────────────────────────
 
 
@@ -612,5 +914,5 @@ class TestEdgeCases:
 
         # Both should be extracted (to different paths), both named "report.pdf"
         assert len(results) == 2
-        paths = [r[0] for r in results]
+        paths = [r.path for r in results]
         assert paths[0] != paths[1]  # Different file paths
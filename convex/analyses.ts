@@ -11,12 +11,16 @@ export const create = mutation({
     model: v.string(),
     status: v.string(),
     user_id: v.optional(v.id("users")),
+    fingerprint: v.optional(v.string()),
+    params_json: v.optional(v.any()),
   },
   handler: async (ctx, args) => {
     return await ctx.db.insert("analyses", {
       model: args.model,
       status: args.status,
       user_id: args.user_id,
+      fingerprint: args.fingerprint,
+      params_json: args.params_json,
       events_json: [],
     });
   },
@@ -32,6 +36,7 @@ export const update = mutation({
     metrics_json: v.optional(v.any()),
     error: v.optional(v.string()),
     completed_at: v.optional(v.number()),
+    fingerprint: v.optional(v.string()),
   },
   handler: async (ctx, args) => {
     const { id, ...fields } = args;
@@ -124,6 +129,24 @@ export const appendEvent = mutation({
   },
 });
 
+export const appendEvents = mutation({
+  args: {
+    id: v.string(),
+    events: v.array(v.any()),
+  },
+  handler: async (ctx, args) => {
+    const docId = ctx.db.normalizeId("analyses", args.id);
+    if (!docId) throw new Error(`Invalid analysis ID: ${args.id}`);
+
+    const doc = await ctx.db.get(docId);
+    if (!doc) throw new Error(`Analysis ${args.id} not found`);
+
+    const events = doc.events_json ?? [];
+    events.push(...args.events);
+    await ctx.db.patch(docId, { events_json: events });
+  },
+});
+
 export const getEvents = query({
   args: {
     id: v.string(),
@@ -158,3 +181,21 @@ export const listByUser = query({
     return page.map((doc) => ({ ...doc, _id: doc._id.toString() }));
   },
 });
+
+export const findCompletedByFingerprint = query({
+  args: {
+    fingerprint: v.string(),
+    user_id: v.optional(v.id("users")),
+  },
+  handler: async (ctx, args) => {
+    const matches = await ctx.db
+      .query("analyses")
+      .withIndex("by_fingerprint", (q) => q.eq("fingerprint", args.fingerprint))
+      .order("desc")
+      .collect();
+    const doc = matches.find(
+      (m) => m.status === "completed" && m.user_id === args.user_id,
+    );
+    return doc ? { ...doc, _id: doc._id.toString() } : null;
+  },
+});
@@ -22,9 +22,12 @@ export default defineSchema({
     events_json: v.optional(v.array(v.any())),
     error: v.optional(v.string()),
     completed_at: v.optional(v.number()),
+    fingerprint: v.optional(v.string()), // upload content hashes + analysis settings
+    params_json: v.optional(v.any()), // analysis_type, custom_instructions, thinking, origin
   })
     .index("by_status", ["status"])
-    .index("by_user", ["user_id"]),
+    .index("by_user", ["user_id"])
+    .index("by_fingerprint", ["fingerprint"]),
 
   // ── Analysis documents ──
   analysis_documents: defineTable({
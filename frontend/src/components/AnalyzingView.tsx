@@ -51,12 +51,20 @@ function formatTime(sec: number) {
 function formatEvent(e: { event: string; data: any }) {
   const type = e.data?.event_type || e.event;
   switch (type) {
+    case 'archive_limit':
+      return {
+        badge: 'event-badge-error',
+        label: 'ARCHIVE',
+        detail: `${e.data.member || e.data.archive} — viršyta riba (${e.data.limit})${e.data.stopped ? ', išpakavimas sustabdytas' : ', praleista'}`,
+      };
     case 'file_parsed':
       return { badge: 'event-badge-parse', label: 'PARSED', detail: e.data.filename };
     case 'extraction_started':
       return { badge: 'event-badge-extract', label: 'EXTRACT', detail: `${e.data.filename} — pradėta` };
     case 'extraction_completed':
       return { badge: 'event-badge-extract', label: 'EXTRACT', detail: `${e.data.filename} — baigta` };
+    case 'ocr_progress':
+      return { badge: 'event-badge-extract', label: 'OCR', detail: `${e.data.filename} — ${e.data.pages_done}/${e.data.pages_total} psl.` };
     case 'aggregation_started':
       return { badge: 'event-badge-aggregate', label: 'AGGREGATE', detail: 'Kryžminė analizė pradėta' };
     case 'aggregation_completed':
@@ -69,6 +77,12 @@ function formatEvent(e: { event: string; data: any }) {
       return { badge: 'event-badge-metrics', label: 'METRICS', detail: e.data.message || 'Atnaujinta' };
     case 'error':
       return { badge: 'event-badge-error', label: 'ERROR', detail: e.data.message || e.data.error || 'Klaida' };
+    case 'analysis_resumed':
+      return { badge: 'event-badge-status', label: 'RESUME', detail: 'Tęsiama nuo paskutinio išsaugoto taško' };
+    case 'analysis_amended':
+      return { badge: 'event-badge-status', label: 'AMEND', detail: 'Patikslinimas — nagrinėjami tik pakeisti dokumentai' };
+    case 'analysis_reused':
+      return { badge: 'event-badge-status', label: 'REUSE', detail: 'Tie patys dokumentai jau išanalizuoti — rezultatai perimti' };
     case 'status_change':
       return { badge: 'event-badge-status', label: 'STATUS', detail: e.data.new_status || 'Pasikeitė' };
     default:
@@ -78,9 +92,11 @@ function formatEvent(e: { event: string; data: any }) {
 
 /** Route event types to step indices */
 const EVENT_STEP_MAP: Record<string, number> = {
+  archive_limit: 0,
   file_parsed: 0,
   extraction_started: 1,
   extraction_completed: 1,
+  ocr_progress: 1,
   aggregation_started: 2,
   aggregation_completed: 2,
   evaluation_started: 3,
@@ -249,6 +265,13 @@ export default function AnalyzingView({ analysisId, error, reviewMode, onComplet
     [currentStatus, activeIdx],
   );
 
+  // Position in the analysis scheduler queue (latest status event while PENDING)
+  const queueInfo = useMemo(() => {
+    if (currentStatus !== 'PENDING') return null;
+    const last = [...events].reverse().find((e) => e.event === 'status');
+    return last?.data?.queue_position != null ? last.data : null;
+  }, [events, currentStatus]);
+
   // All displayable events (all 9 types)
   const displayEvents = events
     .filter((e) => e.data?.event_type || e.event === 'status')
@@ -353,6 +376,12 @@ export default function AnalyzingView({ analysisId, error, reviewMode, onComplet
           )}
         </div>
       )}
+      {queueInfo && (
+        <p className="text-[12px] text-surface-400 mb-2 px-1">
+          Eilėje: {queueInfo.queue_position + 1} vieta
+          {queueInfo.eta_seconds != null && <> · pradžia po ~{formatTime(queueInfo.eta_seconds)}</>}
+        </p>
+      )}
       <div className="rounded-[6px] bg-surface-800/55 border border-surface-600/30 overflow-hidden py-2 space-y-3">
       {steps.map((step, i) => {
         const Icon = step.icon;